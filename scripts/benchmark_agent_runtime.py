@@ -0,0 +1,77 @@
+"""
+Benchmark of per-run overhead: building the agent graph on every run (what
+run_kfm_agent does without a runtime) vs a KFMAgentRuntime that builds once.
+
+By default the real factory (create_kfm_agent_graph) is used, which needs the
+LLM, memory and config dependencies. --synthetic compiles a graph with the same
+topology and trivial nodes instead, which isolates the LangGraph compile and the
+runtime's own bookkeeping.
+
+Usage:
+    python scripts/benchmark_agent_runtime.py --runs 50
+    python scripts/benchmark_agent_runtime.py --runs 200 --synthetic
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langgraph.graph import StateGraph, END
+
+from src.kfm_agent import KFMAgentRuntime, close_components, create_kfm_agent_graph
+from src.state_types import KFMAgentState
+
+
+def create_synthetic_graph():
+    builder = StateGraph(KFMAgentState)
+    builder.add_node("monitor", lambda state: {"performance_data": {"latency": 0.1}})
+    builder.add_node("decide", lambda state: {"kfm_action": {"action": "keep", "component": "c"}})
+    builder.add_node("execute", lambda state: {"result": {"ok": True}})
+    builder.add_node("reflect", lambda state: {"done": True})
+    builder.add_node("fallback", lambda state: {})
+    builder.set_entry_point("monitor")
+    builder.add_edge("monitor", "decide")
+    builder.add_conditional_edges("decide", lambda state: "execute", {"fallback": "fallback", "execute": "execute"})
+    builder.add_edge("execute", "reflect")
+    builder.add_edge("fallback", "reflect")
+    builder.add_conditional_edges("reflect", lambda state: END)
+    return builder.compile(), {}
+
+
+def per_run(label: str, runs: int, func) -> None:
+    start = time.perf_counter()
+    for i in range(runs):
+        func(i)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<30} {elapsed / runs * 1000:>9.2f} ms/run  ({runs} runs)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark per-run overhead of the agent runtime')
+    parser.add_argument('--runs', type=int, default=50)
+    parser.add_argument('--synthetic', action='store_true', help='Use a trivial graph instead of the real factory')
+    args = parser.parse_args()
+
+    factory = create_synthetic_graph if args.synthetic else create_kfm_agent_graph
+
+    def rebuild_each_run(i):
+        app, components = factory()
+        try:
+            app.invoke({"input": {"text": f"run {i}"}, "task_name": "bench", "done": False})
+        finally:
+            close_components(components)
+
+    runtime = KFMAgentRuntime(graph_factory=factory, auto_reload=False)
+    start = time.perf_counter()
+    runtime.run({"text": "warm"}, task_name="bench")
+    print(f"{'runtime first build + run':<30} {(time.perf_counter() - start) * 1000:>9.2f} ms")
+
+    per_run("rebuild on every run", args.runs, rebuild_each_run)
+    per_run("shared runtime", args.runs, lambda i: runtime.run({"text": f"run {i}"}, task_name="bench"))
+    runtime.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Cold-start time of src/compile_application.py with and without the compilation cache.
+
+Each measurement is a fresh process, so interpreter start, imports, graph build
+and validation are all included. "uncached" passes --no-cache; "cached" runs after
+one warm-up run has written the artifact for the current fingerprint, so the
+export is served from the artifact without building the graph.
+
+--lookup-only skips the subprocesses and times just the cache lookup (fingerprint
+over the graph sources + artifact load), which is what a cached start pays
+instead of building and validating the graph.
+
+Usage:
+    python scripts/benchmark_compilation_cache.py --runs 5
+    python scripts/benchmark_compilation_cache.py --lookup-only
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from src.compilation_cache import GraphCompilationCache, compute_graph_fingerprint
+
+
+def time_process(args, runs: int) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        completed = subprocess.run([sys.executable, os.path.join(ROOT, "src", "compile_application.py")] + args,
+                                   cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        elapsed = time.perf_counter() - start
+        if completed.returncode != 0:
+            raise SystemExit(f"compile_application failed:\n{completed.stderr[-2000:]}")
+        best = min(best, elapsed)
+    return best
+
+
+def lookup_only(runs: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        cache = GraphCompilationCache(directory)
+        fingerprint = compute_graph_fingerprint({}, False)
+        cache.store(fingerprint, {"nodes": [], "edges": [], "conditional_edges": [], "entry_point": None},
+                    {"valid": True, "issues": []})
+        start = time.perf_counter()
+        for _ in range(runs):
+            cache.load(compute_graph_fingerprint({}, False))
+        print(f"fingerprint + artifact load: {(time.perf_counter() - start) / runs * 1000:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark compile_application cold start with the compilation cache')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--lookup-only', action='store_true', help='Only time the cache lookup, in-process')
+    args = parser.parse_args()
+
+    if args.lookup_only:
+        lookup_only(max(args.runs, 100))
+        return
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        common = ["--output-dir", output_dir]
+        uncached = time_process(common + ["--no-cache"], args.runs)
+        time_process(common, 1)  # Warm-up run writes the artifact
+        cached = time_process(common, args.runs)
+    print(f"{'uncached (build + validate)':<30} {uncached:>7.2f} s")
+    print(f"{'cached artifact':<30} {cached:>7.2f} s")
+
+
+if __name__ == "__main__":
+    main()
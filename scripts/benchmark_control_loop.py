@@ -0,0 +1,75 @@
+"""
+Benchmark of per-decision overhead: re-invoking a compiled graph once per decision
+(what continuous optimization needed before the loop mode) vs one invocation that
+iterates reflect -> loop -> monitor under a ControlLoop.
+
+Both variants use a synthetic graph with the KFM topology and trivial nodes, so the
+numbers isolate LangGraph invocation and state setup from the LLM and module work.
+
+Usage:
+    python scripts/benchmark_control_loop.py --iterations 500
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langgraph.graph import StateGraph, END
+
+from src.core.control_loop import ControlLoop, ControlLoopConfig, LOOP_NODE
+from src.state_types import KFMAgentState
+
+
+def create_synthetic_graph(loop=None):
+    builder = StateGraph(KFMAgentState)
+    builder.add_node("monitor", lambda state: {"performance_data": {"latency": 0.1}})
+    builder.add_node("decide", lambda state: {"kfm_action": {"action": "keep", "component": "c"}})
+    builder.add_node("execute", lambda state: {"result": {"ok": True}})
+    builder.add_node("reflect", lambda state: {"done": True})
+    builder.set_entry_point("monitor")
+    builder.add_edge("monitor", "decide")
+    builder.add_edge("decide", "execute")
+    builder.add_edge("execute", "reflect")
+    if loop is None:
+        builder.add_conditional_edges("reflect", lambda state: END)
+    else:
+        builder.add_node(LOOP_NODE, loop.runnable)
+        builder.add_edge("reflect", LOOP_NODE)
+        builder.add_conditional_edges(LOOP_NODE, loop.route, {"monitor": "monitor", "end": END})
+    return builder.compile()
+
+
+def initial_state(i):
+    return {"input": {"text": f"run {i}"}, "task_name": "bench", "done": False,
+            "loop_iteration_started_at": time.perf_counter()}
+
+
+def report(label: str, iterations: int, elapsed: float) -> None:
+    print(f"{label:<28} {elapsed / iterations * 1e6:>9.1f} us/iteration  ({iterations / elapsed:,.0f} iterations/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark per-iteration overhead of the control-loop mode')
+    parser.add_argument('--iterations', type=int, default=500)
+    args = parser.parse_args()
+
+    app = create_synthetic_graph()
+    start = time.perf_counter()
+    for i in range(args.iterations):
+        app.invoke(initial_state(i))
+    report("re-invoke per decision", args.iterations, time.perf_counter() - start)
+
+    loop = ControlLoop(ControlLoopConfig(max_iterations=args.iterations, stable_iterations=None))
+    loop_app = create_synthetic_graph(loop)
+    start = time.perf_counter()
+    final = loop_app.invoke(initial_state(0), config=loop.graph_config())
+    report("control loop", final["loop_iteration"], time.perf_counter() - start)
+    metrics = loop.metrics()
+    print(f"loop metrics: rate {metrics['loop_rate_hz']:,.0f} Hz, "
+          f"iteration p50 {metrics['iteration_seconds_p50'] * 1e6:.0f} us, stop reasons {metrics['stop_reasons']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark of DependencyResolver: full resolution vs incremental re-resolution.
+
+Builds a synthetic layered graph (each module depends on a few modules of lower
+layers, each module has several versions), resolves it once from scratch, then
+measures re-resolution after single-module changes: a new version of a leaf
+module, a new version of a widely used base module, and removing a version.
+
+Usage:
+    python scripts/benchmark_dependency_resolution.py --modules 3000 --versions 3
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.dependency_resolver import DependencyResolver
+from src.core.discovery import ModuleDependency, ModuleMetadata
+
+
+def make_meta(index: int, version: str, deps) -> ModuleMetadata:
+    return ModuleMetadata(
+        module_name=f"m{index:05d}", version=version, entry_point=f"plugins.m{index:05d}",
+        source_file_path=Path(f"/synthetic/m{index:05d}.module.yaml"), cached_at_mtime=0.0,
+        dependencies=[ModuleDependency(f"m{dep:05d}", ">=1.0,<2.0") for dep in deps],
+    )
+
+
+def build(modules: int, versions: int, fan_out: int, seed: int) -> Dict[str, Dict[str, ModuleMetadata]]:
+    rng = random.Random(seed)
+    available: Dict[str, Dict[str, ModuleMetadata]] = {}
+    for i in range(modules):
+        deps = rng.sample(range(i), min(i, fan_out)) if i else []
+        available[f"m{i:05d}"] = {f"1.{v}": make_meta(i, f"1.{v}", deps) for v in range(versions)}
+    return available
+
+
+def timed(func, repeat: int = 1) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark incremental dependency resolution')
+    parser.add_argument('--modules', type=int, default=3000)
+    parser.add_argument('--versions', type=int, default=3, help='Versions per module')
+    parser.add_argument('--fan-out', type=int, default=3, help='Dependencies per module')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    available = build(args.modules, args.versions, args.fan_out, args.seed)
+    nodes = args.modules * args.versions
+    print(f"{args.modules} modules x {args.versions} versions = {nodes} nodes")
+
+    full = timed(lambda: DependencyResolver().resolve(available), repeat=3)
+    print(f"{'full resolution':<40} {full * 1000:>9.1f} ms")
+
+    resolver = DependencyResolver()
+    resolver.resolve(available)
+    print(f"{'unchanged input':<40} {timed(lambda: resolver.resolve(available)) * 1000:>9.1f} ms")
+
+    last = args.modules - 1
+    scenarios = [
+        (f"new version of leaf m{last:05d}", last),
+        ("new version of base m00000", 0),
+    ]
+    for label, index in scenarios:
+        name = f"m{index:05d}"
+        deps = [int(dep.name[1:]) for dep in next(iter(available[name].values())).dependencies]
+        available[name]["1.99"] = make_meta(index, "1.99", deps)
+        elapsed = timed(lambda: resolver.resolve(available))
+        print(f"{label:<40} {elapsed * 1000:>9.1f} ms  ({resolver.last_reselected} modules re-selected)")
+
+    del available[f"m{last:05d}"]["1.99"]
+    elapsed = timed(lambda: resolver.resolve(available))
+    print(f"{'remove that leaf version again':<40} {elapsed * 1000:>9.1f} ms  ({resolver.last_reselected} modules re-selected)")
+
+    assert resolver.resolve(available) == DependencyResolver().resolve(available)
+
+
+if __name__ == "__main__":
+    main()
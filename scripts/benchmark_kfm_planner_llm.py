@@ -31,23 +31,27 @@ except ImportError:
             print("Placeholder StateMonitor: get_performance_data")
             return {}
 
-# LangChain components - Import all potential models
+# LangChain components. Provider SDKs are loaded by KFMPlannerLlm on demand, and the
+# response cache (langchain-community) is only needed for live runs.
 try:
-    from langchain_google_genai import ChatGoogleGenerativeAI
-    from langchain_openai import ChatOpenAI
-    from langchain_cerebras import ChatCerebras
     from langchain_core.prompts import ChatPromptTemplate
     from langchain_core.output_parsers import JsonOutputParser
-    from langchain_community.cache import InMemoryCache, SQLiteCache
-    from langchain.globals import set_llm_cache
 except ImportError as e:
     print(f"Error importing a LangChain component: {e}")
-    print("Please ensure langchain-google-genai, langchain-openai, langchain-cerebras, langchain-core, langchain-community, and langchain are installed.")
+    print("Please ensure langchain-core is installed.")
     sys.exit(1)
 
+import argparse
+import asyncio
+import statistics
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from src.core.component_registry import ComponentRegistry
+from src.core.local_chat_model import rule_based_kfm_decision
+
 # Import KFMDecision and KFMPlannerLlm from src.core
 try:
-    from src.core.kfm_planner_llm import KFMDecision, KFMPlannerLlm
+    from src.core.kfm_planner_llm import KFMDecision, KFMPlannerLlm, build_components_prompt_fragment
     print("Successfully imported KFMDecision and KFMPlannerLlm from src.core.kfm_planner_llm")
 except ImportError as e:
     print(f"CRITICAL ERROR: Could not import KFMDecision or KFMPlannerLlm from src.core.kfm_planner_llm: {e}")
@@ -203,11 +207,11 @@ scenarios = [
         "components": {"comp_a": {"accuracy": 0.01, "latency": 50}},
         "expected_outcome": {"action": "marry", "component": "comp_a"}
     },
-    { # KFMPlannerLlm currently returns kill for missing reqs, reason "LLM chain failed..."
+    {
         "name": "test_incomplete_requirements_no_latency",
         "requirements": {"min_accuracy": 0.9}, # Missing max_latency
         "components": {"comp_a": {"accuracy": 0.95, "latency": 50}},
-        "expected_outcome": {"action": "kill", "component": None} # Or specific reasoning
+        "expected_outcome": {"action": "kill", "component": None}
     }
 ]
 
@@ -216,8 +220,149 @@ def format_component_data(components: Dict[str, Any]) -> str:
         return "No components available."
     return "\n".join([f"{name}: Acc={data.get('accuracy', 'N/A')}, Lat={data.get('latency', 'N/A')}" for name, data in components.items()])
 
+def reference_kfm_decision(requirements: Dict[str, Any], components: Dict[str, Any]) -> Dict[str, Any]:
+    """The system prompt's rules (the local LLM tier's rules mode), in the scenarios' expected_outcome format."""
+    decision = rule_based_kfm_decision(requirements, components)
+    return {"action": decision["action"].lower(), "component": decision["component"]}
+
+def synthetic_fleet_scenario(size: int = 200, seed: int = 7) -> Dict[str, Any]:
+    """A large fleet where most components are dominated, to show prompt savings at scale."""
+    import random
+    rng = random.Random(seed)
+    components = {
+        f"comp_{i:04d}": {"accuracy": round(rng.uniform(0.5, 0.99), 3), "latency": round(rng.uniform(10, 300), 1)}
+        for i in range(size)
+    }
+    return {
+        "name": f"synthetic_fleet_{size}",
+        "requirements": {"min_accuracy": 0.9, "max_latency": 100},
+        "components": components,
+    }
+
+def report_prompt_pruning(scenario_list: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Reports tokens saved by Pareto pruning and checks decision equivalence (no LLM needed)."""
+    print("\n--- Prompt Size (Pareto pruning) ---")
+    totals = {"tokens_before": 0, "tokens_after": 0, "mismatches": 0}
+    for scenario_data in scenario_list + [synthetic_fleet_scenario()]:
+        components = {
+            name: {**data, "supports_reversibility": data.get("supports_reversibility", False)}
+            for name, data in scenario_data["components"].items()
+        }
+        requirements = scenario_data["requirements"]
+        pruned_json, stats = build_components_prompt_fragment(components, requirements, prune=True)
+        pruned_components = json.loads(pruned_json)
+        equivalent = reference_kfm_decision(requirements, components) == reference_kfm_decision(requirements, pruned_components)
+        if not equivalent:
+            totals["mismatches"] += 1
+        totals["tokens_before"] += stats["estimated_tokens_before"]
+        totals["tokens_after"] += stats["estimated_tokens_after"]
+        print(f"  {scenario_data['name']}: {stats['components_before']} -> {stats['components_after']} components, "
+              f"~{stats['estimated_tokens_saved']} tokens saved, decision equivalent: {equivalent}")
+    saved = totals["tokens_before"] - totals["tokens_after"]
+    pct = (saved / totals["tokens_before"] * 100) if totals["tokens_before"] else 0.0
+    print(f"Total component tokens: ~{totals['tokens_before']} -> ~{totals['tokens_after']} (~{saved} saved, {pct:.1f}%)")
+    print(f"Decision mismatches after pruning: {totals['mismatches']}")
+    return totals
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(pct / 100 * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+def run_offline_load_test(decisions: int = 1000, concurrency: int = 64, mode: str = "rules",
+                          latency_ms: float = 50.0, jitter_ms: float = 10.0, error_rates: str = "",
+                          recordings_path: Optional[str] = None, seed: int = 7) -> Dict[str, Any]:
+    """Drives decide_kfm_action concurrently against the local LLM tier (no network access).
+
+    Uses the KFM_LOCAL_LLM_* provider configuration, so the planner builds its normal
+    prompt | llm | parser chain with LocalKfmChatModel in place of a live provider.
+    """
+    os.environ["KFM_LOCAL_LLM_MODE"] = mode
+    os.environ["KFM_LOCAL_LLM_LATENCY_MS"] = str(latency_ms)
+    os.environ["KFM_LOCAL_LLM_LATENCY_JITTER_MS"] = str(jitter_ms)
+    os.environ["KFM_LOCAL_LLM_ERROR_RATES"] = error_rates
+    os.environ["KFM_LOCAL_LLM_SEED"] = str(seed)
+    if recordings_path:
+        os.environ["KFM_LOCAL_LLM_RECORDINGS"] = recordings_path
+
+    planner = KFMPlannerLlm(component_registry=MagicMock(spec=ComponentRegistry),
+                            snapshot_storage_path=tempfile.mkdtemp(prefix="kfm_bench_snapshots_"))
+    planner.snapshot_service = None # Measure the decision path, not snapshot I/O
+    workload = [scenarios[i % len(scenarios)] for i in range(decisions)]
+
+    # Chain calls get their own pool, sized to the load, rather than the loop's default executor
+    planner.llm_executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="kfm-bench-llm")
+
+    async def drive():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one(scenario_data):
+            async with semaphore:
+                start = time.perf_counter()
+                result = await planner.decide_kfm_action(
+                    task_name=scenario_data["name"],
+                    task_requirements=scenario_data["requirements"],
+                    all_components_performance=scenario_data["components"]
+                )
+                return time.perf_counter() - start, scenario_data, result
+
+        start = time.perf_counter()
+        outcomes = await asyncio.gather(*(one(s) for s in workload))
+        return outcomes, time.perf_counter() - start
+
+    try:
+        outcomes, elapsed = asyncio.run(drive())
+    finally:
+        planner.llm_executor.shutdown(wait=False)
+    latencies = sorted(latency for latency, _, _ in outcomes)
+    errors = agreements = 0
+    for _, scenario_data, result in outcomes:
+        expected = reference_kfm_decision(scenario_data["requirements"], scenario_data["components"])
+        if result.get("error"):
+            errors += 1
+            continue
+        if result["action"].lower() == expected["action"] and result.get("component") == expected["component"]:
+            agreements += 1
+    summary = {
+        "decisions": decisions,
+        "concurrency": concurrency,
+        "elapsed_s": elapsed,
+        "throughput_per_s": decisions / elapsed if elapsed else 0.0,
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p95_ms": _percentile(latencies, 95) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+        "errors": errors,
+        "reference_agreement": agreements,
+    }
+    print("\n--- Offline Load Test (local LLM tier) ---")
+    print(f"Mode: {mode}, injected latency {latency_ms}ms +/- {jitter_ms}ms, error rates: {error_rates or 'none'}")
+    print(f"{decisions} decisions at concurrency {concurrency} in {elapsed:.2f}s "
+          f"({summary['throughput_per_s']:.1f} decisions/s)")
+    print(f"Latency p50/p95/p99: {summary['p50_ms']:.1f} / {summary['p95_ms']:.1f} / {summary['p99_ms']:.1f} ms")
+    print(f"Errors: {errors}, agreement with reference rules: {agreements}/{decisions}")
+    return summary
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description='Benchmark KFMPlannerLlm decisions')
+    parser.add_argument('--offline', action='store_true',
+                        help='Run a concurrent load test against the local LLM tier instead of live providers')
+    parser.add_argument('--mode', choices=['rules', 'replay'], default='rules',
+                        help='Local LLM mode for --offline')
+    parser.add_argument('--recordings', default=None, help='Recordings file for --mode replay')
+    parser.add_argument('--decisions', type=int, default=1000, help='Number of decisions for --offline')
+    parser.add_argument('--concurrency', type=int, default=64, help='Concurrent decisions for --offline')
+    parser.add_argument('--latency-ms', type=float, default=50.0, help='Injected mean LLM latency')
+    parser.add_argument('--jitter-ms', type=float, default=10.0, help='Injected latency std deviation')
+    parser.add_argument('--error-rates', default='',
+                        help='Injected errors as kind=probability pairs, e.g. error=0.02,timeout=0.01,malformed=0.01')
+    return parser.parse_args()
+
 def main(provider_model_str: Optional[str] = None): # Made argument optional
     print(f"Benchmarking KFMPlannerLlm with fallback priority.")
+    report_prompt_pruning(scenarios)
     
     # --- Initialize Caching --- 
     # Cache can be based on the KFMPlannerLlm class or a generic name if desired
@@ -225,20 +370,21 @@ def main(provider_model_str: Optional[str] = None): # Made argument optional
     if not os.path.exists(cache_dir):
         os.makedirs(cache_dir)
     db_path = os.path.join(cache_dir, "kfm_planner_llm_benchmark_cache.sqlite")
-    print(f"Initializing LLM cache (SQLiteCache at {db_path})...")
-    set_llm_cache(SQLiteCache(database_path=db_path))
-    print("LLM Caching is ACTIVE.")
+    try:
+        from langchain_community.cache import SQLiteCache
+        from langchain.globals import set_llm_cache
+        print(f"Initializing LLM cache (SQLiteCache at {db_path})...")
+        set_llm_cache(SQLiteCache(database_path=db_path))
+        print("LLM Caching is ACTIVE.")
+    except ImportError:
+        print("langchain-community not installed; running without the LLM cache.")
 
-    # --- Mock StateMonitor and initialize KFMPlannerLlm from src.core ---
-    mock_state_monitor = MagicMock(spec=StateMonitor)
-    
-    # Define the priority list for KFMPlannerLlm
-    # This is the fallback chain we want to test.
-    llm_priority = ["cerebras", "google", "openai_3_5"] 
-    print(f"Initializing KFMPlannerLlm from src.core with priority: {llm_priority}")
+    # --- Initialize KFMPlannerLlm from src.core ---
+    # The fallback chain is built from the configured provider tiers (API keys or KFM_LOCAL_LLM_MODE).
     try:
-        planner = KFMPlannerLlm(state_monitor=mock_state_monitor, priority=llm_priority)
-        print("KFMPlannerLlm initialized successfully.")
+        planner = KFMPlannerLlm(component_registry=MagicMock(spec=ComponentRegistry))
+        llm_priority = list(planner.llm_configs.keys())
+        print(f"KFMPlannerLlm initialized successfully with priority: {llm_priority}")
     except Exception as e:
         print(f"CRITICAL ERROR: Failed to initialize KFMPlannerLlm from src.core: {e}")
         sys.exit(1)
@@ -266,11 +412,11 @@ def main(provider_model_str: Optional[str] = None): # Made argument optional
         log_message_prefix = f"  {i+1}/{len(scenarios)}: {task_name}"
 
         try:
-            decision_obj = planner.decide_kfm_action(
+            decision_obj = KFMDecision(**asyncio.run(planner.decide_kfm_action(
                 task_name=task_name,
-                requirements=requirements,
-                components=components
-            )
+                task_requirements=requirements,
+                all_components_performance=components
+            )))
             end_time = time.time()
             latency_ms = (end_time - start_time) * 1000
             total_latency_scenario += latency_ms
@@ -280,7 +426,7 @@ def main(provider_model_str: Optional[str] = None): # Made argument optional
 
             # Validation
             is_pass = True
-            if decision_obj.action != expected["action"]:
+            if decision_obj.action.lower() != expected["action"]:
                 is_pass = False
             # Only check component if expected action is not 'kill'
             if expected["action"] != "kill" and decision_obj.component != expected["component"]:
@@ -371,5 +517,10 @@ def main(provider_model_str: Optional[str] = None): # Made argument optional
 
 
 if __name__ == "__main__":
-    # Removed the provider_model_arg, main will use the hardcoded priority for KFMPlannerLlm
-    main()
\ No newline at end of file
+    args = parse_args()
+    if args.offline:
+        run_offline_load_test(decisions=args.decisions, concurrency=args.concurrency, mode=args.mode,
+                              latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                              error_rates=args.error_rates, recordings_path=args.recordings)
+    else:
+        main()
\ No newline at end of file
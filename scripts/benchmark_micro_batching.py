@@ -0,0 +1,116 @@
+"""
+Throughput/latency benchmark of ExecutionEngine with and without micro-batching.
+
+The synthetic component models vectorizable inference: every call pays a fixed
+overhead (kernel launch, model call) plus a small per-item cost, so one call with N
+items is much cheaper than N calls with one item each.
+
+Usage:
+    python scripts/benchmark_micro_batching.py --requests 2000 --concurrency 1 8 32 128
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import Any, Dict, List
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.component_executor import ComponentExecutorPool, ExecutorConfig
+from src.core.component_registry import ComponentRegistry
+from src.core.execution_engine import ExecutionEngine
+from src.state_types import ActionType
+
+CALL_OVERHEAD_S = 0.002
+PER_ITEM_S = 0.0001
+
+
+def single_component(params: Dict[str, Any]):
+    time.sleep(CALL_OVERHEAD_S + PER_ITEM_S)
+    return {"score": params["x"] * 2}, 0.9
+
+
+def batch_component(batch: List[Dict[str, Any]]):
+    time.sleep(CALL_OVERHEAD_S + PER_ITEM_S * len(batch))
+    return [({"score": params["x"] * 2}, 0.9) for params in batch]
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _engine(batched: bool, workers: int, max_batch_size: int, max_batch_wait_ms: float) -> ExecutionEngine:
+    registry = MagicMock(spec=ComponentRegistry)
+    registry.get_default_component_key = MagicMock(return_value="model")
+    registry.list_components = MagicMock(return_value={"model": single_component})
+    registry.get_component = MagicMock(return_value=single_component)
+    pool = ComponentExecutorPool(default_config=ExecutorConfig(max_concurrency=workers, max_queue_depth=100000))
+    engine = ExecutionEngine(registry, executor_pool=pool)
+    engine.logger.disabled = True
+    if batched:
+        engine.enable_batching("model", batch_component, max_batch_size=max_batch_size,
+                               max_batch_wait=max_batch_wait_ms / 1000.0)
+    return engine
+
+
+def run_level(batched: bool, requests: int, concurrency: int, workers: int,
+              max_batch_size: int, max_batch_wait_ms: float) -> Dict[str, float]:
+    engine = _engine(batched, workers, max_batch_size, max_batch_wait_ms)
+    latencies: List[float] = []
+
+    async def drive():
+        remaining = iter(range(requests))
+
+        async def client():
+            for i in remaining:
+                start = time.perf_counter()
+                result = await engine.execute(ActionType.NO_ACTION, None, {"x": i}, {})
+                if result["status"] != "success":
+                    raise RuntimeError(result)
+                latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+
+    start = time.perf_counter()
+    asyncio.run(drive())
+    elapsed = time.perf_counter() - start
+    engine.executor_pool.shutdown()
+    latencies.sort()
+    return {
+        "throughput_rps": requests / elapsed,
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p95_ms": _percentile(latencies, 95) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark micro-batched component execution')
+    parser.add_argument('--requests', type=int, default=2000, help='Requests per concurrency level')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32, 128], help='Concurrent callers')
+    parser.add_argument('--workers', type=int, default=4, help='Executor threads for the component')
+    parser.add_argument('--max-batch-size', type=int, default=32)
+    parser.add_argument('--max-batch-wait-ms', type=float, default=2.0)
+    return parser.parse_args()
+
+
+def main():
+    import logging
+    logging.disable(logging.INFO)
+    args = parse_args()
+    print(f"{'concurrency':>11} {'mode':>8} {'req/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for concurrency in args.concurrency:
+        for batched in (False, True):
+            stats = run_level(batched, args.requests, concurrency, args.workers,
+                              args.max_batch_size, args.max_batch_wait_ms)
+            print(f"{concurrency:>11} {'batched' if batched else 'single':>8} {stats['throughput_rps']:>10.1f} "
+                  f"{stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
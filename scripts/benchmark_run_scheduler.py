@@ -0,0 +1,115 @@
+"""
+Throughput and latency benchmark of AgentRunScheduler with the local LLM stand-in.
+
+Each run goes through a small LangGraph (monitor -> decide -> snapshot) where the
+decide node calls LocalKfmChatModel in rules mode with injected latency under the
+scheduler's "llm" limiter, and the snapshot node simulates a store write under the
+"snapshot" limiter. The same workload is run at several concurrency levels.
+
+Usage:
+    python scripts/benchmark_run_scheduler.py --runs 500 --llm-latency-ms 50 --llm-capacity 16
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional, TypedDict
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_core.messages import HumanMessage
+from langgraph.graph import StateGraph, END
+
+from src.core.local_chat_model import LocalKfmChatModel
+from src.core.run_scheduler import AgentRunScheduler
+
+COMPONENTS = {
+    "analyze_fast": {"accuracy": 0.7, "latency": 0.2},
+    "analyze_balanced": {"accuracy": 0.85, "latency": 0.5},
+    "analyze_deep": {"accuracy": 0.95, "latency": 1.2},
+}
+
+
+class BenchState(TypedDict, total=False):
+    run_id: str
+    original_correlation_id: str
+    input: Dict[str, Any]
+    task_requirements: Dict[str, float]
+    kfm_action: Optional[Dict[str, Any]]
+    done: bool
+
+
+def build_app(scheduler_ref: List[AgentRunScheduler], llm: LocalKfmChatModel, snapshot_ms: float):
+    def monitor(state):
+        return {"task_requirements": {"min_accuracy": 0.8, "max_latency": 0.6 + (hash(state["run_id"]) % 10) / 10}}
+
+    async def decide(state):
+        req = state["task_requirements"]
+        prompt = (f"Min Accuracy: {req['min_accuracy']}\nMax Latency: {req['max_latency']}\n"
+                  f"Components: {json.dumps(COMPONENTS)}")
+        async with scheduler_ref[0].limiter("llm"):
+            message = await llm.ainvoke([HumanMessage(content=prompt)])
+        return {"kfm_action": json.loads(message.content)}
+
+    async def snapshot(state):
+        async with scheduler_ref[0].limiter("snapshot"):
+            await asyncio.sleep(snapshot_ms / 1000)
+        return {"done": True}
+
+    builder = StateGraph(BenchState)
+    builder.add_node("monitor", monitor)
+    builder.add_node("decide", decide)
+    builder.add_node("snapshot", snapshot)
+    builder.set_entry_point("monitor")
+    builder.add_edge("monitor", "decide")
+    builder.add_edge("decide", "snapshot")
+    builder.add_edge("snapshot", END)
+    return builder.compile()
+
+
+async def run_level(args, concurrency: int) -> Dict[str, Any]:
+    llm = LocalKfmChatModel(mode="rules", latency_ms=args.llm_latency_ms,
+                            latency_jitter_ms=args.llm_latency_ms / 5, seed=1)
+    scheduler_ref: List[AgentRunScheduler] = []
+    app = build_app(scheduler_ref, llm, args.snapshot_ms)
+    scheduler = AgentRunScheduler(app.ainvoke, max_concurrency=concurrency, max_queue_size=args.queue_size,
+                                  capacities={"llm": args.llm_capacity, "snapshot": args.snapshot_capacity})
+    scheduler_ref.append(scheduler)
+    start = time.perf_counter()
+    for i in range(args.runs):
+        await scheduler.submit({"input": {"text": f"request {i}"}}, priority=i % 3)
+    await scheduler.join()
+    wall = time.perf_counter() - start
+    stats = scheduler.stats()
+    stats["wall"] = wall
+    stats["llm_peak_waiting"] = scheduler.limiter("llm").peak_waiting
+    return stats
+
+
+async def main_async(args):
+    print(f"{args.runs} runs, LLM {args.llm_latency_ms:.0f} ms (capacity {args.llm_capacity}), "
+          f"snapshot {args.snapshot_ms:.0f} ms (capacity {args.snapshot_capacity})")
+    print(f"{'concurrency':>11} {'runs/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9} {'failed':>7} {'queue waits':>12}")
+    for concurrency in args.concurrency:
+        stats = await run_level(args, concurrency)
+        print(f"{concurrency:>11} {stats['throughput']:>9.1f} {stats['latency_p50'] * 1000:>9.1f} "
+              f"{stats['latency_p95'] * 1000:>9.1f} {stats['latency_max'] * 1000:>9.1f} "
+              f"{stats['failed']:>7} {stats['backpressure_waits']:>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark concurrent agent runs on the run scheduler')
+    parser.add_argument('--runs', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32, 128])
+    parser.add_argument('--queue-size', type=int, default=1000)
+    parser.add_argument('--llm-latency-ms', type=float, default=50.0)
+    parser.add_argument('--llm-capacity', type=int, default=16)
+    parser.add_argument('--snapshot-ms', type=float, default=5.0)
+    parser.add_argument('--snapshot-capacity', type=int, default=8)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
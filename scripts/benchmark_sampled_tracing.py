@@ -0,0 +1,109 @@
+"""
+Per-node overhead of tracing modes versus tracing disabled.
+
+Each run passes a KFM-shaped state through a chain of traced nodes (monitor,
+decide, execute, reflect) inside trace_run(), the way the agent runtime does.
+The nodes themselves do almost nothing, so the numbers are the tracing cost:
+
+- disabled: trace_node returns straight into the node
+- full: the existing tracer (state summaries, diffs, RSS, unbounded history)
+- sampled: SampledTracer at the given rates; export is not included, since it
+  only runs when a trace is read
+
+Usage:
+    python scripts/benchmark_sampled_tracing.py --runs 2000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import tracing
+from src.tracing import trace_node, trace_run
+
+
+@trace_node
+def monitor(state):
+    return {"performance_data": {"latency": 0.1, "accuracy": 0.92, "cost": 3.0}}
+
+
+@trace_node
+def decide(state):
+    return {"kfm_action": {"action": "Marry", "component": "analyze_balanced", "reason": "balanced"}}
+
+
+@trace_node
+def execute(state):
+    return {"result": {"analysis": "ok", "items": list(range(20))}, "execution_performance": {"latency": 0.1}}
+
+
+@trace_node
+def reflect(state):
+    return {"reflection_output": "Balanced component kept.", "done": True}
+
+
+NODES = (monitor, decide, execute, reflect)
+
+
+def initial_state(i):
+    return {
+        "input": {"text": f"request {i}", "tokens": list(range(50))},
+        "task_name": "bench",
+        "task_requirements": {"min_accuracy": 0.8, "max_latency": 1.0},
+        "active_component": "analyze_balanced",
+        "done": False,
+    }
+
+
+def run_all(runs: int, repeats: int) -> float:
+    """Best-of-`repeats` time for `runs` runs."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for i in range(runs):
+            with trace_run():
+                state = initial_state(i)
+                for node in NODES:
+                    state = {**state, **node(state)}
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark tracing overhead per node call')
+    parser.add_argument('--runs', type=int, default=2000)
+    parser.add_argument('--rates', type=float, nargs='+', default=[0.01, 0.1, 1.0])
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+    calls = args.runs * len(NODES)
+
+    tracing.set_trace_enabled(False)
+    run_all(args.runs, 1)  # Warm-up
+    baseline = run_all(args.runs, args.repeats)
+    results = [("disabled", baseline)]
+
+    tracing.set_trace_enabled(True)
+    tracing.reset_trace_history()
+    results.append(("full", run_all(args.runs, 1)))
+    tracing.reset_trace_history()
+
+    for rate in args.rates:
+        tracer = tracing.enable_sampled_tracing(sample_rate=rate, seed=0)
+        results.append((f"sampled {rate:g}", run_all(args.runs, args.repeats)))
+        spans = tracer.stats()["buffered_spans"]
+        export_start = time.perf_counter()
+        tracer.export()
+        export_ms = (time.perf_counter() - export_start) * 1000
+        print(f"sampled {rate:g}: {spans} spans buffered, export {export_ms:.1f} ms")
+    tracing.disable_sampled_tracing()
+
+    print(f"{'mode':<16} {'us/node':>9} {'overhead us/node':>17}")
+    for label, elapsed in results:
+        per_call = elapsed / calls * 1e6
+        print(f"{label:<16} {per_call:>9.2f} {per_call - baseline / calls * 1e6:>17.2f}")
+
+
+if __name__ == "__main__":
+    main()
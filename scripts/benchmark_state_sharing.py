@@ -0,0 +1,94 @@
+"""
+Memory and latency of per-node deep copies vs structurally shared state versions.
+
+Simulates one agent run over a large `input` payload: five node steps each derive
+the next state version (monitor, decide, execute, reflect, and fallback-like
+updates) and snapshot it as JSON. "deepcopy" is the previous node pattern
+(copy.deepcopy(dict(state)) + json.dumps); "shared" freezes the input once and
+uses evolve()/evolve_in() + encode_state_json().
+
+Usage:
+    python scripts/benchmark_state_sharing.py --input-mb 5 --runs 5
+"""
+import argparse
+import copy
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.state_sharing import encode_state_json, evolve, evolve_in, freeze
+
+STEPS = [
+    ("monitor_entry", {"current_task_requirements": {"min_accuracy": 0.8, "max_latency": 1.0}}),
+    ("decision_entry", {"kfm_action": {"action": "Marry", "component": "analyze_balanced"}}),
+    ("execute_pre_action", {"result": {"summary": "ok"}, "execution_performance": {"latency": 0.4}}),
+    ("execute_post_action", {"done": True}),
+    ("reflect", {"reflection_output": "Placeholder reflection"}),
+]
+
+
+def make_input(megabytes: float) -> dict:
+    rows = int(megabytes * 1024 * 1024 / 120)
+    return {
+        "text": "lorem ipsum " * 200,
+        "documents": [{"id": i, "title": f"doc {i}", "body": "x" * 64, "tags": ["a", "b"]} for i in range(rows)],
+    }
+
+
+def run_deepcopy(input_data: dict) -> list:
+    state = {"input": copy.deepcopy(input_data), "task_name": "bench", "last_snapshot_ids": {}}
+    versions = []
+    for snapshot_name, updates in STEPS:
+        state = copy.deepcopy(dict(state))
+        state.update(updates)
+        json.dumps(state, default=str, sort_keys=True)
+        state["last_snapshot_ids"][snapshot_name] = f"snap-{snapshot_name}"
+        versions.append(state)
+    return versions
+
+
+def run_shared(input_data: dict) -> list:
+    state = {"input": freeze(input_data), "task_name": "bench", "last_snapshot_ids": {}}
+    versions = []
+    for snapshot_name, updates in STEPS:
+        state = evolve(state, **updates)
+        encode_state_json(state)
+        evolve_in(state, "last_snapshot_ids", snapshot_name, f"snap-{snapshot_name}")
+        versions.append(state)
+    return versions
+
+
+def measure(func, input_data: dict, runs: int):
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        func(input_data)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    versions = func(input_data)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del versions
+    return best, retained, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark structurally shared agent state')
+    parser.add_argument('--input-mb', type=float, default=5.0, help='Approximate size of the input payload')
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    input_data = make_input(args.input_mb)
+    print(f"input payload ~{len(json.dumps(input_data)) / 1e6:.1f} MB as JSON, {len(STEPS)} node steps with a snapshot each")
+    print(f"{'':<10} {'run time':>10} {'retained':>12} {'peak':>12}")
+    for label, func in (("deepcopy", run_deepcopy), ("shared", run_shared)):
+        best, retained, peak = measure(func, input_data, args.runs)
+        print(f"{label:<10} {best * 1000:>8.1f} ms {retained / 1e6:>9.1f} MB {peak / 1e6:>9.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
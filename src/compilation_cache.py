@@ -0,0 +1,244 @@
+# src/compilation_cache.py
+"""
+Persisted graph compilation artifacts.
+
+KFMGraphCompiler validates the graph structure on every process start, and
+export_compiled_graph only ever wrote a node list. A compilation artifact records
+the validated structure (nodes with their metadata, edges, conditional edges,
+entry point) and the validation result under a fingerprint of everything the
+structure depends on:
+
+- the structural compiler config (logging and cache settings are excluded),
+- debug mode,
+- the contents of the modules that define and build the graph and its nodes
+  (including the component factory and the compiler),
+- the verification config the factory builds the components from,
+- the installed LangGraph version.
+
+Because the fingerprint does not need a built graph, a cached artifact can be
+loaded before (or instead of) building one. When a graph is built anyway, its
+structure digest is compared with the artifact's before the cached validation
+is trusted.
+"""
+import datetime
+import functools
+import hashlib
+import inspect
+import json
+import os
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.logger import setup_logger
+
+cache_logger = setup_logger('CompilationCache')
+
+CACHE_FORMAT_VERSION = 1
+DEFAULT_CACHE_DIRECTORY = '.kfm_cache/compiled_graphs'
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Files whose contents determine the graph's nodes and edges, or whether it builds at all
+GRAPH_SOURCE_FILES = (
+    'src/kfm_agent.py',
+    'src/langgraph_nodes.py',
+    'src/state_types.py',
+    'src/debugging.py',
+    'src/core/control_loop.py',
+    'src/factory.py',
+    'src/compiler.py',
+    # Locations load_verification_config() searches, as seen from the project root
+    'verification_config.yaml',
+    'config/verification_config.yaml',
+)
+
+# Compiler config keys that do not affect the graph structure
+NON_STRUCTURAL_CONFIG_KEYS = frozenset({
+    'enable_enhanced_logging', 'log_level', 'log_directory',
+    'compilation_cache', 'cache_directory',
+})
+
+
+def _langgraph_version() -> str:
+    try:
+        from importlib.metadata import version
+        return version('langgraph')
+    except Exception:
+        return 'unknown'
+
+
+def compute_graph_fingerprint(
+    config: Optional[Dict[str, Any]],
+    debug_mode: bool,
+    source_files: Iterable[str] = GRAPH_SOURCE_FILES,
+    root: str = PROJECT_ROOT
+) -> str:
+    """Cache key for the graph a compiler with this config would build.
+
+    Args:
+        config: Compiler config; non-structural keys are ignored
+        debug_mode: Whether the debug graph is built
+        source_files: Graph-defining modules, relative to `root`
+        root: Directory the source files are resolved against
+
+    Returns:
+        str: Hex digest
+    """
+    structural_config = {k: v for k, v in (config or {}).items() if k not in NON_STRUCTURAL_CONFIG_KEYS}
+    digest = hashlib.sha256()
+    digest.update(json.dumps({
+        "format": CACHE_FORMAT_VERSION,
+        "config": structural_config,
+        "debug_mode": bool(debug_mode),
+        "langgraph": _langgraph_version(),
+    }, sort_keys=True, default=str).encode('utf-8'))
+    for relative_path in source_files:
+        digest.update(relative_path.encode('utf-8'))
+        try:
+            with open(os.path.join(root, relative_path), 'rb') as f:
+                digest.update(hashlib.sha256(f.read()).digest())
+        except OSError:
+            digest.update(b'<missing>')
+    return digest.hexdigest()
+
+
+def _callable_name(runnable: Any) -> Optional[str]:
+    func = getattr(runnable, 'func', None) or getattr(runnable, 'afunc', None) or runnable
+    while isinstance(func, functools.partial):
+        func = func.func
+    qualname = getattr(func, '__qualname__', None)
+    if not isinstance(qualname, str):
+        return type(runnable).__name__
+    module = getattr(func, '__module__', None)
+    return f"{module}.{qualname}" if isinstance(module, str) else qualname
+
+
+def _is_async(runnable: Any) -> bool:
+    if getattr(runnable, 'afunc', None) is not None and getattr(runnable, 'func', None) is None:
+        return True
+    func = getattr(runnable, 'func', None) or runnable
+    return inspect.iscoroutinefunction(func)
+
+
+def describe_graph(graph: Any) -> Dict[str, Any]:
+    """Structure and node metadata of a graph, as plain JSON-compatible data.
+
+    Accepts a StateGraph builder or a compiled graph (whose builder is described).
+
+    Args:
+        graph: The graph to describe
+
+    Returns:
+        Dict[str, Any]: 'nodes', 'edges', 'conditional_edges' and 'entry_point'
+    """
+    spec = getattr(graph, 'builder', None)
+    if not isinstance(getattr(spec, 'nodes', None), dict):
+        spec = graph
+    nodes: List[Dict[str, Any]] = []
+    raw_nodes = getattr(spec, 'nodes', None)
+    for name in (raw_nodes.keys() if isinstance(raw_nodes, dict) else []):
+        if name == '__start__':
+            continue
+        node_spec = raw_nodes[name]
+        runnable = getattr(node_spec, 'runnable', node_spec)
+        metadata = getattr(node_spec, 'metadata', None)
+        nodes.append({
+            "name": name,
+            "callable": _callable_name(runnable),
+            "async": _is_async(runnable),
+            "metadata": metadata if isinstance(metadata, dict) else {},
+        })
+
+    raw_edges = getattr(spec, 'edges', None)
+    edges = sorted([list(edge) for edge in raw_edges] if isinstance(raw_edges, (set, frozenset, list, tuple)) else [])
+    entry_point = next((target for source, target in edges if source == '__start__'), None)
+    if entry_point is None:
+        declared = getattr(graph, 'entry_point', None)
+        entry_point = declared if isinstance(declared, str) else None
+    branches = getattr(spec, 'branches', None)
+    conditional_edges = sorted(branches.keys()) if isinstance(branches, dict) else []
+    return {
+        "nodes": nodes,
+        "edges": edges,
+        "conditional_edges": conditional_edges,
+        "entry_point": entry_point,
+    }
+
+
+def structure_digest(structure: Dict[str, Any]) -> str:
+    """Digest of a describe_graph() result."""
+    return hashlib.sha256(json.dumps(structure, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+class GraphCompilationCache:
+    """Directory of compilation artifacts, one JSON file per fingerprint."""
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIRECTORY):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+
+    def path_for(self, fingerprint: str) -> str:
+        return os.path.join(self.directory, f"{fingerprint}.json")
+
+    def load(self, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """Returns the artifact stored under `fingerprint`, or None.
+
+        Unreadable or outdated artifacts count as misses.
+        """
+        path = self.path_for(fingerprint)
+        try:
+            with open(path, 'r') as f:
+                artifact = json.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError) as e:
+            cache_logger.warning(f"Ignoring unreadable compilation artifact {path}: {e}")
+            self.misses += 1
+            return None
+        if (not isinstance(artifact, dict) or artifact.get("format") != CACHE_FORMAT_VERSION
+                or artifact.get("fingerprint") != fingerprint):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return artifact
+
+    def store(self, fingerprint: str, structure: Dict[str, Any],
+              validation_result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Writes an artifact atomically; returns it, or None if it could not be written."""
+        artifact = {
+            "format": CACHE_FORMAT_VERSION,
+            "fingerprint": fingerprint,
+            "created_at": datetime.datetime.now().isoformat(),
+            "structure": structure,
+            "structure_digest": structure_digest(structure),
+            "validation_result": validation_result,
+        }
+        path = self.path_for(fingerprint)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp_path, 'w') as f:
+                json.dump(artifact, f, indent=2, default=str)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            cache_logger.warning(f"Could not write compilation artifact {path}: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return None
+        return artifact
+
+    def clear(self) -> int:
+        """Deletes all artifacts; returns how many were removed."""
+        removed = 0
+        if not os.path.isdir(self.directory):
+            return removed
+        for name in os.listdir(self.directory):
+            if name.endswith('.json'):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
@@ -47,6 +47,8 @@ def parse_args():
     parser.add_argument("--export", "-e", help="Export compiled graph to specified path")
     parser.add_argument("--output-dir", "-o", default="./compiled_graph", 
                         help="Directory to save outputs when not specifying explicit paths")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Rebuild and re-validate the graph even if a compilation artifact is cached")
     return parser.parse_args()
 
 def main():
@@ -62,9 +64,24 @@ def main():
     if args.config:
         config = load_config(args.config)
     
+    if args.no_cache:
+        config['compilation_cache'] = False
+    
     # Create compiler
     compiler = KFMGraphCompiler(config)
     
+    # Export straight from a cached artifact when nothing needs the built graph
+    if not args.visualize:
+        artifact = compiler.load_cached_artifact(debug_mode=args.debug)
+        if artifact is not None:
+            export_path = args.export or os.path.join(args.output_dir, "compiled_graph.json")
+            if not compiler.export_artifact(artifact, export_path):
+                app_logger.warning("Failed to export graph")
+                return 1
+            app_logger.info(f"Graph exported to {export_path} from cached artifact {artifact['fingerprint'][:12]}")
+            app_logger.info(f"Compilation statistics: {len(artifact['structure']['nodes'])} nodes (cached)")
+            return 0
+    
     # Compile the graph
     try:
         app_logger.info(f"Starting compilation (debug_mode={args.debug})")
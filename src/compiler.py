@@ -6,6 +6,10 @@ from langgraph.graph import StateGraph
 from src.state_types import KFMAgentState
 from src.kfm_agent import create_kfm_agent_graph, create_debug_kfm_agent_graph
 from src.logger import setup_logger
+from src.compilation_cache import (
+    GraphCompilationCache, DEFAULT_CACHE_DIRECTORY,
+    compute_graph_fingerprint, describe_graph, structure_digest
+)
 import traceback
 import json
 import datetime
@@ -33,6 +37,11 @@ class KFMGraphCompiler:
         self.enable_enhanced_logging = self.config.get('enable_enhanced_logging', True)
         self.log_level = self.config.get('log_level', 'INFO')
         self.log_directory = self.config.get('log_directory', 'logs/compiler')
+        self.cache = None
+        if self.config.get('compilation_cache', True):
+            self.cache = GraphCompilationCache(self.config.get('cache_directory', DEFAULT_CACHE_DIRECTORY))
+        self.last_artifact: Optional[Dict[str, Any]] = None
+        self.last_cache_hit = False
         
         # Create log directory if it doesn't exist
         if self.enable_enhanced_logging:
@@ -93,9 +102,9 @@ class KFMGraphCompiler:
             
             compiler_logger.info("Graph compiled successfully")
             
-            # Step 2: Validate the graph structure
+            # Step 2: Validate the graph structure, unless a matching artifact is cached
             step_start = datetime.datetime.now()
-            validation_result = self.validate_graph_structure(kfm_app)
+            validation_result = self._validate_with_cache(kfm_app, debug_mode)
             step_times["validation"] = (datetime.datetime.now() - step_start).total_seconds()
             
             if not validation_result['valid']:
@@ -113,7 +122,8 @@ class KFMGraphCompiler:
                     "duration": duration,
                     "success": True,
                     "step_times": step_times,
-                    "validation_result": validation_result
+                    "validation_result": validation_result,
+                    "cache_hit": self.last_cache_hit
                 }
                 self._log_compilation_event("compilation_complete", completion_log)
                 
@@ -149,6 +159,46 @@ class KFMGraphCompiler:
             
             raise RuntimeError(error_msg) from e
 
+    def graph_fingerprint(self, debug_mode: bool = False) -> str:
+        """Fingerprint of the graph this compiler builds (see src.compilation_cache)."""
+        return compute_graph_fingerprint(self.config, debug_mode)
+
+    def load_cached_artifact(self, debug_mode: bool = False) -> Optional[Dict[str, Any]]:
+        """Load the validated structure and node metadata without building the graph.
+
+        Args:
+            debug_mode (bool): Whether to look up the debug graph
+
+        Returns:
+            Optional[Dict[str, Any]]: The cached artifact, or None if caching is disabled
+                or nothing matching is cached
+        """
+        if self.cache is None:
+            return None
+        artifact = self.cache.load(self.graph_fingerprint(debug_mode))
+        if artifact is not None:
+            compiler_logger.info(f"Loaded cached compilation artifact {artifact['fingerprint'][:12]}")
+        return artifact
+
+    def _validate_with_cache(self, graph: StateGraph, debug_mode: bool) -> Dict[str, Any]:
+        """Validation result for a freshly built graph, reused from the cache when the
+        cached structure matches the built one."""
+        self.last_cache_hit = False
+        if self.cache is None:
+            self.last_artifact = None
+            return self.validate_graph_structure(graph)
+        fingerprint = self.graph_fingerprint(debug_mode)
+        structure = describe_graph(graph)
+        artifact = self.cache.load(fingerprint)
+        if artifact is not None and artifact.get("structure_digest") == structure_digest(structure):
+            compiler_logger.info(f"Graph structure matches cached artifact {fingerprint[:12]}; skipping validation")
+            self.last_cache_hit = True
+            self.last_artifact = artifact
+            return artifact["validation_result"]
+        validation_result = self.validate_graph_structure(graph)
+        self.last_artifact = self.cache.store(fingerprint, structure, validation_result)
+        return validation_result
+
     def _log_compilation_event(self, event_type: str, event_data: Dict[str, Any]) -> None:
         """Log a compilation event to a file.
         
@@ -292,14 +342,16 @@ class KFMGraphCompiler:
                     with open(output_path, 'wb') as f:
                         f.write(serialized_graph)
                 else:
-                    # Fallback - create a JSON representation of the graph structure
+                    # Fallback - the graph structure, node metadata and, when this graph
+                    # was the last one compiled, its validation result
                     graph_structure = {
                         "nodes": list(graph.nodes.keys()),
                         "entry_point": getattr(graph, 'entry_point', None),
-                        "export_date": str(os.path.basename(__file__))
+                        "export_date": datetime.datetime.now().isoformat()
                     }
+                    graph_structure.update(self._artifact_export_fields(graph))
                     with open(output_path, 'w') as f:
-                        json.dump(graph_structure, f, indent=2)
+                        json.dump(graph_structure, f, indent=2, default=str)
                     
                 compiler_logger.info("Graph exported successfully")
                 return True
@@ -311,6 +363,49 @@ class KFMGraphCompiler:
             compiler_logger.error(f"Error exporting graph: {str(e)}")
             return False
 
+    def _artifact_export_fields(self, graph: StateGraph) -> Dict[str, Any]:
+        structure = describe_graph(graph)
+        fields = {
+            "structure": structure,
+            "node_metadata": {node["name"]: node for node in structure["nodes"]},
+        }
+        if self.last_artifact is not None and self.last_artifact.get("structure_digest") == structure_digest(structure):
+            fields["fingerprint"] = self.last_artifact["fingerprint"]
+            fields["validation_result"] = self.last_artifact["validation_result"]
+        return fields
+
+    def export_artifact(self, artifact: Dict[str, Any], output_path: str) -> bool:
+        """Export a cached compilation artifact in the export_compiled_graph format.
+
+        Args:
+            artifact (Dict[str, Any]): Artifact from load_cached_artifact()
+            output_path (str): Path to save the exported graph
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        compiler_logger.info(f"Exporting cached compilation artifact to {output_path}")
+        structure = artifact["structure"]
+        graph_structure = {
+            "nodes": ["__start__"] + [node["name"] for node in structure["nodes"]],
+            "entry_point": structure["entry_point"],
+            "export_date": datetime.datetime.now().isoformat(),
+            "structure": structure,
+            "node_metadata": {node["name"]: node for node in structure["nodes"]},
+            "fingerprint": artifact["fingerprint"],
+            "validation_result": artifact["validation_result"],
+        }
+        try:
+            dir_path = os.path.dirname(output_path)
+            if dir_path:
+                os.makedirs(dir_path, exist_ok=True)
+            with open(output_path, 'w') as f:
+                json.dump(graph_structure, f, indent=2, default=str)
+            return True
+        except Exception as e:
+            compiler_logger.error(f"Error exporting graph: {str(e)}")
+            return False
+
 # Convenient function to create and compile in one step
 def compile_kfm_graph(config: Optional[Dict[str, Any]] = None, 
                      debug_mode: bool = False) -> Tuple[StateGraph, Dict[str, Any]]:
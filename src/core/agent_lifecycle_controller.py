@@ -13,6 +13,8 @@ from src.core.reversibility.snapshot_service import SnapshotService
 from src.core.component_registry import ComponentRegistry
 from src.core.execution_engine import ExecutionEngine
 from src.core.kfm_planner_llm import KFMPlannerLlm
+from src.core.run_scheduler import AgentRunScheduler
+from src.tracing import trace_run
 
 lifecycle_logger = logging.getLogger(__name__)
 # Ensure logs propagate to allow capture by testing frameworks like pytest's caplog,
@@ -53,6 +55,8 @@ class AgentLifecycleController:
         self.current_task = None
         self.kfm_app: Optional[Any] = None
         self.agent_components: Optional[Dict[str, Any]] = None
+        self.run_scheduler: Optional[AgentRunScheduler] = None
+        self._graph_init_lock = asyncio.Lock()
 
     def _get_graph_creation_functions(self) -> Tuple[Optional[Callable], Optional[Callable]]:
         """Calls the stored factories to get the actual graph and config creation functions."""
@@ -65,17 +69,22 @@ class AgentLifecycleController:
 
     async def _ensure_graph_initialized(self):
         """Ensures the graph is initialized. Called by methods that need the graph."""
-        if self.kfm_app is None:
-            graph_creation_fn, config_creation_fn = self._get_graph_creation_functions()
-            if graph_creation_fn is None or config_creation_fn is None:
-                raise RuntimeError("Graph creation functions not set during AgentLifecycleController initialization.")
-            
-            graph_config = await config_creation_fn(self.snapshot_service, self.component_registry, self.execution_engine, self.kfm_planner_instance)
-            self.kfm_app = await graph_creation_fn(graph_config)
+        if self.kfm_app is not None:
+            return
+        async with self._graph_init_lock: # Concurrent scheduled runs share one initialization
             if self.kfm_app is None:
-                raise RuntimeError("KFM Agent graph (kfm_app) could not be initialized by the lifecycle controller.")
+                graph_creation_fn, config_creation_fn = self._get_graph_creation_functions()
+                if graph_creation_fn is None or config_creation_fn is None:
+                    raise RuntimeError("Graph creation functions not set during AgentLifecycleController initialization.")
+            
+                graph_config = await config_creation_fn(self.snapshot_service, self.component_registry, self.execution_engine, self.kfm_planner_instance)
+                self.kfm_app = await graph_creation_fn(graph_config)
+                if self.kfm_app is None:
+                    raise RuntimeError("KFM Agent graph (kfm_app) could not be initialized by the lifecycle controller.")
 
     async def stop_current_run(self, run_id_to_stop: Optional[str] = None) -> bool:
+        if run_id_to_stop and self.run_scheduler and self.run_scheduler.get_run(run_id_to_stop):
+            return await self.stop_run(run_id_to_stop)
         lifecycle_logger.info("Attempting to stop current agent execution task...")
         if self.current_execution_task and not self.current_execution_task.done():
             self.current_execution_task.cancel()
@@ -138,7 +147,8 @@ class AgentLifecycleController:
         # The initial_state for the *current* run is passed directly to _execute_run_internal.
         await self.prepare_for_new_run_with_state(run_id=run_id, restored_state=initial_state) 
 
-        final_state_from_graph = await self._execute_run_internal(initial_graph_state=initial_state)
+        with trace_run(run_id):
+            final_state_from_graph = await self._execute_run_internal(initial_graph_state=initial_state)
         
         if final_state_from_graph is None:
             self.logger.error(f"Agent run (ID: {run_id}) _execute_run_internal returned None. This should not happen.")
@@ -253,3 +263,85 @@ class AgentLifecycleController:
             }
             return KFMAgentState(error=json.dumps(error_payload), done=True)
 
+    # --- Concurrent runs ---
+
+    def get_run_scheduler(self, max_concurrency: int = 32, max_queue_size: int = 1000,
+                          capacities: Optional[Dict[str, int]] = None) -> AgentRunScheduler:
+        """Returns the scheduler for concurrent runs, creating it on first use.
+
+        The arguments only apply when the scheduler is created. `capacities` sets up
+        downstream limiters (e.g. {"llm": 8, "snapshot": 4}); while one is saturated no
+        new runs start. The "llm" limiter is installed on the planner's chain calls and
+        the "snapshot" limiter on the snapshot services' storage writes.
+
+        Scheduled runs share this controller's components, including the engine's
+        active component (see run_scheduler); only their graph state is per run.
+        """
+        if self.run_scheduler is None:
+            self.run_scheduler = AgentRunScheduler(
+                self._execute_scheduled_run,
+                max_concurrency=max_concurrency,
+                max_queue_size=max_queue_size,
+                capacities=capacities
+            )
+            self._install_limiters(self.run_scheduler)
+        return self.run_scheduler
+
+    def _install_limiters(self, scheduler: AgentRunScheduler) -> None:
+        """Routes planner LLM calls and snapshot writes through the scheduler's limiters."""
+        llm_limiter = scheduler.limiters.get("llm")
+        if llm_limiter is not None and self.kfm_planner_instance is not None:
+            self.kfm_planner_instance.llm_limiter = llm_limiter
+        snapshot_limiter = scheduler.limiters.get("snapshot")
+        if snapshot_limiter is not None:
+            # The planner may own a separate SnapshotService for its decision snapshots
+            for service in (self.snapshot_service, getattr(self.kfm_planner_instance, "snapshot_service", None)):
+                if service is not None:
+                    service.capacity_limiter = snapshot_limiter
+
+    async def submit_run(self, initial_state: KFMAgentState, priority: int = 0) -> str:
+        """Queues a run on the scheduler (lower priority runs first) and returns its run_id.
+
+        Unlike start_new_run this does not stop runs already in progress; await the
+        result with `self.run_scheduler.wait(run_id)`.
+        """
+        await self._ensure_graph_initialized()
+        run = await self.get_run_scheduler().submit(dict(initial_state), priority=priority)
+        self.logger.info(f"Queued agent run {run.run_id} with priority {priority}")
+        return run.run_id
+
+    async def stop_run(self, run_id: str) -> bool:
+        """Cancels one scheduled run, queued or running, and waits until it has stopped."""
+        if self.run_scheduler is None:
+            return False
+        stopped = await self.run_scheduler.stop_run(run_id)
+        self.logger.info(f"Stop requested for run {run_id}: {'stopped' if stopped else 'not active'}")
+        return stopped
+
+    async def _execute_scheduled_run(self, initial_graph_state: KFMAgentState) -> KFMAgentState:
+        """Executes one scheduled run with its own LangGraph config (thread_id = run_id)."""
+        run_id = initial_graph_state["run_id"]
+        await self._ensure_graph_initialized()
+        run_config = {"configurable": {"thread_id": run_id}, "metadata": {"langgraph_run_id": run_id}}
+        try:
+            # Node traces of concurrent runs keep their own correlation ID and execution count
+            with trace_run(run_id):
+                final_graph_output = await self.kfm_app.ainvoke(initial_graph_state, config=run_config)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            tb_str = traceback.format_exc()
+            self.logger.error(f"Exception during scheduled agent run {run_id}: {e}\n{tb_str}")
+            error_payload = {
+                "type": "AgentExecutionError",
+                "message": str(e),
+                "category": "FATAL",
+                "severity": 5,
+                "timestamp": datetime.utcnow().isoformat() + "Z",
+                "recoverable": False,
+                "details": {"run_id": run_id, "traceback": tb_str}
+            }
+            return KFMAgentState(error=json.dumps(error_payload), done=True, run_id=run_id)
+        final_state = KFMAgentState(**final_graph_output)
+        final_state.setdefault("done", True)
+        return final_state
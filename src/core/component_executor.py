@@ -0,0 +1,349 @@
+# src/core/component_executor.py
+"""
+Per-component executors for ExecutionEngine.
+
+Each component runs on its own executor instead of the event loop's shared default
+pool, so a slow or CPU-bound component cannot starve the others (bulkheads):
+
+- ``thread``: a dedicated ThreadPoolExecutor with ``max_concurrency`` workers.
+- ``process``: a dedicated ProcessPoolExecutor, for CPU-bound components that would
+  otherwise serialize behind the GIL (the function and its arguments must be picklable).
+- ``inline``: called directly on the event loop thread (for trivial components).
+
+Admission is bounded: at most ``max_concurrency`` calls run and ``max_queue_depth`` more
+wait per component; further calls are rejected with ComponentQueueFullError instead of
+piling up. Each call's queue wait (submission until a worker picks it up) and run time
+are recorded separately, so saturation shows up as growing queue wait rather than as
+an unexplained latency increase.
+
+Deadlines and cancellation: a call exceeding the component's ``timeout`` raises
+ComponentTimeoutError; cancelling the awaiting task (e.g. AgentLifecycleController
+stopping a run) propagates as usual. Either way the call's CancellationToken is set so
+cooperative components can stop early (``current_cancellation_token()``), and a worker
+that is still busy is reclaimed:
+
+- process lanes terminate their worker processes and start a fresh pool (other calls
+  in flight on the same lane fail with BrokenProcessPool);
+- thread lanes cannot kill a thread, so the busy worker is abandoned and the lane gets
+  a fresh thread pool, keeping its capacity. At most ``max_abandoned_workers`` hung
+  threads are abandoned per component. Once that many are hung, new calls are
+  rejected until some finish, and a worker that hangs anyway (a call admitted
+  earlier) stays in its pool, using up lane capacity instead of adding a thread.
+  Sustained timeouts therefore cannot grow the thread count without bound.
+- inline calls run on the event loop thread and cannot be interrupted.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from src.core.streaming_metrics import Ewma, WindowedQuantileSketch
+from src.logger import setup_logger
+
+EXECUTION_MODES = ("thread", "process", "inline")
+
+
+class ComponentQueueFullError(Exception):
+    """Raised when a component's bulkhead has no free slot and its queue is full."""
+    pass
+
+
+class ComponentTimeoutError(TimeoutError):
+    """Raised when a component call exceeds its deadline."""
+    pass
+
+
+class ComponentCancelledError(Exception):
+    """Raised by `CancellationToken.raise_if_cancelled` inside a cancelled component call."""
+    pass
+
+
+class CancellationToken:
+    """Set when the caller stops waiting for a component call (timeout or cancellation)."""
+
+    __slots__ = ("_event",)
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise ComponentCancelledError("Component call was cancelled by its caller")
+
+
+_worker_state = threading.local()
+
+
+def current_cancellation_token() -> Optional[CancellationToken]:
+    """Token of the component call running on this worker thread (None outside thread lanes)."""
+    return getattr(_worker_state, "token", None)
+
+
+@dataclass(frozen=True)
+class ExecutorConfig:
+    """Execution settings for one component.
+
+    Attributes:
+        mode: 'thread', 'process' or 'inline'.
+        max_concurrency: Maximum calls running at once (worker count of the pool).
+        max_queue_depth: Maximum calls waiting for a worker before new calls are rejected.
+        timeout: Deadline in seconds per call, queue wait included (None = no deadline).
+        max_abandoned_workers: Hung threads tolerated after timeouts before rejecting calls.
+    """
+    mode: str = "thread"
+    max_concurrency: int = 4
+    max_queue_depth: int = 32
+    timeout: Optional[float] = None
+    max_abandoned_workers: int = 8
+
+    def __post_init__(self):
+        if self.mode not in EXECUTION_MODES:
+            raise ValueError(f"Unknown execution mode '{self.mode}'. Expected one of {EXECUTION_MODES}")
+        if self.max_concurrency < 1 or self.max_queue_depth < 0:
+            raise ValueError("max_concurrency must be at least 1 and max_queue_depth non-negative")
+        if self.timeout is not None and self.timeout <= 0:
+            raise ValueError("timeout must be positive or None")
+        if self.max_abandoned_workers < 0:
+            raise ValueError("max_abandoned_workers must be non-negative")
+
+
+def _timed_call(func: Callable, args: Tuple[Any, ...],
+                token: Optional[CancellationToken] = None) -> Tuple[float, float, Any]:
+    """Runs func in the worker and returns (wall-clock start, run time, result).
+
+    Wall-clock time is used for the start so queue wait can be computed across processes.
+    """
+    started_at = time.time()
+    if token is not None:
+        token.raise_if_cancelled()  # Timed out while still queued
+        _worker_state.token = token
+    run_start = time.perf_counter()
+    try:
+        result = func(*args)
+    finally:
+        if token is not None:
+            _worker_state.token = None
+    return started_at, time.perf_counter() - run_start, result
+
+
+class _ComponentLane:
+    """Executor, admission counters and timing metrics for one component."""
+
+    def __init__(self, name: str, config: ExecutorConfig):
+        self.name = name
+        self.config = config
+        self.executor: Optional[Executor] = self._new_executor()
+        self.lock = threading.Lock()
+        # Running + queued; the pool has max_concurrency workers, so the first
+        # max_concurrency admitted calls are the running ones
+        self.admitted = 0
+        self.abandoned = 0  # Hung threads left behind by timed-out or cancelled calls
+        self.counters = {"submitted": 0, "rejected": 0, "completed": 0, "failed": 0,
+                         "timeouts": 0, "cancelled": 0, "workers_replaced": 0}
+        self.queue_wait_ewma = Ewma()
+        self.run_time_ewma = Ewma()
+        self.queue_wait_sketch = WindowedQuantileSketch(min_value=1e-6)
+        self.run_time_sketch = WindowedQuantileSketch(min_value=1e-6)
+
+    def _new_executor(self) -> Optional[Executor]:
+        if self.config.mode == "thread":
+            return ThreadPoolExecutor(max_workers=self.config.max_concurrency,
+                                      thread_name_prefix=f"component-{self.name}")
+        if self.config.mode == "process":
+            return ProcessPoolExecutor(max_workers=self.config.max_concurrency)
+        return None
+
+    def admit(self) -> None:
+        with self.lock:
+            self.counters["submitted"] += 1
+            if self.config.max_abandoned_workers and self.abandoned >= self.config.max_abandoned_workers:
+                self.counters["rejected"] += 1
+                raise ComponentQueueFullError(
+                    f"Component '{self.name}' has {self.abandoned} hung workers from timed-out calls")
+            if self.admitted >= self.config.max_concurrency + self.config.max_queue_depth:
+                self.counters["rejected"] += 1
+                raise ComponentQueueFullError(
+                    f"Component '{self.name}' is saturated: {self.config.max_concurrency} running "
+                    f"and {self.config.max_queue_depth} queued")
+            self.admitted += 1
+
+    def reclaim(self, future: Future, outcome: str) -> None:
+        """Frees the worker of a call the caller stopped waiting for ('timeouts' or 'cancelled')."""
+        with self.lock:
+            self.counters[outcome] += 1
+        if future.cancel():
+            return  # Never started; nothing to reclaim
+        if future.done():
+            return
+        with self.lock:
+            if self.config.mode == "thread" and self.abandoned >= self.config.max_abandoned_workers:
+                return  # At the limit: the worker stays in the pool rather than being replaced
+            old, self.executor = self.executor, self._new_executor()
+            self.counters["workers_replaced"] += 1
+            if self.config.mode == "thread":
+                self.abandoned += 1
+        if self.config.mode == "thread":
+            # Outside the lock: runs immediately if the call finished in the meantime
+            future.add_done_callback(self._release_abandoned)
+        else:
+            # ProcessPoolExecutor cannot stop a single task; terminate the lane's workers.
+            # The broken pool fails its other pending calls with BrokenProcessPool.
+            for process in list((getattr(old, "_processes", None) or {}).values()):
+                process.terminate()
+        old.shutdown(wait=False)
+
+    def _release_abandoned(self, _future: Future) -> None:
+        with self.lock:
+            self.abandoned -= 1
+
+    def finish(self, outcome: str, queue_wait: Optional[float], run_time: Optional[float]) -> None:
+        with self.lock:
+            self.admitted -= 1
+            if outcome in ("completed", "failed"):
+                self.counters[outcome] += 1
+            if queue_wait is not None:
+                queue_wait = max(0.0, queue_wait)
+                self.queue_wait_ewma.update(queue_wait)
+                self.queue_wait_sketch.add(queue_wait)
+            if run_time is not None:
+                self.run_time_ewma.update(run_time)
+                self.run_time_sketch.add(run_time)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self.lock:
+            queue_p50, queue_p95, queue_p99 = self.queue_wait_sketch.quantiles()
+            run_p50, run_p95, run_p99 = self.run_time_sketch.quantiles()
+            running = min(self.admitted, self.config.max_concurrency)
+            return {
+                "mode": self.config.mode,
+                "max_concurrency": self.config.max_concurrency,
+                "max_queue_depth": self.config.max_queue_depth,
+                "running": running,
+                "queued": self.admitted - running,
+                "abandoned_workers": self.abandoned,
+                "timeout": self.config.timeout,
+                **self.counters,
+                "queue_wait_ewma": self.queue_wait_ewma.value,
+                "queue_wait_p50": queue_p50,
+                "queue_wait_p95": queue_p95,
+                "queue_wait_p99": queue_p99,
+                "run_time_ewma": self.run_time_ewma.value,
+                "run_time_p50": run_p50,
+                "run_time_p95": run_p95,
+                "run_time_p99": run_p99,
+            }
+
+    def shutdown(self, wait: bool) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(wait=wait)
+
+
+class ComponentExecutorPool:
+    """Routes component calls to per-component executors (see module docstring).
+
+    Components without an explicit configuration get their own lane built from
+    ``default_config``, so they are still isolated from each other.
+    """
+
+    def __init__(self, default_config: Optional[ExecutorConfig] = None,
+                 component_configs: Optional[Dict[str, ExecutorConfig]] = None):
+        self.logger = setup_logger('ComponentExecutorPool')
+        self.default_config = default_config or ExecutorConfig()
+        self._configs: Dict[str, ExecutorConfig] = dict(component_configs or {})
+        self._lanes: Dict[str, _ComponentLane] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, component_name: str, config: ExecutorConfig) -> None:
+        """Sets a component's executor configuration, replacing its lane if one exists.
+
+        Calls already running on a replaced lane finish on the old executor.
+        """
+        with self._lock:
+            self._configs[component_name] = config
+            old = self._lanes.pop(component_name, None)
+        if old is not None:
+            old.shutdown(wait=False)
+        self.logger.info(f"Configured executor for '{component_name}': {config}")
+
+    def get_config(self, component_name: str) -> ExecutorConfig:
+        return self._configs.get(component_name, self.default_config)
+
+    def _lane(self, component_name: str) -> _ComponentLane:
+        lane = self._lanes.get(component_name)
+        if lane is None:
+            with self._lock:
+                lane = self._lanes.get(component_name)
+                if lane is None:
+                    lane = self._lanes[component_name] = _ComponentLane(component_name, self.get_config(component_name))
+        return lane
+
+    async def run(self, component_name: str, func: Callable, *args: Any, timeout: Optional[float] = None) -> Any:
+        """Runs a synchronous component function on the component's executor.
+
+        Args:
+            component_name: Component key selecting the lane.
+            func: Synchronous callable.
+            *args: Arguments for func.
+            timeout: Deadline overriding the component's configured timeout.
+
+        Raises:
+            ComponentQueueFullError: If the component's concurrency and queue limits are reached.
+            ComponentTimeoutError: If the call exceeds its deadline.
+            Exception: Whatever the component function raises.
+        """
+        lane = self._lane(component_name)
+        lane.admit()
+        deadline = timeout if timeout is not None else lane.config.timeout
+        submitted_at = time.time()
+        outcome = "failed"
+        queue_wait = run_time = None
+        try:
+            if lane.executor is None:
+                started_at, run_time, result = _timed_call(func, args)
+            else:
+                token = CancellationToken() if lane.config.mode == "thread" else None
+                future = lane.executor.submit(_timed_call, func, args, token)
+                try:
+                    started_at, run_time, result = await asyncio.wait_for(asyncio.wrap_future(future), deadline)
+                except asyncio.TimeoutError:
+                    outcome = "timeouts"
+                    if token is not None:
+                        token.cancel()
+                    lane.reclaim(future, outcome)
+                    self.logger.warning(f"Component '{component_name}' exceeded its {deadline}s deadline")
+                    raise ComponentTimeoutError(f"Component '{component_name}' timed out after {deadline}s") from None
+                except asyncio.CancelledError:
+                    outcome = "cancelled"
+                    if token is not None:
+                        token.cancel()
+                    lane.reclaim(future, outcome)
+                    raise
+            queue_wait = started_at - submitted_at
+            outcome = "completed"
+            return result
+        finally:
+            lane.finish(outcome, queue_wait, run_time)
+
+    def metrics(self, component_name: Optional[str] = None) -> Dict[str, Any]:
+        """Queue-wait/run-time metrics and counters for one component, or all by name."""
+        if component_name is not None:
+            lane = self._lanes.get(component_name)
+            return lane.metrics() if lane is not None else {}
+        return {name: lane.metrics() for name, lane in list(self._lanes.items())}
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shuts down every component executor."""
+        with self._lock:
+            lanes = list(self._lanes.values())
+            self._lanes.clear()
+        for lane in lanes:
+            lane.shutdown(wait)
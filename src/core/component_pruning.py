@@ -0,0 +1,139 @@
+# src/core/component_pruning.py
+"""
+Pareto-frontier pruning of component candidates before LLM prompt construction.
+
+A component is *dominated* when another component is at least as accurate AND at
+least as fast, and strictly better on one of the two. Under the KFM rules used by
+KFMPlannerLlm (Marry/Fuck tiebreak on highest accuracy, then lowest latency) a
+dominated component can never be the chosen one: whatever requirement it meets,
+its dominator meets as well and wins the tiebreak. Removing dominated components
+therefore shrinks the prompt without changing the decision.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Same rough approximation as src.llm_logging.calculate_performance_metrics
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate for a prompt fragment (characters / 4)."""
+    return int(len(text) / CHARS_PER_TOKEN)
+
+
+def _metrics(info: Dict[str, Any]) -> Optional[Tuple[float, float]]:
+    """Returns (accuracy, latency) or None if either metric is missing/non-numeric."""
+    accuracy = info.get("accuracy")
+    latency = info.get("latency")
+    if isinstance(accuracy, bool) or isinstance(latency, bool):
+        return None
+    if not isinstance(accuracy, (int, float)) or not isinstance(latency, (int, float)):
+        return None
+    return float(accuracy), float(latency)
+
+
+def _is_protected(key: str, protected: Iterable[str]) -> bool:
+    """A key is protected if it equals a protected name or is a version of it ('name@x.y')."""
+    for name in protected:
+        if key == name or key.startswith(f"{name}@"):
+            return True
+    return False
+
+
+def pareto_frontier(components: Dict[str, Dict[str, Any]]) -> List[str]:
+    """
+    Returns the keys of all non-dominated components.
+
+    Components with identical (accuracy, latency) do not dominate each other, so exact
+    ties are all retained; the LLM needs them for the reversibility and alphabetical
+    tiebreakers. Components with missing metrics cannot be ranked and are always kept.
+
+    Runs in O(n log n): sort by accuracy descending, latency ascending, then sweep while
+    tracking the best latency seen at strictly higher accuracy.
+    """
+    unranked: List[str] = []
+    ranked: List[Tuple[float, float, str]] = []
+    for key, info in components.items():
+        m = _metrics(info)
+        if m is None:
+            unranked.append(key)
+        else:
+            ranked.append((m[0], m[1], key))
+
+    ranked.sort(key=lambda item: (-item[0], item[1], item[2]))
+
+    frontier: List[str] = []
+    best_latency_above = float("inf")  # best latency among strictly more accurate components
+    i = 0
+    while i < len(ranked):
+        accuracy = ranked[i][0]
+        # Group of components sharing this accuracy; sorted by latency ascending
+        j = i
+        while j < len(ranked) and ranked[j][0] == accuracy:
+            j += 1
+        group_best_latency = ranked[i][1]
+        if group_best_latency < best_latency_above:
+            for _, latency, key in ranked[i:j]:
+                if latency == group_best_latency:
+                    frontier.append(key)
+            best_latency_above = group_best_latency
+        i = j
+
+    return frontier + unranked
+
+
+def _decision_rank(info: Dict[str, Any], min_accuracy: float, max_latency: float) -> Tuple:
+    """Sort key mirroring the KFM rules: Marry candidates, then Fuck, then the rest."""
+    m = _metrics(info)
+    if m is None:
+        return (3, 0.0, 0.0)
+    accuracy, latency = m
+    meets_acc = accuracy >= min_accuracy
+    meets_lat = latency <= max_latency
+    tier = 0 if (meets_acc and meets_lat) else 1 if (meets_acc or meets_lat) else 2
+    return (tier, -accuracy, latency, not info.get("supports_reversibility", False))
+
+
+def prune_components(
+    components: Dict[str, Dict[str, Any]],
+    requirements: Optional[Dict[str, Any]] = None,
+    active_component: Optional[str] = None,
+    max_components: Optional[int] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Reduces a flat ``{component_key: {"accuracy", "latency", ...}}`` mapping to its Pareto
+    frontier, preserving the original insertion order.
+
+    Args:
+        components: Candidate components keyed by name (or 'name@version').
+        requirements: Task requirements; used only to rank the frontier when capping.
+        active_component: The currently active component. It is always retained so the
+            LLM can reason about keeping or replacing it.
+        max_components: Optional cap on the number of components returned. When the
+            frontier exceeds it, members are kept in KFM decision order (Marry candidates
+            by accuracy/latency first, then Fuck candidates), so the winner survives.
+
+    Returns:
+        A new dict containing the retained components.
+    """
+    if not components:
+        return {}
+
+    keep = set(pareto_frontier(components))
+    protected = [active_component] if active_component else []
+    for key in components:
+        if _is_protected(key, protected):
+            keep.add(key)
+
+    if max_components is not None and len(keep) > max_components:
+        requirements = requirements or {}
+        min_accuracy = requirements.get("min_accuracy", 0.0)
+        max_latency = requirements.get("max_latency", float("inf"))
+        pinned = [k for k in keep if _is_protected(k, protected)]
+        ranked = sorted(
+            (k for k in keep if k not in pinned),
+            key=lambda k: (_decision_rank(components[k], min_accuracy, max_latency), k),
+        )
+        budget = max(max_components - len(pinned), 0)
+        keep = set(pinned) | set(ranked[:budget])
+
+    return {key: info for key, info in components.items() if key in keep}
@@ -1,8 +1,28 @@
 import threading
-from typing import Callable, Dict, List, Optional, Tuple, Any
-from packaging.version import parse as parse_version
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, Optional, Tuple, Any, Union
+from packaging.specifiers import SpecifierSet
 from src.logger import setup_logger
 from .discovery import ModuleMetadata
+from .state_sharing import FrozenDict
+from .version_index import VersionIndex, parse_specifier_cached
+
+
+@dataclass(frozen=True)
+class RegistrySnapshot:
+    """Immutable view of the registry at one generation.
+
+    Attributes:
+        generation: Incremented on every registry write.
+        modules: module_name -> version -> ModuleMetadata (read-only mappings).
+        default_module_key: (module_name, version) of the default module, if any.
+        version_index: module_name -> sorted, pre-parsed VersionIndex of its versions.
+    """
+    generation: int
+    modules: Mapping[str, Mapping[str, ModuleMetadata]]
+    default_module_key: Optional[Tuple[str, str]]
+    version_index: Mapping[str, VersionIndex]
 
 class ComponentRegistry:
     """Registry for managing KFM analysis components and dynamically loaded modules.
@@ -10,6 +30,12 @@ class ComponentRegistry:
     Note: ComponentRegistry manages the currently active default component
     but does not track whether that component was activated via 'Marry' or 'Fuck'.
     That contextual information is managed by KFMAgentState.
+
+    Writers mutate under the lock and then publish a new RegistrySnapshot (copy-on-write);
+    readers use the current snapshot without locking. get_all_component_details is
+    built once per snapshot generation and shared by all readers until the next write.
+    Versions are parsed once at registration into a per-module VersionIndex, so latest
+    version and specifier lookups bisect instead of re-parsing and sorting.
     """
 
     def __init__(self):
@@ -17,6 +43,11 @@ class ComponentRegistry:
         self._modules: Dict[str, Dict[str, ModuleMetadata]] = {}
         self._default_module_key: Optional[Tuple[str, str]] = None
         self._lock = threading.RLock()
+        self._generation = 0
+        self._version_indexes: Dict[str, VersionIndex] = {}
+        self._snapshot = RegistrySnapshot(generation=0, modules=MappingProxyType({}), default_module_key=None,
+                                          version_index=MappingProxyType({}))
+        self._details_cache: Optional[Tuple[int, Dict[str, Any]]] = None
         self._event_listeners: Dict[str, List[Callable]] = {
             "registered": [],
             "deregistered": []
@@ -69,6 +100,15 @@ class ComponentRegistry:
                 )
             
             self._modules[module_name][version] = module_meta
+            index = self._version_indexes.get(module_name) or VersionIndex.from_versions(())
+            updated_index = index.with_version(version)
+            self._version_indexes[module_name] = updated_index
+            if version in updated_index.invalid and version not in index.invalid:
+                self.logger.warning(
+                    f"Could not parse version '{version}' for module '{module_name}'. "
+                    f"It is excluded from latest-version and specifier lookups."
+                )
+            self._publish()
             self.logger.info(f"Module '{module_name}' version '{version}' registered.")
             
             self._notify("registered", module_meta) # Pass ModuleMetadata object
@@ -79,6 +119,25 @@ class ComponentRegistry:
                 except ValueError as e: 
                     self.logger.error(f"Error setting default module during registration of {module_name} v{version}: {e}")
 
+    def _publish(self) -> None:
+        """Swaps in a new snapshot of the current state. Must be called with the lock held."""
+        self._generation += 1
+        self._snapshot = RegistrySnapshot(
+            generation=self._generation,
+            modules=MappingProxyType({name: MappingProxyType(dict(versions)) for name, versions in self._modules.items()}),
+            default_module_key=self._default_module_key,
+            version_index=MappingProxyType(dict(self._version_indexes)),
+        )
+
+    def snapshot(self) -> RegistrySnapshot:
+        """Returns the current immutable view of the registry (no locking)."""
+        return self._snapshot
+
+    @property
+    def generation(self) -> int:
+        """Counter incremented on every registry write."""
+        return self._snapshot.generation
+
     def subscribe(self, event_type: str, callback: Callable):
         """
         Subscribe to module lifecycle events.
@@ -133,6 +192,7 @@ class ComponentRegistry:
                 if version in self._modules[module_name]:
                     # module_meta_to_remove = self._modules[module_name].pop(version) # Keep for notification if needed
                     del self._modules[module_name][version]
+                    self._version_indexes[module_name] = self._version_indexes[module_name].without_version(version)
                     self.logger.info(f"Module '{module_name}' version '{version}' deregistered.")
                     self._notify("deregistered", module_name, version_info=version) 
                     deregistered_something = True
@@ -143,7 +203,9 @@ class ComponentRegistry:
                     
                     if not self._modules[module_name]: # Check if the inner dict is empty
                         del self._modules[module_name]
+                        del self._version_indexes[module_name]
                         self.logger.info(f"All versions of module '{module_name}' removed after deregistering version '{version}'.")
+                    self._publish()
                 else:
                     self.logger.warning(f"Version '{version}' of module '{module_name}' not found for deregistration.")
             else:
@@ -153,12 +215,14 @@ class ComponentRegistry:
                     self._notify("deregistered", module_name, version_info=None) 
                     
                     del self._modules[module_name]
+                    del self._version_indexes[module_name]
                     self.logger.info(f"All versions of module '{module_name}' deregistered.")
                     deregistered_something = True
 
                     if self._default_module_key and self._default_module_key[0] == module_name:
                         self._default_module_key = None
                         self.logger.info(f"Default module '{module_name}' (all versions) was deregistered. Default cleared.")
+                    self._publish()
             
             return deregistered_something
 
@@ -168,10 +232,8 @@ class ComponentRegistry:
         Returns:
             Dict[str, Dict[str, ModuleMetadata]]: Dictionary of module names to a dict of their versions and metadata.
         """
-        with self._lock:
-            # Return a deep copy to prevent external modification of cached ModuleMetadata objects
-            # For now, a shallow copy of the outer dicts and direct refs to immutable ModuleMetadata
-            return {name: vers.copy() for name, vers in self._modules.items()}
+        # Shallow copies of the snapshot's mappings; ModuleMetadata objects are immutable
+        return {name: dict(vers) for name, vers in self._snapshot.modules.items()}
 
     def get_module_names(self) -> List[str]:
         """Get the names (keys) of all registered module groups (module_name).
@@ -179,8 +241,7 @@ class ComponentRegistry:
         Returns:
             List[str]: A list of module names.
         """
-        with self._lock:
-            return list(self._modules.keys())
+        return list(self._snapshot.modules.keys())
 
     def get_module_versions(self, module_name: str) -> Optional[Dict[str, ModuleMetadata]]:
         """Get all registered versions for a specific module name.
@@ -191,11 +252,11 @@ class ComponentRegistry:
         Returns:
             Optional[Dict[str, ModuleMetadata]]: A dictionary of version strings to ModuleMetadata, or None if module not found.
         """
-        with self._lock:
-            if module_name in self._modules:
-                return self._modules[module_name].copy() # Return a copy of the versions dict
-            self.logger.warning(f"Module family '{module_name}' not found.")
-            return None
+        versions = self._snapshot.modules.get(module_name)
+        if versions is not None:
+            return dict(versions) # Return a copy of the versions dict
+        self.logger.warning(f"Module family '{module_name}' not found.")
+        return None
 
     def get_module(self, module_name: str, version: str) -> Optional[ModuleMetadata]:
         """Get a specific version of a module by its name and version string.
@@ -207,11 +268,11 @@ class ComponentRegistry:
         Returns:
             Optional[ModuleMetadata]: The ModuleMetadata for the specific version, or None if not found.
         """
-        with self._lock:
-            if module_name in self._modules and version in self._modules[module_name]:
-                return self._modules[module_name][version]
-            self.logger.warning(f"Module '{module_name}' version '{version}' not found.")
-            return None
+        module_meta = self._snapshot.modules.get(module_name, {}).get(version)
+        if module_meta is not None:
+            return module_meta
+        self.logger.warning(f"Module '{module_name}' version '{version}' not found.")
+        return None
 
     def get_latest_module_version(self, module_name: str) -> Optional[ModuleMetadata]:
         """Gets the latest registered version of a module based on semantic versioning.
@@ -222,30 +283,43 @@ class ComponentRegistry:
         Returns:
             Optional[ModuleMetadata]: The ModuleMetadata for the latest version, or None if no versions are registered or versions are unparseable.
         """
-        with self._lock:
-            if module_name not in self._modules or not self._modules[module_name]:
-                self.logger.warning(f"No versions found for module '{module_name}'.")
-                return None
-            
-            versions_dict = self._modules[module_name]
-            latest_version_obj = None
-            latest_version_str = None
+        snapshot = self._snapshot
+        versions_dict = snapshot.modules.get(module_name)
+        if not versions_dict:
+            self.logger.warning(f"No versions found for module '{module_name}'.")
+            return None
+
+        latest_version_str = snapshot.version_index[module_name].latest()
+        if latest_version_str is None:
+            self.logger.warning(f"Could not determine latest version for module '{module_name}' (possibly all versions unparseable).")
+            return None
+        return versions_dict[latest_version_str]
+
+    def find_compatible_version(self, module_name: str, specifier: Union[str, SpecifierSet]) -> Optional[ModuleMetadata]:
+        """Gets the highest registered version of a module that satisfies a version specifier.
+
+        Args:
+            module_name (str): The name of the module.
+            specifier (Union[str, SpecifierSet]): PEP 440 specifier, e.g. ">=1.0,<2.0".
+
+        Returns:
+            Optional[ModuleMetadata]: The best matching ModuleMetadata, or None if no version matches.
+
+        Raises:
+            packaging.specifiers.InvalidSpecifier: If `specifier` is a malformed string.
+        """
+        if isinstance(specifier, str):
+            parse_specifier_cached(specifier) # Validate before looking anything up
+        snapshot = self._snapshot
+        index = snapshot.version_index.get(module_name)
+        if index is None:
+            self.logger.warning(f"No versions found for module '{module_name}'.")
+            return None
+        best_version_str = index.best_match(specifier)
+        if best_version_str is None:
+            return None
+        return snapshot.modules[module_name][best_version_str]
 
-            for v_str in versions_dict.keys():
-                try:
-                    current_v_obj = parse_version(v_str)
-                    if latest_version_obj is None or current_v_obj > latest_version_obj:
-                        latest_version_obj = current_v_obj
-                        latest_version_str = v_str
-                except Exception as e: # Handles InvalidVersion from packaging.version.parse
-                    self.logger.warning(f"Could not parse version '{v_str}' for module '{module_name}'. Skipping for latest check. Error: {e}")
-            
-            if latest_version_str:
-                return versions_dict[latest_version_str]
-            else:
-                self.logger.warning(f"Could not determine latest version for module '{module_name}' (possibly all versions unparseable).")
-                return None
-        
     def get_default_module_key(self) -> Optional[Tuple[str, str]]:
         """Get the key (name, version) of the default module.
         
@@ -284,36 +358,51 @@ class ComponentRegistry:
             if module_name not in self._modules or version not in self._modules[module_name]:
                 raise ValueError(f"Module '{module_name}' version '{version}' not found in registry. Cannot set as default.")
             self._default_module_key = (module_name, version)
+            self._publish()
             self.logger.info(f"Module '{module_name}' version '{version}' set as default.")
 
     # --- New method to get richer component details ---
     def get_all_component_details(self) -> Dict[str, List[Dict[str, Any]]]:
-        """Returns detailed information for all registered module versions, including reversibility support."""
-        details_map: Dict[str, List[Dict[str, Any]]] = {}
-        with self._lock:
-            for module_name, versions_dict in self._modules.items():
-                version_details_list = []
-                for version_str, module_meta in versions_dict.items():
-                    details = {
-                        "module_name": module_meta.module_name,
-                        "version": module_meta.version,
-                        "description": module_meta.description,
-                        "entry_point": module_meta.entry_point,
-                        "supports_reversibility": module_meta.supports_reversibility,
-                        "author": module_meta.author,
-                        "source_file_path": str(module_meta.source_file_path), # Convert Path to str
-                        "dependencies": [
-                            {"name": dep.name, "version_specifier": dep.version_specifier}
-                            for dep in module_meta.dependencies
-                        ],
-                        # Placeholder for performance data - to be integrated later
-                        "performance_metrics": self.get_component_performance(module_name, version_str) or {}
-                    }
-                    version_details_list.append(details)
-                if version_details_list: # Only add if there are versions
-                    details_map[module_name] = version_details_list
+        """Returns detailed information for all registered module versions, including reversibility support.
+
+        The result is built once per registry generation and shared between callers, so
+        it is read-only (version lists are tuples, dicts reject mutation); deepcopy it to
+        get a modifiable structure.
+        """
+        snapshot = self._snapshot
+        cached = self._details_cache
+        if cached is not None and cached[0] == snapshot.generation:
+            return cached[1]
+        details_map = self._build_component_details(snapshot)
+        self._details_cache = (snapshot.generation, details_map)
         return details_map
 
+    def _build_component_details(self, snapshot: RegistrySnapshot) -> Dict[str, Any]:
+        """Builds the read-only details structure for one snapshot."""
+        details_map: Dict[str, Any] = {}
+        for module_name, versions_dict in snapshot.modules.items():
+            version_details_list = []
+            for version_str, module_meta in versions_dict.items():
+                details = FrozenDict({
+                    "module_name": module_meta.module_name,
+                    "version": module_meta.version,
+                    "description": module_meta.description,
+                    "entry_point": module_meta.entry_point,
+                    "supports_reversibility": module_meta.supports_reversibility,
+                    "author": module_meta.author,
+                    "source_file_path": str(module_meta.source_file_path), # Convert Path to str
+                    "dependencies": tuple(
+                        FrozenDict({"name": dep.name, "version_specifier": dep.version_specifier})
+                        for dep in module_meta.dependencies
+                    ),
+                    # Placeholder for performance data - to be integrated later
+                    "performance_metrics": FrozenDict(self.get_component_performance(module_name, version_str) or {})
+                })
+                version_details_list.append(details)
+            if version_details_list: # Only add if there are versions
+                details_map[module_name] = tuple(version_details_list)
+        return FrozenDict(details_map)
+
     # --- Methods related to performance (may need adjustment for ModuleMetadata) ---
     def get_component_performance(self, module_name: str, version: str) -> Optional[Dict[str, float]]:
         # Implementation of get_component_performance method
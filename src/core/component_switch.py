@@ -0,0 +1,59 @@
+# src/core/component_switch.py
+"""
+Data types for ExecutionEngine's warm switch protocol.
+
+Switching the active component on a Marry/Fuck normally happens instantly, so the
+first live requests pay the target's cold-start costs (model load, cache fill). For
+components with a SwitchConfig the engine instead:
+
+1. warms the target up with one call using ``warmup_params`` (result discarded),
+2. optionally shadow-executes it on the next ``shadow_requests`` live requests while
+   the previous component keeps serving (shadow results are discarded; their
+   measurements are still fed back to the StateMonitor),
+3. commits the switch and records a SwitchReport with the switch latency
+   (time from the switch request to the commit).
+"""
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+
+@dataclass(frozen=True)
+class SwitchConfig:
+    """How a component is brought up before it becomes active.
+
+    Attributes:
+        warmup_params: Params for a warm-up call before the switch (None = no warm-up).
+        shadow_requests: Live requests to shadow-execute on the target before committing.
+    """
+    warmup_params: Optional[Dict[str, Any]] = None
+    shadow_requests: int = 0
+
+    def __post_init__(self):
+        if self.shadow_requests < 0:
+            raise ValueError("shadow_requests must be non-negative")
+
+
+@dataclass
+class SwitchReport:
+    """Outcome and timings of one warm switch."""
+    target: str
+    action: str
+    previous: Optional[str]
+    requested_at: float = field(default_factory=time.time)
+    warmup_latency: Optional[float] = None
+    warmup_error: Optional[str] = None
+    shadow_runs: int = 0
+    shadow_errors: int = 0
+    committed: bool = False
+    superseded: bool = False
+    switch_latency: Optional[float] = None
+
+
+@dataclass
+class PendingSwitch:
+    """A switch waiting for its shadow executions to complete."""
+    action: Dict[str, Any]
+    report: SwitchReport
+    required: int
+    launched: int = 0
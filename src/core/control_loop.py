@@ -0,0 +1,223 @@
+# src/core/control_loop.py
+"""
+Continuous control-loop mode for the KFM graph.
+
+Without a loop the graph ends after reflect, so continuous optimization meant
+re-invoking the whole graph (setup, logging and snapshots included) per decision.
+With a ControlLoop the graph routes reflect -> loop -> monitor until a stop
+condition holds:
+
+- the iteration budget (``max_iterations``) is used up,
+- convergence: the decided (action, component) did not change for
+  ``stable_iterations`` consecutive iterations,
+- an iteration ended with an error (``stop_on_error``),
+- ControlLoop.stop() was called.
+
+``min_interval`` sets the cadence: an iteration starts at most once per
+``min_interval`` seconds (the loop node sleeps for the remainder).
+
+Add ``loop.runnable`` as the loop node (it has both a sync and an async body) and
+invoke the graph with ``loop.graph_config()`` so the recursion limit fits the budget.
+
+Per-run counters travel in the state (``loop_iteration``, ``loop_stable_count``,
+``loop_last_action``, ``loop_iteration_started_at``); the final state carries
+``loop_stop_reason`` and ``loop_metrics``. Aggregate loop-rate metrics (iterations
+per second, iteration latency quantiles, stop reasons) are exported by
+ControlLoop.metrics().
+"""
+import asyncio
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from langchain_core.runnables import RunnableLambda
+
+from src.core.streaming_metrics import Ewma, WindowedQuantileSketch
+from src.logger import setup_logger
+
+loop_logger = setup_logger('ControlLoop')
+
+LOOP_NODE = "loop"
+# Supersteps of one iteration: monitor, decide, execute/fallback, reflect, loop
+STEPS_PER_ITERATION = 5
+
+STOP_MAX_ITERATIONS = "max_iterations"
+STOP_CONVERGED = "converged"
+STOP_ERROR = "error"
+STOP_REQUESTED = "stopped"
+
+
+@dataclass(frozen=True)
+class ControlLoopConfig:
+    """Stop conditions and cadence of the control loop.
+
+    Attributes:
+        max_iterations: Iteration budget per run.
+        min_interval: Minimum seconds between the starts of two iterations (0 = no pacing).
+        stable_iterations: Stop once the decision was unchanged for this many consecutive
+            iterations (None disables the convergence check).
+        stop_on_error: Stop when an iteration ends with an error in the state.
+    """
+    max_iterations: int = 100
+    min_interval: float = 0.0
+    stable_iterations: Optional[int] = 3
+    stop_on_error: bool = True
+
+    def __post_init__(self):
+        if self.max_iterations < 1:
+            raise ValueError("max_iterations must be at least 1")
+        if self.min_interval < 0:
+            raise ValueError("min_interval must be non-negative")
+        if self.stable_iterations is not None and self.stable_iterations < 1:
+            raise ValueError("stable_iterations must be at least 1 (or None)")
+
+
+def _action_key(state: Dict[str, Any]) -> Optional[Tuple[Any, Any]]:
+    action = state.get("kfm_action") or {}
+    if not action:
+        return None
+    return (action.get("action"), action.get("component"))
+
+
+class ControlLoop:
+    """The loop node, its routing function and the loop-rate metrics."""
+
+    def __init__(self, config: Optional[ControlLoopConfig] = None, metrics_window: float = 300.0):
+        self.config = config or ControlLoopConfig()
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._period_ewma = Ewma(0.2)
+        self._iteration_sketch = WindowedQuantileSketch(window_seconds=metrics_window)
+        self.iterations = 0
+        self.stop_reasons: Dict[str, int] = {}
+
+    def stop(self) -> None:
+        """Asks every run of this loop to stop after its current iteration."""
+        self._stop_event.set()
+
+    def reset(self) -> None:
+        """Clears a previous stop() request."""
+        self._stop_event.clear()
+
+    def graph_config(self) -> Dict[str, Any]:
+        """Invocation config with a recursion limit that fits the iteration budget."""
+        return {"recursion_limit": (self.config.max_iterations + 1) * STEPS_PER_ITERATION}
+
+    def _stop_reason(self, state: Dict[str, Any], iteration: int, stable_count: int) -> Optional[str]:
+        if self._stop_event.is_set():
+            return STOP_REQUESTED
+        if self.config.stop_on_error and state.get("error"):
+            return STOP_ERROR
+        stable = self.config.stable_iterations
+        if stable is not None and stable_count >= stable:
+            return STOP_CONVERGED
+        if iteration >= self.config.max_iterations:
+            return STOP_MAX_ITERATIONS
+        return None
+
+    def _advance(self, state: Dict[str, Any]) -> Tuple[Dict[str, Any], float]:
+        """Counters and stop decision for the iteration that just ended.
+
+        Returns the state updates and the pacing delay still owed before the next
+        iteration (0 when stopping or unpaced).
+        """
+        now = time.perf_counter()
+        started_at = state.get("loop_iteration_started_at")
+        iteration = (state.get("loop_iteration") or 0) + 1
+        action = _action_key(state)
+        previous = state.get("loop_last_action")
+        previous = tuple(previous) if previous is not None else None
+        stable_count = (state.get("loop_stable_count") or 0) + 1 if action is not None and action == previous else 0
+        if started_at is not None:
+            self._record_iteration(now - started_at)
+        else:
+            with self._lock:
+                self.iterations += 1
+
+        updates: Dict[str, Any] = {
+            "loop_iteration": iteration,
+            "loop_stable_count": stable_count,
+            "loop_last_action": action,
+        }
+        reason = self._stop_reason(state, iteration, stable_count)
+        if reason is not None:
+            with self._lock:
+                self.stop_reasons[reason] = self.stop_reasons.get(reason, 0) + 1
+            updates["loop_stop_reason"] = reason
+            updates["loop_metrics"] = self.metrics()
+            updates["done"] = True
+            loop_logger.info(f"Control loop stopping after {iteration} iterations: {reason}",
+                             extra={"props": {"run_id": state.get("run_id"), "loop_metrics": updates["loop_metrics"]}})
+            return updates, 0.0
+
+        delay = 0.0
+        if self.config.min_interval and started_at is not None:
+            delay = max(0.0, started_at + self.config.min_interval - time.perf_counter())
+        return updates, delay
+
+    def _next_iteration(self, state: Dict[str, Any], updates: Dict[str, Any]) -> Dict[str, Any]:
+        next_start = time.perf_counter()
+        started_at = state.get("loop_iteration_started_at")
+        if started_at is not None:
+            with self._lock:
+                self._period_ewma.update(next_start - started_at)
+        updates.update({
+            "loop_iteration_started_at": next_start,
+            # Per-iteration outputs are recomputed by the next pass
+            "error": None,
+            "done": False,
+        })
+        return updates
+
+    async def node(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Graph node after reflect: updates loop counters, paces, and decides whether to stop."""
+        updates, delay = self._advance(state)
+        if "loop_stop_reason" in updates:
+            return updates
+        if delay:
+            await asyncio.sleep(delay)
+        return self._next_iteration(state, updates)
+
+    def sync_node(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Blocking variant of node() for graphs run with invoke()."""
+        updates, delay = self._advance(state)
+        if "loop_stop_reason" in updates:
+            return updates
+        if delay:
+            time.sleep(delay)
+        return self._next_iteration(state, updates)
+
+    @property
+    def runnable(self) -> RunnableLambda:
+        """The loop node for StateGraph.add_node(); works with both invoke() and ainvoke()."""
+        return RunnableLambda(self.sync_node, afunc=self.node, name=LOOP_NODE)
+
+    def route(self, state: Dict[str, Any]) -> str:
+        """Conditional edge after the loop node: 'monitor' to iterate again, else 'end'."""
+        return "end" if state.get("loop_stop_reason") else "monitor"
+
+    def _record_iteration(self, duration: float) -> None:
+        with self._lock:
+            self.iterations += 1
+            self._iteration_sketch.add(duration)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Loop-rate metrics across all runs of this loop.
+
+        loop_rate_hz comes from the EWMA of the period between iteration starts (pacing
+        included); iteration_seconds_* are quantiles of the work time of an iteration
+        (monitor through reflect, pacing excluded).
+        """
+        p50, p95, p99 = self._iteration_sketch.quantiles()
+        with self._lock:
+            period = self._period_ewma.value
+            return {
+                "iterations": self.iterations,
+                "loop_rate_hz": 1.0 / period if period else None,
+                "iteration_period_seconds_ewma": period,
+                "iteration_seconds_p50": p50,
+                "iteration_seconds_p95": p95,
+                "iteration_seconds_p99": p99,
+                "stop_reasons": dict(self.stop_reasons),
+            }
@@ -1,17 +1,19 @@
 # src/core/dependency_resolver.py
-from typing import Dict, List, Optional, Tuple, Any
+import heapq
+from typing import Dict, List, Optional, Set, Tuple, Any, Union
 import networkx as nx
-from packaging.version import parse as parse_version, InvalidVersion
 from packaging.specifiers import SpecifierSet, InvalidSpecifier
 
 # Assuming ModuleMetadata and ModuleDependency are correctly importable
 # Adjust the path if necessary based on project structure
 try:
     from .discovery import ModuleMetadata, ModuleDependency
+    from .version_index import VersionIndex, parse_specifier_cached
 except ImportError:
     # Fallback for potential execution context issues (e.g., running tests directly)
     # This might need adjustment based on the actual project structure and test setup.
     from discovery import ModuleMetadata, ModuleDependency
+    from version_index import VersionIndex, parse_specifier_cached
 
 
 # --- Custom Exceptions ---
@@ -52,153 +54,207 @@ class VersionConflictError(DependencyResolutionError):
 
 # --- Resolver Class ---
 
+# (module_name, version)
+NodeId = Tuple[str, str]
+
 class DependencyResolver:
     """
     Resolves dependencies between modules and determines a valid loading order.
+
+    Resolution is incremental: the resolver keeps the modules, the selected dependency
+    edges and a reverse index (dependency name -> dependers) from the previous call.
+    resolve() diffs its input against them and re-runs version selection only for
+    modules that were added or changed and for dependers of module names whose version
+    set changed. Unchanged inputs return the cached order. After an error the cache is
+    dropped, so the next call re-resolves (and re-reports) from scratch.
+
+    The loading order is canonical (it depends only on the modules, not on dict order
+    or on the history of changes): among modules whose dependencies are loaded, versions
+    required by another module come first, then by module name, then highest version.
+    The first version of each module name in that order is returned.
     """
 
     def __init__(self):
         """Initialize the resolver."""
-        pass
+        # dep_name -> sorted, pre-parsed index of its versions, rebuilt when the version set changes
+        self._version_indexes: Dict[str, VersionIndex] = {}
+        self._reset_cache()
+
+    def _reset_cache(self) -> None:
+        self._metas: Dict[NodeId, ModuleMetadata] = {}
+        # Selected dependency edges: depender -> dependees, dependee -> dependers
+        self._selected_deps: Dict[NodeId, Set[NodeId]] = {}
+        self._dependers: Dict[NodeId, Set[NodeId]] = {}
+        # dep_name -> nodes declaring a dependency on that name (whatever version they selected)
+        self._dependers_by_name: Dict[str, Set[NodeId]] = {}
+        self._versions_by_name: Dict[str, Dict[str, ModuleMetadata]] = {}
+        self._version_ranks: Dict[str, Dict[str, int]] = {}
+        self._resolved_order: Optional[List[ModuleMetadata]] = None
+        # Modules whose dependency versions were (re)selected by the last resolve() call
+        self.last_reselected = 0
 
     def _find_best_compatible_version(
         self,
         dep_name: str,
-        specifier_set: SpecifierSet,
+        specifier_set: Union[str, SpecifierSet],
         available_versions: Dict[str, ModuleMetadata]
     ) -> Optional[str]:
         """
         Finds the highest version string that satisfies the specifier set.
         Args:
             dep_name: Name of the dependency.
-            specifier_set: The packaging.specifiers.SpecifierSet required.
+            specifier_set: The packaging.specifiers.SpecifierSet required (or its string form).
             available_versions: Dictionary of available versions {version_str: meta} for the dep_name.
         Returns:
             The best compatible version string, or None if none found.
         """
-        candidate_strings = []
-        for version_str in available_versions.keys():
-            try:
-                # Check if the version string is contained within the specifier set.
-                if specifier_set.contains(version_str):
-                    candidate_strings.append(version_str)
-            except InvalidVersion:
-                 # Ignore versions that cannot be parsed according to PEP 440
-                 pass 
-        
-        if not candidate_strings:
-            return None
-
-        parsed_candidates: List[Tuple[Any, str]] = [] # Store (Version_obj, original_str)
-        for s_version in candidate_strings:
+        index = self._version_indexes.get(dep_name)
+        if index is None or available_versions.keys() != index.versions:
+            index = VersionIndex.from_versions(available_versions.keys())
+            self._version_indexes[dep_name] = index
+        return index.best_match(specifier_set)
+
+
+    def _select_dependencies(self, node_id: NodeId, meta: ModuleMetadata) -> None:
+        """(Re)selects the dependency versions of one module and updates the edge indexes."""
+        self._drop_dependencies(node_id)
+        selected: Set[NodeId] = set()
+        self._selected_deps[node_id] = selected
+        for dep_info in meta.dependencies:
+            dep_name = dep_info.name
+            dep_specifier_str = dep_info.version_specifier
+            self._dependers_by_name.setdefault(dep_name, set()).add(node_id)
+
             try:
-                # Ensure we are creating Version objects for comparison
-                parsed_v = parse_version(s_version)
-                parsed_candidates.append((parsed_v, s_version))
-            except InvalidVersion:
-                # This case should ideally not be reached if specifier_set.contains worked
-                # as .contains itself often involves parsing or handling unparseable versions.
-                # However, good to be defensive.
-                continue # Skip unparseable versions at this stage too
-        
-        if not parsed_candidates:
-            # This could happen if all candidate_strings were somehow unparseable here
-            # despite passing the initial .contains() check (unlikely but possible).
-            return None
-
-        # Sort by Version object (primary key), then by original string (secondary, for stability if versions parse identically)
-        # Default sort for tuples will achieve this if Version objects are correctly comparable.
-        # Version objects are rich comparable, so this works as expected.
-        parsed_candidates.sort() # Sorts in ascending order
-
-        # The last element after sorting will have the highest version
-        # Return its original string representation
-        return parsed_candidates[-1][1]
-
-
-    def _build_dependency_graph(
-        self,
-        available_modules: Dict[str, Dict[str, ModuleMetadata]]
-    ) -> nx.DiGraph:
-        """
-        Builds a directed graph containing only the selected versions of modules
-        and their resolved dependencies.
-        Nodes are (module_name, version_string), storing ModuleMetadata.
-        Edges go from the selected dependee version to the depender version.
-        """
-        final_resolved_graph = nx.DiGraph()
-        
-        # Flatten all available modules for easy lookup by (name, version) tuple
-        all_available_meta: Dict[Tuple[str,str], ModuleMetadata] = {}
+                parse_specifier_cached(dep_specifier_str)
+            except InvalidSpecifier:
+                raise DependencyResolutionError(
+                    f"Module {node_id[0]}({node_id[1]}) has an invalid version specifier "
+                    f"'{dep_specifier_str}' for dependency '{dep_name}'."
+                )
+
+            versions_for_this_dep = self._versions_by_name.get(dep_name)
+            if not versions_for_this_dep:
+                raise MissingDependencyError(node_id, dep_name, dep_specifier_str)
+
+            # The specifier string (already validated above) lets the index memoize matches
+            selected_dep_version_str = self._find_best_compatible_version(
+                dep_name, dep_specifier_str, versions_for_this_dep
+            )
+            if selected_dep_version_str is None:
+                raise MissingDependencyError(node_id, dep_name, dep_specifier_str)
+
+            dependee_node_id = (dep_name, selected_dep_version_str)
+            selected.add(dependee_node_id)
+            self._dependers.setdefault(dependee_node_id, set()).add(node_id)
+
+    def _drop_dependencies(self, node_id: NodeId) -> None:
+        for dependee_node_id in self._selected_deps.pop(node_id, ()):
+            dependers = self._dependers.get(dependee_node_id)
+            if dependers is not None:
+                dependers.discard(node_id)
+                if not dependers:
+                    del self._dependers[dependee_node_id]
+        meta = self._metas.get(node_id)
+        if meta is not None:
+            for dep_info in meta.dependencies:
+                dependers_of_name = self._dependers_by_name.get(dep_info.name)
+                if dependers_of_name is not None:
+                    dependers_of_name.discard(node_id)
+                    if not dependers_of_name:
+                        del self._dependers_by_name[dep_info.name]
+
+    def _apply_changes(self, available_modules: Dict[str, Dict[str, ModuleMetadata]]) -> bool:
+        """Brings the cached graph in line with `available_modules`; returns whether anything changed."""
+        current: Dict[NodeId, ModuleMetadata] = {}
         for name, versions_dict in available_modules.items():
             for version_str, meta in versions_dict.items():
-                all_available_meta[(name, version_str)] = meta
-
-        # Process each initially available module version as a potential start of a chain
-        for initial_node_id, initial_meta in all_available_meta.items():
-            
-            # Queue for BFS-like traversal for the current initial_node_id's chain
-            # Stores (node_to_process_id, meta_of_node_to_process)
-            queue: List[Tuple[Tuple[str, str], ModuleMetadata]] = []
-            
-            # Add the initial module to the graph if not already present
-            if not final_resolved_graph.has_node(initial_node_id):
-                final_resolved_graph.add_node(initial_node_id, meta=initial_meta)
-            
-            # Start traversal from this initial module to resolve its specific dependencies
-            queue.append((initial_node_id, initial_meta))
-            # visited_in_current_traversal prevents cycles within a single starting point's resolution
-            # and redundant processing if multiple paths lead to the same dependency.
-            visited_in_current_traversal = {initial_node_id}
-
-            head = 0
-            while head < len(queue):
-                depender_node_id, depender_meta = queue[head]
-                head += 1
-
-                for dep_info in depender_meta.dependencies:
-                    dep_name = dep_info.name
-                    dep_specifier_str = dep_info.version_specifier
-                    
-                    try:
-                        specifier_set = SpecifierSet(dep_specifier_str)
-                    except InvalidSpecifier:
-                        raise DependencyResolutionError(
-                            f"Module {depender_node_id[0]}({depender_node_id[1]}) has an invalid version specifier "
-                            f"'{dep_specifier_str}' for dependency '{dep_name}'."
-                        )
-
-                    versions_for_this_dep = available_modules.get(dep_name)
-                    if not versions_for_this_dep:
-                        raise MissingDependencyError(depender_node_id, dep_name, dep_specifier_str)
-
-                    selected_dep_version_str = self._find_best_compatible_version(
-                        dep_name, specifier_set, versions_for_this_dep
-                    )
-
-                    if selected_dep_version_str is None:
-                        raise MissingDependencyError(depender_node_id, dep_name, dep_specifier_str)
-
-                    dependee_node_id = (dep_name, selected_dep_version_str)
-                    selected_dependee_meta = all_available_meta.get(dependee_node_id)
-
-                    if selected_dependee_meta is None:
-                        raise DependencyResolutionError(
-                            f"Internal error: Metadata for selected dependency {dependee_node_id} "
-                            f"not found in the initial module set."
-                        )
-                    
-                    if not final_resolved_graph.has_node(dependee_node_id):
-                        final_resolved_graph.add_node(dependee_node_id, meta=selected_dependee_meta)
-                    
-                    final_resolved_graph.add_edge(dependee_node_id, depender_node_id)
-
-                    if dependee_node_id not in visited_in_current_traversal:
-                        visited_in_current_traversal.add(dependee_node_id)
-                        queue.append((dependee_node_id, selected_dependee_meta))
-                        
-        return final_resolved_graph
-
+                current[(name, version_str)] = meta
+
+        previous = self._metas
+        added = [node_id for node_id in current if node_id not in previous]
+        removed = [node_id for node_id in previous if node_id not in current]
+        changed = [node_id for node_id, meta in current.items()
+                   if node_id in previous and previous[node_id] is not meta and previous[node_id] != meta]
+        if not (added or removed or changed):
+            return False
+
+        changed_names = {name for name, _ in added} | {name for name, _ in removed}
+        to_reselect: Set[NodeId] = set(added) | set(changed)
+        for name in changed_names:
+            to_reselect |= self._dependers_by_name.get(name, set())
+            self._version_ranks.pop(name, None)
+
+        for node_id in removed:
+            self._drop_dependencies(node_id)
+            del self._metas[node_id]
+        for node_id in changed:
+            self._drop_dependencies(node_id)
+        for node_id in added + changed:
+            self._metas[node_id] = current[node_id]
+        self._versions_by_name = {name: dict(versions) for name, versions in available_modules.items()}
+
+        # Reselect in input order so the first error reported is stable
+        reselect_in_order = [node_id for node_id in current if node_id in to_reselect]
+        for node_id in reselect_in_order:
+            self._select_dependencies(node_id, self._metas[node_id])
+        self.last_reselected = len(reselect_in_order)
+        return True
+
+    def _version_rank(self, name: str) -> Dict[str, int]:
+        """version string -> rank (0 = highest parseable version; unparseable versions last)."""
+        ranks = self._version_ranks.get(name)
+        if ranks is None:
+            versions = self._versions_by_name.get(name, {})
+            index = VersionIndex.from_versions(versions)
+            ordered = list(reversed(index.sorted_versions())) + sorted(index.invalid)
+            ranks = {version_str: rank for rank, version_str in enumerate(ordered)}
+            self._version_ranks[name] = ranks
+        return ranks
+
+    def _loading_order(self) -> List[ModuleMetadata]:
+        """Kahn's algorithm over the cached graph with the canonical tie-break."""
+        def sort_key(node_id):
+            name, version = node_id
+            return (0 if node_id in self._dependers else 1, name, self._version_rank(name)[version])
+
+        pending_deps = {node_id: len(self._selected_deps.get(node_id, ())) for node_id in self._metas}
+        ready = [(sort_key(node_id), node_id) for node_id, count in pending_deps.items() if count == 0]
+        heapq.heapify(ready)
+
+        resolved_order_meta: List[ModuleMetadata] = []
+        included_module_names: Set[str] = set()
+        emitted = 0
+        while ready:
+            _, node_id = heapq.heappop(ready)
+            emitted += 1
+            if node_id[0] not in included_module_names:
+                resolved_order_meta.append(self._metas[node_id])
+                included_module_names.add(node_id[0])
+            for depender_node_id in self._dependers.get(node_id, ()):
+                pending_deps[depender_node_id] -= 1
+                if pending_deps[depender_node_id] == 0:
+                    heapq.heappush(ready, (sort_key(depender_node_id), depender_node_id))
+
+        if emitted < len(self._metas):
+            self._raise_cycle({node_id for node_id, count in pending_deps.items() if count > 0})
+        return resolved_order_meta
+
+    def _raise_cycle(self, blocked_nodes: Set[NodeId]) -> None:
+        graph = nx.DiGraph()
+        for node_id in blocked_nodes:
+            for dependee_node_id in self._selected_deps.get(node_id, ()):
+                if dependee_node_id in blocked_nodes:
+                    graph.add_edge(dependee_node_id, node_id)
+        try:
+            # Cycle edges are (u, v) where v depends on u; show the path with the start node repeated
+            cycle_edges = nx.find_cycle(graph, orientation='original')
+            cycle_nodes = [edge[0] for edge in cycle_edges]
+            if cycle_nodes:
+                cycle_nodes.append(cycle_nodes[0])
+            raise CircularDependencyError(cycle_nodes)
+        except nx.NetworkXNoCycle:
+            raise DependencyResolutionError("Dependency graph is not acyclic, but failed to locate a specific cycle.")
 
     def resolve(
         self,
@@ -207,55 +263,14 @@ class DependencyResolver:
         """
         Resolves dependencies and returns a list of modules in a valid loading order.
         """
-        if not available_modules:
-            return []
-
         try:
-            graph = self._build_dependency_graph(available_modules)
-
-            if not nx.is_directed_acyclic_graph(graph):
-                # Find a cycle to report it
-                try:
-                    # Note: find_cycle requires edge orientation handling in some nx versions
-                    cycle_edges = nx.find_cycle(graph, orientation='original') 
-                    # Format cycle for better error message
-                    # Cycle edges are (u, v) where u depends on v.
-                    # We want to show the path: A -> B -> C -> A
-                    # If cycle_edges = [(A, B), (B, C), (C, A)]
-                    cycle_nodes = [edge[0] for edge in cycle_edges] 
-                    # Add the start node again to explicitly show the loop
-                    if cycle_nodes:
-                        cycle_nodes.append(cycle_nodes[0])
-                    raise CircularDependencyError(cycle_nodes)
-                except nx.NetworkXNoCycle:
-                     # This path indicates graph is not a DAG but no simple cycle was found?
-                     # Or find_cycle failed unexpectedly.
-                     raise DependencyResolutionError("Dependency graph is not acyclic, but failed to locate a specific cycle.")
-            
-            # Perform topological sort (generator)
-            sorted_nodes_generator = nx.topological_sort(graph)
-
-            # Filter to ensure only one version per module name ends up in the list,
-            # respecting the topological order (first encounter wins).
-            resolved_order_meta: List[ModuleMetadata] = []
-            included_module_names: set[str] = set()
-            
-            for node_id in sorted_nodes_generator:
-                name, version = node_id # Extract module name
-                if name not in included_module_names:
-                    meta = graph.nodes[node_id].get('meta')
-                    if meta:
-                        resolved_order_meta.append(meta)
-                        included_module_names.add(name)
-                    else:
-                        # This should ideally not happen if graph construction is correct
-                        raise DependencyResolutionError(f"Internal error: Metadata missing for node {node_id} in dependency graph.")
-
-            return resolved_order_meta
-
-        # Allow specific custom errors from _build_dependency_graph to propagate
+            if self._apply_changes(available_modules) or self._resolved_order is None:
+                self._resolved_order = self._loading_order()
+            return list(self._resolved_order)
         except (MissingDependencyError, CircularDependencyError, DependencyResolutionError):
-            raise 
+            self._reset_cache()
+            raise
         except Exception as e:
             # Catch any other unexpected errors during resolution
-            raise DependencyResolutionError(f"An unexpected error occurred during dependency resolution: {e}") from e 
\ No newline at end of file
+            self._reset_cache()
+            raise DependencyResolutionError(f"An unexpected error occurred during dependency resolution: {e}") from e
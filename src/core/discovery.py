@@ -1,8 +1,13 @@
+import json
 import os
 import yaml
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any, Optional, NamedTuple
-from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, NamedTuple, Tuple, Union
+from dataclasses import asdict, dataclass, field, fields
+
+# libyaml's loader is several times faster than the pure-Python one when available
+_YAML_SAFE_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
 @dataclass(frozen=True)
 class ModuleDependency:
@@ -20,6 +25,15 @@ class ModuleMetadata:
     author: Optional[str] = None
     dependencies: List[ModuleDependency] = field(default_factory=list)
     supports_reversibility: bool = False
+    # Optional vectorized entry point ('function' in the entry module, or 'package.module:function')
+    # taking a list of params dicts; ExecutionEngine coalesces concurrent calls into micro-batches
+    batch_entry_point: Optional[str] = None
+    max_batch_size: int = 16
+    max_batch_wait_ms: float = 5.0
+    # Pure function of its params: ExecutionEngine may serve repeated inputs from a result cache
+    deterministic: bool = False
+    # Params for a warm-up call before ExecutionEngine switches to this module (None = no warm-up)
+    warmup_params: Optional[Dict[str, Any]] = None
 
 class ModuleDiscoveryError(Exception):
     """Base exception for module discovery issues."""
@@ -33,13 +47,123 @@ class MetadataValidationError(ModuleDiscoveryError):
     """Raised when module metadata validation fails."""
     pass
 
+class _CacheEntry(NamedTuple):
+    """Cached metadata of one module file, valid while the file's mtime and size are unchanged."""
+    mtime_ns: int
+    size: int
+    metadata: ModuleMetadata
+
+
+def _entry_to_json(entry: _CacheEntry) -> Optional[List[Any]]:
+    """JSON form of a cache entry, or None if its metadata does not survive a JSON round trip."""
+    metadata = asdict(entry.metadata)
+    metadata["source_file_path"] = str(entry.metadata.source_file_path)
+    encoded = [entry.mtime_ns, entry.size, metadata]
+    try:
+        # warmup_params is free-form YAML (e.g. dates, non-string keys), which JSON would alter
+        return encoded if json.loads(json.dumps(encoded)) == encoded else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _entry_from_json(encoded: List[Any]) -> _CacheEntry:
+    mtime_ns, size, metadata = encoded
+    metadata = dict(metadata,
+                    source_file_path=Path(metadata["source_file_path"]),
+                    dependencies=[ModuleDependency(**dep) for dep in metadata["dependencies"]])
+    return _CacheEntry(mtime_ns, size, ModuleMetadata(**metadata))
+
+
+def _load_yaml_mapping(file_path: Path) -> Dict[str, Any]:
+    """Reads a module YAML file into a dict (module-level so worker processes can run it)."""
+    try:
+        with open(file_path, 'r') as f:
+            content = yaml.load(f, Loader=_YAML_SAFE_LOADER)
+            if content is None: # Handles completely empty file
+                return {}
+            if not isinstance(content, dict): # Ensure top level is a map
+                raise YAMLParseError(f"YAML content in {file_path} is not a dictionary (map). Expected a map, got {type(content)}.")
+            return content
+    except yaml.YAMLError as e:
+        raise YAMLParseError(f"Error parsing YAML file {file_path}: {e}") from e
+    except IOError as e:
+        raise ModuleDiscoveryError(f"Error reading file {file_path}: {e}") from e
+
+
+def _load_yaml_mapping_in_worker(file_path: Path) -> Tuple[Optional[Dict[str, Any]], Optional[Exception]]:
+    """Like _load_yaml_mapping, but returns the error so one bad file does not fail the batch."""
+    try:
+        return _load_yaml_mapping(file_path), None
+    except Exception as e:
+        return None, e
+
+
 class ModuleDiscoveryService:
     """
     Discovers modules defined by YAML configuration files within specified directories.
     Parses, validates, and caches the metadata from these files.
+
+    The cache is keyed by resolved file path and an entry is reused while the file's
+    mtime and size are unchanged. With ``cache_path`` set it is also persisted as JSON
+    so a new process does not re-parse unchanged files; loading it never runs code, so
+    the file is safe to keep in a shared location. Entries whose metadata JSON cannot
+    represent exactly are left out and re-parsed. Cache misses are parsed in a
+    process pool when there are at least ``parallel_threshold`` of them (cold starts);
+    smaller batches are parsed inline.
     """
-    def __init__(self):
+    # Bump when ModuleMetadata validation changes in a way that should invalidate persisted entries
+    CACHE_FORMAT_VERSION = 2
+
+    def __init__(self, cache_path: Optional[Union[str, Path]] = None, parse_workers: Optional[int] = None,
+                 parallel_threshold: int = 64):
         self._cache: Dict[str, ModuleMetadata] = {} # In-memory cache
+        self._path_index: Dict[Path, _CacheEntry] = {}
+        self._cache_path = Path(cache_path) if cache_path is not None else None
+        self._cache_dirty = False
+        self.parse_workers = parse_workers if parse_workers is not None else min(8, os.cpu_count() or 1)
+        self.parallel_threshold = parallel_threshold
+        if self._cache_path is not None:
+            self._load_persistent_cache()
+
+    @classmethod
+    def _cache_schema(cls) -> List[Any]:
+        return [cls.CACHE_FORMAT_VERSION, [f.name for f in fields(ModuleMetadata)]]
+
+    def _load_persistent_cache(self) -> None:
+        """Loads the persisted path index; a missing, stale or unreadable file is ignored."""
+        if not self._cache_path.is_file():
+            return
+        try:
+            with open(self._cache_path, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+            if payload.get("schema") != self._cache_schema():
+                print(f"Info: Discarding module cache {self._cache_path} written by an incompatible version.")
+                return
+            self._path_index = {Path(path): _entry_from_json(entry) for path, entry in payload["entries"].items()}
+        except Exception as e:
+            print(f"Warning: Could not read module cache {self._cache_path}: {e}. Starting with an empty cache.")
+            self._path_index = {}
+
+    def _save_persistent_cache(self) -> None:
+        """Atomically writes the path index to ``cache_path``."""
+        if self._cache_path is None or not self._cache_dirty:
+            return
+        entries = {}
+        for path, entry in self._path_index.items():
+            encoded = _entry_to_json(entry)
+            if encoded is not None:
+                entries[str(path)] = encoded
+        payload = {"schema": self._cache_schema(), "entries": entries}
+        tmp_path = self._cache_path.with_name(f"{self._cache_path.name}.{os.getpid()}.tmp")
+        try:
+            self._cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(payload, f)
+            os.replace(tmp_path, self._cache_path)
+            self._cache_dirty = False
+        except Exception as e:
+            print(f"Warning: Could not write module cache {self._cache_path}: {e}")
+            tmp_path.unlink(missing_ok=True)
 
     def _scan_for_module_files(self, directories: List[str], file_pattern: str = "*.module.yaml") -> List[Path]:
         """Scans directories for module definition files."""
@@ -54,21 +178,15 @@ class ModuleDiscoveryService:
 
     def _parse_yaml_file(self, file_path: Path) -> Dict[str, Any]:
         """Parses a single YAML file into a dictionary."""
-        try:
-            with open(file_path, 'r') as f:
-                content = yaml.safe_load(f)
-                if content is None: # Handles completely empty file
-                    return {} 
-                if not isinstance(content, dict): # Ensure top level is a map
-                    raise YAMLParseError(f"YAML content in {file_path} is not a dictionary (map). Expected a map, got {type(content)}.")
-                return content
-        except yaml.YAMLError as e:
-            raise YAMLParseError(f"Error parsing YAML file {file_path}: {e}") from e
-        except IOError as e:
-            raise ModuleDiscoveryError(f"Error reading file {file_path}: {e}") from e
-
-    def _validate_and_create_metadata(self, data: Dict[str, Any], file_path: Path) -> ModuleMetadata:
-        """Validates the raw data and creates a ModuleMetadata object."""
+        return _load_yaml_mapping(file_path)
+
+    def _validate_and_create_metadata(self, data: Dict[str, Any], file_path: Path,
+                                      mtime: Optional[float] = None,
+                                      resolved_path: Optional[Path] = None) -> ModuleMetadata:
+        """Validates the raw data and creates a ModuleMetadata object.
+
+        ``mtime`` and ``resolved_path`` may be passed when the caller already has them.
+        """
         required_fields = ["module_name", "version", "entry_point"]
         for field_name in required_fields:
             if field_name not in data:
@@ -105,8 +223,26 @@ class ModuleDiscoveryService:
         if not isinstance(supports_reversibility_val, bool):
             raise MetadataValidationError(f"Optional field 'supports_reversibility' must be a boolean if present in {file_path}")
 
+        deterministic_val = data.get("deterministic", False)
+        if not isinstance(deterministic_val, bool):
+            raise MetadataValidationError(f"Optional field 'deterministic' must be a boolean if present in {file_path}")
+
+        warmup_params = data.get("warmup_params")
+        if warmup_params is not None and not isinstance(warmup_params, dict):
+            raise MetadataValidationError(f"Optional field 'warmup_params' must be a mapping if present in {file_path}")
+
+        batch_entry_point = data.get("batch_entry_point")
+        if batch_entry_point is not None and (not isinstance(batch_entry_point, str) or not batch_entry_point.strip()):
+            raise MetadataValidationError(f"Optional field 'batch_entry_point' must be a non-empty string if present in {file_path}")
+        max_batch_size = data.get("max_batch_size", 16)
+        if isinstance(max_batch_size, bool) or not isinstance(max_batch_size, int) or max_batch_size < 1:
+            raise MetadataValidationError(f"Optional field 'max_batch_size' must be a positive integer if present in {file_path}")
+        max_batch_wait_ms = data.get("max_batch_wait_ms", 5.0)
+        if isinstance(max_batch_wait_ms, bool) or not isinstance(max_batch_wait_ms, (int, float)) or max_batch_wait_ms < 0:
+            raise MetadataValidationError(f"Optional field 'max_batch_wait_ms' must be a non-negative number if present in {file_path}")
+
         try:
-            current_mtime = file_path.stat().st_mtime
+            current_mtime = mtime if mtime is not None else file_path.stat().st_mtime
             return ModuleMetadata(
                 module_name=data["module_name"].strip(),
                 version=data["version"].strip(),
@@ -114,9 +250,14 @@ class ModuleDiscoveryService:
                 description=data.get("description", "").strip() or None,
                 author=data.get("author", "").strip() or None,
                 dependencies=parsed_dependencies,
-                source_file_path=file_path.resolve(),
+                source_file_path=resolved_path if resolved_path is not None else file_path.resolve(),
                 cached_at_mtime=current_mtime,
-                supports_reversibility=supports_reversibility_val
+                supports_reversibility=supports_reversibility_val,
+                batch_entry_point=batch_entry_point.strip() if batch_entry_point else None,
+                max_batch_size=max_batch_size,
+                max_batch_wait_ms=float(max_batch_wait_ms),
+                deterministic=deterministic_val,
+                warmup_params=warmup_params
             )
         except TypeError as e: 
             raise MetadataValidationError(f"Error creating ModuleMetadata from data in {file_path}: {e}")
@@ -132,40 +273,38 @@ class ModuleDiscoveryService:
 
         discovered_modules_this_run: Dict[str, ModuleMetadata] = {}
         module_files = self._scan_for_module_files(directories)
+        seen_paths = set()
+        # Files that need parsing: (file_path, resolved_path, stat_result)
+        to_parse: List[Tuple[Path, Path, os.stat_result]] = []
 
         for file_path in module_files:
-            module_name_for_cache_check: Optional[str] = None
-            cached_entry_found_by_path = False
-            
             try:
-                current_file_mtime = file_path.stat().st_mtime
-
-                if use_cache:
-                    for mn_in_cache, meta_in_cache in list(self._cache.items()): 
-                        if meta_in_cache.source_file_path.resolve() == file_path.resolve():
-                            module_name_for_cache_check = mn_in_cache
-                            if not meta_in_cache.source_file_path.exists():
-                                print(f"Info: Cached source file {meta_in_cache.source_file_path} for module {mn_in_cache} no longer exists. Removing from cache.")
-                                del self._cache[mn_in_cache]
-                                break
-
-                            cached_object_mtime = meta_in_cache.cached_at_mtime 
-                            if current_file_mtime <= cached_object_mtime:
-                                discovered_modules_this_run[module_name_for_cache_check] = meta_in_cache
-                                cached_entry_found_by_path = True
-                            else:
-                                print(f"Info: Cache invalidated for {module_name_for_cache_check} (file: {file_path}) due to file modification (current_mtime: {current_file_mtime}, cached_mtime: {cached_object_mtime}).")
-                                del self._cache[module_name_for_cache_check]
-                            break 
-                
-                if cached_entry_found_by_path:
+                stat_result = file_path.stat()
+                resolved_path = file_path.resolve()
+            except FileNotFoundError:
+                print(f"Warning: File {file_path} not found during processing (e.g., deleted after scan). Skipping.")
+                continue
+            seen_paths.add(resolved_path)
+
+            entry = self._path_index.get(resolved_path)
+            if entry is not None:
+                if entry.mtime_ns == stat_result.st_mtime_ns and entry.size == stat_result.st_size:
+                    module_name = entry.metadata.module_name
+                    self._cache[module_name] = entry.metadata
+                    discovered_modules_this_run[module_name] = entry.metadata
                     continue
+                print(f"Info: Cache invalidated for {entry.metadata.module_name} (file: {file_path}) due to file modification "
+                      f"(current_mtime: {stat_result.st_mtime}, cached_mtime: {entry.metadata.cached_at_mtime}).")
+                self._forget_path(resolved_path)
+            to_parse.append((file_path, resolved_path, stat_result))
 
-                raw_data = self._parse_yaml_file(file_path)
+        self._prune_missing(directories, seen_paths)
+
+        for (file_path, resolved_path, stat_result), (raw_data, error) in zip(to_parse, self._parse_files(to_parse)):
+            try:
+                if error is not None:
+                    raise error
                 if not raw_data:
-                    # This case should be handled by _parse_yaml_file returning {} for empty file
-                    # and then the module_name check below will fail.
-                    # Adding an explicit check here if _parse_yaml_file can return None/empty for other reasons.
                     print(f"Warning: No data parsed from {file_path} or file is empty. Skipping.")
                     continue
 
@@ -174,12 +313,15 @@ class ModuleDiscoveryService:
                     print(f"Warning: 'module_name' missing, not a string, or empty in {file_path}. Skipping.")
                     continue
                 module_name = module_name.strip()
-                
-                metadata = self._validate_and_create_metadata(raw_data, file_path)
-                
+
+                metadata = self._validate_and_create_metadata(raw_data, file_path, mtime=stat_result.st_mtime,
+                                                              resolved_path=resolved_path)
+
                 # If an old module with the same name but different file path existed, this will overwrite it.
                 # This is generally fine. If a module moves and keeps its name, it's effectively a "new" discovery at the new path.
-                self._cache[module_name] = metadata 
+                self._cache[module_name] = metadata
+                self._path_index[resolved_path] = _CacheEntry(stat_result.st_mtime_ns, stat_result.st_size, metadata)
+                self._cache_dirty = True
                 discovered_modules_this_run[module_name] = metadata
 
             except ModuleDiscoveryError as e:
@@ -188,11 +330,55 @@ class ModuleDiscoveryService:
                 print(f"Warning: File {file_path} not found during processing (e.g., deleted after scan). Skipping.")
             except Exception as e:
                 print(f"Unexpected error processing file {file_path}: {e}")
-        
+
+        self._save_persistent_cache()
         return discovered_modules_this_run
 
+    def _parse_files(self, to_parse: List[Tuple[Path, Path, os.stat_result]]) -> List[Tuple[Optional[Dict[str, Any]], Optional[Exception]]]:
+        """Parses files in order, returning (data, error) per file; uses a process pool for large batches."""
+        paths = [file_path for file_path, _, _ in to_parse]
+        if self.parse_workers > 1 and len(paths) >= self.parallel_threshold:
+            try:
+                workers = min(self.parse_workers, len(paths))
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    chunksize = max(1, len(paths) // (workers * 4))
+                    return list(pool.map(_load_yaml_mapping_in_worker, paths, chunksize=chunksize))
+            except Exception as e:
+                print(f"Warning: Parallel module parsing failed ({e}); parsing {len(paths)} files inline.")
+        results: List[Tuple[Optional[Dict[str, Any]], Optional[Exception]]] = []
+        for file_path in paths:
+            try:
+                results.append((self._parse_yaml_file(file_path), None))
+            except Exception as e:
+                results.append((None, e))
+        return results
+
+    def _forget_path(self, resolved_path: Path) -> None:
+        """Drops the cache entry of a file (and its module name if it still points at that file)."""
+        entry = self._path_index.pop(resolved_path, None)
+        if entry is None:
+            return
+        self._cache_dirty = True
+        module_name = entry.metadata.module_name
+        if module_name in self._cache and self._cache[module_name].source_file_path == resolved_path:
+            del self._cache[module_name]
+
+    def _prune_missing(self, directories: List[str], seen_paths: set) -> None:
+        """Drops entries for files under the scanned directories that no longer exist."""
+        roots = []
+        for directory_str in directories:
+            try:
+                roots.append(Path(directory_str).resolve())
+            except OSError:
+                continue
+        for resolved_path in [p for p in self._path_index if p not in seen_paths]:
+            if any(resolved_path.is_relative_to(root) for root in roots):
+                print(f"Info: Cached source file {resolved_path} for module {self._path_index[resolved_path].metadata.module_name} "
+                      f"no longer exists. Removing from cache.")
+                self._forget_path(resolved_path)
 
     def clear_cache(self):
-        """Clears the in-memory module cache."""
+        """Clears the module cache (the persisted copy is rewritten by the next discovery)."""
         self._cache.clear()
-        print("Info: Module discovery cache cleared.") 
\ No newline at end of file
+        self._path_index.clear()
+        self._cache_dirty = True
@@ -1,8 +1,20 @@
 from src.core.component_registry import ComponentRegistry
+from src.core.component_executor import ComponentExecutorPool, ComponentTimeoutError
+from src.core.component_switch import PendingSwitch, SwitchConfig, SwitchReport
+from src.core.discovery import ModuleMetadata
+from src.core.micro_batcher import MicroBatcher
+from src.core.module_loader import ModuleLoader
+from src.core.result_cache import ResultCache, params_fingerprint
+import copy
+import dataclasses
 import time
 from src.logger import setup_logger
-from typing import Dict, Any, Optional, Tuple, TypedDict
+from typing import Callable, Deque, Dict, Any, List, Optional, Set, Tuple, TypedDict, TYPE_CHECKING
 import asyncio # Added for asyncio.iscoroutinefunction and get_running_loop
+from collections import deque
+
+if TYPE_CHECKING:
+    from src.core.metrics_feedback import MetricsFeedbackChannel
 
 from src.state_types import KFMAgentState, ActionType # Added imports
 
@@ -18,17 +30,39 @@ class ExecutionEngine:
     """Manages the application of KFM actions (setting the active component) 
     and executes tasks using the currently active component.
     It interacts with the ComponentRegistry to get component functions.
+
+    The active component belongs to the engine, not to a run: concurrent runs that
+    share an engine also share it, and the latest applied action wins.
     """
     
-    def __init__(self, component_registry: ComponentRegistry):
+    def __init__(self, component_registry: ComponentRegistry, metrics_feedback: Optional["MetricsFeedbackChannel"] = None,
+                 executor_pool: Optional[ComponentExecutorPool] = None, result_cache: Optional[ResultCache] = None):
         """Initialize the ExecutionEngine.
         
         Args:
             component_registry (ComponentRegistry): Registry of available components.
+            metrics_feedback (Optional[MetricsFeedbackChannel]): Channel that streams task
+                latency/accuracy measurements into the StateMonitor.
+            executor_pool (Optional[ComponentExecutorPool]): Per-component executors for
+                synchronous components. Defaults to one thread pool per component.
+            result_cache (Optional[ResultCache]): Cache for memoized (deterministic) components.
+                Created on first use if not given.
         """
         if not isinstance(component_registry, ComponentRegistry):
             raise TypeError("component_registry must be an instance of ComponentRegistry")
+        self.logger = setup_logger('ExecutionEngine')
         self._registry = component_registry
+        self.metrics_feedback = metrics_feedback
+        self.executor_pool = executor_pool or ComponentExecutorPool()
+        self._batchers: Dict[str, MicroBatcher] = {}
+        self.result_cache = result_cache
+        self._memoized_versions: Dict[str, str] = {}
+        self._memoized_module_keys: Dict[str, str] = {}  # module name -> component key, where they differ
+        self._subscribed_to_registry = False
+        self._switch_configs: Dict[str, SwitchConfig] = {}
+        self._pending_switch: Optional[PendingSwitch] = None
+        self._shadow_tasks: Set[asyncio.Task] = set()
+        self.switch_reports: Deque[SwitchReport] = deque(maxlen=100)
         self._active_component_key = self._registry.get_default_component_key() 
         if self._active_component_key is None:
             available_keys = list(self._registry.list_components().keys())
@@ -39,7 +73,6 @@ class ExecutionEngine:
                 self.logger.warning("No components available in registry during ExecutionEngine initialization.")
                 self._active_component_key = None # Explicitly None if no components
         
-        self.logger = setup_logger('ExecutionEngine')
         self.logger.info(f"ExecutionEngine initialized. Active component: {self._active_component_key}")
     
     def apply_kfm_action(self, action: dict) -> bool:
@@ -120,7 +153,16 @@ class ExecutionEngine:
 
         # 1. Apply KFM Action (sets self._active_component_key)
         kfm_action_for_engine = {"action": action_type.value, "component": target_component}
-        apply_success = self.apply_kfm_action(kfm_action_for_engine)
+        switch_report: Optional[SwitchReport] = None
+        if (action_type in (ActionType.MARRY, ActionType.FUCK) and target_component in self._switch_configs
+                and target_component != self._active_component_key):
+            # Warm switch: warm up / shadow the target before it serves (see component_switch)
+            switch_report = await self.switch_component(kfm_action_for_engine)
+            apply_success = switch_report.committed or self.pending_switch is switch_report
+        else:
+            if action_type in (ActionType.MARRY, ActionType.FUCK):
+                self._supersede_pending_switch(target_component)
+            apply_success = self.apply_kfm_action(kfm_action_for_engine)
 
         # For Marry/Fuck, if apply_kfm_action fails (e.g., component not found), it's an error.
         # NO_ACTION and KILL are generally considered successful applications at this stage.
@@ -146,37 +188,67 @@ class ExecutionEngine:
         self.logger.info(f"Executing task with input (keys): {list(params.keys())} on active component: {active_component_to_run} (activated via: {activation_type_info})")
         self.logger.debug(f"Task input (full): {params}")
         
-        component_func = self._registry.get_component(active_component_to_run)
+        batcher, component_func = self._resolve_component(active_component_to_run)
         
-        if component_func is None:
+        if batcher is None and component_func is None:
             self.logger.error(f"Cannot execute task: Active component '{active_component_to_run}' function not found in registry.")
             return ExecutionResult(status="error", output={"error": f"Component function for '{active_component_to_run}' not found"}, performance={'latency': 0.0, 'accuracy': 0.0})
 
+        memo_version = self._memoized_versions.get(active_component_to_run)
+        params_hash = params_fingerprint(params) if memo_version is not None else None
+        if params_hash is not None:
+            lookup_start = time.time()
+            hit, cached, tier = self.result_cache.get(active_component_to_run, memo_version, params_hash)
+            if hit:
+                result_data, component_accuracy = copy.deepcopy(cached)
+                self.logger.info(f"Served '{active_component_to_run}' v{memo_version} from the {tier} result cache")
+                performance_metrics = {'latency': time.time() - lookup_start,
+                                       'accuracy': component_accuracy if component_accuracy is not None else 0.0,
+                                       'cache_hit': 1.0}
+                if switch_report is not None and switch_report.committed:
+                    performance_metrics['switch_latency'] = switch_report.switch_latency
+                # Served requests count towards a pending switch whether or not they were memoized
+                self._maybe_shadow(active_component_to_run, params)
+                return ExecutionResult(status="success", output=result_data, performance=performance_metrics)
+
         start_time_exec = time.time()
         try:
-            # Assuming component_func is synchronous as per current KFM design.
-            # If component_func can be async, this needs more sophisticated handling.
-            # For now, run synchronous component functions in an executor to be awaitable.
-            if asyncio.iscoroutinefunction(component_func):
-                 result_data, component_accuracy = await component_func(params)
-            else:
-                 loop = asyncio.get_running_loop()
-                 # component_func typically returns (result_dict, accuracy_float)
-                 raw_result_tuple = await loop.run_in_executor(None, component_func, params)
-                 result_data, component_accuracy = raw_result_tuple if isinstance(raw_result_tuple, tuple) and len(raw_result_tuple) == 2 else (raw_result_tuple, None)
-
+            result_data, component_accuracy = await self._invoke_component(active_component_to_run, batcher, component_func, params)
 
             latency = time.time() - start_time_exec
             performance_metrics = {'latency': latency, 'accuracy': component_accuracy if component_accuracy is not None else 0.0}
+            if switch_report is not None and switch_report.committed:
+                performance_metrics['switch_latency'] = switch_report.switch_latency
             
             self.logger.info(f"Task execution on '{active_component_to_run}' completed in {latency:.4f}s. Accuracy: {component_accuracy}")
             self.logger.debug(f"Result: {result_data}, Performance: {performance_metrics}")
+            if self.metrics_feedback is not None:
+                # Only measured values are fed back; a missing accuracy is not an observed 0.0
+                self.metrics_feedback.submit(active_component_to_run, latency=latency, accuracy=component_accuracy)
+            if params_hash is not None:
+                self.result_cache.put(active_component_to_run, memo_version, params_hash,
+                                      copy.deepcopy([result_data, component_accuracy]))
+                performance_metrics['cache_hit'] = 0.0
+            self._maybe_shadow(active_component_to_run, params)
             
             return ExecutionResult(
                 status="success",
                 output=result_data,
                 performance=performance_metrics
             )
+        except ComponentTimeoutError as e:
+            latency = time.time() - start_time_exec
+            self.logger.warning(f"Task execution on '{active_component_to_run}' timed out after {latency:.4f}s: {e}")
+            if self.metrics_feedback is not None:
+                # The deadline is a lower bound on the component's latency; report it so the planner sees it
+                self.metrics_feedback.submit(active_component_to_run, latency=latency)
+            return ExecutionResult(
+                status="error",
+                output={"error": str(e)},
+                details=str(e),
+                error_type=type(e).__name__,
+                performance={'latency': latency, 'accuracy': 0.0, 'timed_out': 1.0}
+            )
         except Exception as e:
             latency = time.time() - start_time_exec
             self.logger.exception(f"Error during task execution with component '{active_component_to_run}': {e}", exc_info=True)
@@ -188,6 +260,271 @@ class ExecutionEngine:
                 performance={'latency': latency, 'accuracy': 0.0}
             )
 
+    def _resolve_component(self, component_key: str) -> Tuple[Optional[MicroBatcher], Optional[Callable]]:
+        """Returns (batcher, component_func) for a component; both None if it is unknown."""
+        batcher = self._batchers.get(component_key)
+        component_func = self._registry.get_component(component_key) if batcher is None else None
+        return batcher, component_func
+
+    async def _invoke_component(self, component_key: str, batcher: Optional[MicroBatcher],
+                                component_func: Optional[Callable], params: Dict) -> Tuple[Any, Optional[float]]:
+        """Runs a component once and returns (result_data, accuracy)."""
+        # Synchronous component functions run on the component's own executor (see
+        # ComponentExecutorPool), so one slow component cannot starve the others.
+        # Batched components coalesce concurrent calls into one vectorized call (see MicroBatcher).
+        if batcher is not None:
+            raw_result_tuple = await batcher.submit(params)
+        elif asyncio.iscoroutinefunction(component_func):
+            deadline = self.executor_pool.get_config(component_key).timeout
+            try:
+                raw_result_tuple = await asyncio.wait_for(component_func(params), deadline)
+            except asyncio.TimeoutError:
+                raise ComponentTimeoutError(f"Component '{component_key}' timed out after {deadline}s") from None
+        else:
+            raw_result_tuple = await self.executor_pool.run(component_key, component_func, params)
+        # Components typically return (result_dict, accuracy_float)
+        return raw_result_tuple if isinstance(raw_result_tuple, tuple) and len(raw_result_tuple) == 2 else (raw_result_tuple, None)
+
+    def configure_switch(self, component_key: str, warmup_params: Optional[Dict[str, Any]] = None,
+                         shadow_requests: int = 0) -> None:
+        """Makes Marry/Fuck switches to a component warm switches (see component_switch).
+
+        Args:
+            component_key: Target component.
+            warmup_params: Params for a warm-up call before switching (None = no warm-up).
+            shadow_requests: Live requests to shadow-execute on the target before committing.
+        """
+        if warmup_params is None and not shadow_requests:
+            self._switch_configs.pop(component_key, None)
+            return
+        self._switch_configs[component_key] = SwitchConfig(warmup_params=warmup_params, shadow_requests=shadow_requests)
+        self.logger.info(f"Warm switch configured for '{component_key}' (warm-up: {warmup_params is not None}, shadow requests: {shadow_requests})")
+
+    def configure_switch_for_module(self, module_meta: ModuleMetadata, component_key: Optional[str] = None,
+                                    shadow_requests: int = 0) -> None:
+        """Configures a warm switch using the module's declared `warmup_params`."""
+        self.configure_switch(component_key or module_meta.module_name, module_meta.warmup_params, shadow_requests)
+
+    @property
+    def pending_switch(self) -> Optional[SwitchReport]:
+        """Report of the switch currently waiting for shadow executions, if any."""
+        return self._pending_switch.report if self._pending_switch is not None else None
+
+    async def switch_component(self, action: Dict[str, Any]) -> SwitchReport:
+        """Runs the warm switch protocol for a Marry/Fuck action.
+
+        The previous component keeps serving while the target warms up. Without shadow
+        requests the switch is committed right after the warm-up; otherwise it is
+        committed once the configured number of shadow executions have finished.
+
+        Args:
+            action: KFM action dict with 'action' and 'component' keys.
+
+        Returns:
+            SwitchReport: committed, or pending (see `pending_switch`), or neither if the
+            target is unknown.
+        """
+        target = action['component']
+        pending = self._pending_switch
+        if pending is not None and pending.report.target == target:
+            return pending.report
+        self._supersede_pending_switch(target)
+
+        config = self._switch_configs.get(target, SwitchConfig())
+        report = SwitchReport(target=target, action=action['action'], previous=self._active_component_key)
+        if target not in self._registry.list_components():
+            self.logger.error(f"Cannot switch to '{target}': Component not found in registry.")
+            self.switch_reports.append(report)
+            return report
+
+        if config.warmup_params is not None:
+            batcher, component_func = self._resolve_component(target)
+            warmup_start = time.time()
+            try:
+                await self._invoke_component(target, batcher, component_func, copy.deepcopy(config.warmup_params))
+            except Exception as e:
+                # A failed warm-up does not veto the planner's decision; it is reported instead
+                report.warmup_error = f"{type(e).__name__}: {e}"
+                self.logger.warning(f"Warm-up of '{target}' failed: {report.warmup_error}")
+            report.warmup_latency = time.time() - warmup_start
+            self.logger.info(f"Warmed up '{target}' in {report.warmup_latency:.4f}s")
+
+        if config.shadow_requests > 0 and self._active_component_key is not None:
+            self._pending_switch = PendingSwitch(action=action, report=report, required=config.shadow_requests)
+            self.logger.info(f"Switch to '{target}' pending {config.shadow_requests} shadow executions; '{self._active_component_key}' keeps serving")
+            return report
+
+        self._commit_switch(action, report)
+        return report
+
+    def _supersede_pending_switch(self, new_target: Optional[str]) -> None:
+        """Drops a pending switch when the planner decides on a different component."""
+        pending = self._pending_switch
+        if pending is None or pending.report.target == new_target:
+            return
+        pending.report.superseded = True
+        self._pending_switch = None
+        self.switch_reports.append(pending.report)
+        self.logger.info(f"Pending switch to '{pending.report.target}' superseded by a switch to '{new_target}'")
+
+    def _commit_switch(self, action: Dict[str, Any], report: SwitchReport) -> None:
+        if self._pending_switch is not None and self._pending_switch.report is report:
+            self._pending_switch = None
+        report.committed = self.apply_kfm_action(action)
+        report.switch_latency = time.time() - report.requested_at
+        self.switch_reports.append(report)
+        self.logger.info(f"Switch to '{report.target}' {'committed' if report.committed else 'failed'} after {report.switch_latency:.4f}s "
+                         f"(warm-up: {report.warmup_latency}, shadow runs: {report.shadow_runs}, shadow errors: {report.shadow_errors})")
+
+    def _maybe_shadow(self, served_component: str, params: Dict) -> None:
+        """Shadow-executes a served request on the pending switch target, if one needs it."""
+        pending = self._pending_switch
+        if pending is None or pending.report.target == served_component or pending.launched >= pending.required:
+            return
+        pending.launched += 1
+        task = asyncio.get_running_loop().create_task(self._shadow_run(pending, copy.deepcopy(params)))
+        self._shadow_tasks.add(task)
+        task.add_done_callback(self._shadow_tasks.discard)
+
+    async def _shadow_run(self, pending: PendingSwitch, params: Dict) -> None:
+        target = pending.report.target
+        batcher, component_func = self._resolve_component(target)
+        start = time.time()
+        try:
+            _, accuracy = await self._invoke_component(target, batcher, component_func, params)
+            pending.report.shadow_runs += 1
+            if self.metrics_feedback is not None:
+                self.metrics_feedback.submit(target, latency=time.time() - start, accuracy=accuracy)
+        except Exception as e:
+            pending.report.shadow_errors += 1
+            self.logger.warning(f"Shadow execution on '{target}' failed: {type(e).__name__}: {e}")
+        if (self._pending_switch is pending
+                and pending.report.shadow_runs + pending.report.shadow_errors >= pending.required):
+            self._commit_switch(pending.action, pending.report)
+
+    def set_component_timeout(self, component_key: str, timeout: Optional[float]) -> None:
+        """Sets (or clears with None) the deadline for a component's execute calls.
+
+        Timed-out calls return an error result with error_type 'ComponentTimeoutError';
+        see ComponentExecutorPool for how the busy worker is reclaimed.
+        """
+        config = dataclasses.replace(self.executor_pool.get_config(component_key), timeout=timeout)
+        self.executor_pool.configure(component_key, config)
+
+    def enable_batching(self, component_key: str, batch_func: Callable[[List[Dict[str, Any]]], List[Any]],
+                        max_batch_size: int = 16, max_batch_wait: float = 0.005) -> MicroBatcher:
+        """Executes a component through micro-batches of concurrent calls.
+
+        Args:
+            component_key: Component whose execute calls are batched.
+            batch_func: Synchronous callable taking a list of params dicts and returning one
+                result per item (each a (result_dict, accuracy) tuple or a result dict).
+            max_batch_size: Maximum calls per batch.
+            max_batch_wait: Maximum seconds a call waits for a batch to fill.
+
+        Returns:
+            MicroBatcher: The batcher now used for the component.
+        """
+        batcher = MicroBatcher(component_key, batch_func, self.executor_pool,
+                               max_batch_size=max_batch_size, max_batch_wait=max_batch_wait)
+        self._batchers[component_key] = batcher
+        self.logger.info(f"Micro-batching enabled for '{component_key}' (max_batch_size={max_batch_size}, max_batch_wait={max_batch_wait}s)")
+        return batcher
+
+    def enable_batching_for_module(self, module_meta: ModuleMetadata, component_key: Optional[str] = None,
+                                   loader: Optional[ModuleLoader] = None) -> Optional[MicroBatcher]:
+        """Enables micro-batching from a module's declared `batch_entry_point`.
+
+        Args:
+            module_meta: Module metadata; modules without a batch entry point are left unbatched.
+            component_key: Component key used by execute (defaults to the module name).
+            loader: ModuleLoader used to resolve the entry point.
+
+        Returns:
+            Optional[MicroBatcher]: The batcher, or None if the module does not declare one.
+
+        Raises:
+            ModuleLoadError: If the batch entry point cannot be resolved.
+        """
+        if not module_meta.batch_entry_point:
+            return None
+        batch_func = (loader or ModuleLoader()).load_batch_entry_point(module_meta)
+        return self.enable_batching(component_key or module_meta.module_name, batch_func,
+                                    max_batch_size=module_meta.max_batch_size,
+                                    max_batch_wait=module_meta.max_batch_wait_ms / 1000.0)
+
+    def disable_batching(self, component_key: str) -> None:
+        """Returns a component to one call per execute."""
+        self._batchers.pop(component_key, None)
+
+    def enable_memoization(self, component_key: str, version: str = "unversioned") -> ResultCache:
+        """Serves repeated params of a deterministic component from the result cache.
+
+        Entries are keyed by component key, version and a canonical hash of params.
+        Registering another version of the module (or deregistering it) invalidates them.
+
+        Args:
+            component_key: Component to memoize.
+            version: Current version of the component.
+
+        Returns:
+            ResultCache: The engine's result cache.
+        """
+        if self.result_cache is None:
+            self.result_cache = ResultCache()
+        if not self._subscribed_to_registry:
+            self._registry.subscribe("registered", self._on_module_registered)
+            self._registry.subscribe("deregistered", self._on_module_deregistered)
+            self._subscribed_to_registry = True
+        previous = self._memoized_versions.get(component_key)
+        self._memoized_versions[component_key] = version
+        if previous is not None and previous != version:
+            self.result_cache.invalidate(component_key, keep_version=version)
+        self.logger.info(f"Memoization enabled for '{component_key}' v{version}")
+        return self.result_cache
+
+    def enable_memoization_for_module(self, module_meta: ModuleMetadata, component_key: Optional[str] = None) -> bool:
+        """Enables memoization if the module declares itself `deterministic`. Returns whether it did."""
+        if not module_meta.deterministic:
+            return False
+        key = component_key or module_meta.module_name
+        if key != module_meta.module_name:
+            self._memoized_module_keys[module_meta.module_name] = key
+        self.enable_memoization(key, module_meta.version)
+        return True
+
+    def disable_memoization(self, component_key: str) -> None:
+        """Stops memoizing a component and drops its cached results."""
+        for module_name, key in list(self._memoized_module_keys.items()):
+            if key == component_key:
+                del self._memoized_module_keys[module_name]
+        if self._memoized_versions.pop(component_key, None) is not None and self.result_cache is not None:
+            self.result_cache.invalidate(component_key)
+
+    def _on_module_registered(self, module_meta: ModuleMetadata) -> None:
+        key = self._memoized_module_keys.get(module_meta.module_name, module_meta.module_name)
+        current = self._memoized_versions.get(key)
+        if current is not None and current != module_meta.version:
+            self.logger.info(f"Module '{module_meta.module_name}' changed version {current} -> {module_meta.version}; invalidating cached results for '{key}'")
+            self._memoized_versions[key] = module_meta.version
+            self.result_cache.invalidate(key, keep_version=module_meta.version)
+
+    def _on_module_deregistered(self, module_name: str, version: Optional[str]) -> None:
+        key = self._memoized_module_keys.get(module_name, module_name)
+        current = self._memoized_versions.get(key)
+        if current is not None and (version is None or version == current):
+            self.result_cache.invalidate(key)
+
+    def set_metrics_feedback(self, metrics_feedback: Optional["MetricsFeedbackChannel"]) -> None:
+        """Attach (or detach with None) the channel that feeds measurements to the StateMonitor."""
+        self.metrics_feedback = metrics_feedback
+
     def get_active_component_key(self) -> Optional[str]:
         """Returns the key of the currently active component."""
-        return self._active_component_key
\ No newline at end of file
+        return self._active_component_key
+    def close(self) -> None:
+        """Shuts down the per-component executors without waiting for running calls.
+
+        A later synchronous component call starts a new executor for its component.
+        """
+        self.executor_pool.shutdown(wait=False)
@@ -1,6 +1,7 @@
 import time
 from src.core.state_monitor import StateMonitor
 from src.core.execution_engine import ExecutionEngine
+from src.core.performance_index import PerformanceIndex
 from src.logger import setup_logger
 
 class KFMPlanner:
@@ -54,6 +55,13 @@ class KFMPlanner:
 
         self.logger.debug(f"Task '{task_name}' Requirements: min_accuracy={min_accuracy:.2f}, max_latency={max_latency:.2f}s")
 
+        # Use the StateMonitor's sorted performance index when it has one (O(log n) lookups)
+        performance_index = getattr(self.state_monitor, 'performance_index', None)
+        if isinstance(performance_index, PerformanceIndex) and len(performance_index):
+            decision = self._decide_from_index(performance_index, task_name, min_accuracy, max_latency)
+            self.logger.info(f"Final KFM Decision for task '{task_name}': {decision}")
+            return decision
+
         # Assuming StateMonitor provides a way to get all components and their performance
         # This might be: self.state_monitor.get_all_component_performance() -> dict[str, dict]
         # Or: self.state_monitor.get_available_component_keys() -> list[str]
@@ -111,6 +119,30 @@ class KFMPlanner:
         self.logger.info(f"Final KFM Decision for task '{task_name}': {decision}")
         return decision
         
+    def _decide_from_index(self, performance_index: PerformanceIndex, task_name: str,
+                           min_accuracy: float, max_latency: float) -> dict:
+        """Same decision as the scan in decide_kfm_action, answered from the sorted index."""
+        chosen_component_key = performance_index.best_marry(min_accuracy, max_latency)
+        if chosen_component_key is not None:
+            perf = self.state_monitor.get_performance_data(chosen_component_key)
+            self.logger.info(f"Selected MARRY action with component '{chosen_component_key}'. Perf: {perf.get('accuracy', 0.0):.2f} acc, {perf.get('latency', float('inf')):.2f}s lat")
+            return {'action': 'marry', 'component': chosen_component_key}
+
+        chosen_component_key = performance_index.best_fuck(min_accuracy, max_latency)
+        if chosen_component_key is not None:
+            perf = self.state_monitor.get_performance_data(chosen_component_key)
+            accuracy, latency = perf.get('accuracy', 0.0), perf.get('latency', float('inf'))
+            chosen_score = (accuracy, -latency)
+            self.logger.warning(
+                f"KFM Decision: FUCK component '{chosen_component_key}'. "
+                f"Reason: Compromise solution (meets partial criteria). "
+                f"Score: {chosen_score} (acc: {accuracy:.2f}, lat: {latency:.2f}s)"
+            )
+            return {'action': 'fuck', 'component': chosen_component_key}
+
+        self.logger.warning(f"KFM Decision: KILL proposed. No suitable MARRY or FUCK component found for task '{task_name}'.")
+        return {'action': 'kill', 'component': None}
+
     def get_kfm_action(self, task_name: str, performance_data=None, requirements=None, current_state=None) -> dict | None:
         """Alias for decide_kfm_action for API compatibility.
         
@@ -1,6 +1,9 @@
+import contextlib
+import contextvars
+import functools
 import json
 import logging
-from typing import Dict, Any, Optional, Literal, Tuple, List, ClassVar
+from typing import Dict, Any, Optional, Literal, Tuple, List, ClassVar, TYPE_CHECKING
 from uuid import UUID
 from src.core.llm_logging import KfmPlannerCallbackHandler, get_configured_logger
 # Import custom exceptions
@@ -18,17 +21,15 @@ from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from langchain_core.runnables import Runnable, RunnablePassthrough, RunnableSerializable
 from langchain_core.exceptions import OutputParserException as LangchainOutputParserException
-from httpx import TimeoutException, NetworkError
-from openai import APIError, RateLimitError, APITimeoutError, APIConnectionError, APIStatusError
 import os
+import sys
+import importlib
 from dotenv import load_dotenv
-from google.generativeai import GenerativeModel # Assuming direct Google AI usage
-# from langchain_google_genai import ChatGoogleGenerativeAI # Alternative if using LangChain
 from .state import KFMAgentState # Corrected import from .state
 from .component_registry import ComponentRegistry # Corrected import from .component_registry
-from .memory.chroma_manager import ChromaMemoryManager # Import the manager
 from .memory.models import AgentQueryContext # Import AgentQueryContext
 from .prompt_manager import get_global_prompt_manager, PromptManager # Added PromptManager
+from .component_pruning import prune_components, estimate_tokens
 import re
 from src.core.ethical_manager_instance import get_ecm_instance # Added import for ECM
 from src.core.ethical_config_manager_mock import EthicalConfigManagerMock # Use the mock type for now
@@ -37,30 +38,66 @@ from src.core.ethical_config_manager_mock import EthicalConfigManagerMock # Use
 from .reversibility.file_snapshot_storage import FileSnapshotStorage
 from .reversibility.snapshot_service import SnapshotService
 import asyncio # For running async snapshot calls if in sync context (though decide_kfm_action is sync)
+import time
 
-# Attempt to import Chat Models - handle gracefully if unavailable
-try:
-    from langchain_google_genai import ChatGoogleGenerativeAI
-except ImportError:
-    ChatGoogleGenerativeAI = None
-    print("Warning: langchain-google-genai not installed. Google models unavailable.")
-
-try:
-    from langchain_openai import ChatOpenAI
-except ImportError:
-    ChatOpenAI = None
-    print("Warning: langchain-openai not installed. OpenAI models unavailable.")
-
-try:
-    from langchain_cerebras import ChatCerebras
-except ImportError:
-    ChatCerebras = None
-    print("Warning: langchain-cerebras not installed. Cerebras models unavailable.")
+if TYPE_CHECKING:
+    from .memory.chroma_manager import ChromaMemoryManager
 
 from datetime import datetime, timezone # Added datetime and timezone
 
-# Load environment variables from .env file
-load_dotenv()
+# --- Lazily loaded provider SDKs ---
+# Provider SDKs (and the chroma/torch stack behind ChromaMemoryManager) take seconds to
+# import, so they are only loaded when a planner actually builds that provider tier.
+# Module attributes of the same name (e.g. `kfm_planner_llm.ChatOpenAI`) still resolve
+# through __getattr__ and can be patched in tests.
+_LAZY_PROVIDER_ATTRS: Dict[str, Tuple[str, str]] = {
+    "ChatCerebras": ("langchain_cerebras", "langchain-cerebras"),
+    "ChatGoogleGenerativeAI": ("langchain_google_genai", "langchain-google-genai"),
+    "ChatOpenAI": ("langchain_openai", "langchain-openai"),
+    "GenerativeModel": ("google.generativeai", "google-generativeai"),
+}
+
+def _load_provider_attr(name: str) -> Optional[Any]:
+    """Returns the named provider class, importing its SDK on first use (None if not installed)."""
+    if name in globals():
+        # Patched onto this module (e.g. by unittest.mock.patch)
+        return globals()[name]
+    module_name, package_name = _LAZY_PROVIDER_ATTRS[name]
+    try:
+        return getattr(importlib.import_module(module_name), name)
+    except ImportError:
+        print(f"Warning: {package_name} not installed. {name} unavailable.")
+        return None
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_PROVIDER_ATTRS:
+        return _load_provider_attr(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def _llm_api_error_types() -> Tuple[type, ...]:
+    """Returns the openai/httpx exception types treated as LLM API/network errors.
+
+    Only SDKs that are already imported are consulted: a client library that was never
+    loaded cannot have raised. An empty tuple matches nothing in an except clause.
+    """
+    error_types: List[type] = []
+    openai_module = sys.modules.get("openai")
+    if openai_module is not None:
+        for error_name in ("APIError", "RateLimitError", "APITimeoutError", "APIConnectionError", "APIStatusError"):
+            error_types.append(getattr(openai_module, error_name))
+    httpx_module = sys.modules.get("httpx")
+    if httpx_module is not None:
+        error_types.extend([httpx_module.NetworkError, httpx_module.TimeoutException])
+    return tuple(error_types)
+
+_dotenv_loaded = False
+
+def _ensure_dotenv_loaded() -> None:
+    """Loads environment variables from .env once, on first planner construction."""
+    global _dotenv_loaded
+    if not _dotenv_loaded:
+        load_dotenv()
+        _dotenv_loaded = True
 
 # --- Pydantic Model for LLM Output Validation ---
 
@@ -173,13 +210,95 @@ OPTIMIZED_KFM_HUMAN_PROMPT = "Task: {task_name}\nMin Accuracy: {min_accuracy}\nM
 
 logger = logging.getLogger(__name__)
 
-# Initialize default prompts in the global manager at module load time
-# This ensures they are available even if KFMPlannerLlm is instantiated multiple times
-# or if other modules need to reference these specific prompt IDs.
-_initial_prompt_manager = get_global_prompt_manager()
-_initial_prompt_manager.register_prompt(KFM_LLM_SYSTEM_DEFAULT_ID, OPTIMIZED_KFM_SYSTEM_PROMPT, version=1)
-_initial_prompt_manager.register_prompt(KFM_LLM_HUMAN_DEFAULT_ID, OPTIMIZED_KFM_HUMAN_PROMPT, version=1)
-_initial_prompt_manager.register_prompt(KFM_LLM_SYSTEM_CEREBRAS_ID, CEREBRAS_OPTIMIZED_KFM_SYSTEM_PROMPT, version=1)
+def register_default_prompts(prompt_manager: Optional[PromptManager] = None) -> None:
+    """Registers the default KFM prompts with the given (or global) prompt manager.
+
+    Called on planner construction rather than at import time; prompts that are already
+    registered are left untouched, so repeated calls are cheap.
+    """
+    manager = prompt_manager if prompt_manager else get_global_prompt_manager()
+    for prompt_id, template in (
+        (KFM_LLM_SYSTEM_DEFAULT_ID, OPTIMIZED_KFM_SYSTEM_PROMPT),
+        (KFM_LLM_HUMAN_DEFAULT_ID, OPTIMIZED_KFM_HUMAN_PROMPT),
+        (KFM_LLM_SYSTEM_CEREBRAS_ID, CEREBRAS_OPTIMIZED_KFM_SYSTEM_PROMPT),
+    ):
+        if manager.get_prompt_version(prompt_id) is None:
+            manager.register_prompt(prompt_id, template, version=1)
+
+def flatten_components_for_prompt(components_details: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Flattens component details into the ``{key: {accuracy, latency, supports_reversibility}}`` shape the prompt uses.
+
+    Accepts either the registry format (``{module_name: [version_details, ...]}``, keyed
+    as ``module_name@version``) or an already flat performance map (``{name: {...}}``).
+    """
+    formatted_components_for_llm: Dict[str, Dict[str, Any]] = {}
+
+    for module_name, versions_list in components_details.items():
+        if isinstance(versions_list, dict):
+            # Flat performance map entry, e.g. {"accuracy": 0.9, "latency": 0.5}
+            version_entries = [(module_name, versions_list, versions_list)]
+        else:
+            # Construct a unique key for the LLM, e.g., "MyComponent@1.0.0"
+            version_entries = [
+                (f"{module_name}@{version_detail['version']}", version_detail.get("performance_metrics", {}), version_detail)
+                for version_detail in versions_list
+            ]
+
+        for component_key, perf_metrics, version_detail in version_entries:
+            accuracy = perf_metrics.get("accuracy")
+            latency = perf_metrics.get("latency")
+            supports_rev = version_detail.get("supports_reversibility", False)
+
+            component_info_for_llm: Dict[str, Any] = {"supports_reversibility": supports_rev}
+
+            if accuracy is not None:
+                component_info_for_llm["accuracy"] = accuracy
+            if latency is not None:
+                component_info_for_llm["latency"] = latency
+
+            formatted_components_for_llm[component_key] = component_info_for_llm
+
+    return formatted_components_for_llm
+
+def build_components_prompt_fragment(
+    formatted_components: Dict[str, Dict[str, Any]],
+    requirements: Dict[str, Any],
+    active_component: Optional[str] = None,
+    prune: bool = True,
+    max_components: Optional[int] = None
+) -> Tuple[str, Dict[str, Any]]:
+    """Serializes flattened components for the prompt, optionally pruning dominated ones.
+
+    Returns:
+        The JSON string for the prompt and a stats dict with component counts and the
+        estimated tokens saved by pruning.
+    """
+    unpruned_json = json.dumps(formatted_components)
+    if prune:
+        kept = prune_components(
+            formatted_components,
+            requirements=requirements,
+            active_component=active_component,
+            max_components=max_components
+        )
+        components_json = json.dumps(kept)
+    else:
+        kept = formatted_components
+        components_json = unpruned_json
+
+    # The system prompt expects components as a JSON-like string of a dictionary.
+    # Example: {{"component_A@1.0": {{"accuracy": 0.95, "latency": 50, "supports_reversibility": true}}, ...}}
+    tokens_before = estimate_tokens(unpruned_json)
+    tokens_after = estimate_tokens(components_json)
+    stats = {
+        "components_before": len(formatted_components),
+        "components_after": len(kept),
+        "pruned_count": len(formatted_components) - len(kept),
+        "estimated_tokens_before": tokens_before,
+        "estimated_tokens_after": tokens_after,
+        "estimated_tokens_saved": tokens_before - tokens_after
+    }
+    return components_json, stats
 
 class KFMPlannerLlm(RunnablePassthrough):
     """
@@ -189,6 +308,8 @@ class KFMPlannerLlm(RunnablePassthrough):
 
     Utilizes a tiered fallback mechanism for model selection (default: cerebras -> google -> openai_3_5).
     Includes model-specific prompt tuning (e.g., for Cerebras).
+    Setting KFM_LOCAL_LLM_MODE swaps in the offline LocalKfmChatModel tier
+    (replay/record/rules, see src/core/local_chat_model.py).
 
     Known Limitations (based on benchmark `scripts/benchmark_kfm_planner_llm.py`):
     - Achieved 93.75% (15/16) accuracy on the test suite.
@@ -200,6 +321,7 @@ class KFMPlannerLlm(RunnablePassthrough):
     KfmAction: ClassVar[Literal["Kill", "Marry", "Fuck", "No Action"]] # Type alias for actions
     DEFAULT_SNAPSHOT_STORAGE_PATH: ClassVar[str] = "./kfm_snapshots" # Default path for snapshots
     DEFAULT_MAX_MEMORIES_TO_RETRIEVE: ClassVar[int] = 3 # Added default for max memories
+    DEFAULT_MAX_PROMPT_COMPONENTS: ClassVar[Optional[int]] = None # No cap on pruned component count
 
     # Pydantic model_config to allow arbitrary types for complex service objects
     model_config = {
@@ -209,7 +331,7 @@ class KFMPlannerLlm(RunnablePassthrough):
 
     # Pydantic model fields (instance variables) - these must be declared with type hints
     component_registry: ComponentRegistry
-    memory_manager: Optional[ChromaMemoryManager]
+    memory_manager: Optional[Any] # ChromaMemoryManager; typed loosely so chromadb isn't imported with the planner
     prompt_manager: Optional[PromptManager]
     snapshot_service: Optional[SnapshotService]
     primary_llm_key_for_logging: str
@@ -221,15 +343,19 @@ class KFMPlannerLlm(RunnablePassthrough):
     ecm: Optional[EthicalConfigManagerMock]
     max_memories_to_retrieve: int
     model_name: str # Added model_name as an instance field
+    prune_dominated_components: bool
+    max_prompt_components: Optional[int]
 
     def __init__(self, 
                  component_registry: ComponentRegistry, 
-                 memory_manager: Optional[ChromaMemoryManager] = None, # Added memory_manager
+                 memory_manager: Optional["ChromaMemoryManager"] = None, # Added memory_manager
                  model_name: str = DEFAULT_MODEL_NAME, 
                  google_api_key: Optional[str] = None,
                  prompt_manager: Optional[PromptManager] = None, # Added prompt_manager
                  snapshot_storage_path: str = DEFAULT_SNAPSHOT_STORAGE_PATH, # Added snapshot_storage_path
-                 max_memories_to_retrieve: int = DEFAULT_MAX_MEMORIES_TO_RETRIEVE): # Added max_memories
+                 max_memories_to_retrieve: int = DEFAULT_MAX_MEMORIES_TO_RETRIEVE, # Added max_memories
+                 prune_dominated_components: bool = True,
+                 max_prompt_components: Optional[int] = DEFAULT_MAX_PROMPT_COMPONENTS):
         """
         Initializes the LLM-based KFM Planner.
 
@@ -241,6 +367,10 @@ class KFMPlannerLlm(RunnablePassthrough):
             prompt_manager (Optional[PromptManager]): An instance of PromptManager. If None, uses global.
             snapshot_storage_path (str): Path for storing KFM snapshots.
             max_memories_to_retrieve (int): Max number of memories to retrieve for context.
+            prune_dominated_components (bool): Drop components dominated on both accuracy and
+                latency before building the prompt (see src/core/component_pruning.py).
+            max_prompt_components (Optional[int]): Optional cap on components sent to the LLM
+                after pruning. The active component is always kept.
         """
         # Initialize attributes that will be passed to super().__init__()
         # These must match the fields declared at the class level for Pydantic validation.
@@ -249,7 +379,9 @@ class KFMPlannerLlm(RunnablePassthrough):
         _memory_manager = memory_manager
         _max_memories_to_retrieve = max_memories_to_retrieve
         _model_name = model_name
+        _ensure_dotenv_loaded()
         _prompt_manager = prompt_manager if prompt_manager else get_global_prompt_manager()
+        register_default_prompts(_prompt_manager)
         _ecm = get_ecm_instance()
 
         _snapshot_service: Optional[SnapshotService] = None
@@ -278,28 +410,46 @@ class KFMPlannerLlm(RunnablePassthrough):
 
         # Initialize LLMs
         _llms: Dict[str, BaseLanguageModel] = {}
-        if ChatCerebras and os.getenv("CEREBRAS_API_KEY"):
-            try:
-                _llms["cerebras"] = ChatCerebras(model="llama3.1-8b", temperature=0)
-            except Exception as e:
-                print(f"Warning: Failed to initialize Cerebras LLM: {e}")
-        if ChatGoogleGenerativeAI and os.getenv("GOOGLE_API_KEY"):
-            try:
-                _llms["google"] = ChatGoogleGenerativeAI(model="gemini-1.5-flash-latest", temperature=0, convert_system_message_to_human=True)
-            except Exception as e:
-                print(f"Warning: Failed to initialize Google LLM: {e}")
-        if ChatOpenAI and os.getenv("OPENAI_API_KEY"):
-            try:
-                _llms["openai_3_5"] = ChatOpenAI(model="gpt-3.5-turbo", temperature=0)
-            except Exception as e:
-                print(f"Warning: Failed to initialize OpenAI gpt-3.5-turbo LLM: {e}")
+        local_llm_mode = (os.getenv("KFM_LOCAL_LLM_MODE") or "").strip().lower()
+        if local_llm_mode and local_llm_mode != "record":
+            # Offline tier (replay/rules, see src/core/local_chat_model.py) replaces the live
+            # providers so benchmarks and load tests never touch the network.
+            from .local_chat_model import LocalKfmChatModel
+            _llms["local"] = LocalKfmChatModel.from_env()
+        else:
+            if os.getenv("CEREBRAS_API_KEY"):
+                ChatCerebras = _load_provider_attr("ChatCerebras")
+                if ChatCerebras:
+                    try:
+                        _llms["cerebras"] = ChatCerebras(model="llama3.1-8b", temperature=0)
+                    except Exception as e:
+                        print(f"Warning: Failed to initialize Cerebras LLM: {e}")
+            if os.getenv("GOOGLE_API_KEY"):
+                ChatGoogleGenerativeAI = _load_provider_attr("ChatGoogleGenerativeAI")
+                if ChatGoogleGenerativeAI:
+                    try:
+                        _llms["google"] = ChatGoogleGenerativeAI(model="gemini-1.5-flash-latest", temperature=0, convert_system_message_to_human=True)
+                    except Exception as e:
+                        print(f"Warning: Failed to initialize Google LLM: {e}")
+            if os.getenv("OPENAI_API_KEY"):
+                ChatOpenAI = _load_provider_attr("ChatOpenAI")
+                if ChatOpenAI:
+                    try:
+                        _llms["openai_3_5"] = ChatOpenAI(model="gpt-3.5-turbo", temperature=0)
+                    except Exception as e:
+                        print(f"Warning: Failed to initialize OpenAI gpt-3.5-turbo LLM: {e}")
+            if local_llm_mode == "record" and _llms:
+                # Record the primary live tier's responses for later offline replay
+                from .local_chat_model import LocalKfmChatModel
+                primary_key = next(key for key in ("cerebras", "google", "openai_3_5") if key in _llms)
+                _llms[primary_key] = LocalKfmChatModel.from_env(delegate=_llms[primary_key])
 
         # Build Fallback Chain
         _runnable_chains: Dict[str, Runnable] = {}
         _llm_configs: Dict[str, Dict[str, Any]] = {}
         _primary_llm_key_for_logging = "unknown"
         
-        llm_provider_priority = ["cerebras", "google", "openai_3_5"]
+        llm_provider_priority = ["local", "cerebras", "google", "openai_3_5"]
         processed_runnable_chains_list: List[Runnable] = []
 
         for provider_key in llm_provider_priority:
@@ -346,7 +496,9 @@ class KFMPlannerLlm(RunnablePassthrough):
             execution_chain=_execution_chain_instance,
             ecm=_ecm,
             max_memories_to_retrieve=_max_memories_to_retrieve,
-            model_name=_model_name
+            model_name=_model_name,
+            prune_dominated_components=prune_dominated_components,
+            max_prompt_components=max_prompt_components
             # Note: Other attributes like self.llms, self.standard_prompt, self.parser, etc.,
             # are effectively intermediate build steps or helper attributes if not declared as fields.
             # If they ARE meant to be fields, they must be declared at class level and included here.
@@ -365,48 +517,44 @@ class KFMPlannerLlm(RunnablePassthrough):
         # or redundant with the Langchain chain. Review if still needed.
         # If `self.model` is a required field by Pydantic (declared at class level),
         # it must be included in the call to super().__init__ above.
-        try:
-            self.model = GenerativeModel(_model_name) # _model_name is the original model_name arg
-            logger.info(f"Initialized KFMPlannerLlm's direct GenerativeModel with: {_model_name}")
-        except Exception as e:
-            logger.error(f"Failed to initialize KFMPlannerLlm's direct GenerativeModel ({_model_name}): {e}", exc_info=True)
-            self.model = None
+        # It belongs to the Google tier, so google.generativeai is only imported when that tier is configured.
+        self.model = None
+        if google_api_key or os.getenv("GOOGLE_API_KEY"):
+            try:
+                GenerativeModel = _load_provider_attr("GenerativeModel")
+                if GenerativeModel:
+                    self.model = GenerativeModel(_model_name) # _model_name is the original model_name arg
+                    logger.info(f"Initialized KFMPlannerLlm's direct GenerativeModel with: {_model_name}")
+            except Exception as e:
+                logger.error(f"Failed to initialize KFMPlannerLlm's direct GenerativeModel ({_model_name}): {e}", exc_info=True)
+                self.model = None
         self.kfm_callback_handler = None # Placeholder
+        self.last_prompt_pruning_stats: Dict[str, Any] = {} # Populated by _format_component_data_for_prompt
+        self.last_decision_timings: Dict[str, float] = {} # Per-stage timings of the last decide_kfm_action call
+        self.llm_limiter = None # Optional async context manager bounding concurrent chain calls (e.g. a scheduler CapacityLimiter)
+        self.llm_executor = None # Optional Executor for the blocking chain call (None = the event loop's default executor)
 
-    def _format_component_data_for_prompt(self, components_details: Dict[str, List[Dict[str, Any]]], requirements: Dict[str, Any]) -> str:
-        """Formats component data, including performance, indicators, and reversibility, for the LLM prompt."""
-        min_accuracy = requirements.get("min_accuracy", 0.0)
-        max_latency = requirements.get("max_latency", float('inf'))
+    def _format_component_data_for_prompt(self, components_details: Dict[str, Any], requirements: Dict[str, Any], active_component: Optional[str] = None) -> str:
+        """Formats component data, including performance, indicators, and reversibility, for the LLM prompt.
 
-        # components_details is Dict[module_name, List[version_details_dict]]
-        # We need to present a flat list of "component instances" (module_name@version) to the LLM.
-        
-        formatted_components_for_llm: Dict[str, Dict[str, Any]] = {}
-
-        for module_name, versions_list in components_details.items():
-            for version_detail in versions_list:
-                # Construct a unique key for the LLM, e.g., "MyComponent@1.0.0"
-                component_key = f"{module_name}@{version_detail['version']}"
-                
-                perf_metrics = version_detail.get("performance_metrics", {})
-                accuracy = perf_metrics.get("accuracy") 
-                latency = perf_metrics.get("latency")
-                supports_rev = version_detail.get("supports_reversibility", False)
-
-                component_info_for_llm: Dict[str, Any] = {"supports_reversibility": supports_rev}
-                
-                if accuracy is not None:
-                    component_info_for_llm["accuracy"] = accuracy
-                if latency is not None:
-                    component_info_for_llm["latency"] = latency
-                
-                formatted_components_for_llm[component_key] = component_info_for_llm
-        
-        # The system prompt expects components as a JSON-like string of a dictionary.
-        # Example: {{"component_A@1.0": {{"accuracy": 0.95, "latency": 50, "supports_reversibility": true}}, ...}}
-        components_json_for_prompt = json.dumps(formatted_components_for_llm)
-        
-        # Return the JSON string for the system prompt, and also the human-readable parts if needed by other templates
+        Components strictly dominated on accuracy and latency are pruned first (unless
+        `prune_dominated_components` is False). Token savings are recorded in
+        `self.last_prompt_pruning_stats`.
+        """
+        formatted_components_for_llm = flatten_components_for_prompt(components_details)
+        components_json_for_prompt, stats = build_components_prompt_fragment(
+            formatted_components_for_llm,
+            requirements,
+            active_component=active_component,
+            prune=self.prune_dominated_components,
+            max_components=self.max_prompt_components
+        )
+        self.last_prompt_pruning_stats = stats
+        if stats["pruned_count"]:
+            logger.info(
+                f"Pruned {stats['pruned_count']} dominated components from prompt "
+                f"({stats['components_before']} -> {stats['components_after']}, ~{stats['estimated_tokens_saved']} tokens saved)."
+            )
         return components_json_for_prompt # For system prompt
 
     def _format_retrieved_memories(self, memories: List[Dict]) -> str:
@@ -521,13 +669,140 @@ class KFMPlannerLlm(RunnablePassthrough):
             logger.error(f"LLM output parsing: Unexpected error: {e}. Response: {llm_response_text}", exc_info=True)
             return KFMDecision(action="No Action", component=None, reasoning=f"Unexpected parsing error: {e}", confidence=0.0, error="Unexpected parsing error")
 
-    async def decide_kfm_action(self, task_name: str, task_requirements: Dict, all_components_performance: Dict) -> Dict:
+    async def _retrieve_memories_once(self, task_name: str, task_requirements: Dict, all_components_performance: Dict) -> Optional[List[Any]]:
+        """Retrieves past experiences for the current decision. Called once per decision.
+
+        ChromaMemoryManager.retrieve_memories is synchronous (embedding + vector query), so it
+        runs in a worker thread; awaitable results (async managers) are awaited directly.
+        """
+        if not self.memory_manager:
+            return None
+        query_context = AgentQueryContext(
+            task_name=task_name,
+            current_task_requirements=task_requirements,
+            available_components=list(all_components_performance.keys()) if all_components_performance else []
+        )
+        retrieve_kwargs = {
+            "query_context": query_context,
+            "n_results": self.max_memories_to_retrieve,
+            "where_filter": {"outcome_success": "True"}
+        }
+        retrieve_fn = self.memory_manager.retrieve_memories
+        if asyncio.iscoroutinefunction(retrieve_fn):
+            result = await retrieve_fn(**retrieve_kwargs)
+        else:
+            result = await asyncio.to_thread(retrieve_fn, **retrieve_kwargs)
+            if asyncio.iscoroutine(result): # e.g. AsyncMock-backed managers
+                result = await result
+        return result
+
+    async def _assemble_decision_context(
+        self,
+        task_name: str,
+        task_requirements: Dict,
+        all_components_performance: Dict,
+        snapshot_state: Dict[str, Any],
+        active_component: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Builds everything the prompt and the pre-decision snapshot need, in a single pass.
+
+        Memory retrieval, component formatting and the pre-decision snapshot write are run
+        with asyncio.gather. The snapshot waits on the shared memory task so both the
+        snapshot and the prompt see the same retrieved memories; retrieval happens once.
+
+        Returns:
+            Dict with 'components_str', 'formatted_memories', 'retrieved_memories' and
+            'timings' (seconds per stage).
+        """
+        timings: Dict[str, float] = {}
+        assembly_start = time.perf_counter()
+
+        async def timed(stage: str, coro):
+            stage_start = time.perf_counter()
+            try:
+                return await coro
+            finally:
+                timings[stage] = time.perf_counter() - stage_start
+
+        memory_task = asyncio.ensure_future(
+            timed("memory_retrieval", self._retrieve_memories_once(task_name, task_requirements, all_components_performance))
+        )
+
+        async def format_components() -> str:
+            if not task_requirements or not all_components_performance:
+                return ""
+            return self._format_component_data_for_prompt(
+                all_components_performance, task_requirements, active_component=active_component
+            )
+
+        async def write_pre_decision_snapshot() -> None:
+            try:
+                retrieved = await memory_task
+            except Exception:
+                retrieved = None # Retrieval failure is reported below; still snapshot the rest
+            if retrieved:
+                snapshot_state["retrieved_memories"] = [
+                    mem.model_dump() if hasattr(mem, "model_dump") else mem for mem in retrieved
+                ]
+            if not self.snapshot_service:
+                return
+            logger.debug("KFMPlannerLlm: Taking pre-decision snapshot.")
+            try:
+                await self.snapshot_service.take_snapshot(
+                    trigger="pre_kfm_decision", # Corrected: trigger_event to trigger
+                    kfm_agent_state=snapshot_state,
+                    # component_system_state can be None here or include general system info if available
+                    additional_metadata={"stage": "pre_llm_invocation"} # Corrected: metadata to additional_metadata
+                )
+            except Exception as e_snap:
+                logger.error(f"KFMPlannerLlm: Error taking pre-decision snapshot: {e_snap}")
+                # Logging and continuing; a failed snapshot does not block the decision.
+
+        memory_result, components_str, _ = await asyncio.gather(
+            memory_task,
+            timed("component_formatting", format_components()),
+            timed("pre_decision_snapshot", write_pre_decision_snapshot()),
+            return_exceptions=True
+        )
+
+        formatted_memories = "No relevant past experiences found." # Default if no memory manager or no memories
+        retrieved_memories: Optional[List[Any]] = None
+        if isinstance(memory_result, BaseException):
+            logger.error(f"Error retrieving memories: {memory_result}")
+            formatted_memories = "Error retrieving past experiences."
+        elif memory_result:
+            retrieved_memories = memory_result
+            formatted_memories = self._format_retrieved_memories(retrieved_memories)
+            logger.info(f"Retrieved {len(retrieved_memories)} memories for the prompt.")
+        elif self.memory_manager:
+            logger.info("No relevant memories retrieved.")
+
+        if isinstance(components_str, BaseException):
+            # Surface formatting failures through the normal decision error handling
+            raise components_str
+
+        timings["context_assembly"] = time.perf_counter() - assembly_start
+        return {
+            "components_str": components_str,
+            "formatted_memories": formatted_memories,
+            "retrieved_memories": retrieved_memories,
+            "timings": timings
+        }
+
+    @staticmethod
+    def _format_stage_timings(timings: Dict[str, float]) -> str:
+        return ", ".join(f"{stage}={duration:.4f}" for stage, duration in timings.items())
+
+    async def decide_kfm_action(self, task_name: str, task_requirements: Dict, all_components_performance: Dict, active_component: Optional[str] = None) -> Dict:
         """
         Core logic for deciding a KFM action using the configured LLM and chain.
         This is where the main LLM invocation happens.
         Wraps the LLM call with error handling and validation.
         Includes pre-decision and post-decision snapshot triggers.
+
+        `active_component`, if given, is always kept in the prompt by Pareto pruning.
         """
+        decision_start = time.perf_counter()
         current_kfm_agent_state_for_snapshot = {
             "task_name": task_name,
             "task_requirements": task_requirements,
@@ -535,91 +810,51 @@ class KFMPlannerLlm(RunnablePassthrough):
             "active_llm_key": self.primary_llm_key_for_logging, # Log which LLM config is active
             "timestamp": datetime.now(timezone.utc).isoformat()
         }
-        if self.memory_manager:
-            query_context = AgentQueryContext(
-                task_name=task_name,
-                current_task_requirements=task_requirements,
-                available_components=list(all_components_performance.keys())
-            )
-            retrieved_memories = self.memory_manager.retrieve_memories(
-                query_context=query_context,
-                n_results=3,
-                where_filter={"outcome_success": "True"} 
-            )
-
-            if retrieved_memories:
-                current_kfm_agent_state_for_snapshot["retrieved_memories"] = [mem.model_dump() for mem in retrieved_memories]
-                logger.info(f"Retrieved {len(retrieved_memories)} memories for the prompt.")
-            else:
-                logger.info("No relevant memories retrieved.")
+        ecm_review_result = None
 
-        # Take pre-decision snapshot
-        if self.snapshot_service:
-            logger.debug("KFMPlannerLlm: Taking pre-decision snapshot.")
-            try:
-                await self.snapshot_service.take_snapshot(
-                    trigger="pre_kfm_decision", # Corrected: trigger_event to trigger
-                    kfm_agent_state=current_kfm_agent_state_for_snapshot,
-                    # component_system_state can be None here or include general system info if available
-                    additional_metadata={"stage": "pre_llm_invocation"} # Corrected: metadata to additional_metadata
-                )
-            except Exception as e_snap:
-                logger.error(f"KFMPlannerLlm: Error taking pre-decision snapshot: {e_snap}")
-                # Decide if this error should halt the process or just be logged.
-                # For now, logging and continuing.
+        stage_timings: Dict[str, float] = {}
+        self.last_decision_timings = stage_timings
 
         try:
-            # --- Input Validation (moved from _generate_prompt for early exit) ---
-            if not task_requirements or not all_components_performance:
-                logger.warning("Missing task requirements or component performance data. Defaulting to No Action.")
-                # Log an error for missing critical data for decision making
-                logger.error("KFMPlannerLlm: Critical data missing (task requirements or component performance), cannot make an informed decision.")
-                
-                # Defaulting to 'No Action' as per previous logic for missing data
-                # but also including an error field to make it explicit in the output
-                return KFMDecision(
-                    action='No Action', 
-                    reasoning='Critical data missing: task requirements or component performance data not provided.', 
-                    confidence=0.0, # Confidence is zero as no analysis was performed
-                    error="Missing critical input data"
-                ).to_dict()
-
-            # Format components with indicators for the prompt
-            components_str_with_indicators = self._format_component_data_for_prompt(
-                all_components_performance, task_requirements
+            # --- Context Assembly: memories, component formatting and pre-decision snapshot run concurrently ---
+            # Inside the try so that formatting failures map to the Kill decision below
+            context = await self._assemble_decision_context(
+                task_name, task_requirements, all_components_performance,
+                current_kfm_agent_state_for_snapshot, active_component=active_component
             )
+            stage_timings.update(context["timings"])
 
-            # Retrieve and format memories if memory_manager is configured
-            formatted_memories = "No relevant past experiences found." # Default if no memory manager or no memories
-            if self.memory_manager:
-                try:
-                    query_context = AgentQueryContext(
-                        task_name=task_name,
-                        current_task_requirements=task_requirements,
-                        available_components=list(all_components_performance.keys())
-                    )
-                    retrieved_memories = self.memory_manager.retrieve_memories(
-                        query_context=query_context,
-                        k=self.max_memories_to_retrieve # Use configured k
-                    )
-                    if retrieved_memories:
-                        formatted_memories = self._format_retrieved_memories(retrieved_memories)
-                        logger.info(f"Retrieved {len(retrieved_memories)} memories for the prompt.")
-                except Exception as e:
-                    logger.error(f"Error retrieving memories: {e}")
-                    formatted_memories = "Error retrieving past experiences."
+            # --- Input Validation: the system prompt's error-handling rules, applied without the LLM ---
+            if not task_requirements or task_requirements.get("min_accuracy") is None \
+                    or task_requirements.get("max_latency") is None:
+                logger.warning(f"Task '{task_name}' has missing requirements. Deciding Kill without the LLM.")
+                return KFMDecision(action='Kill', component=None, reasoning='missing requirements', confidence=1.0).to_dict()
+            if not all_components_performance:
+                logger.warning(f"No component performance data for task '{task_name}'. Deciding Kill without the LLM.")
+                return KFMDecision(action='Kill', component=None, reasoning='no components', confidence=1.0).to_dict()
+
+            components_str_with_indicators = context["components_str"]
+            formatted_memories = context["formatted_memories"]
 
             logger.info(f"Invoking KFM LLM chain (primary: '{self.primary_llm_key_for_logging}') for task: {task_name}")
             
             # Invoke the Langchain (LCEL) chain
-            llm_decision_obj = self.execution_chain.invoke({
+            llm_start = time.perf_counter()
+            # The chain is synchronous; run it off the event loop so concurrent decisions overlap
+            chain_call = functools.partial(contextvars.copy_context().run, self.execution_chain.invoke, {
                 "task_name": task_name,
-                "min_accuracy": task_requirements.get("min_accuracy", 0.0),
-                "max_latency": task_requirements.get("max_latency", float('inf')),
+                "min_accuracy": task_requirements["min_accuracy"],
+                "max_latency": task_requirements["max_latency"],
                 "components_str_with_indicators": components_str_with_indicators,
                 "formatted_memories": formatted_memories
             })
+            async with self.llm_limiter or contextlib.nullcontext():
+                llm_decision_obj = await asyncio.get_running_loop().run_in_executor(self.llm_executor, chain_call)
             # llm_decision_obj is already a KFMDecision instance due to KFMDecisionOutputParser in the chain
+            stage_timings["llm_invocation"] = time.perf_counter() - llm_start
+            if isinstance(llm_decision_obj, dict):
+                # JsonOutputParser yields a plain dict; validate it into the decision model
+                llm_decision_obj = KFMDecision.model_validate(llm_decision_obj)
 
             logger.info(f"LLM decision for task '{task_name}': Action={llm_decision_obj.action}, Component={llm_decision_obj.component}, Confidence={llm_decision_obj.confidence:.2f}")
 
@@ -703,7 +938,7 @@ class KFMPlannerLlm(RunnablePassthrough):
             # ... existing error handling ...
             logger.error(f"KfmValidationError: {ve}. Raw LLM output: {ve.llm_output}")
             final_decision_obj = KFMDecision(action="Kill", component=None, reasoning=f"LLM output parsing error: {ve}", confidence=0.1, error=str(ve)).to_dict()
-        except (APIError, RateLimitError, APITimeoutError, APIConnectionError, NetworkError, TimeoutException, APIStatusError) as http_err:
+        except _llm_api_error_types() as http_err:
             # ... existing error handling ...
             logger.error(f"LLM API/Network Error: {http_err.__class__.__name__}: {http_err}")
             final_decision_obj = KFMDecision(action="Kill", component=None, reasoning=f"LLM API/Network Error: {http_err}", confidence=0.1, error=str(http_err)).to_dict()
@@ -711,6 +946,9 @@ class KFMPlannerLlm(RunnablePassthrough):
             # ... existing error handling ...
             logger.error(f"Unexpected error in KFM LLM decision process: {e}", exc_info=True)
             final_decision_obj = KFMDecision(action="Kill", component=None, reasoning=f"Unexpected error: {e}", confidence=0.1, error=str(e)).to_dict()
+        finally:
+            stage_timings["total"] = time.perf_counter() - decision_start
+            logger.info(f"KFMPlannerLlm decision stage timings (s): {self._format_stage_timings(stage_timings)}")
 
         return final_decision_obj
 
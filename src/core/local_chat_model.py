@@ -0,0 +1,330 @@
+# src/core/local_chat_model.py
+"""
+Offline stand-in for the KFMPlannerLlm provider tiers.
+
+LocalKfmChatModel implements the LangChain chat-model interface, so it slots into the
+planner's ``prompt | llm | parser`` chain in place of a live provider. Modes:
+
+- ``replay``: return recorded responses keyed by a hash of the rendered prompt.
+- ``record``: call a delegate (live) chat model and store its responses for later replay.
+- ``rules``: synthesize ``KFMDecision`` JSON from the prompt using the KFM rules.
+
+Latency and error injection apply in every mode, so throughput and fallback behaviour
+can be exercised without network access. The planner enables this tier through the
+``KFM_LOCAL_LLM_*`` environment variables (see ``LocalKfmChatModel.from_env``).
+"""
+import asyncio
+import atexit
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+import weakref
+from typing import Any, Dict, List, Literal, Optional, Tuple
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import Field, PrivateAttr
+
+from src.core.kfm_llm_exceptions import KfmConfigurationError, KfmInvocationError
+
+logger = logging.getLogger(__name__)
+
+LOCAL_LLM_ENV_PREFIX = "KFM_LOCAL_LLM_"
+INJECTED_ERROR_KINDS = ("error", "timeout", "malformed")
+
+_MIN_ACCURACY_RE = re.compile(r"Min Accuracy:\s*([-+0-9.eEinfa]+)")
+_MAX_LATENCY_RE = re.compile(r"Max Latency:\s*([-+0-9.eEinfa]+)")
+
+
+def prompt_hash(messages: List[BaseMessage]) -> str:
+    """Stable hash of the rendered prompt's non-system messages.
+
+    The system message is fixed per provider tier (e.g. the Cerebras-tuned prompt), so it
+    is left out: a response recorded against one tier replays against any other.
+    """
+    payload = json.dumps([[message.type, message.content] for message in messages if message.type != "system"])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def rule_based_kfm_decision(requirements: Dict[str, Any], components: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Applies the KFM rules from the planner's system prompt and returns a KFMDecision-shaped dict.
+
+    Marry if a component meets both requirements, else Fuck if one meets either, else Kill.
+    Tiebreak: highest accuracy, lowest latency, reversibility, then alphabetical name.
+
+    KFMPlannerLlm applies the "missing requirements" and "no components" Kills itself,
+    before calling the model, so both tiers answer every input the same way.
+    """
+    min_accuracy = requirements.get("min_accuracy")
+    max_latency = requirements.get("max_latency")
+    if min_accuracy is None or max_latency is None:
+        return {"action": "Kill", "component": None, "reasoning": "missing requirements", "confidence": 1.0}
+    if not components:
+        return {"action": "Kill", "component": None, "reasoning": "no components", "confidence": 1.0}
+
+    marry, fuck = [], []
+    for name, info in components.items():
+        accuracy, latency = info.get("accuracy"), info.get("latency")
+        if accuracy is None or latency is None:
+            continue
+        rank = (-accuracy, latency, not info.get("supports_reversibility", False), name)
+        if accuracy >= min_accuracy and latency <= max_latency:
+            marry.append((rank, name))
+        elif accuracy >= min_accuracy or latency <= max_latency:
+            fuck.append((rank, name))
+
+    if marry:
+        name = min(marry)[1]
+        reasoning = f"{name} meets both min_accuracy and max_latency; best by accuracy then latency."
+        return {"action": "Marry", "component": name, "reasoning": reasoning, "confidence": 0.95}
+    if fuck:
+        name = min(fuck)[1]
+        reasoning = f"No component meets both requirements; {name} meets one and ranks best."
+        return {"action": "Fuck", "component": name, "reasoning": reasoning, "confidence": 0.8}
+    return {"action": "Kill", "component": None, "reasoning": "No component meets either requirement.", "confidence": 0.9}
+
+
+def parse_kfm_prompt(text: str) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+    """Extracts (requirements, components) from the rendered KFM human prompt.
+
+    The prompt carries ``Min Accuracy: ...``, ``Max Latency: ...`` and the components as
+    a JSON object after ``Components:``. Anything missing is left out of the result.
+    """
+    requirements: Dict[str, Any] = {}
+    for key, pattern in (("min_accuracy", _MIN_ACCURACY_RE), ("max_latency", _MAX_LATENCY_RE)):
+        match = pattern.search(text)
+        if match:
+            try:
+                requirements[key] = float(match.group(1))
+            except ValueError:
+                pass
+
+    components: Dict[str, Dict[str, Any]] = {}
+    marker = text.find("Components:")
+    start = text.find("{", marker) if marker != -1 else -1
+    if start != -1:
+        try:
+            parsed, _ = json.JSONDecoder().raw_decode(text[start:])
+            if isinstance(parsed, dict):
+                components = parsed
+        except json.JSONDecodeError:
+            pass
+    return requirements, components
+
+
+class LocalKfmChatModel(BaseChatModel):
+    """LangChain chat model that answers KFM prompts locally (replay, record or rules)."""
+
+    mode: Literal["replay", "record", "rules"] = "rules"
+    recordings_path: Optional[str] = None
+    delegate: Optional[BaseChatModel] = None  # Live model used in record mode
+    replay_miss_fallback_to_rules: bool = False
+    latency_ms: float = 0.0
+    latency_jitter_ms: float = 0.0  # Std deviation of gaussian jitter, clipped at zero
+    error_rates: Dict[str, float] = Field(default_factory=dict)  # {"error" | "timeout" | "malformed": probability}
+    seed: Optional[int] = None
+    recordings_flush_every: int = 20  # Record mode: new recordings buffered before the file is rewritten
+    model_name: str = "local-kfm"
+    temperature: float = 0
+
+    _recordings: Dict[str, str] = PrivateAttr(default_factory=dict)
+    _rng: random.Random = PrivateAttr(default_factory=random.Random)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _save_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)  # Serializes recordings file writes
+    _unsaved: int = PrivateAttr(default=0)
+
+    def model_post_init(self, __context: Any) -> None:
+        super().model_post_init(__context)
+        unknown = set(self.error_rates) - set(INJECTED_ERROR_KINDS)
+        if unknown:
+            raise KfmConfigurationError(f"Unknown injected error kinds: {sorted(unknown)}",
+                                        details={"allowed": list(INJECTED_ERROR_KINDS)})
+        if sum(self.error_rates.values()) > 1.0:
+            raise KfmConfigurationError("Injected error rates must sum to at most 1.0",
+                                        details={"error_rates": self.error_rates})
+        if self.mode == "record" and self.delegate is None:
+            raise KfmConfigurationError("LocalKfmChatModel in record mode needs a delegate model")
+        self._rng = random.Random(self.seed)
+        if self.recordings_path and os.path.exists(self.recordings_path):
+            with open(self.recordings_path, "r", encoding="utf-8") as f:
+                self._recordings = json.load(f)
+        if self.mode == "record" and self.recordings_path:
+            atexit.register(_flush_at_exit, weakref.ref(self))
+
+    @classmethod
+    def from_env(cls, delegate: Optional[BaseChatModel] = None) -> Optional["LocalKfmChatModel"]:
+        """Builds a model from ``KFM_LOCAL_LLM_*`` environment variables, or None if the tier is off.
+
+        KFM_LOCAL_LLM_MODE (replay|record|rules), KFM_LOCAL_LLM_RECORDINGS (path),
+        KFM_LOCAL_LLM_REPLAY_FALLBACK (1 to answer replay misses with the rules),
+        KFM_LOCAL_LLM_LATENCY_MS, KFM_LOCAL_LLM_LATENCY_JITTER_MS, KFM_LOCAL_LLM_SEED, and
+        KFM_LOCAL_LLM_ERROR_RATES as ``kind=probability`` pairs, e.g. ``error=0.05,timeout=0.01``.
+        """
+        mode = os.getenv(f"{LOCAL_LLM_ENV_PREFIX}MODE")
+        if not mode:
+            return None
+        error_rates: Dict[str, float] = {}
+        for pair in filter(None, os.getenv(f"{LOCAL_LLM_ENV_PREFIX}ERROR_RATES", "").split(",")):
+            kind, _, rate = pair.partition("=")
+            error_rates[kind.strip()] = float(rate)
+        seed = os.getenv(f"{LOCAL_LLM_ENV_PREFIX}SEED")
+        return cls(
+            mode=mode.strip().lower(),
+            recordings_path=os.getenv(f"{LOCAL_LLM_ENV_PREFIX}RECORDINGS"),
+            delegate=delegate,
+            replay_miss_fallback_to_rules=os.getenv(f"{LOCAL_LLM_ENV_PREFIX}REPLAY_FALLBACK", "0") == "1",
+            latency_ms=float(os.getenv(f"{LOCAL_LLM_ENV_PREFIX}LATENCY_MS", "0")),
+            latency_jitter_ms=float(os.getenv(f"{LOCAL_LLM_ENV_PREFIX}LATENCY_JITTER_MS", "0")),
+            error_rates=error_rates,
+            seed=int(seed) if seed else None,
+        )
+
+    @property
+    def _llm_type(self) -> str:
+        return "local-kfm"
+
+    @property
+    def recordings(self) -> Dict[str, str]:
+        """Copy of the prompt-hash -> response mapping."""
+        with self._lock:
+            return dict(self._recordings)
+
+    def add_recording(self, messages: List[BaseMessage], response: str) -> str:
+        """Stores a response for a prompt and returns the prompt hash."""
+        key = prompt_hash(messages)
+        with self._lock:
+            self._recordings[key] = response
+        return key
+
+    def save_recordings(self, path: Optional[str] = None) -> None:
+        """Writes recordings as JSON to `path` (defaults to `recordings_path`)."""
+        target = path or self.recordings_path
+        if not target:
+            raise KfmConfigurationError("No recordings path configured")
+        with self._save_lock:
+            with self._lock:
+                snapshot = dict(self._recordings)
+                if target == self.recordings_path:
+                    self._unsaved = 0
+            os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok=True)
+            tmp_path = f"{target}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, target)
+
+    def flush_recordings(self) -> bool:
+        """Writes recordings not yet saved to `recordings_path`; returns whether it wrote.
+
+        Record mode rewrites the file every `recordings_flush_every` new recordings and
+        at interpreter exit; call this to persist the rest earlier.
+        """
+        with self._lock:
+            pending = self._unsaved
+        if not pending or not self.recordings_path:
+            return False
+        self.save_recordings()
+        return True
+
+    # --- Injection ---
+
+    def _draw_injection(self) -> Tuple[float, Optional[str]]:
+        """Returns (delay_seconds, injected_error_kind_or_None) for one call."""
+        with self._lock:
+            delay_ms = self.latency_ms
+            if self.latency_jitter_ms:
+                delay_ms += self._rng.gauss(0.0, self.latency_jitter_ms)
+            roll = self._rng.random()
+        cumulative = 0.0
+        for kind in INJECTED_ERROR_KINDS:
+            cumulative += self.error_rates.get(kind, 0.0)
+            if roll < cumulative:
+                return max(delay_ms, 0.0) / 1000, kind
+        return max(delay_ms, 0.0) / 1000, None
+
+    @staticmethod
+    def _raise_injected(kind: str) -> None:
+        if kind == "timeout":
+            raise TimeoutError("Injected LLM timeout")
+        raise KfmInvocationError("Injected LLM error", details={"injected": True, "kind": kind})
+
+    # --- Response synthesis ---
+
+    def _local_response(self, messages: List[BaseMessage]) -> str:
+        if self.mode == "replay":
+            key = prompt_hash(messages)
+            with self._lock:
+                recorded = self._recordings.get(key)
+            if recorded is not None:
+                return recorded
+            if not self.replay_miss_fallback_to_rules:
+                raise KfmInvocationError("No recorded response for prompt", details={"prompt_hash": key})
+        requirements, components = parse_kfm_prompt(str(messages[-1].content) if messages else "")
+        return json.dumps(rule_based_kfm_decision(requirements, components))
+
+    def _result(self, text: str, kind: Optional[str]) -> ChatResult:
+        if kind == "malformed":
+            text = "Sorry, I cannot produce JSON right now."
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        delay, kind = self._draw_injection()
+        if delay:
+            time.sleep(delay)
+        if kind in ("error", "timeout"):
+            self._raise_injected(kind)
+        if self.mode == "record":
+            text = str(self.delegate.invoke(messages, stop=stop).content)
+            self._record(messages, text)
+        else:
+            text = self._local_response(messages)
+        return self._result(text, kind)
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        delay, kind = self._draw_injection()
+        if delay:
+            await asyncio.sleep(delay)
+        if kind in ("error", "timeout"):
+            self._raise_injected(kind)
+        if self.mode == "record":
+            text = str((await self.delegate.ainvoke(messages, stop=stop)).content)
+            self._record(messages, text)
+        else:
+            text = self._local_response(messages)
+        return self._result(text, kind)
+
+    def _record(self, messages: List[BaseMessage], text: str) -> None:
+        key = prompt_hash(messages)
+        with self._lock:
+            self._recordings[key] = text
+            self._unsaved += 1
+            due = bool(self.recordings_path) and self._unsaved >= self.recordings_flush_every
+        if due:
+            self.save_recordings()
+
+
+def _flush_at_exit(model_ref: "weakref.ReferenceType[LocalKfmChatModel]") -> None:
+    model = model_ref()
+    if model is not None:
+        try:
+            model.flush_recordings()
+        except Exception as e:
+            logger.warning(f"Could not save LLM recordings at exit: {e}")
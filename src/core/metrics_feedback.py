@@ -0,0 +1,172 @@
+# src/core/metrics_feedback.py
+"""
+Feedback channel from ExecutionEngine measurements into StateMonitor aggregates.
+
+Producers (the engine, possibly from executor threads) call ``submit``, which appends
+to a bounded ``collections.deque`` -- append/popleft are atomic in CPython, so the hot
+path takes no lock unless a rate limit is configured. A consumer drains the queue in
+batches (``drain``, or a background thread via ``start``) and hands each batch to
+``StateMonitor.ingest_observations``, which updates the streaming metrics and the
+planner-visible statistics once per component per batch.
+
+Ingestion controls:
+    sample_rate: Fraction of measurements accepted (0.0 - 1.0).
+    max_events_per_second: Token-bucket cap on accepted measurements (None = unlimited).
+    max_pending: Queue bound; when full the oldest pending measurement is dropped.
+    batch_size / flush_interval: Consumer batch size and background drain period.
+"""
+import random
+import threading
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Callable, Deque, Dict, Optional, Tuple
+
+from src.logger import setup_logger
+
+if TYPE_CHECKING:
+    from src.core.state_monitor import StateMonitor
+
+# (component_name, latency, accuracy, timestamp)
+Observation = Tuple[str, Optional[float], Optional[float], float]
+
+
+class MetricsFeedbackChannel:
+    """Batched, rate-controlled stream of execution measurements into a StateMonitor."""
+
+    def __init__(self, state_monitor: "StateMonitor", sample_rate: float = 1.0,
+                 max_events_per_second: Optional[float] = None, max_pending: int = 10000,
+                 batch_size: int = 256, flush_interval: float = 0.5,
+                 clock: Optional[Callable[[], float]] = None):
+        if batch_size < 1 or max_pending < 1:
+            raise ValueError("batch_size and max_pending must be at least 1")
+        self.logger = setup_logger('MetricsFeedbackChannel')
+        self.state_monitor = state_monitor
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        # Timestamps must come from the same clock as the metrics store's windows
+        self.clock = clock or state_monitor.metrics_store.clock
+        self._pending: Deque[Observation] = deque(maxlen=max_pending)
+        self._rate_lock = threading.Lock()
+        self._drain_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {
+            "submitted": 0, "accepted": 0, "dropped_sampling": 0, "dropped_rate_limit": 0,
+            "dropped_overflow": 0, "ingested": 0, "batches": 0,
+        }
+        self.sample_rate = 1.0
+        self.max_events_per_second: Optional[float] = None
+        self._tokens = 0.0
+        self._last_refill = time.monotonic()
+        self.set_ingestion_rate(sample_rate=sample_rate, max_events_per_second=max_events_per_second)
+
+    # --- Controls ---
+
+    def set_ingestion_rate(self, sample_rate: Optional[float] = None,
+                           max_events_per_second: Optional[float] = None,
+                           clear_rate_limit: bool = False) -> None:
+        """Adjusts ingestion controls at runtime.
+
+        Args:
+            sample_rate: New fraction of measurements to accept (0.0 - 1.0).
+            max_events_per_second: New token-bucket rate.
+            clear_rate_limit: Remove the events-per-second cap.
+        """
+        if sample_rate is not None:
+            if not 0.0 <= sample_rate <= 1.0:
+                raise ValueError(f"sample_rate must be within [0, 1], got {sample_rate}")
+            self.sample_rate = sample_rate
+        with self._rate_lock:
+            if clear_rate_limit:
+                self.max_events_per_second = None
+            elif max_events_per_second is not None:
+                if max_events_per_second <= 0:
+                    raise ValueError("max_events_per_second must be positive")
+                self.max_events_per_second = max_events_per_second
+                self._tokens = max(1.0, max_events_per_second)
+                self._last_refill = time.monotonic()
+        self.logger.info(f"Ingestion controls: sample_rate={self.sample_rate}, max_events_per_second={self.max_events_per_second}")
+
+    def _take_token(self) -> bool:
+        with self._rate_lock:
+            rate = self.max_events_per_second
+            if rate is None:
+                return True
+            now = time.monotonic()
+            self._tokens = min(max(1.0, rate), self._tokens + (now - self._last_refill) * rate)
+            self._last_refill = now
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            return False
+
+    # --- Producer side ---
+
+    def submit(self, component_name: str, latency: Optional[float] = None,
+               accuracy: Optional[float] = None, timestamp: Optional[float] = None) -> bool:
+        """Queues one measurement; returns False if it was sampled out or rate limited."""
+        self._stats["submitted"] += 1
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            self._stats["dropped_sampling"] += 1
+            return False
+        if self.max_events_per_second is not None and not self._take_token():
+            self._stats["dropped_rate_limit"] += 1
+            return False
+        if len(self._pending) == self._pending.maxlen:
+            self._stats["dropped_overflow"] += 1
+        self._pending.append((component_name, latency, accuracy, self.clock() if timestamp is None else timestamp))
+        self._stats["accepted"] += 1
+        return True
+
+    # --- Consumer side ---
+
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def drain(self, max_items: Optional[int] = None) -> int:
+        """Moves queued measurements into the StateMonitor in batches; returns how many."""
+        ingested = 0
+        with self._drain_lock:
+            while max_items is None or ingested < max_items:
+                limit = self.batch_size if max_items is None else min(self.batch_size, max_items - ingested)
+                batch = []
+                try:
+                    while len(batch) < limit:
+                        batch.append(self._pending.popleft())
+                except IndexError:
+                    pass
+                if not batch:
+                    break
+                self.state_monitor.ingest_observations(batch)
+                ingested += len(batch)
+                self._stats["batches"] += 1
+        self._stats["ingested"] += ingested
+        return ingested
+
+    def start(self) -> None:
+        """Starts a daemon thread draining every `flush_interval` seconds."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="metrics-feedback", daemon=True)
+        self._thread.start()
+
+    def stop(self, flush: bool = True) -> None:
+        """Stops the background thread, optionally draining what is still queued."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if flush:
+            self.drain()
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.flush_interval):
+            try:
+                self.drain()
+            except Exception as e:
+                self.logger.error(f"Failed to ingest execution metrics: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for submitted/accepted/dropped/ingested measurements plus current backlog."""
+        return {**self._stats, "pending": len(self._pending)}
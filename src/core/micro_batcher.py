@@ -0,0 +1,101 @@
+# src/core/micro_batcher.py
+"""
+Micro-batching of concurrent component calls for ExecutionEngine.
+
+Components that declare a ``batch_entry_point`` (see ModuleMetadata) receive a list of
+params dicts and return one result per item. Concurrent ``submit`` calls are queued and
+flushed as one batch when ``max_batch_size`` items are waiting or ``max_batch_wait``
+seconds after the first item of the batch arrived, whichever comes first. Each caller
+gets back its own item's result; a failure of the batch call is delivered to every
+caller in that batch.
+
+Batches run through the ComponentExecutorPool lane of the component, so its bulkhead
+limits how many batches are in flight.
+"""
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from src.core.component_executor import ComponentExecutorPool
+from src.logger import setup_logger
+
+
+class BatchResultMismatchError(Exception):
+    """Raised when a batch entry point returns a different number of results than inputs."""
+    pass
+
+
+class MicroBatcher:
+    """Coalesces concurrent calls to one component into micro-batches.
+
+    Args:
+        component_name: Component key (also selects the executor lane).
+        batch_func: Synchronous callable taking a list of params and returning a list of results.
+        executor_pool: Pool the batch calls run on.
+        max_batch_size: Flush as soon as this many calls are waiting.
+        max_batch_wait: Maximum seconds the first call of a batch waits for company.
+    """
+
+    def __init__(self, component_name: str, batch_func: Callable[[List[Dict[str, Any]]], List[Any]],
+                 executor_pool: ComponentExecutorPool, max_batch_size: int = 16, max_batch_wait: float = 0.005):
+        if max_batch_size < 1 or max_batch_wait < 0:
+            raise ValueError("max_batch_size must be at least 1 and max_batch_wait non-negative")
+        self.logger = setup_logger('MicroBatcher')
+        self.component_name = component_name
+        self.batch_func = batch_func
+        self.executor_pool = executor_pool
+        self.max_batch_size = max_batch_size
+        self.max_batch_wait = max_batch_wait
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._running: Set[asyncio.Task] = set()  # Strong references to in-flight batches
+        self.stats = {"items": 0, "batches": 0, "max_observed_batch": 0}
+
+    async def submit(self, params: Dict[str, Any]) -> Any:
+        """Queues one call and waits for its item of the batch result."""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            if self._pending:
+                raise RuntimeError(f"MicroBatcher for '{self.component_name}' is in use by another event loop")
+            self._loop = loop
+        future = loop.create_future()
+        self._pending.append((params, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_batch_wait, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending[:self.max_batch_size], self._pending[self.max_batch_size:]
+        if self._pending:
+            self._timer = self._loop.call_later(self.max_batch_wait, self._flush)
+        self.stats["items"] += len(batch)
+        self.stats["batches"] += 1
+        self.stats["max_observed_batch"] = max(self.stats["max_observed_batch"], len(batch))
+        task = self._loop.create_task(self._run_batch(batch))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run_batch(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        params_list = [params for params, _ in batch]
+        try:
+            results = await self.executor_pool.run(self.component_name, self.batch_func, params_list)
+            results = list(results)
+            if len(results) != len(batch):
+                raise BatchResultMismatchError(
+                    f"Batch entry point of '{self.component_name}' returned {len(results)} results for {len(batch)} inputs")
+        except Exception as e:
+            self.logger.error(f"Batch of {len(batch)} for '{self.component_name}' failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
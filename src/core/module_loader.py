@@ -1,7 +1,9 @@
 # src/core/module_loader.py
 import importlib
 import logging
-from typing import Any
+import threading
+import time
+from typing import Any, Callable, Optional
 
 try:
     # Assuming ModuleMetadata is defined here or importable
@@ -66,4 +68,105 @@ class ModuleLoader:
         except Exception as e:
             # Catch other potential errors during module execution/import (e.g., SyntaxError, NameError in module)
             logger.error(f"Exception during import/loading of {module_name} v{version} ({entry_point}): {e}")
-            raise ModuleLoadError(module_name, version, entry_point, e) from e 
\ No newline at end of file
+            raise ModuleLoadError(module_name, version, entry_point, e) from e
+
+    def load_batch_entry_point(self, module_metadata: ModuleMetadata) -> Callable:
+        """
+        Resolves a module's batch entry point to a callable.
+
+        The entry point is either a function name inside the module's entry point, or a
+        fully qualified 'package.module:function' reference.
+
+        Args:
+            module_metadata: The metadata of the module declaring `batch_entry_point`.
+
+        Returns:
+            The batch callable (takes a list of params dicts, returns a list of results).
+
+        Raises:
+            ModuleLoadError: If no batch entry point is declared or it cannot be resolved.
+        """
+        module_name = module_metadata.module_name
+        version = module_metadata.version
+        batch_entry_point = module_metadata.batch_entry_point
+        if not batch_entry_point:
+            raise ModuleLoadError(module_name, version, "", ValueError("Batch entry point not specified in metadata"))
+
+        if ":" in batch_entry_point:
+            module_path, function_name = batch_entry_point.split(":", 1)
+            try:
+                target_module = importlib.import_module(module_path)
+            except Exception as e:
+                logger.error(f"Exception importing batch entry point of {module_name} v{version} ({batch_entry_point}): {e}")
+                raise ModuleLoadError(module_name, version, batch_entry_point, e) from e
+        else:
+            target_module = self.load_module(module_metadata)
+            function_name = batch_entry_point
+
+        batch_func = getattr(target_module, function_name, None)
+        if not callable(batch_func):
+            raise ModuleLoadError(module_name, version, batch_entry_point,
+                                  AttributeError(f"'{function_name}' is not a callable in {target_module.__name__}"))
+        logger.info(f"Resolved batch entry point \'{batch_entry_point}\' for module \'{module_name}\' v{version}.")
+        return batch_func
+
+
+class LazyModule:
+    """Stand-in for a module that is imported on first attribute access.
+
+    Used by ModuleOrchestrator's lazy load mode so startup does not pay for importing
+    modules that are never executed. The import runs once (thread-safe); a failed
+    import raises ModuleLoadError on that access and is retried on the next one.
+
+    Args:
+        loader: The ModuleLoader that performs the import.
+        module_metadata: Metadata of the module to import.
+        on_load: Optional callback(module_metadata, seconds) invoked after a successful import.
+    """
+
+    def __init__(self, loader: ModuleLoader, module_metadata: ModuleMetadata,
+                 on_load: Optional[Callable[[ModuleMetadata, float], None]] = None):
+        self._loader = loader
+        self._metadata = module_metadata
+        self._on_load = on_load
+        self._module: Any = None
+        self._load_lock = threading.Lock()
+        self.import_time: Optional[float] = None
+
+    @property
+    def metadata(self) -> ModuleMetadata:
+        return self._metadata
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._module is not None
+
+    def load(self) -> Any:
+        """Imports the module if needed and returns it."""
+        module = self._module
+        if module is not None:
+            return module
+        with self._load_lock:
+            if self._module is None:
+                start = time.perf_counter()
+                module = self._loader.load_module(self._metadata)
+                self.import_time = time.perf_counter() - start
+                self._module = module
+                logger.info(f"Lazily imported module '{self._metadata.module_name}' v{self._metadata.version} "
+                            f"in {self.import_time * 1000:.1f} ms.")
+                if self._on_load is not None:
+                    self._on_load(self._metadata, self.import_time)
+            return self._module
+
+    _OWN_ATTRIBUTES = frozenset({"_loader", "_metadata", "_on_load", "_module", "_load_lock", "import_time"})
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached for names not found on the proxy itself; own attributes missing here
+        # (e.g. during unpickling) must not trigger an import
+        if name in LazyModule._OWN_ATTRIBUTES or (name.startswith("__") and name.endswith("__")):
+            raise AttributeError(name)
+        return getattr(self.load(), name)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.is_loaded else "not loaded"
+        return f"<LazyModule {self._metadata.module_name} v{self._metadata.version} ({state})>"
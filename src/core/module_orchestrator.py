@@ -1,33 +1,77 @@
 # src/core/module_orchestrator.py
 import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import List, Dict, Tuple, Any
+from typing import List, Dict, Tuple, Any, Optional, Set
 
 # Assuming components are importable from siblings
 try:
     from .discovery import ModuleDiscoveryService, ModuleMetadata
     from .dependency_resolver import DependencyResolver, DependencyResolutionError
-    from .module_loader import ModuleLoader, ModuleLoadError
+    from .module_loader import ModuleLoader, ModuleLoadError, LazyModule
+    from .version_index import VersionIndex
 except ImportError:
     # Fallback for potential execution context issues (e.g., running tests directly)
     from discovery import ModuleDiscoveryService, ModuleMetadata
     from dependency_resolver import DependencyResolver, DependencyResolutionError
-    from module_loader import ModuleLoader, ModuleLoadError
+    from module_loader import ModuleLoader, ModuleLoadError, LazyModule
+    from version_index import VersionIndex
 
 logger = logging.getLogger(__name__)
 
+ModuleId = Tuple[str, str]
+
+LOAD_MODES = ("sequential", "parallel", "lazy")
+
+
 class ModuleOrchestrator:
-    """Coordinates the discovery, resolution, and loading of dynamic modules."""
+    """Coordinates the discovery, resolution, and loading of dynamic modules.
+
+    Load modes:
+        sequential: import every resolved module one at a time in load order (default).
+        parallel: import in dependency order, with modules whose dependencies have all
+            been loaded imported concurrently on up to ``max_workers`` threads.
+        lazy: import nothing up front; each entry of the result is a LazyModule that
+            imports the module on first attribute access (i.e. first execution).
+
+    Import time of every module is recorded in ``import_times``.
+    """
 
     def __init__(
         self,
         discovery_service: ModuleDiscoveryService,
         resolver: DependencyResolver,
-        loader: ModuleLoader
+        loader: ModuleLoader,
+        load_mode: str = "sequential",
+        max_workers: int = 4
     ):
+        if load_mode not in LOAD_MODES:
+            raise ValueError(f"load_mode must be one of {LOAD_MODES}, got '{load_mode}'")
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
         self._discovery_service = discovery_service
         self._resolver = resolver
         self._loader = loader
+        self.load_mode = load_mode
+        self.max_workers = max_workers
+        self._import_times: Dict[ModuleId, float] = {}
+        self._import_times_lock = threading.Lock()
+
+    @property
+    def import_times(self) -> Dict[ModuleId, float]:
+        """Seconds spent importing each loaded module, keyed by (module_name, version)."""
+        with self._import_times_lock:
+            return dict(self._import_times)
+
+    def slowest_imports(self, limit: int = 5) -> List[Tuple[ModuleId, float]]:
+        """The `limit` modules that took longest to import, slowest first."""
+        return sorted(self.import_times.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+    def _record_import_time(self, meta: ModuleMetadata, seconds: float) -> None:
+        with self._import_times_lock:
+            self._import_times[(meta.module_name, meta.version)] = seconds
 
     def load_discovered_modules(self, discovery_root_path: Path) -> Dict[Tuple[str, str], Any]:
         """
@@ -47,6 +91,8 @@ class ModuleOrchestrator:
         logger.info(f"Starting module discovery in: {discovery_root_path}")
         try:
             discovered_meta_list: List[ModuleMetadata] = self._discovery_service.discover_modules(discovery_root_path)
+            if isinstance(discovered_meta_list, dict): # ModuleDiscoveryService returns {module_name: meta}
+                discovered_meta_list = list(discovered_meta_list.values())
             if not discovered_meta_list:
                 logger.info("No module metadata files found.")
                 return {}
@@ -76,24 +122,109 @@ class ModuleOrchestrator:
             logger.exception(f"An unexpected error occurred during dependency resolution: {e}")
             return {} # Halt on unexpected error
 
-        # 4. Load Modules in Order
-        logger.info("Loading modules in resolved order...")
-        modules_loaded_count = 0
-        for meta_to_load in resolved_load_order:
-            module_id = (meta_to_load.module_name, meta_to_load.version)
-            try:
-                loaded_module_obj = self._loader.load_module(meta_to_load)
-                loaded_modules[module_id] = loaded_module_obj
-                modules_loaded_count += 1
-                # Optionally: Notify registry or perform other actions with loaded_module_obj
-            except ModuleLoadError as e:
-                logger.error(f"Failed to load module {module_id[0]} v{module_id[1]}: {e}")
-                # Decide whether to continue loading others or halt.
-                # Let's continue loading other modules for robustness.
-                continue 
-            except Exception as e:
-                logger.exception(f"An unexpected error occurred loading module {module_id[0]} v{module_id[1]}: {e}")
-                continue # Also continue on unexpected errors?
-
-        logger.info(f"Module loading complete. Successfully loaded {modules_loaded_count} out of {len(resolved_load_order)} resolved modules.")
-        return loaded_modules 
\ No newline at end of file
+        # 4. Load Modules
+        if self.load_mode == "lazy":
+            for meta_to_load in resolved_load_order:
+                module_id = (meta_to_load.module_name, meta_to_load.version)
+                loaded_modules[module_id] = LazyModule(self._loader, meta_to_load, on_load=self._record_import_time)
+            logger.info(f"Registered {len(loaded_modules)} modules for lazy import on first use.")
+            return loaded_modules
+
+        logger.info(f"Loading modules in resolved order ({self.load_mode})...")
+        if self.load_mode == "parallel":
+            self._load_parallel(resolved_load_order, loaded_modules)
+        else:
+            for meta_to_load in resolved_load_order:
+                self._load_one(meta_to_load, loaded_modules)
+
+        logger.info(f"Module loading complete. Successfully loaded {len(loaded_modules)} out of {len(resolved_load_order)} resolved modules.")
+        slowest = self.slowest_imports()
+        if slowest:
+            logger.info("Slowest module imports: " + ", ".join(
+                f"{name} v{version} {seconds * 1000:.1f} ms" for (name, version), seconds in slowest))
+        return loaded_modules
+
+    def _load_one(self, meta_to_load: ModuleMetadata, loaded_modules: Dict[ModuleId, Any]) -> None:
+        """Imports one module, recording its import time; failures are logged and skipped."""
+        module_id = (meta_to_load.module_name, meta_to_load.version)
+        try:
+            start = time.perf_counter()
+            loaded_module_obj = self._loader.load_module(meta_to_load)
+            elapsed = time.perf_counter() - start
+            self._record_import_time(meta_to_load, elapsed)
+            loaded_modules[module_id] = loaded_module_obj
+            logger.debug(f"Imported module {module_id[0]} v{module_id[1]} in {elapsed * 1000:.1f} ms.")
+        except ModuleLoadError as e:
+            logger.error(f"Failed to load module {module_id[0]} v{module_id[1]}: {e}")
+            # Continue loading other modules for robustness.
+        except Exception as e:
+            logger.exception(f"An unexpected error occurred loading module {module_id[0]} v{module_id[1]}: {e}")
+
+    @staticmethod
+    def _dependency_edges(resolved_load_order: List[ModuleMetadata]) -> Dict[ModuleId, Set[ModuleId]]:
+        """Maps each resolved module to the resolved modules it depends on.
+
+        A dependency points at the highest resolved version satisfying its specifier;
+        dependencies outside the resolved set are ignored (the resolver already vetted them).
+        """
+        versions_by_name: Dict[str, List[str]] = {}
+        for meta in resolved_load_order:
+            versions_by_name.setdefault(meta.module_name, []).append(meta.version)
+        indexes = {name: VersionIndex.from_versions(versions) for name, versions in versions_by_name.items()}
+
+        edges: Dict[ModuleId, Set[ModuleId]] = {}
+        for meta in resolved_load_order:
+            module_id = (meta.module_name, meta.version)
+            edges[module_id] = set()
+            for dep in meta.dependencies:
+                index = indexes.get(dep.name)
+                if index is None:
+                    continue
+                try:
+                    best_version = index.best_match(dep.version_specifier)
+                except Exception:
+                    best_version = None
+                if best_version is not None and (dep.name, best_version) != module_id:
+                    edges[module_id].add((dep.name, best_version))
+        return edges
+
+    def _load_parallel(self, resolved_load_order: List[ModuleMetadata], loaded_modules: Dict[ModuleId, Any]) -> None:
+        """Imports modules as soon as all of their dependencies have been attempted."""
+        edges = self._dependency_edges(resolved_load_order)
+        metas = {(meta.module_name, meta.version): meta for meta in resolved_load_order}
+        remaining = {module_id: set(deps) for module_id, deps in edges.items()}
+        dependents: Dict[ModuleId, List[ModuleId]] = {module_id: [] for module_id in edges}
+        for module_id, deps in edges.items():
+            for dep_id in deps:
+                dependents[dep_id].append(module_id)
+
+        results: Dict[ModuleId, Any] = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="module-import") as pool:
+            running: Dict[Future, ModuleId] = {}
+
+            def submit_ready(candidates):
+                for module_id in candidates:
+                    if not remaining[module_id]:
+                        del remaining[module_id]
+                        running[pool.submit(self._load_one, metas[module_id], results)] = module_id
+
+            # Resolved order is a topological order, so this also preserves it among ready modules
+            submit_ready([module_id for module_id in metas])
+            while running:
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    finished_id = running.pop(future)
+                    for dependent_id in dependents[finished_id]:
+                        remaining[dependent_id].discard(finished_id)
+                    submit_ready([dependent_id for dependent_id in dependents[finished_id] if dependent_id in remaining])
+            if remaining:
+                # Only possible if the resolver returned a cyclic order; fall back to load order
+                logger.warning(f"Could not order {len(remaining)} modules by dependency; loading them sequentially.")
+                for module_id in metas:
+                    if module_id in remaining:
+                        self._load_one(metas[module_id], results)
+
+        # Keep the resolved load order in the result
+        for module_id in metas:
+            if module_id in results:
+                loaded_modules[module_id] = results[module_id]
@@ -0,0 +1,223 @@
+# src/core/performance_index.py
+"""
+Sorted index over component performance, maintained incrementally by StateMonitor.
+
+Entries are ordered by accuracy (descending), then latency (ascending), then insertion
+sequence, which is exactly the KFMPlanner ranking (ties go to the component seen first).
+With that order:
+
+- the best Marry candidate is the first entry with latency <= max_latency among the
+  prefix of entries with accuracy >= min_accuracy;
+- Fuck candidates are the prefix entries slower than max_latency, then the remaining
+  entries within it, in rank order.
+
+The entries live in a treap (randomized balanced search tree) whose nodes also keep the
+minimum and maximum latency of their subtree, so a query can skip whole subtrees that
+cannot contain a candidate. Updates cost O(log n), best_marry O(log n) and
+fuck_candidates O(log n) per candidate returned (expected), instead of a scan over
+every component.
+"""
+import random
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# (-accuracy, latency, sequence, component_name)
+IndexEntry = Tuple[float, float, int, str]
+
+_INF = float("inf")
+
+
+def _metric(value: Any, default: float) -> float:
+    """Coerces a metric to float, falling back to the planner's default for missing values."""
+    if value is None or isinstance(value, bool) or not isinstance(value, (int, float)):
+        return default
+    return float(value)
+
+
+class _Node:
+    """Treap node; min/max_latency cover the node's whole subtree."""
+
+    __slots__ = ("entry", "priority", "left", "right", "min_latency", "max_latency")
+
+    def __init__(self, entry: IndexEntry):
+        self.entry = entry
+        self.priority = random.random()
+        self.left: Optional["_Node"] = None
+        self.right: Optional["_Node"] = None
+        self.min_latency = self.max_latency = entry[1]
+
+    def pull(self) -> "_Node":
+        """Recomputes the subtree latency range after a child changed."""
+        low = high = self.entry[1]
+        left, right = self.left, self.right
+        if left is not None:
+            if left.min_latency < low:
+                low = left.min_latency
+            if left.max_latency > high:
+                high = left.max_latency
+        if right is not None:
+            if right.min_latency < low:
+                low = right.min_latency
+            if right.max_latency > high:
+                high = right.max_latency
+        self.min_latency = low
+        self.max_latency = high
+        return self
+
+
+def _split(node: Optional[_Node], entry: IndexEntry) -> Tuple[Optional[_Node], Optional[_Node]]:
+    """Splits into (entries < entry, entries >= entry)."""
+    if node is None:
+        return None, None
+    if node.entry < entry:
+        node.right, right = _split(node.right, entry)
+        return node.pull(), right
+    left, node.left = _split(node.left, entry)
+    return left, node.pull()
+
+
+def _merge(left: Optional[_Node], right: Optional[_Node]) -> Optional[_Node]:
+    """Joins two treaps where every entry of `left` sorts before every entry of `right`."""
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        return left.pull()
+    right.left = _merge(left, right.left)
+    return right.pull()
+
+
+def _delete(node: Optional[_Node], entry: IndexEntry) -> Optional[_Node]:
+    if node is None:
+        return None
+    if entry == node.entry:
+        return _merge(node.left, node.right)
+    if entry < node.entry:
+        node.left = _delete(node.left, entry)
+    else:
+        node.right = _delete(node.right, entry)
+    return node.pull()
+
+
+def _first_within(node: Optional[_Node], bound: Tuple[float, float, float], max_latency: float) -> Optional[str]:
+    """First entry (in rank order) before `bound` with latency <= max_latency."""
+    while node is not None and node.min_latency <= max_latency:
+        if node.entry >= bound:
+            node = node.left
+            continue
+        # The left subtree lies entirely before the bound: its minimum decides
+        if node.left is not None and node.left.min_latency <= max_latency:
+            node = node.left
+        elif node.entry[1] <= max_latency:
+            return node.entry[3]
+        else:
+            node = node.right
+    return None
+
+
+def _collect(node: Optional[_Node], bound: Tuple[float, float, float], before: bool, slow: bool,
+             max_latency: float, found: List[str], k: int) -> None:
+    """Appends, in rank order, entries on one side of `bound` that are slow (or fast) until k are found."""
+    if node is None or len(found) >= k:
+        return
+    if (node.max_latency <= max_latency) if slow else (node.min_latency > max_latency):
+        return  # Nothing in this subtree qualifies
+    if (node.entry < bound) != before:
+        # The node and one of its subtrees are on the other side of the bound
+        _collect(node.left if before else node.right, bound, before, slow, max_latency, found, k)
+        return
+    _collect(node.left, bound, before, slow, max_latency, found, k)
+    if len(found) < k and (node.entry[1] > max_latency) == slow:
+        found.append(node.entry[3])
+    _collect(node.right, bound, before, slow, max_latency, found, k)
+
+
+class PerformanceIndex:
+    """Components sorted by (accuracy desc, latency asc) for fast KFM candidate queries.
+
+    Missing metrics use the same defaults as KFMPlanner's scan (accuracy 0.0, latency inf).
+    """
+
+    def __init__(self, performance_data: Optional[Dict[str, Dict[str, Any]]] = None):
+        self._root: Optional[_Node] = None
+        self._by_name: Dict[str, IndexEntry] = {}
+        self._sequence: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        for component_name, metrics in (performance_data or {}).items():
+            self.update(component_name, metrics)
+
+    def __len__(self) -> int:
+        return len(self._by_name)
+
+    def __contains__(self, component_name: str) -> bool:
+        return component_name in self._by_name
+
+    def update(self, component_name: str, metrics: Dict[str, Any]) -> None:
+        """Inserts or repositions a component from its current accuracy/latency."""
+        with self._lock:
+            sequence = self._sequence.setdefault(component_name, len(self._sequence))
+            entry = (
+                -_metric(metrics.get("accuracy"), 0.0),
+                _metric(metrics.get("latency"), _INF),
+                sequence,
+                component_name,
+            )
+            old = self._by_name.get(component_name)
+            if old == entry:
+                return
+            if old is not None:
+                self._root = _delete(self._root, old)
+            left, right = _split(self._root, entry)
+            self._root = _merge(_merge(left, _Node(entry)), right)
+            self._by_name[component_name] = entry
+
+    def remove(self, component_name: str) -> None:
+        """Drops a component from the index (no-op if absent)."""
+        with self._lock:
+            old = self._by_name.pop(component_name, None)
+            if old is not None:
+                self._root = _delete(self._root, old)
+
+    def ranked(self) -> Iterator[Tuple[str, float, float]]:
+        """Yields (component_name, accuracy, latency) in KFM rank order."""
+        entries: List[IndexEntry] = []
+        with self._lock:
+            stack: List[_Node] = []
+            node = self._root
+            while stack or node is not None:
+                while node is not None:
+                    stack.append(node)
+                    node = node.left
+                node = stack.pop()
+                entries.append(node.entry)
+                node = node.right
+        for neg_accuracy, latency, _, name in entries:
+            yield name, -neg_accuracy, latency
+
+    def best_marry(self, min_accuracy: float, max_latency: float) -> Optional[str]:
+        """Best component meeting accuracy >= min_accuracy AND latency <= max_latency."""
+        with self._lock:
+            # Entries with accuracy >= min_accuracy sort before this bound
+            return _first_within(self._root, (-min_accuracy, _INF, _INF), max_latency)
+
+    def fuck_candidates(self, min_accuracy: float, max_latency: float, k: int = 1) -> List[str]:
+        """Top-k components (in rank order) meeting exactly one of the two requirements."""
+        found: List[str] = []
+        bound = (-min_accuracy, _INF, _INF)
+        with self._lock:
+            # Accurate but too slow rank above every component below the accuracy bar
+            _collect(self._root, bound, True, True, max_latency, found, k)
+            _collect(self._root, bound, False, False, max_latency, found, k)
+        return found
+
+    def best_fuck(self, min_accuracy: float, max_latency: float) -> Optional[str]:
+        """Best Fuck candidate, assuming no Marry candidate exists.
+
+        Without Marry candidates every component with enough accuracy is too slow, so the
+        top-ranked entry wins if it meets the accuracy bar; otherwise the first entry fast
+        enough does.
+        """
+        candidates = self.fuck_candidates(min_accuracy, max_latency, k=1)
+        return candidates[0] if candidates else None
@@ -0,0 +1,192 @@
+# src/core/result_cache.py
+"""
+Memoization of deterministic component results for ExecutionEngine.
+
+Entries are keyed by (component key, component version, canonical hash of params). The
+hash is a SHA-256 of the params serialized as JSON with sorted keys, so equal params
+hit regardless of dict ordering; params that cannot be serialized are simply not cached.
+
+The in-memory tier is an LRU bounded by ``max_entries`` with a per-entry TTL. An
+optional on-disk tier (SQLite, values stored as JSON) survives restarts; disk hits are
+promoted into memory. Reading it never runs code, so the file may live anywhere; values
+that JSON cannot represent exactly (tuples, sets, arbitrary objects) stay in memory only. Entries of a component can be dropped wholesale, or all versions
+except the current one, which is how the engine invalidates on module version changes.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+from src.logger import setup_logger
+
+# (component_key, version, params_hash)
+CacheKey = Tuple[str, str, str]
+
+_MISSING = object()
+
+
+def params_fingerprint(params: Any) -> Optional[str]:
+    """Canonical SHA-256 of params, or None if they are not JSON-serializable."""
+    try:
+        canonical = json.dumps(params, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    except (TypeError, ValueError):
+        return None
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _to_json(value: Any) -> Optional[str]:
+    """JSON text of a value, or None if it would not load back equal to the value."""
+    try:
+        text = json.dumps(value, allow_nan=False)
+    except (TypeError, ValueError):
+        return None
+    loaded = json.loads(text)
+    return text if loaded == value and _same_types(loaded, value) else None
+
+
+def _same_types(loaded: Any, value: Any) -> bool:
+    """Type check after an equal round trip: == does not tell 1, 1.0 and True or tuple and list apart."""
+    if type(loaded) is not type(value):
+        return False
+    if isinstance(value, dict):
+        return all(_same_types(loaded[key], item) for key, item in value.items())
+    if isinstance(value, list):
+        return all(_same_types(a, b) for a, b in zip(loaded, value))
+    return True
+
+
+class ResultCache:
+    """Size- and TTL-bounded result cache with an optional SQLite tier.
+
+    Args:
+        max_entries: Maximum entries kept in memory (least recently used are evicted).
+        ttl_seconds: Lifetime of an entry in both tiers (None = no expiry).
+        disk_path: SQLite file for the on-disk tier (None = memory only).
+        clock: Wall-clock time source; also used for disk expiry across restarts.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: Optional[float] = 300.0,
+                 disk_path: Optional[Union[str, Path]] = None, clock: Callable[[], float] = time.time):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        if ttl_seconds is not None and ttl_seconds <= 0:
+            raise ValueError("ttl_seconds must be positive or None")
+        self.logger = setup_logger('ResultCache')
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._memory: "OrderedDict[CacheKey, Tuple[Optional[float], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+        self._db: Optional[sqlite3.Connection] = None
+        if disk_path is not None:
+            Path(disk_path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(disk_path), check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS json_results (component TEXT, version TEXT, params_hash TEXT, "
+                "expires_at REAL, value TEXT, PRIMARY KEY (component, version, params_hash))")
+            self._db.commit()
+
+    def _expires_at(self) -> Optional[float]:
+        return None if self.ttl_seconds is None else self.clock() + self.ttl_seconds
+
+    def get(self, component_key: str, version: str, params_hash: str) -> Tuple[bool, Any, Optional[str]]:
+        """Looks up a result.
+
+        Returns:
+            (hit, value, tier) where tier is 'memory' or 'disk' on a hit and None on a miss.
+        """
+        key = (component_key, version, params_hash)
+        now = self.clock()
+        with self._lock:
+            entry = self._memory.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, value = entry
+                if expires_at is None or expires_at > now:
+                    self._memory.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return True, value, "memory"
+                del self._memory[key]
+                self._stats["expirations"] += 1
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT expires_at, value FROM json_results WHERE component=? AND version=? AND params_hash=?",
+                    key).fetchone()
+                if row is not None:
+                    expires_at, text = row
+                    if expires_at is None or expires_at > now:
+                        try:
+                            value = json.loads(text)
+                        except Exception as e:
+                            self.logger.warning(f"Discarding unreadable cached result for '{component_key}': {e}")
+                        else:
+                            self._store_memory(key, expires_at, value)
+                            self._stats["hits"] += 1
+                            self._stats["disk_hits"] += 1
+                            return True, value, "disk"
+                    self._db.execute("DELETE FROM json_results WHERE component=? AND version=? AND params_hash=?", key)
+                    self._db.commit()
+            self._stats["misses"] += 1
+            return False, None, None
+
+    def put(self, component_key: str, version: str, params_hash: str, value: Any) -> None:
+        """Stores a result in memory and, if configured and JSON-representable, on disk."""
+        key = (component_key, version, params_hash)
+        expires_at = self._expires_at()
+        with self._lock:
+            self._store_memory(key, expires_at, value)
+            if self._db is not None:
+                text = _to_json(value)
+                if text is None:
+                    self.logger.debug(f"Result of '{component_key}' is not JSON-representable; kept in memory only")
+                    return
+                self._db.execute("INSERT OR REPLACE INTO json_results VALUES (?, ?, ?, ?, ?)", (*key, expires_at, text))
+                self._db.commit()
+
+    def _store_memory(self, key: CacheKey, expires_at: Optional[float], value: Any) -> None:
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def invalidate(self, component_key: str, keep_version: Optional[str] = None) -> int:
+        """Drops a component's entries (all versions, or all but `keep_version`); returns how many."""
+        with self._lock:
+            stale = [key for key in self._memory if key[0] == component_key and key[1] != keep_version]
+            for key in stale:
+                del self._memory[key]
+            removed = len(stale)
+            if self._db is not None:
+                if keep_version is None:
+                    cursor = self._db.execute("DELETE FROM json_results WHERE component=?", (component_key,))
+                else:
+                    cursor = self._db.execute("DELETE FROM json_results WHERE component=? AND version!=?",
+                                              (component_key, keep_version))
+                self._db.commit()
+                removed = max(removed, cursor.rowcount)
+        if removed:
+            self.logger.info(f"Invalidated {removed} cached results of '{component_key}'")
+        return removed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM json_results")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, "entries": len(self._memory)}
+
+    def close(self) -> None:
+        """Closes the on-disk tier."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -1,4 +1,5 @@
 import asyncio
+import contextlib
 import time
 import uuid
 import json
@@ -9,6 +10,7 @@ from typing import Optional, Dict, Any, List, Union
 # For now, using Any as a type hint for kfm_agent_state
 # KFMAgentState = Any 
 from src.state_types import KFMAgentState # Import the actual KFMAgentState
+from src.core.state_sharing import encode_state_json
 
 from .snapshot_storage_interface import SnapshotStorageInterface, SnapshotManifest, ChunkReference
 # from .state_adapter_registry import StateAdapterRegistry # To be implemented in 62.4
@@ -33,6 +35,8 @@ class SnapshotService:
         # state_adapter_registry: StateAdapterRegistry # Uncomment when 62.4 is done
     ):
         self.storage = snapshot_storage
+        # Optional async context manager bounding concurrent storage writes (e.g. a scheduler CapacityLimiter)
+        self.capacity_limiter = None
         # self.adapter_registry = state_adapter_registry # Uncomment when 62.4 is done
         # For now, component state fetching is a placeholder
         print(f"SnapshotService initialized with storage: {type(snapshot_storage).__name__}")
@@ -103,7 +107,7 @@ class SnapshotService:
 
         try:
             # Serialize the combined data dictionary to a JSON string, then encode to bytes
-            final_data_to_snapshot_json = json.dumps(combined_data_for_snapshot_dict, default=str, sort_keys=True)
+            final_data_to_snapshot_json = encode_state_json(combined_data_for_snapshot_dict) # Same output as json.dumps(..., default=str, sort_keys=True)
             final_data_to_snapshot_bytes = final_data_to_snapshot_json.encode('utf-8')
         except TypeError as e_serialize:
             print(f"Error serializing data for snapshot {snapshot_id}: {e_serialize}")
@@ -136,11 +140,12 @@ class SnapshotService:
             
             # Delegate chunking, manifest creation, and storage to the backend
             # The backend's store_snapshot_manifest should handle everything from raw bytes.
-            stored_manifest = await self.storage.store_snapshot_manifest(
-                snapshot_id=snapshot_id,
-                state_data=final_data_to_snapshot_bytes, # Pass raw bytes
-                metadata=snapshot_metadata_dict         # Pass combined metadata
-            )
+            async with self.capacity_limiter or contextlib.nullcontext():
+                stored_manifest = await self.storage.store_snapshot_manifest(
+                    snapshot_id=snapshot_id,
+                    state_data=final_data_to_snapshot_bytes, # Pass raw bytes
+                    metadata=snapshot_metadata_dict         # Pass combined metadata
+                )
 
             if stored_manifest:
                 print(f"Successfully stored snapshot: {snapshot_id} with manifest details.") # Consider logging manifest.total_original_size
@@ -0,0 +1,369 @@
+# src/core/run_scheduler.py
+"""
+Concurrent scheduler for agent runs on one event loop.
+
+AgentRunScheduler keeps a priority queue of submitted runs (lower number = higher
+priority, FIFO within a priority) and dispatches them as asyncio tasks, at most
+``max_concurrency`` at a time. Runs can be cancelled by run_id whether they are
+still queued or already running.
+
+Backpressure works at two levels:
+
+- Submission: the queue holds at most ``max_queue_size`` runs. ``submit`` waits for
+  room; ``submit_nowait`` raises SchedulerSaturatedError instead.
+- Downstream: code that calls a shared resource (the LLM, the snapshot store) wraps
+  the call in ``async with scheduler.limiter("llm"):``. A CapacityLimiter admits
+  ``capacity`` callers at once; while callers are waiting on any limiter, the
+  scheduler starts no new runs, so queued work stays queued instead of piling up
+  on the saturated resource. AgentLifecycleController installs the "llm" and
+  "snapshot" limiters on the planner's chain calls and on snapshot storage writes.
+
+Runs are isolated at the state level only: each has its own graph state and
+thread_id, but they share the agent's components. In particular the
+ExecutionEngine's active component is agent-wide, so a Kill, Marry or Fuck decided
+by one run changes the component that every other in-flight run executes with from
+its next task on (the last decision wins). Use separate agents (engines) when runs
+must not influence each other's component choice.
+"""
+import asyncio
+import heapq
+import itertools
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from src.logger import setup_logger
+
+scheduler_logger = setup_logger('RunScheduler')
+
+RUN_QUEUED = "queued"
+RUN_RUNNING = "running"
+RUN_COMPLETED = "completed"
+RUN_FAILED = "failed"
+RUN_CANCELLED = "cancelled"
+
+
+class SchedulerSaturatedError(RuntimeError):
+    """Raised by submit_nowait when the run queue is full."""
+
+
+@dataclass
+class ScheduledRun:
+    """One submitted run and its timings (seconds, time.perf_counter based)."""
+    run_id: str
+    priority: int
+    initial_state: Dict[str, Any]
+    status: str = RUN_QUEUED
+    submitted_at: float = field(default_factory=time.perf_counter)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+    done_event: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    @property
+    def queue_latency(self) -> Optional[float]:
+        """Time from submission to start (to cancellation if it never started)."""
+        end = self.started_at if self.started_at is not None else self.finished_at
+        return None if end is None else end - self.submitted_at
+
+    @property
+    def latency(self) -> Optional[float]:
+        """Time from submission to completion."""
+        return None if self.finished_at is None else self.finished_at - self.submitted_at
+
+    @property
+    def done(self) -> bool:
+        return self.status in (RUN_COMPLETED, RUN_FAILED, RUN_CANCELLED)
+
+
+class CapacityLimiter:
+    """Bounds concurrent use of one downstream resource and reports saturation."""
+
+    def __init__(self, name: str, capacity: int, on_release: Optional[Callable[[], None]] = None):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.name = name
+        self.capacity = capacity
+        self.in_use = 0
+        self.waiting = 0
+        self.peak_waiting = 0
+        self._semaphore = asyncio.Semaphore(capacity)
+        self._on_release = on_release
+
+    @property
+    def saturated(self) -> bool:
+        """True while callers are queued for the resource."""
+        return self.waiting > 0
+
+    async def __aenter__(self) -> "CapacityLimiter":
+        self.waiting += 1
+        self.peak_waiting = max(self.peak_waiting, self.waiting)
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_use += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.in_use -= 1
+        self._semaphore.release()
+        if self._on_release is not None:
+            self._on_release()
+
+
+class AgentRunScheduler:
+    """Runs many agent invocations concurrently with priorities, cancellation and backpressure."""
+
+    def __init__(self, run_fn: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]],
+                 max_concurrency: int = 32, max_queue_size: int = 1000,
+                 capacities: Optional[Dict[str, int]] = None, history_size: int = 10000):
+        """
+        Args:
+            run_fn: Coroutine function executing one run from its initial state
+                (which carries the run_id) and returning the final state.
+            max_concurrency: Maximum number of runs executing at once.
+            max_queue_size: Maximum number of queued (not yet started) runs.
+            capacities: Downstream limiters to create, e.g. {"llm": 8, "snapshot": 4}.
+            history_size: Finished runs (and completion latencies) kept for lookup and stats.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        if max_queue_size < 1:
+            raise ValueError("max_queue_size must be at least 1")
+        self._run_fn = run_fn
+        self.max_concurrency = max_concurrency
+        self.max_queue_size = max_queue_size
+        self._heap: List[tuple] = []
+        self._sequence = itertools.count()
+        self._queued = 0
+        self._runs: Dict[str, ScheduledRun] = {}
+        self._running: Dict[str, ScheduledRun] = {}
+        self._wakeup = asyncio.Event()
+        self._room = asyncio.Event()
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._closing = False
+        self.limiters: Dict[str, CapacityLimiter] = {}
+        self.backpressure_waits = 0
+        self.history_size = history_size
+        self._finished = 0
+        self.completed_total = 0
+        self.completed_latencies: Deque[float] = deque(maxlen=history_size)
+        self._first_submit: Optional[float] = None
+        self._last_finish: Optional[float] = None
+        for name, capacity in (capacities or {}).items():
+            self.add_limiter(name, capacity)
+
+    # --- Downstream capacity ---
+
+    def add_limiter(self, name: str, capacity: int) -> CapacityLimiter:
+        limiter = CapacityLimiter(name, capacity, on_release=self._wakeup.set)
+        self.limiters[name] = limiter
+        return limiter
+
+    def limiter(self, name: str) -> CapacityLimiter:
+        """The limiter for a downstream resource; raises KeyError if none was configured."""
+        return self.limiters[name]
+
+    def saturated_resources(self) -> List[str]:
+        return [name for name, limiter in self.limiters.items() if limiter.saturated]
+
+    # --- Submission ---
+
+    def _enqueue(self, initial_state: Dict[str, Any], priority: int, run_id: Optional[str]) -> ScheduledRun:
+        if self._closing:
+            raise RuntimeError("Scheduler is shutting down")
+        run_id = run_id or initial_state.get("run_id") or str(uuid.uuid4())
+        if run_id in self._runs and not self._runs[run_id].done:
+            raise ValueError(f"Run '{run_id}' is already scheduled")
+        state = dict(initial_state, run_id=run_id)
+        state.setdefault("original_correlation_id", run_id)
+        run = ScheduledRun(run_id=run_id, priority=priority, initial_state=state)
+        self._runs[run_id] = run
+        heapq.heappush(self._heap, (priority, next(self._sequence), run))
+        self._queued += 1
+        if self._first_submit is None:
+            self._first_submit = run.submitted_at
+        self._ensure_dispatcher()
+        self._wakeup.set()
+        return run
+
+    def submit_nowait(self, initial_state: Dict[str, Any], priority: int = 0,
+                      run_id: Optional[str] = None) -> ScheduledRun:
+        """Queues a run; raises SchedulerSaturatedError if the queue is full."""
+        if self._queued >= self.max_queue_size:
+            raise SchedulerSaturatedError(f"Run queue is full ({self.max_queue_size} runs queued)")
+        return self._enqueue(initial_state, priority, run_id)
+
+    async def submit(self, initial_state: Dict[str, Any], priority: int = 0,
+                     run_id: Optional[str] = None) -> ScheduledRun:
+        """Queues a run, waiting for room in the queue first."""
+        if self._queued >= self.max_queue_size:
+            self.backpressure_waits += 1
+            while self._queued >= self.max_queue_size:
+                self._room.clear()
+                await self._room.wait()
+        return self._enqueue(initial_state, priority, run_id)
+
+    async def run(self, initial_state: Dict[str, Any], priority: int = 0,
+                  run_id: Optional[str] = None) -> Dict[str, Any]:
+        """Submits a run and waits for its final state."""
+        run = await self.submit(initial_state, priority, run_id)
+        return await self.wait(run.run_id)
+
+    async def wait(self, run_id: str) -> Dict[str, Any]:
+        """Waits for a run to finish and returns its final state.
+
+        Raises:
+            KeyError: Unknown run_id.
+            asyncio.CancelledError: The run was cancelled.
+        """
+        run = self._runs[run_id]
+        await run.done_event.wait()
+        if run.status == RUN_CANCELLED:
+            raise asyncio.CancelledError(f"Run '{run_id}' was cancelled")
+        return run.result
+
+    def get_run(self, run_id: str) -> Optional[ScheduledRun]:
+        return self._runs.get(run_id)
+
+    # --- Cancellation ---
+
+    def cancel(self, run_id: str) -> bool:
+        """Cancels a queued or running run. Returns False if it is unknown or already finished."""
+        run = self._runs.get(run_id)
+        if run is None or run.done:
+            return False
+        if run.status == RUN_QUEUED:
+            # Left in the heap and skipped by the dispatcher
+            self._queued -= 1
+            self._finish(run, RUN_CANCELLED)
+            self._notify_room()
+        elif run.task is not None:
+            run.task.cancel()
+        scheduler_logger.info(f"Cancelled run {run_id}")
+        return True
+
+    async def stop_run(self, run_id: str) -> bool:
+        """Cancels a run and waits until it has actually stopped."""
+        run = self._runs.get(run_id)
+        if not self.cancel(run_id):
+            return False
+        await run.done_event.wait()
+        return True
+
+    # --- Dispatch ---
+
+    def _ensure_dispatcher(self) -> None:
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.get_running_loop().create_task(self._dispatch_loop())
+
+    def _notify_room(self) -> None:
+        self._room.set()
+
+    def _can_start(self) -> bool:
+        return len(self._running) < self.max_concurrency and not self.saturated_resources()
+
+    async def _dispatch_loop(self) -> None:
+        while True:
+            while self._heap and self._heap[0][2].status != RUN_QUEUED:
+                heapq.heappop(self._heap)  # Cancelled while queued
+            if not self._heap:
+                if self._closing or not self._running:
+                    return
+            elif self._can_start():
+                _, _, run = heapq.heappop(self._heap)
+                self._queued -= 1
+                self._start(run)
+                self._notify_room()
+                continue
+            self._wakeup.clear()
+            await self._wakeup.wait()
+
+    def _start(self, run: ScheduledRun) -> None:
+        run.status = RUN_RUNNING
+        run.started_at = time.perf_counter()
+        self._running[run.run_id] = run
+        run.task = asyncio.get_running_loop().create_task(self._execute(run))
+        # A task cancelled before its first step never enters _execute
+        run.task.add_done_callback(lambda task: None if run.done else self._finish(run, RUN_CANCELLED))
+
+    async def _execute(self, run: ScheduledRun) -> None:
+        try:
+            result = await self._run_fn(run.initial_state)
+        except asyncio.CancelledError:
+            self._finish(run, RUN_CANCELLED)
+            return
+        except Exception as e:
+            scheduler_logger.error(f"Run {run.run_id} failed: {e}", exc_info=True)
+            run.error = str(e)
+            self._finish(run, RUN_FAILED)
+            return
+        run.result = result
+        self._finish(run, RUN_COMPLETED)
+
+    def _finish(self, run: ScheduledRun, status: str) -> None:
+        run.status = status
+        run.finished_at = time.perf_counter()
+        self._running.pop(run.run_id, None)
+        if status == RUN_COMPLETED:
+            self.completed_total += 1
+            self.completed_latencies.append(run.latency)
+            self._last_finish = run.finished_at
+        run.done_event.set()
+        self._wakeup.set()
+        self._finished += 1
+        if self._finished > 2 * self.history_size:
+            self._forget_finished()
+
+    def _forget_finished(self) -> None:
+        """Drops the oldest finished runs beyond history_size (runs are kept in submission order)."""
+        excess = self._finished - self.history_size
+        for run_id in [run_id for run_id, run in self._runs.items() if run.done][:excess]:
+            del self._runs[run_id]
+        self._finished -= excess
+
+    # --- Lifecycle and metrics ---
+
+    async def join(self) -> None:
+        """Waits until every submitted run has finished."""
+        while True:
+            pending = [run for run in self._runs.values() if not run.done]
+            if not pending:
+                return
+            await asyncio.gather(*(run.done_event.wait() for run in pending))
+
+    async def shutdown(self, cancel_pending: bool = False) -> None:
+        """Stops accepting runs, then drains (or cancels) what is queued and running."""
+        self._closing = True
+        if cancel_pending:
+            for run_id in [run_id for run_id, run in self._runs.items() if not run.done]:
+                self.cancel(run_id)
+        await self.join()
+        self._wakeup.set()
+        if self._dispatcher is not None:
+            await self._dispatcher
+
+    def stats(self) -> Dict[str, Any]:
+        """Run counts by status, throughput (completed runs per second since the first
+        submission) and completion latency percentiles over the last history_size runs."""
+        counts = {status: 0 for status in (RUN_QUEUED, RUN_RUNNING, RUN_COMPLETED, RUN_FAILED, RUN_CANCELLED)}
+        for run in self._runs.values():
+            counts[run.status] += 1
+        latencies = sorted(self.completed_latencies)
+        percentile = lambda p: latencies[min(len(latencies) - 1, int(p * len(latencies)))] if latencies else None
+        elapsed = (self._last_finish - self._first_submit) if self._last_finish is not None else None
+        return {
+            **counts,
+            "completed_total": self.completed_total,
+            "throughput": self.completed_total / elapsed if elapsed else None,
+            "latency_p50": percentile(0.50),
+            "latency_p95": percentile(0.95),
+            "latency_max": latencies[-1] if latencies else None,
+            "backpressure_waits": self.backpressure_waits,
+            "saturated": self.saturated_resources(),
+        }
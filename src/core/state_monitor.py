@@ -1,20 +1,42 @@
 from src.logger import setup_logger
-from typing import Dict, Any, Optional
+import threading
+from typing import Dict, Any, Optional, Iterable, Tuple
 from src.core.component_registry import ComponentRegistry
+from src.core.performance_index import PerformanceIndex
+from src.core.streaming_metrics import MetricsStore
+
+LATENCY_STATISTICS = ('last', 'ewma', 'p50', 'p95', 'p99')
+ACCURACY_STATISTICS = ('last', 'ewma')
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
 
 class StateMonitor:
     """Monitors component performance and task requirements."""
     
-    def __init__(self, component_registry: ComponentRegistry, performance_data: Optional[Dict[str, Any]] = None, task_requirements: Optional[Dict[str, Any]] = None):
+    def __init__(self, component_registry: ComponentRegistry, performance_data: Optional[Dict[str, Any]] = None,
+                 task_requirements: Optional[Dict[str, Any]] = None, metrics_store: Optional[MetricsStore] = None,
+                 latency_statistic: str = 'ewma', accuracy_statistic: str = 'ewma'):
         """Initialize the StateMonitor.
         
         Args:
             component_registry: The ComponentRegistry instance.
             performance_data: Optional dictionary of performance metrics by component
             task_requirements: Optional dictionary of requirements by task
+            metrics_store: Optional streaming metrics store; a default MetricsStore is created otherwise
+            latency_statistic: Statistic exposed as a component's 'latency' after observations
+                ('last', 'ewma', 'p50', 'p95' or 'p99')
+            accuracy_statistic: Statistic exposed as a component's 'accuracy' ('last' or 'ewma')
         """
+        if latency_statistic not in LATENCY_STATISTICS:
+            raise ValueError(f"latency_statistic must be one of {LATENCY_STATISTICS}, got '{latency_statistic}'")
+        if accuracy_statistic not in ACCURACY_STATISTICS:
+            raise ValueError(f"accuracy_statistic must be one of {ACCURACY_STATISTICS}, got '{accuracy_statistic}'")
         self.logger = setup_logger('StateMonitor')
         self.component_registry = component_registry
+        self.metrics_store = metrics_store or MetricsStore()
+        self.latency_statistic = latency_statistic
+        self.accuracy_statistic = accuracy_statistic
         
         # Initialize with provided data or defaults
         self._performance_data = performance_data or {
@@ -32,6 +54,12 @@ class StateMonitor:
             }
         }
         
+        # Sorted (accuracy desc, latency asc) view for planner queries; kept in sync by
+        # update_performance_data. Direct edits to the dict returned by
+        # get_performance_data() bypass it.
+        self.performance_index = PerformanceIndex(self._performance_data)
+        self._write_lock = threading.RLock()
+
         self._task_requirements = task_requirements or {
             'default': {
                 'max_latency': 1.5,  # seconds
@@ -73,20 +101,109 @@ class StateMonitor:
         
     def update_performance_data(self, component_name: str, metrics: Dict[str, float]) -> None:
         """Update performance metrics for a component.
+
+        Latency and accuracy are treated as observations: they feed the streaming metrics
+        store and the component's exposed value becomes the configured statistic (EWMA by
+        default), so a single outlier no longer flips planner decisions. Other metrics are
+        stored as given.
         
         Args:
             component_name: Name of the component to update
             metrics: Dictionary of metrics to update
         """
-        if component_name not in self._performance_data:
-            self._performance_data[component_name] = {}
-            
-        # Update only the provided metrics
-        for key, value in metrics.items():
-            self._performance_data[component_name][key] = value
+        latency = metrics.get('latency')
+        accuracy = metrics.get('accuracy')
+        observed_latency = latency if _is_number(latency) else None
+        observed_accuracy = accuracy if _is_number(accuracy) else None
+
+        with self._write_lock:
+            component_data = self._ensure_component(component_name)
+            if observed_latency is not None or observed_accuracy is not None:
+                self.metrics_store.record(component_name, latency=observed_latency, accuracy=observed_accuracy)
+
+            # Update only the provided metrics
+            for key, value in metrics.items():
+                if key not in ('latency', 'accuracy') or not _is_number(value):
+                    component_data[key] = value
+            self._expose_statistics(component_name, observed_latency is not None, observed_accuracy is not None)
             
         self.logger.info(f"Updated performance data for component '{component_name}': {metrics}")
+
+    def ingest_observations(self, observations: Iterable[Tuple[str, Optional[float], Optional[float], Optional[float]]]) -> int:
+        """Ingest a batch of (component_name, latency, accuracy, timestamp) measurements.
+
+        Every measurement feeds the streaming metrics; exposed statistics and the
+        performance index are refreshed once per component per batch. Used by
+        MetricsFeedbackChannel to stream ExecutionEngine measurements in.
+
+        Args:
+            observations: Iterable of measurement tuples; latency/accuracy may be None
+
+        Returns:
+            Number of measurements ingested
+        """
+        touched: Dict[str, Tuple[bool, bool]] = {}
+        count = 0
+        with self._write_lock:
+            for component_name, latency, accuracy, timestamp in observations:
+                latency = latency if _is_number(latency) else None
+                accuracy = accuracy if _is_number(accuracy) else None
+                if latency is None and accuracy is None:
+                    continue
+                self.metrics_store.record(component_name, latency=latency, accuracy=accuracy, timestamp=timestamp)
+                seen_latency, seen_accuracy = touched.get(component_name, (False, False))
+                touched[component_name] = (seen_latency or latency is not None, seen_accuracy or accuracy is not None)
+                count += 1
+            for component_name, (has_latency, has_accuracy) in touched.items():
+                self._ensure_component(component_name)
+                self._expose_statistics(component_name, has_latency, has_accuracy)
+        self.logger.debug(f"Ingested {count} execution measurements for {len(touched)} components")
+        return count
+
+    def _ensure_component(self, component_name: str) -> Dict[str, Any]:
+        """Returns the component's metrics dict, adding it copy-on-write if new.
+
+        Replacing the outer dict (instead of inserting into it) keeps readers that are
+        iterating a previously returned get_performance_data() safe from concurrent
+        ingestion.
+        """
+        component_data = self._performance_data.get(component_name)
+        if component_data is None:
+            component_data = {}
+            self._performance_data = {**self._performance_data, component_name: component_data}
+        return component_data
+
+    def _expose_statistics(self, component_name: str, latency_observed: bool, accuracy_observed: bool) -> None:
+        """Publishes the configured statistics as the component's latency/accuracy and re-indexes it."""
+        component_data = self._performance_data[component_name]
+        if latency_observed:
+            component_data['latency'] = self.metrics_store.statistic(component_name, 'latency', self.latency_statistic)
+        if accuracy_observed:
+            component_data['accuracy'] = self.metrics_store.statistic(component_name, 'accuracy', self.accuracy_statistic)
+        self.performance_index.update(component_name, component_data)
         
+    def get_latency_percentiles(self, component_name: str) -> Dict[str, Optional[float]]:
+        """Get windowed p50/p95/p99 latency for a component.
+
+        Args:
+            component_name: Name of the component
+
+        Returns:
+            Dictionary with 'p50', 'p95' and 'p99' keys, or an empty dict if nothing was observed
+        """
+        return self.metrics_store.latency_percentiles(component_name)
+
+    def get_metrics_summary(self, component_name: str) -> Dict[str, Optional[float]]:
+        """Get streaming aggregates (EWMAs, last values, percentiles) for a component.
+
+        Args:
+            component_name: Name of the component
+
+        Returns:
+            Dictionary of aggregates, or an empty dict if nothing was observed
+        """
+        return self.metrics_store.summary(component_name)
+
     def add_task_requirements(self, task_name: str, requirements: Dict[str, float]) -> None:
         """Add or update requirements for a task.
         
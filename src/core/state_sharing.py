@@ -0,0 +1,155 @@
+# src/core/state_sharing.py
+"""
+Structurally shared agent state.
+
+Graph nodes used to start with ``copy.deepcopy(dict(state))``, so every node paid
+for a full copy of the input, results and performance data even though it only
+changes a few top-level keys. Instead, nodes treat the state they receive as
+immutable and derive the next version:
+
+- ``evolve(state, **updates)`` is a new top-level dict that shares every value it
+  does not replace with the previous version (copy cost = number of keys).
+- ``evolve_in(state, key, subkey, value)`` also copies the one nested dict it
+  updates (e.g. ``last_snapshot_ids``) instead of mutating it in place.
+- ``freeze(value)`` turns large payloads (the run input) into read-only FrozenDicts
+  and tuples once, so sharing them between versions, runs, snapshots and traces is
+  safe. Frozen subtrees keep their identity across versions, which lets the trace
+  diff skip them and the snapshot encoder reuse their JSON (``encode_state_json``).
+
+Frozen payloads stay frozen for whoever reads the state, including the caller that
+gets the final state back: lists in them are tuples, and mutating a FrozenDict or a
+tuple raises TypeError. Code that needs to edit such a payload takes a mutable copy
+with ``thaw(value)`` (or ``copy.deepcopy``, which keeps tuples as tuples).
+"""
+import copy
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Mapping
+
+
+class FrozenDict(dict):
+    """Read-only dict shared between readers (frozen state, registry snapshot details).
+
+    It serializes like a dict (json, pickle) and deep-copies into plain, mutable
+    containers, so a reader that really needs to edit it can deepcopy or thaw() it.
+    """
+
+    __slots__ = ()
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("Shared data is read-only; derive a new version with evolve() or thaw()/deepcopy it")
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = __ior__ = _read_only
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return {key: copy.deepcopy(value, memo) for key, value in self.items()}
+
+    def __reduce__(self):
+        return (dict, (dict(self),))
+
+
+def freeze(value: Any) -> Any:
+    """Returns a deeply read-only equivalent of `value`.
+
+    dicts become FrozenDicts, lists tuples and sets frozensets; already frozen values
+    are returned as is (no copy), other values are assumed immutable.
+    """
+    if isinstance(value, FrozenDict):
+        return value
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        items = tuple(freeze(item) for item in value)
+        if type(value) is tuple and all(new is old for new, old in zip(items, value)):
+            return value
+        return items
+    if isinstance(value, (set, frozenset)):
+        return frozenset(value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Returns a mutable copy of a frozen value, the inverse of freeze().
+
+    FrozenDicts and dicts become dicts, tuples lists and frozensets sets (so a tuple
+    that was a tuple before freezing comes back as a list); other values are shared.
+    """
+    if isinstance(value, dict):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [thaw(item) for item in value]
+    if isinstance(value, (set, frozenset)):
+        return set(value)
+    return value
+
+
+def evolve(state: Mapping[str, Any], **updates: Any) -> Dict[str, Any]:
+    """Next version of `state` with `updates` applied; unchanged values are shared."""
+    derived = dict(state)
+    derived.update(updates)
+    return derived
+
+
+def evolve_in(state: Dict[str, Any], key: str, subkey: str, value: Any) -> Dict[str, Any]:
+    """Sets state[key][subkey] = value on a derived `state` without touching the shared sub-dict.
+
+    `state` must be a version the caller owns (from evolve()); it is updated and returned.
+    """
+    nested = dict(state.get(key) or {})
+    nested[subkey] = value
+    state[key] = nested
+    return state
+
+
+class _EncodedSubtrees:
+    """Bounded cache of the JSON encoding of frozen subtrees, keyed by identity.
+
+    Entries hold a reference to the subtree so its id cannot be reused while cached.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def encode(self, value: Any) -> str:
+        if not isinstance(value, FrozenDict):
+            return json.dumps(value, default=str, sort_keys=True)
+        key = id(value)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is value:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+        encoded = json.dumps(value, default=str, sort_keys=True)
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = (value, encoded)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return encoded
+
+
+_encoded_subtrees = _EncodedSubtrees()
+
+
+def encode_state_json(state: Any) -> str:
+    """json.dumps(state, default=str, sort_keys=True), reusing encodings of frozen subtrees.
+
+    The output is identical to json.dumps. Plain dicts are walked, and FrozenDicts found
+    on the way are encoded once and reused by every later version (and snapshot) that
+    shares them.
+    """
+    if isinstance(state, FrozenDict):
+        return _encoded_subtrees.encode(state)
+    if type(state) is not dict or not all(isinstance(key, str) for key in state):
+        return json.dumps(state, default=str, sort_keys=True)
+    parts = [f"{json.dumps(key)}: {encode_state_json(state[key])}" for key in sorted(state)]
+    return "{" + ", ".join(parts) + "}"
@@ -0,0 +1,296 @@
+# src/core/streaming_metrics.py
+"""
+Streaming per-component metric aggregation for StateMonitor.
+
+Each component keeps an EWMA of latency and accuracy plus a sliding-window quantile
+sketch of latency. The sketch uses logarithmic buckets (relative error bounded by
+``relative_accuracy``, as in DDSketch), so sketches with the same configuration merge
+by adding bucket counts. The window is a ring of time slots stored in one flat
+``array('I')`` (num_slots x num_bins); a running total per bucket is kept alongside, so
+observing a value is O(1) and expiring a slot is O(num_bins).
+
+Quantile queries walk the fixed number of buckets once and cache p50/p95/p99 until the
+next observation or slot expiry, so repeated planner queries are constant time
+regardless of how many observations were made.
+"""
+import math
+import threading
+import time
+from array import array
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+STANDARD_QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Ewma:
+    """Exponentially weighted moving average; the first observation initializes it."""
+
+    __slots__ = ("alpha", "value", "count")
+
+    def __init__(self, alpha: float = 0.3):
+        if not 0.0 < alpha <= 1.0:
+            raise ValueError(f"EWMA alpha must be in (0, 1], got {alpha}")
+        self.alpha = alpha
+        self.value: Optional[float] = None
+        self.count = 0
+
+    def update(self, x: float) -> float:
+        self.value = x if self.value is None else self.value + self.alpha * (x - self.value)
+        self.count += 1
+        return self.value
+
+
+class WindowedQuantileSketch:
+    """Log-bucketed quantile sketch over a sliding time window.
+
+    Args:
+        window_seconds: Length of the sliding window. Data is expired one slot at a time,
+            so the effective window is between ``window_seconds - slot`` and ``window_seconds``.
+        num_slots: Number of time slots the window is split into.
+        relative_accuracy: Maximum relative error of reported quantiles.
+        min_value: Values at or below this are counted in a zero bucket (reported as 0.0).
+        max_value: Values above this are clamped into the top bucket.
+        clock: Time source (seconds); defaults to time.monotonic.
+    """
+
+    def __init__(self, window_seconds: float = 300.0, num_slots: int = 6, relative_accuracy: float = 0.02,
+                 min_value: float = 1e-4, max_value: float = 1e4, clock: Callable[[], float] = time.monotonic):
+        if window_seconds <= 0 or num_slots < 1:
+            raise ValueError("window_seconds must be positive and num_slots at least 1")
+        if not 0.0 < relative_accuracy < 1.0:
+            raise ValueError(f"relative_accuracy must be in (0, 1), got {relative_accuracy}")
+        self.window_seconds = window_seconds
+        self.num_slots = num_slots
+        self.slot_seconds = window_seconds / num_slots
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self.max_value = max_value
+        self.clock = clock
+
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.num_bins = 1 + math.ceil(math.log(max_value / min_value) / self._log_gamma)
+
+        self._slots = array("I", [0]) * (num_slots * self.num_bins)
+        self._slot_epoch = array("q", [-1]) * num_slots
+        self._totals = array("Q", [0]) * self.num_bins
+        self._zero_slot = array("I", [0]) * self.num_bins
+        self._count = 0
+        self._current_epoch: Optional[int] = None
+        self._cached: Optional[Tuple[float, ...]] = None
+
+    # --- Bucketing ---
+
+    def _bin(self, value: float) -> int:
+        if value <= self.min_value:
+            return 0
+        return min(self.num_bins - 1, max(1, math.ceil(math.log(value / self.min_value) / self._log_gamma)))
+
+    def _bin_value(self, index: int) -> float:
+        if index == 0:
+            return 0.0
+        return self.min_value * 2 * self._gamma ** index / (self._gamma + 1)
+
+    # --- Window maintenance ---
+
+    def _clear_slot(self, slot: int) -> None:
+        base = slot * self.num_bins
+        slots, totals = self._slots, self._totals
+        for i in range(self.num_bins):
+            count = slots[base + i]
+            if count:
+                totals[i] -= count
+                self._count -= count
+        slots[base:base + self.num_bins] = self._zero_slot
+
+    def _advance(self, now: float) -> None:
+        epoch = int(now // self.slot_seconds)
+        if self._current_epoch is not None and epoch <= self._current_epoch:
+            return
+        first = epoch - self.num_slots + 1
+        if self._current_epoch is not None:
+            first = max(first, self._current_epoch + 1)
+        for e in range(first, epoch + 1):
+            slot = e % self.num_slots
+            if self._slot_epoch[slot] != -1:
+                self._clear_slot(slot)
+            self._slot_epoch[slot] = e
+        self._current_epoch = epoch
+        self._cached = None
+
+    # --- Public API ---
+
+    def add(self, value: float, timestamp: Optional[float] = None) -> None:
+        """Records an observation (dropped if older than the window)."""
+        now = self.clock() if timestamp is None else timestamp
+        self._advance(now)
+        epoch = int(now // self.slot_seconds)
+        slot = epoch % self.num_slots
+        if self._slot_epoch[slot] != epoch:
+            return
+        index = self._bin(value)
+        self._slots[slot * self.num_bins + index] += 1
+        self._totals[index] += 1
+        self._count += 1
+        self._cached = None
+
+    def count(self, now: Optional[float] = None) -> int:
+        self._advance(self.clock() if now is None else now)
+        return self._count
+
+    def quantiles(self, qs: Iterable[float] = STANDARD_QUANTILES, now: Optional[float] = None) -> Tuple[Optional[float], ...]:
+        """Values at the given quantiles (ascending qs), or None each when the window is empty."""
+        qs = tuple(qs)
+        self._advance(self.clock() if now is None else now)
+        if qs == STANDARD_QUANTILES and self._cached is not None:
+            return self._cached
+        if self._count == 0:
+            return tuple(None for _ in qs)
+        ranks = [q * (self._count - 1) for q in qs]
+        results = []
+        cumulative = 0
+        rank_index = 0
+        for index, count in enumerate(self._totals):
+            if not count:
+                continue
+            cumulative += count
+            while rank_index < len(ranks) and ranks[rank_index] < cumulative:
+                results.append(self._bin_value(index))
+                rank_index += 1
+            if rank_index == len(ranks):
+                break
+        result = tuple(results)
+        if qs == STANDARD_QUANTILES:
+            self._cached = result
+        return result
+
+    def quantile(self, q: float, now: Optional[float] = None) -> Optional[float]:
+        return self.quantiles((q,), now=now)[0]
+
+    def is_compatible(self, other: "WindowedQuantileSketch") -> bool:
+        return (self.num_bins == other.num_bins and self.num_slots == other.num_slots
+                and self.slot_seconds == other.slot_seconds and self.min_value == other.min_value
+                and self._gamma == other._gamma)
+
+    def merge(self, other: "WindowedQuantileSketch") -> None:
+        """Adds another sketch's in-window counts into this one (configurations must match)."""
+        if not self.is_compatible(other):
+            raise ValueError("Cannot merge sketches with different window or bucket configuration")
+        if other._current_epoch is None:
+            return
+        self._advance(other._current_epoch * self.slot_seconds)
+        oldest = self._current_epoch - self.num_slots + 1
+        for other_slot in range(other.num_slots):
+            epoch = other._slot_epoch[other_slot]
+            if epoch < oldest or epoch > self._current_epoch:
+                continue
+            slot = epoch % self.num_slots
+            base, other_base = slot * self.num_bins, other_slot * other.num_bins
+            for i in range(self.num_bins):
+                count = other._slots[other_base + i]
+                if count:
+                    self._slots[base + i] += count
+                    self._totals[i] += count
+                    self._count += count
+        self._cached = None
+
+
+class ComponentMetrics:
+    """Aggregates for one component: EWMAs, last values and a latency sketch."""
+
+    __slots__ = ("latency_ewma", "accuracy_ewma", "latency_sketch", "last_latency", "last_accuracy")
+
+    def __init__(self, ewma_alpha: float, sketch_factory: Callable[[], WindowedQuantileSketch]):
+        self.latency_ewma = Ewma(ewma_alpha)
+        self.accuracy_ewma = Ewma(ewma_alpha)
+        self.latency_sketch = sketch_factory()
+        self.last_latency: Optional[float] = None
+        self.last_accuracy: Optional[float] = None
+
+
+class MetricsStore:
+    """Thread-safe per-component streaming metrics (see module docstring)."""
+
+    def __init__(self, ewma_alpha: float = 0.3, window_seconds: float = 300.0, num_slots: int = 6,
+                 relative_accuracy: float = 0.02, clock: Callable[[], float] = time.monotonic):
+        Ewma(ewma_alpha)  # Validate alpha up front
+        self.ewma_alpha = ewma_alpha
+        self.clock = clock
+        self._sketch_kwargs = dict(window_seconds=window_seconds, num_slots=num_slots,
+                                   relative_accuracy=relative_accuracy, clock=clock)
+        self._components: Dict[str, ComponentMetrics] = {}
+        self._lock = threading.Lock()
+
+    def _new_sketch(self) -> WindowedQuantileSketch:
+        return WindowedQuantileSketch(**self._sketch_kwargs)
+
+    def record(self, component_name: str, latency: Optional[float] = None, accuracy: Optional[float] = None,
+               timestamp: Optional[float] = None) -> None:
+        """Records one observation of a component's latency and/or accuracy."""
+        with self._lock:
+            metrics = self._components.get(component_name)
+            if metrics is None:
+                metrics = self._components[component_name] = ComponentMetrics(self.ewma_alpha, self._new_sketch)
+            if latency is not None:
+                metrics.last_latency = latency
+                metrics.latency_ewma.update(latency)
+                metrics.latency_sketch.add(latency, timestamp)
+            if accuracy is not None:
+                metrics.last_accuracy = accuracy
+                metrics.accuracy_ewma.update(accuracy)
+
+    def __contains__(self, component_name: str) -> bool:
+        return component_name in self._components
+
+    def statistic(self, component_name: str, metric: str, statistic: str) -> Optional[float]:
+        """Returns ``last``, ``ewma`` or (latency only) ``p50``/``p95``/``p99`` for a component."""
+        with self._lock:
+            metrics = self._components.get(component_name)
+            if metrics is None:
+                return None
+            if statistic == "last":
+                return metrics.last_latency if metric == "latency" else metrics.last_accuracy
+            if statistic == "ewma":
+                return (metrics.latency_ewma if metric == "latency" else metrics.accuracy_ewma).value
+            if metric == "latency" and statistic in ("p50", "p95", "p99"):
+                p50, p95, p99 = metrics.latency_sketch.quantiles()
+                return {"p50": p50, "p95": p95, "p99": p99}[statistic]
+        raise ValueError(f"Unsupported statistic '{statistic}' for metric '{metric}'")
+
+    def latency_percentiles(self, component_name: str) -> Dict[str, Optional[float]]:
+        """p50/p95/p99 latency over the window (empty dict for unknown components)."""
+        with self._lock:
+            metrics = self._components.get(component_name)
+            if metrics is None:
+                return {}
+            p50, p95, p99 = metrics.latency_sketch.quantiles()
+        return {"p50": p50, "p95": p95, "p99": p99}
+
+    def summary(self, component_name: str) -> Dict[str, Optional[float]]:
+        """EWMA, last value, window count and percentiles for a component."""
+        with self._lock:
+            metrics = self._components.get(component_name)
+            if metrics is None:
+                return {}
+            p50, p95, p99 = metrics.latency_sketch.quantiles()
+            return {
+                "latency_ewma": metrics.latency_ewma.value,
+                "accuracy_ewma": metrics.accuracy_ewma.value,
+                "last_latency": metrics.last_latency,
+                "last_accuracy": metrics.last_accuracy,
+                "observations": metrics.latency_ewma.count,
+                "window_count": metrics.latency_sketch.count(),
+                "latency_p50": p50,
+                "latency_p95": p95,
+                "latency_p99": p99,
+            }
+
+    def merged_latency_sketch(self, component_names: Iterable[str]) -> WindowedQuantileSketch:
+        """A fresh sketch combining the latency windows of several components."""
+        merged = self._new_sketch()
+        with self._lock:
+            for name in component_names:
+                metrics = self._components.get(name)
+                if metrics is not None:
+                    merged.merge(metrics.latency_sketch)
+        return merged
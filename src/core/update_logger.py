@@ -11,9 +11,6 @@ logger = logging.getLogger(__name__)
 LOGS_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'logs') # Assumes src/core structure
 UPDATES_LOG_FILE = os.path.join(LOGS_DIR, 'updates.jsonl')
 
-# Ensure logs directory exists
-os.makedirs(LOGS_DIR, exist_ok=True)
-
 def log_update(
     manager_type: str, 
     item_id: str, 
@@ -47,6 +44,8 @@ def log_update(
     }
 
     try:
+        # Created on first write rather than at import
+        os.makedirs(os.path.dirname(UPDATES_LOG_FILE), exist_ok=True)
         with open(UPDATES_LOG_FILE, 'a') as f:
             f.write(json.dumps(log_entry) + '\n')
     except IOError as e:
@@ -0,0 +1,157 @@
+# src/core/version_index.py
+"""
+Sorted, pre-parsed version index shared by ComponentRegistry and DependencyResolver.
+
+Version strings are parsed once (parse results are memoized process-wide) and kept
+sorted, so "latest version" is the last entry and a specifier match is a bisect to
+the range the specifier's bounds allow, followed by a downward scan that stops at the
+first version the full SpecifierSet accepts. The bounds only prune; the final decision
+is always SpecifierSet.contains (memoized per specifier and version), so PEP 440 corner cases (pre-releases, local
+versions, post-releases, wildcards, '!=') behave exactly as an unindexed scan would.
+
+VersionIndex is immutable: writers build a new index with with_version/without_version
+and readers can use an index they hold without locking.
+"""
+from bisect import bisect_left, bisect_right, insort
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple, Union
+
+from packaging.specifiers import SpecifierSet
+from packaging.version import InvalidVersion, Version
+
+# Sorts after any character that can appear in a version string
+_MAX_SUFFIX = "\U0010ffff"
+
+# Operators whose version gives an upper / lower bound on every matching version
+_UPPER_BOUND_OPERATORS = ("<", "<=", "==")
+_LOWER_BOUND_OPERATORS = (">", ">=", "==", "~=")
+
+
+@lru_cache(maxsize=4096)
+def parse_version_cached(version_str: str) -> Version:
+    """Parses a PEP 440 version, memoized. Raises InvalidVersion like packaging does."""
+    return Version(version_str)
+
+
+@lru_cache(maxsize=1024)
+def parse_specifier_cached(specifier_str: str) -> SpecifierSet:
+    """Parses a specifier set, memoized. Raises InvalidSpecifier like packaging does."""
+    return SpecifierSet(specifier_str)
+
+
+@lru_cache(maxsize=1024)
+def _specifier_bounds(specifier_str: str) -> Tuple[Optional[Version], Optional[Version]]:
+    """(lower, upper) versions outside of which nothing can match, None where unbounded.
+
+    Only the public version of an upper bound is meaningful: '<=1.0' also accepts
+    '1.0+local', which sorts above '1.0', so callers extend past the upper bound over
+    local variants.
+    """
+    lower: Optional[Version] = None
+    upper: Optional[Version] = None
+    for spec in parse_specifier_cached(specifier_str):
+        if spec.operator == "===" or spec.version.endswith(".*"):
+            continue
+        try:
+            bound = parse_version_cached(spec.version)
+        except InvalidVersion:
+            continue
+        if spec.operator in _LOWER_BOUND_OPERATORS and (lower is None or bound > lower):
+            lower = bound
+        if spec.operator in _UPPER_BOUND_OPERATORS and (upper is None or bound < upper):
+            upper = bound
+    return lower, upper
+
+
+@lru_cache(maxsize=65536)
+def _specifier_accepts(specifier_str: str, version_str: str) -> bool:
+    """SpecifierSet.contains, memoized (it re-parses the specifier's versions on every call)."""
+    return parse_specifier_cached(specifier_str).contains(parse_version_cached(version_str))
+
+
+class VersionIndex:
+    """Immutable sorted index of one module's version strings.
+
+    Attributes:
+        versions: Every version string of the module, including unparseable ones.
+        invalid: Version strings that are not valid PEP 440 versions (never matched).
+    """
+
+    __slots__ = ("_entries", "versions", "invalid")
+
+    def __init__(self, entries: List[Tuple[Version, str]], versions: frozenset, invalid: frozenset):
+        self._entries = entries
+        self.versions = versions
+        self.invalid = invalid
+
+    @classmethod
+    def from_versions(cls, version_strs: Iterable[str]) -> "VersionIndex":
+        entries: List[Tuple[Version, str]] = []
+        versions = set()
+        invalid = set()
+        for version_str in version_strs:
+            versions.add(version_str)
+            try:
+                entries.append((parse_version_cached(version_str), version_str))
+            except InvalidVersion:
+                invalid.add(version_str)
+        entries.sort()
+        return cls(entries, frozenset(versions), frozenset(invalid))
+
+    def with_version(self, version_str: str) -> "VersionIndex":
+        """Returns an index that also contains `version_str` (self if already present)."""
+        if version_str in self.versions:
+            return self
+        entries = list(self._entries)
+        invalid = self.invalid
+        try:
+            insort(entries, (parse_version_cached(version_str), version_str))
+        except InvalidVersion:
+            invalid = invalid | {version_str}
+        return VersionIndex(entries, self.versions | {version_str}, invalid)
+
+    def without_version(self, version_str: str) -> "VersionIndex":
+        """Returns an index without `version_str` (self if not present)."""
+        if version_str not in self.versions:
+            return self
+        entries = [entry for entry in self._entries if entry[1] != version_str]
+        return VersionIndex(entries, self.versions - {version_str}, self.invalid - {version_str})
+
+    def __len__(self) -> int:
+        return len(self.versions)
+
+    def sorted_versions(self) -> List[str]:
+        """Parseable version strings, lowest first."""
+        return [version_str for _, version_str in self._entries]
+
+    def latest(self) -> Optional[str]:
+        """Highest parseable version string, or None if there is none."""
+        return self._entries[-1][1] if self._entries else None
+
+    def best_match(self, specifier: Union[str, SpecifierSet]) -> Optional[str]:
+        """Highest version string accepted by `specifier`, or None.
+
+        Matching is memoized for specifier strings; a SpecifierSet object (which may
+        carry a prereleases override) is checked with its own contains().
+        """
+        entries = self._entries
+        if isinstance(specifier, str):
+            specifier_str = specifier
+            accepts = lambda version, version_str: _specifier_accepts(specifier_str, version_str)
+        else:
+            specifier_str = str(specifier)
+            accepts = lambda version, version_str: specifier.contains(version)
+        lower, upper = _specifier_bounds(specifier_str)
+        lo = 0 if lower is None else bisect_left(entries, (lower,))
+        if upper is None:
+            hi = len(entries)
+        else:
+            hi = bisect_right(entries, (upper, _MAX_SUFFIX))
+            upper_public = parse_version_cached(upper.public)
+            while hi < len(entries) and parse_version_cached(entries[hi][0].public) == upper_public:
+                hi += 1
+        for i in range(hi - 1, lo - 1, -1):
+            version, version_str = entries[i]
+            if accepts(version, version_str):
+                return version_str
+        return None
@@ -12,7 +12,6 @@ import logging
 from typing import Any, Dict, Optional, Union, Tuple, Type
 
 import google.api_core.exceptions
-import google.generativeai as genai
 
 from src.exceptions import (
     LLMAPIError,
@@ -13,12 +13,10 @@ from src.core.state_monitor import StateMonitor
 from src.core.kfm_planner_llm import KFMPlannerLlm
 from src.core.kfm_planner import KFMPlanner
 from src.core.execution_engine import ExecutionEngine
+from src.core.metrics_feedback import MetricsFeedbackChannel
 from src.logger import setup_logger
-from langchain_openai import ChatOpenAI
 from src.state_types import KFMAgentState
 from src.core.component_registry import ComponentRegistry
-from src.core.embedding_service import EmbeddingService
-from src.core.memory.chroma_manager import ChromaMemoryManager
 from src.config.config_loader import load_verification_config
 
 # Import for Reversibility System
@@ -159,6 +157,9 @@ def create_sample_task_requirements():
 def create_kfm_agent() -> Tuple[ComponentRegistry, StateMonitor, KFMPlannerLlm, ExecutionEngine, KFMPlanner, SnapshotService]:
     """Create all components needed for the KFM agent.
     
+    The engine's metrics feedback channel thread is started last, once nothing else can
+    fail; the caller owns it and stops it with ``engine.metrics_feedback.stop()``.
+    
     Returns:
         Tuple of (ComponentRegistry, StateMonitor, KFMPlannerLlm, ExecutionEngine, KFMPlanner, SnapshotService)
     """
@@ -197,8 +198,16 @@ def create_kfm_agent() -> Tuple[ComponentRegistry, StateMonitor, KFMPlannerLlm,
     # Create the execution engine
     engine = ExecutionEngine(registry)
     factory_logger.info("Execution engine created")
+
+    # Stream execution measurements back into the monitor so planner decisions track live latency
+    # (started at the end, so a failure below does not leave its thread running)
+    metrics_feedback = MetricsFeedbackChannel(monitor)
+    engine.set_metrics_feedback(metrics_feedback)
     
     # --- Initialize Memory System ---
+    # Imported here: sentence-transformers (torch) and chromadb take seconds to import
+    from src.core.embedding_service import EmbeddingService
+    from src.core.memory.chroma_manager import ChromaMemoryManager
     try:
         embedding_service = EmbeddingService(model_name=config.memory.embedding_model_name)
         factory_logger.info("Embedding service initialized.")
@@ -267,5 +276,8 @@ def create_kfm_agent() -> Tuple[ComponentRegistry, StateMonitor, KFMPlannerLlm,
         raise # Stop agent creation if reversibility system fails
     # ---------------------------------------
     
+    metrics_feedback.start()
+    factory_logger.info("Execution metrics feedback channel started")
+
     # Return all components, including both planners and the snapshot_service
     return registry, monitor, planner_llm, engine, planner_original, snapshot_service 
\ No newline at end of file
@@ -5,20 +5,23 @@ import logging
 import time
 import hashlib
 import asyncio # Added for async main
+import threading
+import functools
 
 # Add project root to sys.path
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.insert(0, project_root)
 
-from typing import Dict, Any, Callable, Tuple, Optional
+from typing import Dict, Any, Callable, Tuple, Optional, List, Iterable
 from langgraph.graph import StateGraph, END # Import END for conditional edges
 from src.state_types import KFMAgentState
 from src.langgraph_nodes import monitor_state_node, kfm_decision_node, execute_action_node, reflect_node, should_fallback, fallback_node
 from src.factory import create_kfm_agent # Use the factory to get components
 from src.logger import setup_logger, setup_shared_file_logger, setup_centralized_logging, setup_component_logger, create_timestamped_log_file
-from src.tracing import configure_tracing, reset_trace_history, visualize_trace_path, get_trace_history, create_trace_summary, save_trace_to_file
-from src.debugging import debug_graph_execution, step_through_execution, diff_states, wrap_node_for_debug
+from src.tracing import configure_tracing, reset_trace_history, visualize_trace_path, get_trace_history, create_trace_summary, save_trace_to_file, trace_run
 from src.core.execution_engine import ExecutionEngine
+from src.core.state_sharing import freeze
+from src.core.control_loop import ControlLoop, LOOP_NODE
 
 # Imports for Reversibility and Lifecycle Control
 from src.core.reversibility.file_snapshot_storage import FileSnapshotStorage
@@ -46,9 +49,20 @@ def create_components_manager(*args, **kwargs):
     agent_logger.warning("create_components_manager called - stub function for testing")
     return None
 
-def create_kfm_agent_graph() -> Tuple[StateGraph, Dict[str, Any]]:
+def _add_control_loop(builder: StateGraph, loop: ControlLoop) -> None:
+    """Routes reflect back to monitor through the control loop node."""
+    builder.add_node(LOOP_NODE, loop.runnable)
+    builder.add_edge("reflect", LOOP_NODE)
+    builder.add_conditional_edges(LOOP_NODE, loop.route, {"monitor": "monitor", "end": END})
+    agent_logger.info("Control loop enabled: 'reflect' -> 'loop' -> 'monitor' until a stop condition holds.")
+
+def create_kfm_agent_graph(loop: Optional[ControlLoop] = None) -> Tuple[StateGraph, Dict[str, Any]]:
     """Create the KFM Agent LangGraph.
     
+    Args:
+        loop: Run as a continuous control loop instead of ending after reflect.
+            Invoke the graph with ``loop.graph_config()``.
+    
     Returns:
         Tuple[StateGraph, Dict[str, Any]]: The compiled graph application and core components
     """
@@ -120,7 +134,10 @@ def create_kfm_agent_graph() -> Tuple[StateGraph, Dict[str, Any]]:
             agent_logger.info("⚠️ CONDITIONAL RESULT: END")
             return END # End for MVP even if not explicitly done
     
-    builder.add_conditional_edges("reflect", should_continue)
+    if loop is not None:
+        _add_control_loop(builder, loop)
+    else:
+        builder.add_conditional_edges("reflect", should_continue)
     agent_logger.info("Conditional edge added from 'reflect'.")
     
     # Compile the graph with error handling
@@ -132,6 +149,7 @@ def create_kfm_agent_graph() -> Tuple[StateGraph, Dict[str, Any]]:
     except Exception as e:
         error_msg = f"Error compiling LangGraph application: {e}"
         agent_logger.error(error_msg)
+        close_components({"engine": engine})
         raise RuntimeError(error_msg) from e
     
     # Return the graph and its components for potential external use
@@ -150,12 +168,16 @@ def get_graph_creation_functions() -> Tuple[Callable, Callable]:
     """Returns the standard and debug graph creation functions."""
     return create_kfm_agent_graph, create_debug_kfm_agent_graph
 
-def create_debug_kfm_agent_graph() -> Tuple[StateGraph, Dict[str, Any]]:
+def create_debug_kfm_agent_graph(loop: Optional[ControlLoop] = None) -> Tuple[StateGraph, Dict[str, Any]]:
     """Create a debug version of the KFM Agent LangGraph with node wrapping.
     
+    Args:
+        loop: Run as a continuous control loop instead of ending after reflect.
+    
     Returns:
         Tuple[StateGraph, Dict[str, Any]]: The compiled debug graph application and core components
     """
+    from src.debugging import wrap_node_for_debug  # Debug tooling is only imported for debug graphs
     agent_logger.info("Creating KFM Agent debug graph...")
     # Create the KFM agent core components using the factory
     registry, monitor, planner_llm, engine, planner_original, snapshot_service = create_kfm_agent()
@@ -249,7 +271,10 @@ def create_debug_kfm_agent_graph() -> Tuple[StateGraph, Dict[str, Any]]:
             agent_logger.info("⚠️ CONDITIONAL RESULT: END")
             return END
     
-    builder.add_conditional_edges("reflect", should_continue)
+    if loop is not None:
+        _add_control_loop(builder, loop)
+    else:
+        builder.add_conditional_edges("reflect", should_continue)
     agent_logger.info("Conditional edge added from 'reflect'.")
     
     # Compile the graph with error handling
@@ -261,6 +286,7 @@ def create_debug_kfm_agent_graph() -> Tuple[StateGraph, Dict[str, Any]]:
     except Exception as e:
         error_msg = f"Error compiling debug LangGraph application: {e}"
         agent_logger.error(error_msg)
+        close_components({"engine": engine})
         raise RuntimeError(error_msg) from e
     
     # Return the graph and its components
@@ -312,13 +338,301 @@ def save_graph_visualization(kfm_app: StateGraph, output_path: str = "kfm_graph.
             agent_logger.error(f"Failed to save graph visualization: {e}")
     return False
 
+def close_components(components: Dict[str, Any], owner: str = "agent graph") -> None:
+    """Stops background work started by create_kfm_agent.
+
+    That is the metrics feedback thread and the engine's per-component executors.
+    """
+    engine = components.get("engine")
+    feedback = getattr(engine, "metrics_feedback", None)
+    if feedback is not None and hasattr(feedback, "stop"):
+        try:
+            feedback.stop()
+        except Exception as e:
+            agent_logger.warning(f"Failed to stop metrics feedback of {owner}: {e}")
+    if isinstance(engine, ExecutionEngine):
+        try:
+            engine.close()
+        except Exception as e:
+            agent_logger.warning(f"Failed to shut down component executors of {owner}: {e}")
+
+def _initial_state(input_data: Dict[str, Any], task_name: str, loop: Optional[ControlLoop] = None) -> Dict[str, Any]:
+    """Fresh graph input for one run.
+
+    The input is frozen (copied once into read-only containers), so nodes, snapshots and
+    traces can share it between state versions instead of deep-copying it at every step.
+    It stays frozen in the returned state too (lists become tuples); see state_sharing.thaw().
+    """
+    state = {
+        "input": freeze(input_data),
+        "task_name": task_name,
+        # Initialize other optional fields potentially expected by nodes
+        "performance_data": {},
+        "task_requirements": {},
+        "kfm_action": None,
+        "active_component": None,
+        "result": None,
+        "execution_performance": None,
+        "error": None,
+        "done": False
+    }
+    if loop is not None:
+        state["loop_iteration_started_at"] = time.perf_counter()
+    return state
+
+def _invoke_kwargs(loop: Optional[ControlLoop]) -> Dict[str, Any]:
+    return {"config": loop.graph_config()} if loop is not None else {}
+
+DEFAULT_RUNTIME_WATCH_PATHS = (
+    'verification_config.yaml',
+    'config/verification_config.yaml'
+)
+
+class RuntimeGeneration:
+    """One build of the agent: the compiled app, its components and what it was built from."""
+
+    def __init__(self, number: int, app: Any, components: Dict[str, Any], fingerprint: Tuple, build_time: float):
+        self.number = number
+        self.app = app
+        self.components = components
+        self.fingerprint = fingerprint
+        self.build_time = build_time
+        self.in_flight = 0
+        self.retired = False
+
+    def close(self) -> None:
+        """Stops background work owned by this generation's components."""
+        close_components(self.components, f"runtime generation {self.number}")
+
+class KFMAgentRuntime:
+    """Long-lived agent runtime that builds the components and compiled graph once.
+
+    Every run gets its own initial state, while the registry, monitor, planners,
+    engine, snapshot service and compiled app are shared between runs (so is the
+    engine's active component: one run's Marry/Fuck/Kill applies to all). The build
+    is lazy (first run) and is replaced atomically on reload: runs already in
+    flight finish on the generation they started with, which is closed once its
+    last run returns.
+
+    Hot reload: before a run (at most every `check_interval` seconds) the runtime
+    fingerprints `watch_paths` (mtime and size of each file, or of every file under
+    a directory, e.g. module definition directories) and rebuilds when it changed;
+    the configuration cache is refreshed as part of that rebuild. Writes to the
+    live ComponentRegistry need no rebuild, the engine and planner read it directly.
+    """
+
+    def __init__(
+        self,
+        graph_factory: Optional[Callable[[], Tuple[Any, Dict[str, Any]]]] = None,
+        debug_mode: bool = False,
+        watch_paths: Optional[Iterable[str]] = None,
+        auto_reload: bool = True,
+        check_interval: float = 1.0,
+        loop: Optional[ControlLoop] = None
+    ):
+        """
+        Args:
+            graph_factory: Returns (compiled_app, components). Defaults to
+                create_kfm_agent_graph (create_debug_kfm_agent_graph in debug mode).
+            debug_mode: Build the debug graph when no factory is given.
+            watch_paths: Files or directories whose changes trigger a rebuild.
+                Defaults to the verification config locations.
+            auto_reload: Check `watch_paths` before runs.
+            check_interval: Minimum seconds between two change checks.
+            loop: Serve runs as continuous control loops (passed to the default
+                factory; a custom factory must build the graph with the same loop).
+        """
+        self._graph_factory = graph_factory
+        self.debug_mode = debug_mode
+        self.loop = loop
+        self.watch_paths: List[str] = list(DEFAULT_RUNTIME_WATCH_PATHS if watch_paths is None else watch_paths)
+        self.auto_reload = auto_reload
+        self.check_interval = check_interval
+        self._lock = threading.RLock()
+        self._current: Optional[RuntimeGeneration] = None
+        self._generation_count = 0
+        self._last_check = 0.0
+        self.runs = 0
+        self.reloads = 0
+
+    def _factory(self) -> Callable[[], Tuple[Any, Dict[str, Any]]]:
+        if self._graph_factory is not None:
+            return self._graph_factory
+        factory = create_debug_kfm_agent_graph if self.debug_mode else create_kfm_agent_graph
+        return functools.partial(factory, loop=self.loop) if self.loop is not None else factory
+
+    def _fingerprint(self) -> Tuple:
+        entries = []
+        for path in self.watch_paths:
+            if os.path.isdir(path):
+                for root, _, files in os.walk(path):
+                    for name in sorted(files):
+                        entries.append(self._file_stamp(os.path.join(root, name)))
+            else:
+                entries.append(self._file_stamp(path))
+        return tuple(sorted(entries))
+
+    @staticmethod
+    def _file_stamp(path: str) -> Tuple[str, int, int]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return (path, -1, -1)
+        return (path, stat.st_mtime_ns, stat.st_size)
+
+    def _build(self, reload_config: bool) -> RuntimeGeneration:
+        fingerprint = self._fingerprint()
+        if reload_config:
+            from src.config.config_loader import load_verification_config
+            load_verification_config(force_reload=True)
+        start = time.perf_counter()
+        app, components = self._factory()()
+        build_time = time.perf_counter() - start
+        self._generation_count += 1
+        agent_logger.info(f"Agent runtime generation {self._generation_count} built in {build_time:.3f}s")
+        return RuntimeGeneration(self._generation_count, app, components, fingerprint, build_time)
+
+    def _swap(self, generation: RuntimeGeneration) -> None:
+        previous, self._current = self._current, generation
+        if previous is not None:
+            previous.retired = True
+            if previous.in_flight == 0:
+                previous.close()
+
+    @property
+    def generation(self) -> Optional[RuntimeGeneration]:
+        """The generation new runs start on (None before the first build)."""
+        return self._current
+
+    @property
+    def app(self) -> Any:
+        return self._acquire(track=False).app
+
+    @property
+    def components(self) -> Dict[str, Any]:
+        return self._acquire(track=False).components
+
+    def check_for_changes(self) -> bool:
+        """True if the watched files differ from the ones the current generation was built from."""
+        current = self._current
+        return current is not None and self._fingerprint() != current.fingerprint
+
+    def reload(self) -> RuntimeGeneration:
+        """Rebuilds components and graph and makes them current.
+
+        A failed rebuild raises and leaves the current generation serving.
+        """
+        with self._lock:
+            generation = self._build(reload_config=self._current is not None)
+            self._swap(generation)
+            self.reloads += 1
+            return generation
+
+    def _reload_check_due(self) -> bool:
+        return self.auto_reload and time.monotonic() - self._last_check >= self.check_interval
+
+    def _acquire(self, track: bool = True) -> RuntimeGeneration:
+        with self._lock:
+            if self._current is None:
+                self._swap(self._build(reload_config=False))
+            elif self._reload_check_due():
+                self._last_check = time.monotonic()
+                if self.check_for_changes():
+                    agent_logger.info("Watched configuration changed, reloading agent runtime")
+                    try:
+                        self.reload()
+                    except Exception as e:
+                        agent_logger.error(f"Agent runtime reload failed, keeping generation {self._current.number}: {e}")
+            generation = self._current
+            if track:
+                generation.in_flight += 1
+                self.runs += 1
+            return generation
+
+    async def _acquire_async(self) -> RuntimeGeneration:
+        """_acquire() for event-loop callers.
+
+        Only a current generation with no change check due is taken on the loop;
+        builds, reloads and waiting for a thread that holds the lock run in a worker thread.
+        """
+        if self._lock.acquire(blocking=False):
+            try:
+                if self._current is not None and not self._reload_check_due():
+                    return self._acquire()
+            finally:
+                self._lock.release()
+        acquiring = asyncio.ensure_future(asyncio.to_thread(self._acquire))
+        try:
+            return await asyncio.shield(acquiring)
+        except asyncio.CancelledError:
+            # The worker keeps going; give back the generation it acquires for us
+            acquiring.add_done_callback(self._release_abandoned)
+            raise
+
+    def _release_abandoned(self, acquiring: "asyncio.Future[RuntimeGeneration]") -> None:
+        if not acquiring.cancelled() and acquiring.exception() is None:
+            self._release(acquiring.result())
+
+    def _release(self, generation: RuntimeGeneration) -> None:
+        with self._lock:
+            generation.in_flight -= 1
+            if generation.retired and generation.in_flight == 0:
+                generation.close()
+
+    def run(self, input_data: Dict[str, Any], task_name: str = "default") -> Dict[str, Any]:
+        """Runs the compiled graph once on a fresh state; errors are reported in the state.
+
+        That includes a failed first build; later failed rebuilds keep the current generation.
+        """
+        initial_state = _initial_state(input_data, task_name, self.loop)
+        generation = None
+        try:
+            generation = self._acquire()
+            with trace_run():
+                return generation.app.invoke(initial_state, **_invoke_kwargs(self.loop))
+        except Exception as e:
+            agent_logger.exception(f"Error during runtime graph invocation: {e}")
+            return dict(initial_state, error=str(e))
+        finally:
+            if generation is not None:
+                self._release(generation)
+
+    async def arun(self, input_data: Dict[str, Any], task_name: str = "default") -> Dict[str, Any]:
+        """Async variant of run() for event-loop callers; concurrent runs share the compiled app.
+
+        Building or reloading the graph does not block the event loop.
+        """
+        initial_state = _initial_state(input_data, task_name, self.loop)
+        generation = None
+        try:
+            generation = await self._acquire_async()
+            with trace_run():
+                return await generation.app.ainvoke(initial_state, **_invoke_kwargs(self.loop))
+        except Exception as e:
+            agent_logger.exception(f"Error during runtime graph invocation: {e}")
+            return dict(initial_state, error=str(e))
+        finally:
+            if generation is not None:
+                self._release(generation)
+
+    def close(self) -> None:
+        """Closes the current generation; the next run builds a new one."""
+        with self._lock:
+            current, self._current = self._current, None
+            if current is not None:
+                current.retired = True
+                if current.in_flight == 0:
+                    current.close()
+
 def run_kfm_agent(
     input_data: Dict[str, Any], 
     task_name: str = "default", 
     trace_level: int = logging.INFO,
     debug_mode: bool = False,
     step_mode: bool = False,
-    log_file: str = "kfm_app.log"
+    log_file: str = "kfm_app.log",
+    runtime: Optional[KFMAgentRuntime] = None,
+    loop: Optional[ControlLoop] = None
 ) -> Optional[Dict[str, Any]]:
     """Run the KFM Agent on the given input data.
     
@@ -329,6 +643,11 @@ def run_kfm_agent(
         debug_mode (bool): Whether to run in debug mode with full state tracing (default: False)
         step_mode (bool): Whether to run step-by-step execution (default: False)
         log_file (str): Name of the log file to use (default: kfm_app.log)
+        runtime (KFMAgentRuntime): Reuse this runtime's compiled graph instead of
+            building one for this call (default: None)
+        loop (ControlLoop): Keep iterating monitor -> ... -> reflect until the loop's
+            stop conditions hold (default: None). Ignored with a runtime, which
+            carries its own loop.
         
     Returns:
         Dict[str, Any]: Final state after execution, or None if graph creation fails
@@ -356,10 +675,24 @@ def run_kfm_agent(
     
     run_logger.debug(f"Input data: {input_data}")
     
+    # Create initial state (before a runtime generation is acquired, so nothing leaks if it fails)
+    if runtime is not None:
+        loop = runtime.loop
+    initial_state = _initial_state(input_data, task_name, loop)
+    
     try:
         # Create the appropriate version of the graph
         graph_start_time = time.time()
-        if debug_mode:
+        generation = None
+        if runtime is not None:
+            generation = runtime._acquire()
+            kfm_app, components = generation.app, generation.components
+            run_logger.info(f"Reusing agent runtime generation {generation.number}")
+        elif loop is not None:
+            graph_fn = create_debug_kfm_agent_graph if debug_mode else create_kfm_agent_graph
+            kfm_app, components = graph_fn(loop=loop)
+            run_logger.info(f"Created KFM agent graph in control-loop mode in {time.time() - graph_start_time:.2f}s")
+        elif debug_mode:
             kfm_app, components = create_debug_kfm_agent_graph()
             run_logger.info(f"Created debug version of KFM agent graph in {time.time() - graph_start_time:.2f}s")
         else:
@@ -369,20 +702,6 @@ def run_kfm_agent(
         run_logger.exception(f"Failed to create KFM agent graph: {str(e)}", exc_info=True)
         return None
     
-    # Create initial state
-    initial_state = {
-        "input": input_data,
-        "task_name": task_name,
-        # Initialize other optional fields potentially expected by nodes
-        "performance_data": {},
-        "task_requirements": {},
-        "kfm_action": None,
-        "active_component": None,
-        "result": None,
-        "execution_performance": None,
-        "error": None,
-        "done": False
-    }
     run_logger.info(f"Invoking graph with initial state for task '{task_name}'.")
     run_logger.debug(f"Initial state: {initial_state}")
     
@@ -393,15 +712,18 @@ def run_kfm_agent(
     try:
         # Use debug execution modes if requested
         if debug_mode and step_mode:
+            from src.debugging import step_through_execution
             run_logger.info("Running in step-by-step debug mode")
             final_state = step_through_execution(kfm_app, initial_state)
         elif debug_mode:
+            from src.debugging import debug_graph_execution
             run_logger.info("Running in debug mode")
             final_state = debug_graph_execution(kfm_app, initial_state)
         else:
             # Standard execution
             run_logger.info("Running in standard mode")
-            final_state = kfm_app.invoke(initial_state)
+            with trace_run():
+                final_state = kfm_app.invoke(initial_state, **_invoke_kwargs(loop))
             
         execution_time = time.time() - execution_start_time
         run_logger.info(f"Graph invocation complete. Execution time: {execution_time:.2f}s")
@@ -423,6 +745,12 @@ def run_kfm_agent(
         if final_state is None:
              final_state = initial_state.copy()
         final_state["error"] = str(e)
+    finally:
+        if generation is not None:
+            runtime._release(generation)
+        else:
+            # Components built for this call only
+            close_components(components)
     
     # Log total execution time
     total_time = time.time() - start_time
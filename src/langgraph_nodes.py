@@ -21,12 +21,12 @@ import time
 import uuid
 import httpx
 from dotenv import load_dotenv
-import copy
 import asyncio # Added for running async snapshot calls
 import logging
 
 # Import for Reversibility System
 from src.core.reversibility.snapshot_service import SnapshotService # Added
+from src.core.state_sharing import evolve, evolve_in
 
 # Import advanced error handling components
 from src.retry_strategy import (
@@ -45,60 +45,77 @@ from src.llm_logging import (
 from src.core.prompt_manager import get_global_prompt_manager
 from src.core.heuristic_manager import get_global_heuristic_manager
 
-# Try to import Google Generative AI
-try:
-    import google.generativeai as genai
-    from google.generativeai.types import GenerationConfig, HarmCategory, HarmBlockThreshold
-except ImportError:
-    # Create a mock module for genai with necessary classes
-    class MockHarmCategory:
-        HARM_CATEGORY_HATE_SPEECH = "HARM_CATEGORY_HATE_SPEECH"
-        HARM_CATEGORY_DANGEROUS_CONTENT = "HARM_CATEGORY_DANGEROUS_CONTENT"
-        HARM_CATEGORY_SEXUALLY_EXPLICIT = "HARM_CATEGORY_SEXUALLY_EXPLICIT"
-        HARM_CATEGORY_HARASSMENT = "HARM_CATEGORY_HARASSMENT"
+# Google Generative AI names are resolved on first access (the SDK takes about a second to import)
+_LAZY_GENAI_ATTRS = ("genai", "GenerationConfig", "HarmCategory", "HarmBlockThreshold")
+
+def _load_genai_attrs() -> Dict[str, Any]:
+    """Imports Google Generative AI, or builds mock stand-ins if it is not installed."""
+    try:
+        import google.generativeai as genai
+        from google.generativeai.types import GenerationConfig, HarmCategory, HarmBlockThreshold
+    except ImportError:
+        # Create a mock module for genai with necessary classes
+        class MockHarmCategory:
+            HARM_CATEGORY_HATE_SPEECH = "HARM_CATEGORY_HATE_SPEECH"
+            HARM_CATEGORY_DANGEROUS_CONTENT = "HARM_CATEGORY_DANGEROUS_CONTENT"
+            HARM_CATEGORY_SEXUALLY_EXPLICIT = "HARM_CATEGORY_SEXUALLY_EXPLICIT"
+            HARM_CATEGORY_HARASSMENT = "HARM_CATEGORY_HARASSMENT"
     
-    class MockHarmBlockThreshold:
-        BLOCK_MEDIUM_AND_ABOVE = "BLOCK_MEDIUM_AND_ABOVE"
-        BLOCK_ONLY_HIGH = "BLOCK_ONLY_HIGH"
-        BLOCK_NONE = "BLOCK_NONE"
+        class MockHarmBlockThreshold:
+            BLOCK_MEDIUM_AND_ABOVE = "BLOCK_MEDIUM_AND_ABOVE"
+            BLOCK_ONLY_HIGH = "BLOCK_ONLY_HIGH"
+            BLOCK_NONE = "BLOCK_NONE"
     
-    class MockGenerationConfig:
-        def __init__(self, temperature=0.7, top_p=0.95, top_k=40, max_output_tokens=1024, **kwargs):
-            self.temperature = temperature
-            self.top_p = top_p
-            self.top_k = top_k
-            self.max_output_tokens = max_output_tokens
-            for key, value in kwargs.items():
-                setattr(self, key, value)
+        class MockGenerationConfig:
+            def __init__(self, temperature=0.7, top_p=0.95, top_k=40, max_output_tokens=1024, **kwargs):
+                self.temperature = temperature
+                self.top_p = top_p
+                self.top_k = top_k
+                self.max_output_tokens = max_output_tokens
+                for key, value in kwargs.items():
+                    setattr(self, key, value)
     
-    class MockGenerativeModel:
-        def __init__(self, model_name="gemini-pro", **kwargs):
-            self.model_name = model_name
+        class MockGenerativeModel:
+            def __init__(self, model_name="gemini-pro", **kwargs):
+                self.model_name = model_name
             
-        def generate_content(self, prompt, generation_config=None, safety_settings=None, **kwargs):
-            class MockResponse:
-                def __init__(self, prompt):
-                    self.text = f"This is a mock response for: {prompt[:30]}..."
-            return MockResponse(prompt)
+            def generate_content(self, prompt, generation_config=None, safety_settings=None, **kwargs):
+                class MockResponse:
+                    def __init__(self, prompt):
+                        self.text = f"This is a mock response for: {prompt[:30]}..."
+                return MockResponse(prompt)
     
-    # Create mock genai module with necessary components
-    class MockGenAI:
-        def __init__(self):
-            self.HarmCategory = MockHarmCategory
-            self.HarmBlockThreshold = MockHarmBlockThreshold
-            self.GenerationConfig = MockGenerationConfig
+        # Create mock genai module with necessary components
+        class MockGenAI:
+            def __init__(self):
+                self.HarmCategory = MockHarmCategory
+                self.HarmBlockThreshold = MockHarmBlockThreshold
+                self.GenerationConfig = MockGenerationConfig
             
-        def configure(self, api_key=None, **kwargs):
-            pass
+            def configure(self, api_key=None, **kwargs):
+                pass
             
-        def GenerativeModel(self, model_name="gemini-pro", **kwargs):
-            return MockGenerativeModel(model_name, **kwargs)
+            def GenerativeModel(self, model_name="gemini-pro", **kwargs):
+                return MockGenerativeModel(model_name, **kwargs)
     
-    # Create the mock module
-    genai = MockGenAI()
-    HarmCategory = MockHarmCategory
-    HarmBlockThreshold = MockHarmBlockThreshold
-    GenerationConfig = MockGenerationConfig
+        # Create the mock module
+        genai = MockGenAI()
+        HarmCategory = MockHarmCategory
+        HarmBlockThreshold = MockHarmBlockThreshold
+        GenerationConfig = MockGenerationConfig
+    return {
+        "genai": genai,
+        "GenerationConfig": GenerationConfig,
+        "HarmCategory": HarmCategory,
+        "HarmBlockThreshold": HarmBlockThreshold,
+    }
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_GENAI_ATTRS:
+        for attr_name, value in _load_genai_attrs().items():
+            globals().setdefault(attr_name, value)
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Setup loggers for nodes
 monitor_logger = setup_logger('MonitorNode')
@@ -382,7 +399,7 @@ async def monitor_state_node(state: KFMAgentState, state_monitor: StateMonitor,
     try:
         monitor_logger.info("Monitoring state...", extra={"props": {"run_id": state.get('run_id')}})
         start_time = time.perf_counter()
-        current_state_copy = cast(Dict[str, Any], state.copy())
+        current_state_copy = cast(Dict[str, Any], evolve(state))
         current_state_copy["last_snapshot_ids"] = current_state_copy.get("last_snapshot_ids", {})
 
         original_correlation_id = current_state_copy.get("original_correlation_id", str(uuid.uuid4()))
@@ -407,7 +424,7 @@ async def monitor_state_node(state: KFMAgentState, state_monitor: StateMonitor,
                 }
             )
             if snapshot_id:
-                current_state_copy["last_snapshot_ids"]["monitor_entry"] = snapshot_id
+                evolve_in(current_state_copy, "last_snapshot_ids", "monitor_entry", snapshot_id)
                 monitor_logger.info(f"Monitor entry snapshot taken: {snapshot_id}")
             else:
                 monitor_logger.warning("Monitor entry snapshot call returned None.")
@@ -422,9 +439,13 @@ async def monitor_state_node(state: KFMAgentState, state_monitor: StateMonitor,
             monitor_logger.info(f"--- Exiting Monitor State Node early due to error (Duration: {duration:.4f}s) ---")
             return current_state_copy
 
+        # Shared read-only snapshot, rebuilt by the registry only when its generation changes
         all_component_details = state_monitor.component_registry.get_all_component_details()
         current_state_copy['all_components_details'] = all_component_details
-        monitor_logger.info(f"All component details fetched: {json.dumps(all_component_details, indent=2)}")
+        monitor_logger.info(f"All component details fetched: {len(all_component_details)} modules, "
+                            f"{sum(len(versions) for versions in all_component_details.values())} versions")
+        if monitor_logger.isEnabledFor(logging.DEBUG):
+            monitor_logger.debug(f"All component details: {json.dumps(all_component_details, indent=2)}")
 
         current_task_requirements = state_monitor.get_task_requirements(current_state_copy.get('task_name'))
         current_state_copy['current_task_requirements'] = current_task_requirements
@@ -454,11 +475,11 @@ async def kfm_decision_node(state: KFMAgentState, kfm_planner: KFMPlannerLlm, sn
     """Makes a KFM decision based on the current state."""
     log_semantic_state_details(state, "kfm_decision_node_entry")
     
-    updated_state = cast(KFMAgentState, copy.deepcopy(dict(state))) # Ensure it's a mutable copy and treated as KFMAgentState
+    updated_state = cast(KFMAgentState, evolve(state)) # Derived version sharing unchanged values with `state`
     current_task_name = updated_state.get('task_name', "Unknown Task")
     decision_logger.info("--- Entering KFM Decision Node ---")
     start_time = time.perf_counter()
-    current_state_copy = cast(Dict[str, Any], state.copy())
+    current_state_copy = cast(Dict[str, Any], evolve(state))
     current_state_copy["last_snapshot_ids"] = current_state_copy.get("last_snapshot_ids", {})
 
     correlation_id = current_state_copy.get("original_correlation_id", "unknown_correlation_id")
@@ -475,7 +496,7 @@ async def kfm_decision_node(state: KFMAgentState, kfm_planner: KFMPlannerLlm, sn
             }
         )
         if snapshot_id:
-            current_state_copy["last_snapshot_ids"]["decision_entry"] = snapshot_id
+            evolve_in(current_state_copy, "last_snapshot_ids", "decision_entry", snapshot_id)
             decision_logger.info(f"[corr:{correlation_id}, run:{run_id}] Decision entry snapshot: {snapshot_id}")
         else:
             decision_logger.warning(f"[corr:{correlation_id}, run:{run_id}] Decision entry snapshot call returned None.")
@@ -521,10 +542,10 @@ async def kfm_decision_node(state: KFMAgentState, kfm_planner: KFMPlannerLlm, sn
             additional_metadata=snap_metadata_post_planner
         )
         if snapshot_id:
-            current_state_copy["last_snapshot_ids"]["decision_post_planner"] = snapshot_id
+            evolve_in(current_state_copy, "last_snapshot_ids", "decision_post_planner", snapshot_id)
             decision_logger.info(f"[corr:{correlation_id}, run:{run_id}] Post-planner snapshot: {snapshot_id}")
             if kfm_action_details.get("action") == "Fuck":
-                current_state_copy["last_snapshot_ids"]["decision_post_planner_pre_fuck"] = snapshot_id
+                evolve_in(current_state_copy, "last_snapshot_ids", "decision_post_planner_pre_fuck", snapshot_id)
         else:
             decision_logger.warning(f"[corr:{correlation_id}, run:{run_id}] Post-planner snapshot call returned None.")
     except Exception as e_snap_post:
@@ -548,7 +569,7 @@ async def execute_action_node(state: KFMAgentState, execution_engine: ExecutionE
     log_semantic_state_details(state, "execute_action_node_entry")
     start_time = time.perf_counter() # Ensure start_time is defined here
     
-    updated_state = cast(KFMAgentState, copy.deepcopy(dict(state)))
+    updated_state = cast(KFMAgentState, evolve(state))
     kfm_action = updated_state.get('kfm_action')
 
     # Initialize variables that will be used in success/error paths
@@ -593,7 +614,7 @@ async def execute_action_node(state: KFMAgentState, execution_engine: ExecutionE
         )
         if snapshot_id:
             pre_execution_snapshot_id = snapshot_id # Keep for auto-reversal
-            updated_state["last_snapshot_ids"]["execute_pre_action"] = snapshot_id
+            evolve_in(updated_state, "last_snapshot_ids", "execute_pre_action", snapshot_id)
             updated_state["last_pre_execution_snapshot_id"] = snapshot_id
             execution_logger.info(f"[corr:{updated_state.get('original_correlation_id', 'unknown_corr')}, run:{updated_state.get('run_id', 'unknown_run')}] Pre-execution snapshot: {snapshot_id}")
         else:
@@ -740,7 +761,7 @@ async def execute_action_node(state: KFMAgentState, execution_engine: ExecutionE
                     }
                 )
                 if snapshot_id:
-                    updated_state["last_snapshot_ids"]["execute_post_action"] = snapshot_id
+                    evolve_in(updated_state, "last_snapshot_ids", "execute_post_action", snapshot_id)
                     execution_logger.info(f"[corr:{updated_state.get('original_correlation_id', 'unknown_corr')}, run:{updated_state.get('run_id', 'unknown_run')}] Post-execution snapshot: {snapshot_id}")
                 else:
                     execution_logger.warning(f"[corr:{updated_state.get('original_correlation_id', 'unknown_corr')}, run:{updated_state.get('run_id', 'unknown_run')}] Post-execution snapshot call returned None.")
@@ -756,7 +777,7 @@ async def reflect_node(state: KFMAgentState, snapshot_service: SnapshotService)
     """Node for reflecting on the KFM decision and execution outcome."""
     log_semantic_state_details(state, "reflect_node_entry")
     start_time = time.perf_counter() # Add for duration logging
-    updated_state = cast(KFMAgentState, copy.deepcopy(dict(state)))
+    updated_state = cast(KFMAgentState, evolve(state))
     
     # ... (Existing reflection logic to produce reflection_text) ...
     # Example: reflection_text = "Reflection complete."
@@ -781,7 +802,7 @@ async def fallback_node(state: KFMAgentState, kfm_planner_original: KFMPlanner,
     """Handles fallback logic when KFM decision confidence is low or errors occur."""
     log_semantic_state_details(state, "fallback_node_entry")
     start_time = time.perf_counter() # Add for duration logging
-    updated_state = cast(KFMAgentState, copy.deepcopy(dict(state)))
+    updated_state = cast(KFMAgentState, evolve(state))
     
     # ... (Existing fallback logic, which modifies updated_state with a new kfm_action or error) ...
     # Example:
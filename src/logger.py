@@ -10,12 +10,9 @@ import logging.config
 import logging.handlers
 from pathlib import Path
 
-# Default log directory
+# Default log directory (created when the first log file is written, not at import)
 DEFAULT_LOG_DIR = 'logs'
 
-# Create logs directory if it doesn't exist
-os.makedirs(DEFAULT_LOG_DIR, exist_ok=True)
-
 # Define log levels and their names for easier reference
 LOG_LEVELS = {
     'DEBUG': logging.DEBUG,
@@ -82,13 +79,20 @@ STATE_LOG_DIR = os.path.join(LOG_DIR, "states")
 MAX_LOG_SIZE = 5 * 1024 * 1024  # 5 MB
 BACKUP_COUNT = 5
 
-# Make sure log directories exist
-def _ensure_log_directories():
-    """Create log directories if they don't exist."""
-    for directory in [LOG_DIR, NODE_LOG_DIR, ERROR_LOG_DIR, PERFORMANCE_LOG_DIR, STATE_LOG_DIR]:
-        os.makedirs(directory, exist_ok=True)
+class DeferredRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """RotatingFileHandler that creates its directory and file on the first record.
+
+    Module-level loggers are set up at import time; deferring the open keeps importing
+    a module free of filesystem side effects for loggers that never write.
+    """
 
-_ensure_log_directories()
+    def __init__(self, filename, mode='a', maxBytes=0, backupCount=0, encoding=None):
+        super().__init__(filename, mode=mode, maxBytes=maxBytes, backupCount=backupCount,
+                         encoding=encoding, delay=True)
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
 
 # Formatter classes must be defined before they are used
 class ColorFormatter(logging.Formatter):
@@ -426,7 +430,8 @@ def setup_logger(
     file: bool = True,
     file_level: Optional[Union[int, str]] = None,
     json_format: bool = False,
-    log_dir: Optional[str] = None
+    log_dir: Optional[str] = None,
+    filename: Optional[str] = None
 ) -> logging.Logger:
     """
     Set up a logger with console and/or file handlers.
@@ -439,6 +444,7 @@ def setup_logger(
         file_level: Log level for file output (defaults to level)
         json_format: Whether to use JSON format for file logs
         log_dir: Custom log directory
+        filename: Log file name inside the log directory (defaults to '<name>.log')
         
     Returns:
         Configured logger
@@ -482,14 +488,11 @@ def setup_logger(
             else:
                 log_dir = LOG_DIR
         
-        # Ensure directory exists
-        os.makedirs(log_dir, exist_ok=True)
-        
         # Create file path
-        log_file = os.path.join(log_dir, f"{name}.log")
+        log_file = os.path.join(log_dir, filename or f"{name}.log")
         
-        # Create rotating file handler
-        file_handler = logging.handlers.RotatingFileHandler(
+        # Create rotating file handler (directory and file are created on first write)
+        file_handler = DeferredRotatingFileHandler(
             log_file,
             maxBytes=MAX_LOG_SIZE,
             backupCount=BACKUP_COUNT
@@ -18,7 +18,6 @@ from typing import Dict, Any, List, Optional, Set, Union, Tuple, Callable
 from functools import wraps
 from collections import defaultdict
 
-import matplotlib.pyplot as plt
 import numpy as np
 
 from src.logger import setup_logger
@@ -516,6 +515,7 @@ class PerformanceProfiler:
         Returns:
             Dictionary of graph file paths
         """
+        import matplotlib.pyplot as plt  # Deferred: only charts need matplotlib
         graph_paths = {}
         
         # Extract relevant data
@@ -591,6 +591,7 @@ class PerformanceProfiler:
         Returns:
             Dictionary of graph file paths
         """
+        import matplotlib.pyplot as plt  # Deferred: only charts need matplotlib
         if not all(run_id in self.historical_runs for run_id in run_ids):
             return {"error": "Some runs not found"}
             
@@ -0,0 +1,187 @@
+"""
+Low-overhead sampled tracing.
+
+The full tracer (src.tracing.trace_node) summarizes input and output state, diffs
+them, formats tracebacks, reads RSS and appends to an unbounded history on every
+node call. SampledTracer is the production mode:
+
+- Head-based sampling: whether a run is traced is decided once, at its first node
+  call, with probability `sample_rate`.
+- Always sample on error: spans of unsampled runs are kept in a small per-run
+  buffer; when a node raises, the buffer is flushed and the rest of the run is
+  traced as if it had been sampled.
+- Spans are fixed-size records (SpanRecord) in a bounded ring buffer; the oldest
+  are overwritten once it is full.
+- Spans capture a bounded summary when the node returns: a shallow copy of up to
+  16 top-level fields of the input state and result (key fields first), and for
+  errors the exception type, message and extracted stack frames, without frame
+  locals. The span never holds the state, result or exception objects themselves,
+  so a buffered span does not pin them, and fields replaced after the call are not
+  reflected. Field values are still references, so nested values mutated in place
+  are exported as mutated.
+- Summaries, state diffs and traceback text are only computed when the buffer is
+  exported.
+
+Enable it with src.tracing.enable_sampled_tracing().
+"""
+import asyncio
+import datetime
+import random
+import threading
+import traceback
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+
+class SpanRecord:
+    """One node call. Fixed fields; state fields are shallow-copied, not the state itself."""
+
+    __slots__ = ("node", "correlation_id", "execution_id", "timestamp", "duration",
+                 "input_state", "output", "output_is_update", "error_type", "error_message", "error_frames",
+                 "cancelled")
+
+    def __init__(self, node: str, correlation_id: str, execution_id: int, timestamp: float,
+                 input_state: Optional[Dict[str, Any]] = None):
+        self.node = node
+        self.correlation_id = correlation_id
+        self.execution_id = execution_id
+        self.timestamp = timestamp
+        self.duration = 0.0
+        self.input_state = input_state
+        self.output: Optional[Dict[str, Any]] = None
+        # Whether the output is a partial update merged into the input, as node results are
+        self.output_is_update = True
+        self.error_type: Optional[str] = None
+        self.error_message: Optional[str] = None
+        self.error_frames: Optional[traceback.StackSummary] = None
+        self.cancelled = False
+
+    def set_error(self, exception: BaseException) -> None:
+        """Keeps what the exported error needs, dropping the exception and its frames."""
+        self.error_type = type(exception).__name__
+        self.error_message = str(exception)
+        self.error_frames = traceback.extract_tb(exception.__traceback__)
+        self.cancelled = isinstance(exception, asyncio.CancelledError)
+
+    def to_trace_entry(self) -> Dict[str, Any]:
+        """Serializes the span into the same entry format as the full tracer."""
+        from src.tracing import _extract_key_fields, _identify_state_changes
+
+        input_state = self.input_state
+        output_state = self.output if self.error_type is None else None
+        state_changes = {}
+        if input_state and output_state:
+            merged = {**input_state, **output_state} if self.output_is_update else output_state
+            state_changes = _identify_state_changes(input_state, merged)
+        error = None
+        if self.error_type is not None:
+            error = {
+                "type": self.error_type,
+                "message": self.error_message,
+                "traceback": "Traceback (most recent call last):\n" + "".join(self.error_frames.format())
+                             + f"{self.error_type}: {self.error_message}\n"
+            }
+        return {
+            "node": self.node,
+            "timestamp": self.timestamp,
+            "start_timestamp": datetime.datetime.fromtimestamp(self.timestamp).isoformat(),
+            "correlation_id": self.correlation_id,
+            "execution_id": self.execution_id,
+            "input_state": _extract_key_fields(input_state) if input_state else None,
+            "duration": self.duration,
+            "end_timestamp": datetime.datetime.fromtimestamp(self.timestamp + self.duration).isoformat(),
+            "success": self.error_type is None,
+            "cancelled": self.cancelled,
+            "output_state": _extract_key_fields(output_state) if output_state else None,
+            "state_changes": state_changes,
+            "error": error,
+            "sampled": True,
+        }
+
+
+class SampledTracer:
+    """Head-sampled span recorder with a bounded ring buffer."""
+
+    def __init__(self, sample_rate: float = 0.01, capacity: int = 1024,
+                 pending_capacity: int = 64, seed: Optional[int] = None):
+        """
+        Args:
+            sample_rate: Fraction of runs traced (0.0 - 1.0)
+            capacity: Number of spans kept in the ring buffer
+            pending_capacity: Spans buffered per unsampled run, flushed if it errors
+            seed: Seed for the sampling decisions, for reproducible tests
+        """
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError(f"sample_rate must be between 0 and 1, got {sample_rate}")
+        if capacity < 1:
+            raise ValueError(f"capacity must be positive, got {capacity}")
+        self.sample_rate = sample_rate
+        self.capacity = capacity
+        self.pending_capacity = pending_capacity
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._spans: Deque[SpanRecord] = deque(maxlen=capacity)
+        self.runs_sampled = 0
+        self.runs_unsampled = 0
+        self.runs_promoted = 0
+        self.spans_recorded = 0
+
+    def sample_run(self) -> bool:
+        """Head-based sampling decision for a new run."""
+        with self._lock:
+            sampled = self._random.random() < self.sample_rate
+            if sampled:
+                self.runs_sampled += 1
+            else:
+                self.runs_unsampled += 1
+        return sampled
+
+    def new_pending_buffer(self) -> Deque[SpanRecord]:
+        """Buffer for the spans of an unsampled run."""
+        return deque(maxlen=self.pending_capacity)
+
+    def record(self, span: SpanRecord) -> None:
+        with self._lock:
+            self._spans.append(span)
+            self.spans_recorded += 1
+
+    def promote(self, pending: Optional[Deque[SpanRecord]]) -> None:
+        """Moves an unsampled run's buffered spans into the ring after an error."""
+        with self._lock:
+            self.runs_promoted += 1
+            if pending:
+                self._spans.extend(pending)
+                self.spans_recorded += len(pending)
+                pending.clear()
+
+    def spans(self) -> List[SpanRecord]:
+        """The buffered spans, oldest first."""
+        with self._lock:
+            return list(self._spans)
+
+    def export(self, correlation_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Serializes buffered spans into trace entries.
+
+        Args:
+            correlation_id: Only export spans of this run
+
+        Returns:
+            List[Dict[str, Any]]: Entries in the full tracer's format
+        """
+        return [span.to_trace_entry() for span in self.spans()
+                if correlation_id is None or span.correlation_id == correlation_id]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sample_rate": self.sample_rate,
+            "capacity": self.capacity,
+            "buffered_spans": len(self._spans),
+            "spans_recorded": self.spans_recorded,
+            "runs_sampled": self.runs_sampled,
+            "runs_unsampled": self.runs_unsampled,
+            "runs_promoted": self.runs_promoted,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
@@ -1,4 +1,4 @@
-from typing import TypedDict, Dict, Any, List, Optional, Union
+from typing import TypedDict, Dict, Any, List, Optional, Tuple, Union
 from enum import Enum # Import Enum
 
 class ActionType(Enum):
@@ -54,4 +54,11 @@ class KFMAgentState(TypedDict, total=False):
 
     # Component and system details
     all_components_details: Optional[Dict[str, List[Dict[str, Any]]]] # Details about all available components
-    current_task_requirements: Optional[Dict[str, Any]] # More detailed/structured task requirements 
\ No newline at end of file
+    current_task_requirements: Optional[Dict[str, Any]] # More detailed/structured task requirements 
+    # Control loop (see src.core.control_loop)
+    loop_iteration: Optional[int] # Completed loop iterations in this run
+    loop_stable_count: Optional[int] # Consecutive iterations without a decision change
+    loop_last_action: Optional[Tuple[Optional[str], Optional[str]]] # (action, component) of the last iteration
+    loop_iteration_started_at: Optional[float] # time.perf_counter() at the start of the current iteration
+    loop_stop_reason: Optional[str] # Why the loop stopped (max_iterations, converged, error, stopped)
+    loop_metrics: Optional[Dict[str, Any]] # Loop-rate metrics exported when the loop stops
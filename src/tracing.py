@@ -6,10 +6,14 @@ through the LangGraph execution flow, to ensure data properly flows
 between nodes and to aid in debugging.
 """
 
+import asyncio
 import logging
 import time
 import inspect
 import functools
+import contextlib
+import contextvars
+import itertools
 import json
 import traceback
 import os
@@ -19,18 +23,27 @@ from collections import deque
 from typing import Dict, Any, Callable, Optional, List, Set, Union, Tuple, TypeVar, Deque
 from src.logger import setup_logger, set_log_level, get_log_level
 from src.core.state import KFMAgentState
+from src.sampled_tracing import SampledTracer, SpanRecord
 
 # Import profiling utilities
 from src.profiling import get_profiler, start_profiling_run, end_profiling_run
 
-# Import visualization module for reports and visualizations
-try:
-    from src.visualization import visualize_timeline, visualize_state_changes, create_execution_report
-except ImportError:
-    # Create placeholder functions if visualization module is not available
-    def visualize_timeline(*args, **kwargs): return None
-    def visualize_state_changes(*args, **kwargs): return None
-    def create_execution_report(*args, **kwargs): return None
+# The visualization module (matplotlib, networkx) is imported on first use, not at import
+def visualize_timeline(*args, **kwargs):
+    """Proxy for src.visualization.visualize_timeline; returns None if it is unavailable."""
+    try:
+        from src.visualization import visualize_timeline as _visualize_timeline
+    except ImportError:
+        return None
+    return _visualize_timeline(*args, **kwargs)
+
+def create_execution_report(*args, **kwargs):
+    """Proxy for src.visualization.create_execution_report; returns None if it is unavailable."""
+    try:
+        from src.visualization import create_execution_report as _create_execution_report
+    except ImportError:
+        return None
+    return _create_execution_report(*args, **kwargs)
 
 # Add visualize_trace_path function to fix import error in kfm_agent.py
 def visualize_trace_path(trace_history=None, output_format='text', include_states=False, max_state_depth=2):
@@ -80,11 +93,42 @@ _enable_profiling = True
 # Current trace session ID
 _current_trace_session = None
 
-# Correlation ID for tracking execution flow
-_current_correlation_id = None
+class _TraceContext:
+    """Correlation ID, node execution counter and sampling decision of one execution flow."""
+
+    __slots__ = ("correlation_id", "_execution_ids", "sampled", "pending")
+
+    def __init__(self, correlation_id: Optional[str] = None):
+        self.correlation_id = correlation_id
+        self._execution_ids = itertools.count(1)
+        # Head-based sampling decision and buffered spans, when sampled tracing is on
+        self.sampled: Optional[bool] = None
+        self.pending: Optional[Deque[SpanRecord]] = None
+
+    def next_execution_id(self) -> int:
+        return next(self._execution_ids)
+
+# Trace context of the current execution flow. It lives in a ContextVar so that
+# concurrent runs (threads or asyncio tasks) each keep their own correlation ID and
+# execution count; flows that never entered trace_run() share the default context.
+_trace_context: contextvars.ContextVar[Optional[_TraceContext]] = contextvars.ContextVar(
+    "kfm_trace_context", default=None)
+_default_trace_context = _TraceContext()
+
+def _current_trace_context() -> _TraceContext:
+    return _trace_context.get() or _default_trace_context
 
-# Node execution count within the current trace session
-_node_execution_count = 0
+# Sampled tracer replacing the full per-node trace entries, when enabled
+_sampled_tracer: Optional[SampledTracer] = None
+
+# Fields summarized first in trace entries, and kept first in sampled spans
+_CRITICAL_FIELDS = (
+    'task_name', 'error', 'done', 'kfm_action', 'status',
+    'id', 'name', 'type', 'action', 'input', 'output', 'result',
+    'timestamp', 'success'
+)
+# Most top-level state fields a sampled span keeps
+_SPAN_FIELD_LIMIT = 16
 
 # Dictionary to track node type information
 _node_type_info = {}
@@ -207,27 +251,52 @@ def get_correlation_id() -> str:
     Returns:
         Current correlation ID string
     """
-    global _current_correlation_id
+    context = _current_trace_context()
     
-    if _current_correlation_id is None:
-        _current_correlation_id = str(uuid.uuid4())
+    if context.correlation_id is None:
+        context.correlation_id = str(uuid.uuid4())
         
-    return _current_correlation_id
+    return context.correlation_id
 
 def set_correlation_id(correlation_id: str) -> None:
     """
     Set the correlation ID for the current execution flow.
     
+    Starts a fresh trace context in the current context, so node execution IDs
+    count from 1 again and tasks or threads started from here inherit it.
+    
     Args:
         correlation_id: Correlation ID to set
     """
-    global _current_correlation_id
-    _current_correlation_id = correlation_id
+    _trace_context.set(_TraceContext(correlation_id))
 
 def reset_correlation_id() -> None:
     """Reset the correlation ID to generate a new one on next request."""
-    global _current_correlation_id
-    _current_correlation_id = None
+    _trace_context.set(None)
+    _default_trace_context.correlation_id = None
+
+@contextlib.contextmanager
+def trace_run(correlation_id: Optional[str] = None):
+    """
+    Scope a correlation ID and node execution counter to one run.
+    
+    Node traces recorded inside the block - including in asyncio tasks created
+    from it - share the run's correlation ID, and their execution IDs count from 1
+    independently of any other run in flight. The previous context is restored
+    on exit.
+    
+    Args:
+        correlation_id: Correlation ID for the run; generated if omitted
+        
+    Yields:
+        str: The run's correlation ID
+    """
+    context = _TraceContext(correlation_id or str(uuid.uuid4()))
+    token = _trace_context.set(context)
+    try:
+        yield context.correlation_id
+    finally:
+        _trace_context.reset(token)
 
 def get_trace_session() -> str:
     """
@@ -266,9 +335,40 @@ def get_next_node_execution_id() -> int:
     Returns:
         Current node execution count
     """
-    global _node_execution_count
-    _node_execution_count += 1
-    return _node_execution_count
+    return _current_trace_context().next_execution_id()
+
+def enable_sampled_tracing(sample_rate: float = 0.01, capacity: int = 1024,
+                           pending_capacity: int = 64, seed: Optional[int] = None) -> SampledTracer:
+    """
+    Switch traced nodes to the low-overhead sampled mode.
+    
+    Instead of full trace entries in the trace history, a sampled fraction of runs
+    record spans into a ring buffer; runs that hit an error are always recorded.
+    Runs are delimited by trace_run(); node calls outside one are sampled
+    individually.
+    
+    Args:
+        sample_rate: Fraction of runs traced (0.0 - 1.0)
+        capacity: Number of spans kept in the ring buffer
+        pending_capacity: Spans buffered per unsampled run, recorded if it errors
+        seed: Seed for the sampling decisions
+        
+    Returns:
+        SampledTracer: The active tracer; export() serializes its spans
+    """
+    global _sampled_tracer
+    _sampled_tracer = SampledTracer(sample_rate, capacity, pending_capacity, seed)
+    trace_logger.info(f"Sampled tracing enabled (sample_rate={sample_rate}, capacity={capacity})")
+    return _sampled_tracer
+
+def disable_sampled_tracing() -> None:
+    """Return traced nodes to full trace entries."""
+    global _sampled_tracer
+    _sampled_tracer = None
+
+def get_sampled_tracer() -> Optional[SampledTracer]:
+    """The active sampled tracer, or None in full tracing mode."""
+    return _sampled_tracer
 
 def register_node_info(node_func: Callable, node_type: str = None, description: str = None) -> None:
     """
@@ -332,140 +432,227 @@ def get_node_type(node_name: str) -> Dict[str, str]:
     
     return _node_type_info[node_name]
 
+def _state_as_dict(state: Any) -> Optional[Dict[str, Any]]:
+    """Plain dict view of a node's state argument or result, if it is state-like."""
+    if isinstance(state, dict):
+        return state
+    if hasattr(state, 'model_dump'):
+        state = state.model_dump()
+    elif hasattr(state, 'dict'):
+        state = state.dict()
+    elif hasattr(state, '__dict__'):
+        state = state.__dict__
+    return state if isinstance(state, dict) else None
+
+def _start_node_trace(node_name: str, args: tuple) -> Dict[str, Any]:
+    """Open a trace entry for a node call; the caller finishes it with _finish_node_trace."""
+    context = _current_trace_context()
+    correlation_id = get_correlation_id()
+    execution_id = context.next_execution_id()
+    
+    trace_logger.info(f"[corr:{correlation_id}] Entering node {node_name} (exec:{execution_id})")
+    
+    # The first argument is the state
+    input_state = _state_as_dict(args[0]) if args else None
+    
+    return {
+        "node": node_name,
+        "timestamp": time.time(),
+        "start_timestamp": datetime.datetime.now().isoformat(),
+        "correlation_id": correlation_id,
+        "execution_id": execution_id,
+        "input_state": _extract_key_fields(input_state) if input_state else None,
+        "_input": input_state,
+        "_start": time.perf_counter(),
+    }
+
+def _finish_node_trace(trace_entry: Dict[str, Any], result: Any = None,
+                       exception: Optional[BaseException] = None) -> None:
+    """Complete a trace entry with the node's result or exception and record it."""
+    duration = time.perf_counter() - trace_entry.pop("_start")
+    input_state = trace_entry.pop("_input")
+    node_name = trace_entry["node"]
+    correlation_id = trace_entry["correlation_id"]
+    execution_id = trace_entry["execution_id"]
+    
+    output_state = None
+    state_changes = {}
+    error = None
+    if exception is None:
+        output_state = _state_as_dict(result)
+        if input_state and output_state:
+            # LangGraph nodes return partial updates; compare against the merged state
+            if isinstance(result, dict):
+                state_changes = _identify_state_changes(input_state, {**input_state, **output_state})
+            else:
+                state_changes = _identify_state_changes(input_state, output_state)
+        trace_logger.info(f"[corr:{correlation_id}] Completed node {node_name} in {duration:.4f}s (exec:{execution_id})")
+        if state_changes:
+            change_summary = ", ".join(state_changes.keys())
+            trace_logger.info(f"[corr:{correlation_id}] State changes: {change_summary}")
+    else:
+        error = {
+            "type": type(exception).__name__,
+            "message": str(exception),
+            "traceback": "".join(traceback.format_exception(type(exception), exception, exception.__traceback__))
+        }
+        if isinstance(exception, asyncio.CancelledError):
+            trace_logger.warning(f"[corr:{correlation_id}] Node {node_name} cancelled after {duration:.4f}s (exec:{execution_id})")
+        else:
+            trace_logger.error(f"[corr:{correlation_id}] Error in node {node_name} after {duration:.4f}s: {str(exception)} (exec:{execution_id})")
+    
+    trace_entry.update({
+        "duration": duration,
+        "end_timestamp": datetime.datetime.now().isoformat(),
+        "success": exception is None,
+        "cancelled": isinstance(exception, asyncio.CancelledError),
+        "output_state": _extract_key_fields(output_state) if output_state else None,
+        "state_changes": state_changes,
+        "error": error
+    })
+    
+    # Add memory usage if profiling
+    if _enable_profiling:
+        try:
+            import psutil
+            # Get current process memory usage
+            process = psutil.Process(os.getpid())
+            memory_info = process.memory_info()
+            trace_entry["memory_usage"] = memory_info.rss  # resident set size in bytes
+        except ImportError:
+            pass
+        except Exception as mem_error:
+            trace_logger.debug(f"Error getting memory usage: {mem_error}")
+    
+    add_to_trace_history(trace_entry)
+
+def _span_fields(state: Any) -> Optional[Dict[str, Any]]:
+    """Shallow copy of at most _SPAN_FIELD_LIMIT top-level state fields, key fields first."""
+    fields = state if isinstance(state, dict) else getattr(state, '__dict__', None)
+    if not isinstance(fields, dict):
+        return None
+    if len(fields) <= _SPAN_FIELD_LIMIT:
+        return dict(fields)
+    picked = {key: fields[key] for key in _CRITICAL_FIELDS if key in fields}
+    for key in fields:
+        if len(picked) >= _SPAN_FIELD_LIMIT:
+            break
+        picked.setdefault(key, fields[key])
+    return picked
+
+def _start_sampled_span(tracer: SampledTracer, node_name: str, args: tuple) -> Tuple[SpanRecord, bool]:
+    """Open a span for a node call; returns it with the run's sampling decision."""
+    context = _current_trace_context()
+    if context is _default_trace_context:
+        # No run scope to carry a decision: sample the call on its own
+        sampled = tracer.sample_run()
+    else:
+        if context.sampled is None:
+            context.sampled = tracer.sample_run()
+        sampled = context.sampled
+    span = SpanRecord(node_name, get_correlation_id(), context.next_execution_id(), time.time(),
+                      _span_fields(args[0]) if args else None)
+    return span, sampled
+
+def _finish_sampled_span(tracer: SampledTracer, span: SpanRecord, sampled: bool, start: float,
+                         result: Any = None, exception: Optional[BaseException] = None) -> None:
+    """Close a span and record it, buffer it for its unsampled run, or promote the run on error."""
+    span.duration = time.perf_counter() - start
+    if exception is None:
+        span.output = _span_fields(result)
+        span.output_is_update = isinstance(result, dict)
+    else:
+        span.set_error(exception)
+    if sampled:
+        tracer.record(span)
+        return
+    context = _current_trace_context()
+    if exception is None:
+        if context is not _default_trace_context:
+            if context.pending is None:
+                context.pending = tracer.new_pending_buffer()
+            context.pending.append(span)
+        return
+    if span.cancelled:
+        trace_logger.warning(f"[corr:{span.correlation_id}] Node {span.node} cancelled after {span.duration:.4f}s "
+                             f"(exec:{span.execution_id})")
+    else:
+        trace_logger.error(f"[corr:{span.correlation_id}] Error in node {span.node} after {span.duration:.4f}s: "
+                           f"{str(exception)} (exec:{span.execution_id})")
+    if context is not _default_trace_context:
+        tracer.promote(context.pending)
+        context.sampled = True
+    else:
+        tracer.promote(None)
+    tracer.record(span)
+
 def trace_node(func):
     """
     Decorator to trace execution of a node function.
     
+    Coroutine functions get an async wrapper, so the recorded duration covers the
+    awaited execution and the output state is the node's actual result. With
+    sampled tracing enabled, calls are recorded as spans instead of trace entries.
+    Calls that are cancelled or interrupted are recorded as failed (cancellations
+    with ``cancelled`` set) before the exception propagates.
+    
     Args:
         func (Callable): The node function to trace
         
     Returns:
         Callable: Wrapped function with tracing
     """
+    node_name = func.__name__
+    
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            if not is_trace_enabled():
+                return await func(*args, **kwargs)
+            tracer = _sampled_tracer
+            if tracer is not None:
+                span, sampled = _start_sampled_span(tracer, node_name, args)
+                start = time.perf_counter()
+                try:
+                    result = await func(*args, **kwargs)
+                except BaseException as e:  # Including cancellation
+                    _finish_sampled_span(tracer, span, sampled, start, exception=e)
+                    raise
+                _finish_sampled_span(tracer, span, sampled, start, result)
+                return result
+            trace_entry = _start_node_trace(node_name, args)
+            try:
+                result = await func(*args, **kwargs)
+            except BaseException as e:
+                _finish_node_trace(trace_entry, exception=e)
+                raise
+            _finish_node_trace(trace_entry, result)
+            return result
+        return async_wrapper
+    
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        # Skip tracing if disabled
         if not is_trace_enabled():
             return func(*args, **kwargs)
-            
-        # Get correlation ID or create a new one
-        correlation_id = get_correlation_id()
-        
-        # Get function name
-        node_name = func.__name__
-        
-        # Track execution counts
-        global _node_execution_count
-        _node_execution_count += 1
-        execution_id = _node_execution_count
-        
-        # Log entry
-        trace_logger.info(f"[corr:{correlation_id}] Entering node {node_name} (exec:{execution_id})")
-        
-        # Extract state from args if available (first argument is usually the state)
-        input_state = None
-        state_arg = None
-        if args and hasattr(args[0], '__dict__'):
-            state_arg = args[0]
-            # Convert to dict for tracing
-            if hasattr(state_arg, 'dict'):
-                # Handle Pydantic models
-                input_state = state_arg.dict()
-            elif hasattr(state_arg, '__dict__'):
-                # Handle regular objects
-                input_state = state_arg.__dict__
-        
-        # Track timing
-        start_time = time.time()
-        start_timestamp = datetime.datetime.now().isoformat()
-        
-        # Create trace entry
-        trace_entry = {
-            "node": node_name,
-            "timestamp": start_time,
-            "start_timestamp": start_timestamp,
-            "correlation_id": correlation_id,
-            "execution_id": execution_id,
-            "input_state": _extract_key_fields(input_state) if input_state else None
-        }
-        
-        # Execute function
-        success = True
-        error = None
-        output_state = None
-        state_changes = {}
-        
+        tracer = _sampled_tracer
+        if tracer is not None:
+            span, sampled = _start_sampled_span(tracer, node_name, args)
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except BaseException as e:
+                _finish_sampled_span(tracer, span, sampled, start, exception=e)
+                raise
+            _finish_sampled_span(tracer, span, sampled, start, result)
+            return result
+        trace_entry = _start_node_trace(node_name, args)
         try:
-            # Execute the node function
             result = func(*args, **kwargs)
-            
-            # Extract output state if result is a state object
-            if hasattr(result, '__dict__'):
-                if hasattr(result, 'dict'):
-                    # Handle Pydantic models
-                    output_state = result.dict()
-                elif hasattr(result, '__dict__'):
-                    # Handle regular objects
-                    output_state = result.__dict__
-                    
-                # Identify state changes
-                if input_state and output_state:
-                    state_changes = _identify_state_changes(input_state, output_state)
-            
-            # Log successful execution
-            duration = time.time() - start_time
-            trace_logger.info(f"[corr:{correlation_id}] Completed node {node_name} in {duration:.4f}s (exec:{execution_id})")
-            
-            # Add state changes to log if any
-            if state_changes:
-                change_summary = ", ".join(state_changes.keys())
-                trace_logger.info(f"[corr:{correlation_id}] State changes: {change_summary}")
-            
-            return result
-        except Exception as e:
-            # Track failure
-            success = False
-            error = {
-                "type": type(e).__name__,
-                "message": str(e),
-                "traceback": traceback.format_exc()
-            }
-            
-            # Log error
-            duration = time.time() - start_time
-            trace_logger.error(f"[corr:{correlation_id}] Error in node {node_name} after {duration:.4f}s: {str(e)} (exec:{execution_id})")
-            
-            # Re-raise the exception
+        except BaseException as e:
+            _finish_node_trace(trace_entry, exception=e)
             raise
-        finally:
-            # Finalize trace entry
-            duration = time.time() - start_time
-            end_timestamp = datetime.datetime.now().isoformat()
-            
-            trace_entry.update({
-                "duration": duration,
-                "end_timestamp": end_timestamp,
-                "success": success,
-                "output_state": _extract_key_fields(output_state) if output_state else None,
-                "state_changes": state_changes,
-                "error": error
-            })
-            
-            # Add memory usage if profiling
-            if _enable_profiling:
-                try:
-                    import psutil
-                    # Get current process memory usage
-                    process = psutil.Process(os.getpid())
-                    memory_info = process.memory_info()
-                    trace_entry["memory_usage"] = memory_info.rss  # resident set size in bytes
-                except ImportError:
-                    pass
-                except Exception as mem_error:
-                    trace_logger.debug(f"Error getting memory usage: {mem_error}")
-            
-            # Add to trace history
-            add_to_trace_history(trace_entry)
+        _finish_node_trace(trace_entry, result)
+        return result
             
     return wrapper
 
@@ -533,11 +720,7 @@ def _extract_key_fields(state_dict: Dict[str, Any], max_depth: int = 2, max_item
     result = {}
     
     # List of critical fields - always include these if present
-    critical_fields = [
-        'task_name', 'error', 'done', 'kfm_action', 'status', 
-        'id', 'name', 'type', 'action', 'input', 'output', 'result',
-        'timestamp', 'success'
-    ]
+    critical_fields = _CRITICAL_FIELDS
     
     # First, extract critical fields
     for field in critical_fields:
@@ -656,6 +839,9 @@ def _identify_state_changes(old_state: Dict[str, Any], new_state: Dict[str, Any]
             
         current_path = f"{path}.{key}" if path else key
         
+        if key in new_state and new_state[key] is old_value:
+            # Shared subtree (see src.core.state_sharing): unchanged without comparing
+            continue
         if key not in new_state:
             # Key was removed
             changes[current_path] = {
@@ -0,0 +1,295 @@
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.core.component_executor import (
+    ComponentCancelledError,
+    ComponentExecutorPool,
+    ComponentQueueFullError,
+    ComponentTimeoutError,
+    ExecutorConfig,
+    current_cancellation_token,
+)
+from src.core.component_registry import ComponentRegistry
+from src.core.execution_engine import ExecutionEngine
+from src.core.metrics_feedback import MetricsFeedbackChannel
+from src.state_types import ActionType
+
+
+def cpu_component(params):
+    """Module-level so it can be pickled into a process pool."""
+    return {"total": sum(range(params["n"]))}, 0.9
+
+
+def sleepy(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+@pytest.fixture
+def pool():
+    pool = ComponentExecutorPool()
+    yield pool
+    pool.shutdown()
+
+
+class TestExecutorConfig:
+    def test_rejects_unknown_mode(self):
+        with pytest.raises(ValueError):
+            ExecutorConfig(mode="fiber")
+
+    def test_rejects_bad_limits(self):
+        with pytest.raises(ValueError):
+            ExecutorConfig(max_concurrency=0)
+
+
+class TestComponentExecutorPool:
+    @pytest.mark.asyncio
+    async def test_thread_mode_runs_off_loop_thread(self, pool):
+        loop_thread = threading.get_ident()
+        result = await pool.run("comp", lambda: threading.get_ident())
+        assert result != loop_thread
+        metrics = pool.metrics("comp")
+        assert metrics["completed"] == 1 and metrics["run_time_ewma"] is not None
+
+    @pytest.mark.asyncio
+    async def test_inline_mode_runs_on_loop_thread(self, pool):
+        pool.configure("comp", ExecutorConfig(mode="inline"))
+        assert await pool.run("comp", lambda: threading.get_ident()) == threading.get_ident()
+        assert pool.metrics("comp")["queue_wait_ewma"] == pytest.approx(0.0, abs=0.01)
+
+    @pytest.mark.asyncio
+    async def test_process_mode(self, pool):
+        pool.configure("cpu", ExecutorConfig(mode="process", max_concurrency=1))
+        assert await pool.run("cpu", cpu_component, {"n": 10}) == ({"total": 45}, 0.9)
+
+    @pytest.mark.asyncio
+    async def test_bulkhead_limits_concurrency_and_records_queue_wait(self, pool):
+        pool.configure("slow", ExecutorConfig(max_concurrency=2, max_queue_depth=10))
+        active, peak = 0, 0
+        lock = threading.Lock()
+
+        def work():
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.05)
+            with lock:
+                active -= 1
+
+        await asyncio.gather(*(pool.run("slow", work) for _ in range(6)))
+        metrics = pool.metrics("slow")
+        assert peak == 2
+        assert metrics["completed"] == 6
+        # The last pair waited for two earlier rounds
+        assert metrics["queue_wait_p99"] >= 0.08
+        assert metrics["running"] == 0 and metrics["queued"] == 0
+
+    @pytest.mark.asyncio
+    async def test_full_queue_rejects(self, pool):
+        pool.configure("slow", ExecutorConfig(max_concurrency=1, max_queue_depth=1))
+        release = threading.Event()
+        first = asyncio.ensure_future(pool.run("slow", release.wait))
+        second = asyncio.ensure_future(pool.run("slow", release.wait))
+        await asyncio.sleep(0)
+        assert pool.metrics("slow")["queued"] == 1
+        with pytest.raises(ComponentQueueFullError):
+            await pool.run("slow", release.wait)
+        release.set()
+        await asyncio.gather(first, second)
+        assert pool.metrics("slow")["rejected"] == 1
+
+    @pytest.mark.asyncio
+    async def test_slow_component_does_not_starve_others(self, pool):
+        pool.configure("slow", ExecutorConfig(max_concurrency=1, max_queue_depth=10))
+        release = threading.Event()
+        blocked = [asyncio.ensure_future(pool.run("slow", release.wait)) for _ in range(5)]
+        await asyncio.sleep(0)
+        assert await asyncio.wait_for(pool.run("fast", lambda: "done"), timeout=1) == "done"
+        release.set()
+        await asyncio.gather(*blocked)
+
+    @pytest.mark.asyncio
+    async def test_failures_are_counted_and_propagated(self, pool):
+        def broken():
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            await pool.run("comp", broken)
+        assert pool.metrics("comp")["failed"] == 1
+        assert pool.metrics("missing") == {}
+
+
+class TestTimeoutsAndCancellation:
+    @pytest.mark.asyncio
+    async def test_thread_timeout_replaces_hung_worker(self, pool):
+        pool.configure("hung", ExecutorConfig(max_concurrency=1, timeout=0.05))
+        release = threading.Event()
+        with pytest.raises(ComponentTimeoutError):
+            await pool.run("hung", release.wait)
+        # The lane got a fresh worker, so the next call is not stuck behind the hung one
+        assert await asyncio.wait_for(pool.run("hung", lambda: "ok"), timeout=1) == "ok"
+        metrics = pool.metrics("hung")
+        assert metrics["timeouts"] == 1 and metrics["workers_replaced"] == 1
+        assert metrics["abandoned_workers"] == 1
+        release.set()
+        await asyncio.sleep(0.05)
+        assert pool.metrics("hung")["abandoned_workers"] == 0
+
+    @pytest.mark.asyncio
+    async def test_cooperative_component_sees_cancellation(self, pool):
+        pool.configure("coop", ExecutorConfig(timeout=0.05))
+        stopped = threading.Event()
+
+        def cooperative():
+            token = current_cancellation_token()
+            try:
+                while True:
+                    token.raise_if_cancelled()
+                    time.sleep(0.005)
+            except ComponentCancelledError:
+                stopped.set()
+                raise
+
+        with pytest.raises(ComponentTimeoutError):
+            await pool.run("coop", cooperative)
+        assert stopped.wait(timeout=1)
+
+    @pytest.mark.asyncio
+    async def test_sustained_timeouts_are_bounded(self, pool):
+        pool.configure("hung", ExecutorConfig(max_concurrency=1, timeout=0.01, max_abandoned_workers=2))
+        release = threading.Event()
+        for _ in range(2):
+            with pytest.raises(ComponentTimeoutError):
+                await pool.run("hung", release.wait)
+        assert pool.metrics("hung")["abandoned_workers"] == 2
+        with pytest.raises(ComponentQueueFullError):
+            await pool.run("hung", release.wait)
+        release.set()
+        await asyncio.sleep(0.05)
+        assert await pool.run("hung", lambda: "recovered") == "recovered"
+
+    @pytest.mark.asyncio
+    async def test_no_abandoned_workers_allowed(self, pool):
+        pool.configure("hung", ExecutorConfig(max_concurrency=1, timeout=0.02, max_abandoned_workers=0))
+        release = threading.Event()
+        with pytest.raises(ComponentTimeoutError):
+            await pool.run("hung", release.wait)
+        # The hung worker is kept rather than replaced, so the next call waits behind it
+        with pytest.raises(ComponentTimeoutError):
+            await pool.run("hung", lambda: "ok")
+        metrics = pool.metrics("hung")
+        assert metrics["abandoned_workers"] == 0 and metrics["workers_replaced"] == 0
+        release.set()
+        await asyncio.sleep(0.05)
+        assert await pool.run("hung", lambda: "recovered") == "recovered"
+
+    @pytest.mark.asyncio
+    async def test_concurrent_timeouts_respect_abandoned_limit(self, pool):
+        pool.configure("hung", ExecutorConfig(max_concurrency=3, timeout=0.02, max_abandoned_workers=1))
+        release = threading.Event()
+        results = await asyncio.gather(*(pool.run("hung", release.wait) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(result, ComponentTimeoutError) for result in results)
+        assert pool.metrics("hung")["abandoned_workers"] == 1
+        release.set()
+
+    @pytest.mark.asyncio
+    async def test_task_cancellation_reclaims_worker(self, pool):
+        pool.configure("hung", ExecutorConfig(max_concurrency=1))
+        release = threading.Event()
+        task = asyncio.ensure_future(pool.run("hung", release.wait))
+        await asyncio.sleep(0.02)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert pool.metrics("hung")["cancelled"] == 1
+        assert await asyncio.wait_for(pool.run("hung", lambda: "ok"), timeout=1) == "ok"
+        release.set()
+
+    @pytest.mark.asyncio
+    async def test_process_timeout_terminates_worker(self, pool):
+        pool.configure("cpu", ExecutorConfig(mode="process", max_concurrency=1, timeout=0.5))
+        await pool.run("cpu", sleepy, 0)  # Warm up the worker process
+        start = time.perf_counter()
+        with pytest.raises(ComponentTimeoutError):
+            await pool.run("cpu", sleepy, 30)
+        assert await pool.run("cpu", sleepy, 0) == 0
+        assert time.perf_counter() - start < 10
+        assert pool.metrics("cpu")["abandoned_workers"] == 0
+
+    def test_invalid_timeout(self):
+        with pytest.raises(ValueError):
+            ExecutorConfig(timeout=0)
+
+
+class TestExecutionEngineExecutors:
+    @pytest.mark.asyncio
+    async def test_execute_uses_component_executor(self):
+        registry = MagicMock(spec=ComponentRegistry)
+        registry.get_default_component_key = MagicMock(return_value="cpu")
+        registry.list_components = MagicMock(return_value={"cpu": cpu_component})
+        registry.get_component = MagicMock(return_value=cpu_component)
+        pool = ComponentExecutorPool(component_configs={"cpu": ExecutorConfig(mode="process", max_concurrency=1)})
+        engine = ExecutionEngine(registry, executor_pool=pool)
+        try:
+            result = await engine.execute(ActionType.NO_ACTION, None, {"n": 100}, {})
+            assert result["status"] == "success"
+            assert result["output"] == {"total": 4950}
+            assert pool.metrics()["cpu"]["completed"] == 1
+        finally:
+            pool.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_timeout_surfaces_as_error_result_and_metric(self):
+        release = threading.Event()
+
+        def hung(params):
+            release.wait()
+            return {}, 1.0
+
+        registry = MagicMock(spec=ComponentRegistry)
+        registry.get_default_component_key = MagicMock(return_value="hung")
+        registry.list_components = MagicMock(return_value={"hung": hung})
+        registry.get_component = MagicMock(return_value=hung)
+        feedback = MagicMock(spec=MetricsFeedbackChannel)
+        engine = ExecutionEngine(registry, metrics_feedback=feedback)
+        engine.set_component_timeout("hung", 0.05)
+        result = await engine.execute(ActionType.NO_ACTION, None, {}, {})
+        release.set()
+        engine.executor_pool.shutdown()
+        assert result["status"] == "error"
+        assert result["error_type"] == "ComponentTimeoutError"
+        assert result["performance"]["timed_out"] == 1.0
+        feedback.submit.assert_called_once()
+        assert feedback.submit.call_args.kwargs["latency"] >= 0.05
+
+    @pytest.mark.asyncio
+    async def test_async_component_timeout(self):
+        async def slow(params):
+            await asyncio.sleep(10)
+
+        registry = MagicMock(spec=ComponentRegistry)
+        registry.get_default_component_key = MagicMock(return_value="slow")
+        registry.list_components = MagicMock(return_value={"slow": slow})
+        registry.get_component = MagicMock(return_value=slow)
+        engine = ExecutionEngine(registry)
+        engine.set_component_timeout("slow", 0.05)
+        result = await engine.execute(ActionType.NO_ACTION, None, {}, {})
+        assert result["error_type"] == "ComponentTimeoutError"
+
+    @pytest.mark.asyncio
+    async def test_close_shuts_down_component_executors(self):
+        registry = MagicMock(spec=ComponentRegistry)
+        registry.get_default_component_key = MagicMock(return_value="cpu")
+        registry.list_components = MagicMock(return_value={"cpu": cpu_component})
+        registry.get_component = MagicMock(return_value=cpu_component)
+        engine = ExecutionEngine(registry)
+        await engine.execute(ActionType.NO_ACTION, None, {"n": 10}, {})
+        executor = engine.executor_pool._lanes["cpu"].executor
+        engine.close()
+        assert executor._shutdown
+        assert engine.executor_pool.metrics() == {}
@@ -0,0 +1,111 @@
+import pytest
+
+from src.core.component_pruning import pareto_frontier, prune_components, estimate_tokens
+
+
+def _decide(requirements, components):
+    """Reference KFM rules: Marry (both) > Fuck (either) > Kill; tiebreak acc desc, latency asc, name."""
+    marry, fuck = [], []
+    for name, data in components.items():
+        acc, lat = data["accuracy"], data["latency"]
+        meets_acc = acc >= requirements["min_accuracy"]
+        meets_lat = lat <= requirements["max_latency"]
+        if meets_acc and meets_lat:
+            marry.append(((-acc, lat, name), name))
+        elif meets_acc or meets_lat:
+            fuck.append(((-acc, lat, name), name))
+    if marry:
+        return ("marry", min(marry)[1])
+    if fuck:
+        return ("fuck", min(fuck)[1])
+    return ("kill", None)
+
+
+class TestParetoFrontier:
+    def test_dominated_component_removed(self):
+        components = {
+            "fast_accurate": {"accuracy": 0.95, "latency": 50},
+            "slow_inaccurate": {"accuracy": 0.80, "latency": 120},
+        }
+        assert pareto_frontier(components) == ["fast_accurate"]
+
+    def test_tradeoff_components_kept(self):
+        components = {
+            "accurate": {"accuracy": 0.95, "latency": 200},
+            "fast": {"accuracy": 0.70, "latency": 20},
+            "balanced": {"accuracy": 0.85, "latency": 80},
+        }
+        assert set(pareto_frontier(components)) == {"accurate", "fast", "balanced"}
+
+    def test_exact_ties_are_all_kept(self):
+        components = {
+            "a": {"accuracy": 0.9, "latency": 50, "supports_reversibility": False},
+            "b": {"accuracy": 0.9, "latency": 50, "supports_reversibility": True},
+            "c": {"accuracy": 0.9, "latency": 60},
+        }
+        assert set(pareto_frontier(components)) == {"a", "b"}
+
+    def test_equal_latency_lower_accuracy_is_dominated(self):
+        components = {
+            "a": {"accuracy": 0.95, "latency": 50},
+            "b": {"accuracy": 0.90, "latency": 50},
+        }
+        assert pareto_frontier(components) == ["a"]
+
+    def test_components_with_missing_metrics_are_kept(self):
+        components = {
+            "a": {"accuracy": 0.95, "latency": 50},
+            "no_accuracy": {"latency": 500},
+        }
+        assert set(pareto_frontier(components)) == {"a", "no_accuracy"}
+
+
+class TestPruneComponents:
+    def test_active_component_always_retained(self):
+        components = {
+            "best": {"accuracy": 0.95, "latency": 50},
+            "current@1.0.0": {"accuracy": 0.80, "latency": 120},
+        }
+        pruned = prune_components(components, active_component="current")
+        assert set(pruned) == {"best", "current@1.0.0"}
+
+    def test_preserves_insertion_order(self):
+        components = {
+            "z": {"accuracy": 0.70, "latency": 10},
+            "a": {"accuracy": 0.95, "latency": 90},
+        }
+        assert list(prune_components(components)) == ["z", "a"]
+
+    def test_cap_keeps_decision_winner(self):
+        components = {f"c{i}": {"accuracy": 0.5 + i * 0.01, "latency": 10 + i * 5} for i in range(40)}
+        requirements = {"min_accuracy": 0.8, "max_latency": 170}
+        pruned = prune_components(components, requirements=requirements, max_components=3)
+        assert len(pruned) == 3
+        assert _decide(requirements, pruned) == _decide(requirements, components)
+
+    def test_cap_counts_active_component(self):
+        components = {f"c{i}": {"accuracy": 0.5 + i * 0.01, "latency": 10 + i * 5} for i in range(10)}
+        pruned = prune_components(components, requirements={"min_accuracy": 0.5, "max_latency": 100},
+                                  active_component="c0", max_components=2)
+        assert "c0" in pruned
+        assert len(pruned) == 2
+
+    @pytest.mark.parametrize("seed", range(25))
+    def test_decision_equivalence_on_random_fleets(self, seed):
+        import random
+        rng = random.Random(seed)
+        components = {
+            f"comp_{i}": {"accuracy": round(rng.uniform(0.5, 1.0), 2), "latency": rng.choice([10, 50, 80, 100, 120, 300])}
+            for i in range(rng.randint(1, 60))
+        }
+        requirements = {"min_accuracy": rng.choice([0.0, 0.8, 0.9, 0.95]), "max_latency": rng.choice([50, 100, 150])}
+        pruned = prune_components(components, requirements=requirements)
+        assert len(pruned) <= len(components)
+        assert _decide(requirements, pruned) == _decide(requirements, components)
+
+    def test_empty_input(self):
+        assert prune_components({}) == {}
+
+
+def test_estimate_tokens_uses_chars_per_token():
+    assert estimate_tokens("x" * 400) == 100
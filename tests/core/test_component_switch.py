@@ -0,0 +1,144 @@
+import asyncio
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.core.component_registry import ComponentRegistry
+from src.core.component_switch import SwitchConfig
+from src.core.discovery import ModuleMetadata
+from src.core.execution_engine import ExecutionEngine
+from src.core.metrics_feedback import MetricsFeedbackChannel
+from src.state_types import ActionType
+
+
+class ColdComponent:
+    """Records calls; the first call is the cold start."""
+
+    def __init__(self, name, fail=False):
+        self.name = name
+        self.fail = fail
+        self.calls = []
+
+    def __call__(self, params):
+        self.calls.append(params)
+        if self.fail:
+            raise RuntimeError(f"{self.name} is broken")
+        return {"served_by": self.name}, 0.9
+
+
+def _engine(**components):
+    registry = MagicMock(spec=ComponentRegistry)
+    registry.get_default_component_key = MagicMock(return_value="old")
+    registry.list_components = MagicMock(return_value=components)
+    registry.get_component = MagicMock(side_effect=components.get)
+    registry.set_default_component = MagicMock()
+    return ExecutionEngine(registry)
+
+
+class TestWarmSwitch:
+    @pytest.mark.asyncio
+    async def test_switch_without_config_is_instant(self):
+        old, new = ColdComponent("old"), ColdComponent("new")
+        engine = _engine(old=old, new=new)
+        result = await engine.execute(ActionType.MARRY, "new", {"q": 1}, {})
+        assert result["output"] == {"served_by": "new"}
+        assert "switch_latency" not in result["performance"]
+        assert new.calls == [{"q": 1}]
+
+    @pytest.mark.asyncio
+    async def test_warmup_runs_before_first_served_request(self):
+        old, new = ColdComponent("old"), ColdComponent("new")
+        engine = _engine(old=old, new=new)
+        engine.configure_switch("new", warmup_params={"warmup": True})
+        result = await engine.execute(ActionType.MARRY, "new", {"q": 1}, {})
+        assert new.calls == [{"warmup": True}, {"q": 1}]
+        assert result["output"] == {"served_by": "new"}
+        assert result["performance"]["switch_latency"] >= 0.0
+        report = engine.switch_reports[-1]
+        assert report.committed and report.previous == "old" and report.warmup_latency is not None
+
+    @pytest.mark.asyncio
+    async def test_failed_warmup_is_reported_but_switch_commits(self):
+        old, new = ColdComponent("old"), ColdComponent("new", fail=True)
+        engine = _engine(old=old, new=new)
+        engine.configure_switch("new", warmup_params={})
+        await engine.execute(ActionType.FUCK, "new", {}, {})
+        report = engine.switch_reports[-1]
+        assert report.committed
+        assert report.warmup_error.startswith("RuntimeError")
+
+    @pytest.mark.asyncio
+    async def test_shadow_execution_defers_commit(self):
+        old, new = ColdComponent("old"), ColdComponent("new")
+        engine = _engine(old=old, new=new)
+        feedback = MagicMock(spec=MetricsFeedbackChannel)
+        engine.set_metrics_feedback(feedback)
+        engine.configure_switch("new", shadow_requests=2)
+
+        first = await engine.execute(ActionType.MARRY, "new", {"q": 1}, {})
+        assert first["output"] == {"served_by": "old"}  # Previous component keeps serving
+        assert engine.pending_switch is not None
+        await asyncio.sleep(0.05)
+        assert engine.get_active_component_key() == "old"
+
+        second = await engine.execute(ActionType.NO_ACTION, None, {"q": 2}, {})
+        assert second["output"] == {"served_by": "old"}
+        await asyncio.sleep(0.05)
+        assert engine.get_active_component_key() == "new"
+        assert engine.pending_switch is None
+        assert new.calls == [{"q": 1}, {"q": 2}]
+        report = engine.switch_reports[-1]
+        assert report.committed and report.shadow_runs == 2 and report.switch_latency > 0
+        assert any(call.args[0] == "new" for call in feedback.submit.call_args_list)
+
+        third = await engine.execute(ActionType.NO_ACTION, None, {"q": 3}, {})
+        assert third["output"] == {"served_by": "new"}
+
+    @pytest.mark.asyncio
+    async def test_memoized_requests_are_shadowed(self):
+        old, new = ColdComponent("old"), ColdComponent("new")
+        engine = _engine(old=old, new=new)
+        engine.enable_memoization("old", "1.0.0")
+        await engine.execute(ActionType.NO_ACTION, None, {"q": 1}, {})  # Fills the cache
+        engine.configure_switch("new", shadow_requests=2)
+
+        first = await engine.execute(ActionType.MARRY, "new", {"q": 1}, {})
+        second = await engine.execute(ActionType.NO_ACTION, None, {"q": 1}, {})
+        assert first["performance"]["cache_hit"] == second["performance"]["cache_hit"] == 1.0
+        assert old.calls == [{"q": 1}]
+        await asyncio.sleep(0.05)
+        assert engine.get_active_component_key() == "new"
+        assert new.calls == [{"q": 1}, {"q": 1}]
+        assert engine.switch_reports[-1].committed
+
+    @pytest.mark.asyncio
+    async def test_new_switch_supersedes_pending_one(self):
+        old, new, other = ColdComponent("old"), ColdComponent("new"), ColdComponent("other")
+        engine = _engine(old=old, new=new, other=other)
+        engine.configure_switch("new", shadow_requests=5)
+        await engine.execute(ActionType.MARRY, "new", {}, {})
+        result = await engine.execute(ActionType.MARRY, "other", {}, {})
+        assert result["output"] == {"served_by": "other"}
+        assert engine.pending_switch is None
+        assert engine.switch_reports[0].superseded
+
+    @pytest.mark.asyncio
+    async def test_unknown_target_is_an_error(self):
+        engine = _engine(old=ColdComponent("old"))
+        engine.configure_switch("missing", warmup_params={})
+        result = await engine.execute(ActionType.MARRY, "missing", {}, {})
+        assert result["status"] == "error"
+        assert engine.get_active_component_key() == "old"
+
+    def test_configure_from_module_metadata(self):
+        engine = _engine(old=ColdComponent("old"))
+        meta = ModuleMetadata(module_name="new", version="1.0.0", entry_point="new",
+                              source_file_path=Path("new.module.yaml"), cached_at_mtime=0.0,
+                              warmup_params={"text": "warm"})
+        engine.configure_switch_for_module(meta, shadow_requests=3)
+        assert engine._switch_configs["new"] == SwitchConfig(warmup_params={"text": "warm"}, shadow_requests=3)
+
+    def test_invalid_shadow_requests(self):
+        with pytest.raises(ValueError):
+            SwitchConfig(shadow_requests=-1)
@@ -0,0 +1,125 @@
+import time
+
+import pytest
+from langgraph.graph import END, StateGraph
+
+from src.core.control_loop import (
+    LOOP_NODE, STOP_CONVERGED, STOP_ERROR, STOP_MAX_ITERATIONS, STOP_REQUESTED,
+    ControlLoop, ControlLoopConfig,
+)
+from src.state_types import KFMAgentState
+
+
+def build_graph(loop, decisions, fail_at=None):
+    """monitor -> decide -> reflect -> loop -> monitor, with scripted decisions."""
+    calls = {"monitor": 0}
+
+    async def monitor(state):
+        calls["monitor"] += 1
+        return {}
+
+    async def decide(state):
+        index = min(state.get("loop_iteration") or 0, len(decisions) - 1)
+        update = {"kfm_action": {"action": decisions[index], "component": "c"}}
+        if fail_at is not None and (state.get("loop_iteration") or 0) == fail_at:
+            update["error"] = "planner failed"
+        return update
+
+    async def reflect(state):
+        return {"reflection_output": "ok", "done": True}
+
+    builder = StateGraph(KFMAgentState)
+    builder.add_node("monitor", monitor)
+    builder.add_node("decide", decide)
+    builder.add_node("reflect", reflect)
+    builder.add_node(LOOP_NODE, loop.runnable)
+    builder.set_entry_point("monitor")
+    builder.add_edge("monitor", "decide")
+    builder.add_edge("decide", "reflect")
+    builder.add_edge("reflect", LOOP_NODE)
+    builder.add_conditional_edges(LOOP_NODE, loop.route, {"monitor": "monitor", "end": END})
+    return builder.compile(), calls
+
+
+def start_state():
+    return {"input": {}, "task_name": "t", "loop_iteration_started_at": time.perf_counter()}
+
+
+class TestControlLoop:
+    @pytest.mark.asyncio
+    async def test_stops_on_convergence(self):
+        loop = ControlLoop(ControlLoopConfig(max_iterations=50, stable_iterations=2))
+        app, calls = build_graph(loop, ["Marry", "Fuck", "Marry", "Marry", "Marry", "Kill"])
+        final = await app.ainvoke(start_state(), config=loop.graph_config())
+        # Decisions Marry, Fuck, Marry, Marry, Marry: unchanged twice after the third
+        assert final["loop_stop_reason"] == STOP_CONVERGED
+        assert final["loop_iteration"] == 5 and calls["monitor"] == 5
+        assert final["done"] is True
+        assert final["loop_metrics"]["iterations"] == 5
+
+    @pytest.mark.asyncio
+    async def test_iteration_budget_beyond_default_recursion_limit(self):
+        loop = ControlLoop(ControlLoopConfig(max_iterations=40, stable_iterations=None))
+        app, calls = build_graph(loop, ["Marry"])
+        final = await app.ainvoke(start_state(), config=loop.graph_config())
+        assert final["loop_stop_reason"] == STOP_MAX_ITERATIONS
+        assert calls["monitor"] == 40
+
+    @pytest.mark.asyncio
+    async def test_stops_on_error(self):
+        loop = ControlLoop(ControlLoopConfig(max_iterations=10, stable_iterations=None))
+        app, _ = build_graph(loop, ["Marry", "Fuck"], fail_at=2)
+        final = await app.ainvoke(start_state(), config=loop.graph_config())
+        assert final["loop_stop_reason"] == STOP_ERROR
+        assert final["loop_iteration"] == 3
+
+    @pytest.mark.asyncio
+    async def test_errors_are_cleared_between_iterations_when_not_stopping(self):
+        loop = ControlLoop(ControlLoopConfig(max_iterations=3, stable_iterations=None, stop_on_error=False))
+        app, _ = build_graph(loop, ["Marry"], fail_at=0)
+        final = await app.ainvoke(start_state(), config=loop.graph_config())
+        assert final["loop_stop_reason"] == STOP_MAX_ITERATIONS
+        assert final["error"] is None
+
+    @pytest.mark.asyncio
+    async def test_external_stop(self):
+        loop = ControlLoop(ControlLoopConfig(max_iterations=10, stable_iterations=None))
+        loop.stop()
+        app, calls = build_graph(loop, ["Marry"])
+        final = await app.ainvoke(start_state(), config=loop.graph_config())
+        assert final["loop_stop_reason"] == STOP_REQUESTED and calls["monitor"] == 1
+        loop.reset()
+        final = await app.ainvoke(start_state(), config=loop.graph_config())
+        assert final["loop_stop_reason"] == STOP_MAX_ITERATIONS
+        assert loop.metrics()["stop_reasons"] == {STOP_REQUESTED: 1, STOP_MAX_ITERATIONS: 1}
+
+    @pytest.mark.asyncio
+    async def test_cadence_limits_loop_rate(self):
+        loop = ControlLoop(ControlLoopConfig(max_iterations=4, min_interval=0.05, stable_iterations=None))
+        app, _ = build_graph(loop, ["Marry"])
+        start = time.perf_counter()
+        await app.ainvoke(start_state(), config=loop.graph_config())
+        assert time.perf_counter() - start >= 3 * 0.05
+        metrics = loop.metrics()
+        assert metrics["iteration_period_seconds_ewma"] >= 0.05
+        assert metrics["loop_rate_hz"] <= 20
+        assert metrics["iteration_seconds_p50"] < 0.05  # Work time, pacing excluded
+
+    def test_sync_invoke(self):
+        loop = ControlLoop(ControlLoopConfig(max_iterations=3, min_interval=0.01, stable_iterations=None))
+        builder = StateGraph(KFMAgentState)
+        builder.add_node("monitor", lambda state: {})
+        builder.add_node("reflect", lambda state: {"done": True})
+        builder.add_node(LOOP_NODE, loop.runnable)
+        builder.set_entry_point("monitor")
+        builder.add_edge("monitor", "reflect")
+        builder.add_edge("reflect", LOOP_NODE)
+        builder.add_conditional_edges(LOOP_NODE, loop.route, {"monitor": "monitor", "end": END})
+        final = builder.compile().invoke(start_state(), config=loop.graph_config())
+        assert final["loop_stop_reason"] == STOP_MAX_ITERATIONS and final["loop_iteration"] == 3
+        assert loop.metrics()["iteration_period_seconds_ewma"] >= 0.01
+
+    def test_invalid_config(self):
+        for kwargs in ({"max_iterations": 0}, {"min_interval": -1}, {"stable_iterations": 0}):
+            with pytest.raises(ValueError):
+                ControlLoopConfig(**kwargs)
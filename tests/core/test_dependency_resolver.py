@@ -1,4 +1,5 @@
 # tests/core/test_dependency_resolver.py
+import random
 import pytest
 from pathlib import Path
 import time # For dummy mtime
@@ -280,4 +281,72 @@ class TestDependencyResolver:
         assert utils_index < ui_index       
         # App depends on Framework and UI, so Framework < App and UI < App
         assert framework_index < app_index  
-        assert ui_index < app_index 
\ No newline at end of file
+        assert ui_index < app_index 
+
+
+class TestIncrementalResolution:
+
+    @staticmethod
+    def _chain(length):
+        """M0 <- M1 <- ... (each Mi depends on M(i-1)), plus an unrelated module."""
+        available = {"M0": {"1.0": create_meta("M0", "1.0")}, "Other": {"1.0": create_meta("Other", "1.0")}}
+        for i in range(1, length):
+            available[f"M{i}"] = {"1.0": create_meta(f"M{i}", "1.0", deps=[(f"M{i-1}", ">=1.0")])}
+        return available
+
+    def test_unchanged_input_reuses_result(self, resolver: DependencyResolver):
+        available = self._chain(5)
+        first = resolver.resolve(available)
+        assert resolver.last_reselected == 6
+        assert resolver.resolve(available) == first
+        assert resolver.last_reselected == 6  # Nothing was re-selected on the second call
+
+    def test_new_version_reselects_only_dependers(self, resolver: DependencyResolver):
+        available = self._chain(50)
+        resolver.resolve(available)
+        available["M10"]["1.1"] = create_meta("M10", "1.1", deps=[("M9", ">=1.0")])
+        resolved = resolver.resolve(available)
+        # The new version itself plus M11, which declares a dependency on M10
+        assert resolver.last_reselected == 2
+        assert ("M10", "1.1") in [(m.module_name, m.version) for m in resolved]
+        assert resolved == DependencyResolver().resolve(available)
+
+    def test_incremental_matches_fresh_resolution(self, resolver: DependencyResolver):
+        rng = random.Random(7)
+        available = {}
+        for step in range(200):
+            name = f"N{rng.randrange(30)}"
+            if available.get(name) and rng.random() < 0.3:
+                del available[name][rng.choice(list(available[name]))]
+                if not available[name]:
+                    del available[name]
+            else:
+                version = f"1.{rng.randrange(5)}"
+                lower = [n for n in available if int(n[1:]) < int(name[1:])]  # Acyclic by construction
+                deps = [(dep, ">=1.0") for dep in rng.sample(lower, min(len(lower), rng.randrange(3)))]
+                available.setdefault(name, {})[version] = create_meta(name, version, deps=deps)
+            snapshot = {n: dict(v) for n, v in available.items()}
+            try:
+                expected = DependencyResolver().resolve(snapshot)
+            except MissingDependencyError:
+                with pytest.raises(MissingDependencyError):
+                    resolver.resolve(snapshot)
+                continue
+            assert resolver.resolve(snapshot) == expected
+
+    def test_cycle_and_missing_dependency_detected_incrementally(self, resolver: DependencyResolver):
+        available = self._chain(5)
+        resolver.resolve(available)
+
+        available["M0"] = {"1.0": create_meta("M0", "1.0", deps=[("M4", "==1.0")])}
+        with pytest.raises(CircularDependencyError) as excinfo:
+            resolver.resolve(available)
+        assert {name for name, _ in excinfo.value.cycle} == {"M0", "M1", "M2", "M3", "M4"}
+
+        available["M0"] = {"1.0": create_meta("M0", "1.0")}
+        assert len(resolver.resolve(available)) == 6
+
+        del available["M2"]
+        with pytest.raises(MissingDependencyError) as excinfo:
+            resolver.resolve(available)
+        assert excinfo.value.requiring_module == ("M3", "1.0")
@@ -1,3 +1,5 @@
+import json
+import os
 import pytest
 import yaml
 from pathlib import Path
@@ -150,6 +152,25 @@ class TestModuleDiscoveryService:
         assert "Error discovering module from file" in captured.out
         assert "Field 'version' must be a non-empty string" in captured.out
 
+    def test_batch_entry_point_fields(self, discovery_service: ModuleDiscoveryService, temp_plugin_dir: Path):
+        content = {**VALID_MODULE_MINIMAL_CONTENT, "batch_entry_point": "run_batch", "max_batch_size": 32, "max_batch_wait_ms": 2}
+        create_module_file(temp_plugin_dir, "batched.module.yaml", content)
+        metadata = discovery_service.discover_modules([str(temp_plugin_dir)])["MinimalModule"]
+        assert metadata.batch_entry_point == "run_batch"
+        assert metadata.max_batch_size == 32
+        assert metadata.max_batch_wait_ms == 2.0
+
+    def test_batch_fields_default_to_unbatched(self, discovery_service: ModuleDiscoveryService, temp_plugin_dir: Path):
+        create_module_file(temp_plugin_dir, "minimal.module.yaml", VALID_MODULE_MINIMAL_CONTENT)
+        metadata = discovery_service.discover_modules([str(temp_plugin_dir)])["MinimalModule"]
+        assert metadata.batch_entry_point is None
+
+    def test_invalid_max_batch_size(self, discovery_service: ModuleDiscoveryService, temp_plugin_dir: Path, capsys):
+        content = {**VALID_MODULE_MINIMAL_CONTENT, "batch_entry_point": "run_batch", "max_batch_size": 0}
+        create_module_file(temp_plugin_dir, "bad_batch.module.yaml", content)
+        assert discovery_service.discover_modules([str(temp_plugin_dir)]) == {}
+        assert "'max_batch_size' must be a positive integer" in capsys.readouterr().out
+
     def test_empty_yaml_file_is_skipped(self, discovery_service: ModuleDiscoveryService, temp_plugin_dir: Path, capsys):
         module_file_path = temp_plugin_dir / "empty.module.yaml"
         module_file_path.write_text("") # Create an empty file
@@ -285,4 +306,71 @@ class TestModuleDiscoveryService:
         assert f"Error discovering module from file {invalid_file_path}: Missing required field 'module_name'" not in captured.out
         # The following was removed as it's covered by the more specific warning above, and an "Error discovering..." shouldn't occur if it skips.
         # assert "Error discovering module from file" in captured.out # For the invalid one (REMOVED)
-        assert f"Missing required field 'module_name' in {invalid_file_path}" not in captured.out 
\ No newline at end of file
+        assert f"Missing required field 'module_name' in {invalid_file_path}" not in captured.out 
+
+class TestDiscoveryCachePersistence:
+
+    def test_persisted_cache_skips_parsing_in_new_instance(self, temp_plugin_dir: Path, tmp_path: Path):
+        create_module_file(temp_plugin_dir, "persist.module.yaml", VALID_MODULE_CONTENT)
+        cache_file = tmp_path / "discovery.cache"
+        first = ModuleDiscoveryService(cache_path=cache_file).discover_modules([str(temp_plugin_dir)])
+        assert cache_file.is_file()
+
+        service = ModuleDiscoveryService(cache_path=cache_file)
+        with patch.object(service, '_parse_yaml_file', wraps=service._parse_yaml_file) as mock_parse:
+            second = service.discover_modules([str(temp_plugin_dir)])
+            mock_parse.assert_not_called()
+        assert second == first
+
+    def test_size_change_with_same_mtime_invalidates(self, discovery_service: ModuleDiscoveryService, temp_plugin_dir: Path):
+        module_file = create_module_file(temp_plugin_dir, "size.module.yaml", VALID_MODULE_CONTENT)
+        discovery_service.discover_modules([str(temp_plugin_dir)])
+        original_stat = module_file.stat()
+        create_module_file(temp_plugin_dir, "size.module.yaml", {**VALID_MODULE_CONTENT, "version": "1.0.10"})
+        os.utime(module_file, ns=(original_stat.st_atime_ns, original_stat.st_mtime_ns))
+        assert discovery_service.discover_modules([str(temp_plugin_dir)])["TestModule1"].version == "1.0.10"
+
+    def test_incompatible_or_corrupt_cache_file_is_ignored(self, temp_plugin_dir: Path, tmp_path: Path, capsys):
+        create_module_file(temp_plugin_dir, "corrupt.module.yaml", VALID_MODULE_CONTENT)
+        cache_file = tmp_path / "discovery.cache"
+        cache_file.write_bytes(b"not a pickle")
+        discovered = ModuleDiscoveryService(cache_path=cache_file).discover_modules([str(temp_plugin_dir)])
+        assert "TestModule1" in discovered
+        assert "Could not read module cache" in capsys.readouterr().out
+        assert ModuleDiscoveryService(cache_path=cache_file)._path_index  # Rewritten with a valid payload
+
+    def test_cache_file_is_json_and_keeps_lossy_entries_out(self, temp_plugin_dir: Path, tmp_path: Path):
+        create_module_file(temp_plugin_dir, "persist.module.yaml", VALID_MODULE_CONTENT)
+        create_module_file(temp_plugin_dir, "dated.module.yaml",
+                           {**VALID_MODULE_CONTENT, "module_name": "Dated", "warmup_params": {1: "int key"}})
+        cache_file = tmp_path / "discovery.cache"
+        first = ModuleDiscoveryService(cache_path=cache_file).discover_modules([str(temp_plugin_dir)])
+        payload = json.loads(cache_file.read_text())
+        assert [Path(path).name for path in payload["entries"]] == ["persist.module.yaml"]
+
+        service = ModuleDiscoveryService(cache_path=cache_file)
+        with patch.object(service, '_parse_yaml_file', wraps=service._parse_yaml_file) as mock_parse:
+            second = service.discover_modules([str(temp_plugin_dir)])
+            assert mock_parse.call_count == 1  # Only the entry JSON could not represent
+        assert second == first
+        assert second["Dated"].warmup_params == {1: "int key"}
+
+    def test_deleted_file_is_pruned(self, discovery_service: ModuleDiscoveryService, temp_plugin_dir: Path):
+        module_file = create_module_file(temp_plugin_dir, "gone.module.yaml", VALID_MODULE_CONTENT)
+        discovery_service.discover_modules([str(temp_plugin_dir)])
+        module_file.unlink()
+        assert discovery_service.discover_modules([str(temp_plugin_dir)]) == {}
+        assert "TestModule1" not in discovery_service._cache
+        assert not discovery_service._path_index
+
+    def test_parallel_parsing_matches_inline_parsing(self, temp_plugin_dir: Path, capsys):
+        for i in range(6):
+            create_module_file(temp_plugin_dir, f"mod{i}.module.yaml", {**VALID_MODULE_MINIMAL_CONTENT, "module_name": f"Mod{i}"})
+        create_module_file(temp_plugin_dir, "malformed.module.yaml", MALFORMED_YAML_CONTENT)
+
+        inline = ModuleDiscoveryService(parse_workers=1).discover_modules([str(temp_plugin_dir)])
+        inline_out = capsys.readouterr().out
+        parallel = ModuleDiscoveryService(parse_workers=2, parallel_threshold=2).discover_modules([str(temp_plugin_dir)])
+        parallel_out = capsys.readouterr().out
+        assert parallel == inline and len(parallel) == 6
+        assert "Error parsing YAML file" in inline_out and "Error parsing YAML file" in parallel_out
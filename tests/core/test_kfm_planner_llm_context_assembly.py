@@ -0,0 +1,173 @@
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock, AsyncMock, patch
+
+import pytest
+
+from src.core.kfm_planner_llm import KFMPlannerLlm, KFMDecision
+from src.core.component_registry import ComponentRegistry
+from src.core.memory.chroma_manager import ChromaMemoryManager
+from src.core.run_scheduler import CapacityLimiter
+
+
+@pytest.fixture
+def offline_llm_env(monkeypatch):
+    """Only an OpenAI key is configured; the client is never called because invoke is patched."""
+    monkeypatch.delenv("CEREBRAS_API_KEY", raising=False)
+    monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+
+
+@pytest.fixture
+def memories():
+    return [
+        {"id": "m1", "document": "Married comp_a", "metadata": {"kfm_action_taken": "Marry", "outcome_success": "True"}, "distance": 0.2},
+    ]
+
+
+@pytest.fixture
+def memory_manager(memories):
+    manager = MagicMock(spec=ChromaMemoryManager)
+    manager.retrieve_memories.return_value = memories
+    return manager
+
+
+@pytest.fixture
+def planner(offline_llm_env, memory_manager, tmp_path):
+    planner = KFMPlannerLlm(
+        component_registry=MagicMock(spec=ComponentRegistry),
+        memory_manager=memory_manager,
+        snapshot_storage_path=str(tmp_path / "snapshots"),
+    )
+    planner.ecm = None
+    planner.snapshot_service = MagicMock()
+    planner.snapshot_service.take_snapshot = AsyncMock(return_value="snap-1")
+    planner.execution_chain = MagicMock()
+    return planner
+
+
+TASK_REQUIREMENTS = {"min_accuracy": 0.8, "max_latency": 100}
+COMPONENTS = {
+    "comp_a": {"accuracy": 0.9, "latency": 50},
+    "comp_b": {"accuracy": 0.7, "latency": 150},
+}
+
+
+@pytest.mark.asyncio
+async def test_memories_retrieved_once_and_shared(planner, memory_manager):
+    decision = KFMDecision(action="Marry", component="comp_a", reasoning="meets both", confidence=0.9)
+    with patch.object(planner.execution_chain, "invoke", return_value=decision) as mock_invoke:
+        result = await planner.decide_kfm_action("task", TASK_REQUIREMENTS, COMPONENTS)
+
+    assert result["action"] == "Marry"
+    assert memory_manager.retrieve_memories.call_count == 1
+    assert memory_manager.retrieve_memories.call_args.kwargs["n_results"] == planner.max_memories_to_retrieve
+
+    snapshot_state = planner.snapshot_service.take_snapshot.call_args_list[0].kwargs["kfm_agent_state"]
+    assert snapshot_state["retrieved_memories"][0]["id"] == "m1"
+    chain_input = mock_invoke.call_args.args[0]
+    assert "Married comp_a" in chain_input["formatted_memories"]
+
+
+@pytest.mark.asyncio
+async def test_stage_timings_reported(planner):
+    decision = KFMDecision(action="Marry", component="comp_a", reasoning="meets both", confidence=0.9)
+    with patch.object(planner.execution_chain, "invoke", return_value=decision):
+        await planner.decide_kfm_action("task", TASK_REQUIREMENTS, COMPONENTS)
+
+    timings = planner.last_decision_timings
+    for stage in ("memory_retrieval", "component_formatting", "pre_decision_snapshot",
+                  "context_assembly", "llm_invocation", "total"):
+        assert stage in timings
+        assert timings[stage] >= 0.0
+
+
+@pytest.mark.asyncio
+async def test_slow_retrieval_overlaps_with_formatting(planner, memory_manager, memories):
+    def slow_retrieve(**kwargs):
+        time.sleep(0.2)
+        return memories
+
+    memory_manager.retrieve_memories.side_effect = slow_retrieve
+    decision = KFMDecision(action="Marry", component="comp_a", reasoning="meets both", confidence=0.9)
+    with patch.object(planner.execution_chain, "invoke", return_value=decision):
+        await planner.decide_kfm_action("task", TASK_REQUIREMENTS, COMPONENTS)
+
+    timings = planner.last_decision_timings
+    # Assembly is bounded by the slowest branch, not the sum of all branches
+    assert timings["context_assembly"] < timings["memory_retrieval"] + timings["component_formatting"] + 0.15
+
+
+@pytest.mark.asyncio
+async def test_memory_failure_does_not_block_decision(planner, memory_manager):
+    memory_manager.retrieve_memories.side_effect = RuntimeError("chroma down")
+    decision = KFMDecision(action="Marry", component="comp_a", reasoning="meets both", confidence=0.9)
+    with patch.object(planner.execution_chain, "invoke", return_value=decision) as mock_invoke:
+        result = await planner.decide_kfm_action("task", TASK_REQUIREMENTS, COMPONENTS)
+
+    assert result["action"] == "Marry"
+    assert mock_invoke.call_args.args[0]["formatted_memories"] == "Error retrieving past experiences."
+    planner.snapshot_service.take_snapshot.assert_awaited()
+
+
+@pytest.mark.asyncio
+async def test_malformed_components_map_to_kill(planner):
+    # Version history entries without a 'version' key make component formatting fail
+    malformed = {"comp_a": [{"performance_metrics": {"accuracy": 0.9}}]}
+    with patch.object(planner.execution_chain, "invoke") as mock_invoke:
+        result = await planner.decide_kfm_action("task", TASK_REQUIREMENTS, malformed)
+
+    assert result["action"] == "Kill"
+    assert result["error"]
+    mock_invoke.assert_not_called()
+    assert "total" in planner.last_decision_timings
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("requirements, components, reasoning", [
+    ({"min_accuracy": 0.8}, COMPONENTS, "missing requirements"),
+    ({}, COMPONENTS, "missing requirements"),
+    (TASK_REQUIREMENTS, {}, "no components"),
+])
+async def test_missing_inputs_follow_the_prompt_kill_rules(planner, requirements, components, reasoning):
+    result = await planner.decide_kfm_action("task", requirements, components)
+    assert (result["action"], result.get("component"), result["reasoning"]) == ("Kill", None, reasoning)
+    assert result.get("error") is None
+    planner.execution_chain.invoke.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_chain_runs_on_the_configured_executor(planner):
+    from concurrent.futures import ThreadPoolExecutor
+    decision = KFMDecision(action="Marry", component="comp_a", reasoning="meets both", confidence=0.9)
+    threads = []
+    planner.execution_chain.invoke.side_effect = lambda _: threads.append(threading.current_thread().name) or decision
+    planner.llm_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="planner-llm")
+    try:
+        result = await planner.decide_kfm_action("task", TASK_REQUIREMENTS, COMPONENTS)
+    finally:
+        planner.llm_executor.shutdown()
+    assert result["action"] == "Marry"
+    assert threads and threads[0].startswith("planner-llm")
+
+
+@pytest.mark.asyncio
+async def test_llm_limiter_bounds_concurrent_chain_calls(planner):
+    planner.llm_limiter = CapacityLimiter("llm", 1)
+    active = []
+    peak = []
+
+    def slow_invoke(inputs):
+        active.append(1)
+        peak.append(len(active))
+        time.sleep(0.05)
+        active.pop()
+        return KFMDecision(action="Marry", component="comp_a", reasoning="meets both", confidence=0.9)
+
+    with patch.object(planner.execution_chain, "invoke", side_effect=slow_invoke):
+        results = await asyncio.gather(*(planner.decide_kfm_action("task", TASK_REQUIREMENTS, COMPONENTS) for _ in range(3)))
+
+    assert [result["action"] for result in results] == ["Marry"] * 3
+    assert max(peak) == 1
+    assert planner.llm_limiter.peak_waiting >= 1
@@ -0,0 +1,56 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+# Heavy SDKs that must only load once a planner builds the matching provider tier
+LAZY_MODULES = (
+    "openai",
+    "httpx",
+    "langchain_openai",
+    "langchain_cerebras",
+    "langchain_google_genai",
+    "google.generativeai",
+    "chromadb",
+    "sentence_transformers",
+)
+
+# Generous enough for a cold CI worker; eager provider imports took several seconds
+IMPORT_BUDGET_SECONDS = 3.0
+
+
+def _importtime(module: str) -> dict:
+    """Runs `python -X importtime -c 'import <module>'` and returns {module: cumulative_seconds}."""
+    env = dict(os.environ)
+    env.pop("PYTHONPROFILEIMPORTTIME", None)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, self_us, cumulative_us, name = (part.strip() for part in line.replace("import time:", "|", 1).split("|"))
+        cumulative[name] = int(cumulative_us) / 1_000_000
+    return cumulative
+
+
+@pytest.fixture(scope="module")
+def planner_import_times():
+    return _importtime("src.core.kfm_planner_llm")
+
+
+def test_provider_sdks_not_imported(planner_import_times):
+    loaded = [name for name in LAZY_MODULES if name in planner_import_times]
+    assert loaded == []
+
+
+def test_import_within_budget(planner_import_times):
+    assert planner_import_times["src.core.kfm_planner_llm"] < IMPORT_BUDGET_SECONDS
@@ -0,0 +1,170 @@
+import asyncio
+import json
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from src.core.component_registry import ComponentRegistry
+from src.core.kfm_llm_exceptions import KfmConfigurationError, KfmInvocationError
+from src.core.kfm_planner_llm import KFMPlannerLlm
+from src.core.local_chat_model import (
+    LocalKfmChatModel,
+    parse_kfm_prompt,
+    prompt_hash,
+    rule_based_kfm_decision,
+)
+
+REQUIREMENTS = {"min_accuracy": 0.8, "max_latency": 100}
+COMPONENTS = {
+    "comp_a": {"accuracy": 0.9, "latency": 50, "supports_reversibility": True},
+    "comp_b": {"accuracy": 0.95, "latency": 200, "supports_reversibility": False},
+}
+
+
+def _messages(requirements=REQUIREMENTS, components=COMPONENTS, system="system prompt"):
+    human = (f"Task: t\nMin Accuracy: {requirements['min_accuracy']}\nMax Latency: {requirements['max_latency']}\n"
+             f"Components:\n{json.dumps(components)}")
+    return [SystemMessage(content=system), HumanMessage(content=human)]
+
+
+class TestRuleBasedDecision:
+    def test_marry_fuck_kill(self):
+        assert rule_based_kfm_decision(REQUIREMENTS, COMPONENTS)["action"] == "Marry"
+        fuck = rule_based_kfm_decision(REQUIREMENTS, {"comp_b": COMPONENTS["comp_b"]})
+        assert (fuck["action"], fuck["component"]) == ("Fuck", "comp_b")
+        kill = rule_based_kfm_decision(REQUIREMENTS, {"slow": {"accuracy": 0.1, "latency": 500}})
+        assert (kill["action"], kill["component"]) == ("Kill", None)
+
+    def test_reversibility_breaks_exact_ties(self):
+        components = {"a": {"accuracy": 0.9, "latency": 50}, "b": {"accuracy": 0.9, "latency": 50, "supports_reversibility": True}}
+        assert rule_based_kfm_decision(REQUIREMENTS, components)["component"] == "b"
+
+    def test_parse_prompt_round_trip(self):
+        requirements, components = parse_kfm_prompt(_messages()[1].content)
+        assert requirements == {"min_accuracy": 0.8, "max_latency": 100.0}
+        assert components == COMPONENTS
+
+
+class TestModes:
+    def test_rules_mode_returns_decision_json(self):
+        model = LocalKfmChatModel(mode="rules")
+        decision = json.loads(model.invoke(_messages()).content)
+        assert decision["action"] == "Marry"
+        assert decision["component"] == "comp_a"
+
+    def test_replay_returns_recording(self):
+        model = LocalKfmChatModel(mode="replay")
+        model.add_recording(_messages(), '{"action": "Kill", "component": null, "reasoning": "r", "confidence": 0.5}')
+        assert json.loads(model.invoke(_messages()).content)["action"] == "Kill"
+
+    def test_replay_key_ignores_system_prompt(self):
+        assert prompt_hash(_messages(system="cerebras")) == prompt_hash(_messages(system="default"))
+
+    def test_replay_miss_raises_or_falls_back(self):
+        with pytest.raises(KfmInvocationError):
+            LocalKfmChatModel(mode="replay").invoke(_messages())
+        fallback = LocalKfmChatModel(mode="replay", replay_miss_fallback_to_rules=True)
+        assert json.loads(fallback.invoke(_messages()).content)["action"] == "Marry"
+
+    def test_record_then_replay_from_file(self, tmp_path):
+        path = str(tmp_path / "recordings.json")
+        delegate = FakeListChatModel(responses=['{"action": "Fuck", "component": "comp_b", "reasoning": "r", "confidence": 0.7}'])
+        recorder = LocalKfmChatModel(mode="record", delegate=delegate, recordings_path=path)
+        recorder.invoke(_messages())
+        assert recorder.flush_recordings()
+
+        replayer = LocalKfmChatModel(mode="replay", recordings_path=path)
+        assert json.loads(replayer.invoke(_messages()).content)["component"] == "comp_b"
+
+    def test_record_mode_batches_file_writes(self, tmp_path):
+        path = tmp_path / "recordings.json"
+        delegate = FakeListChatModel(responses=['{"action": "Kill", "component": null, "reasoning": "r", "confidence": 0.5}'])
+        recorder = LocalKfmChatModel(mode="record", delegate=delegate, recordings_path=str(path),
+                                     recordings_flush_every=3)
+        for i in range(2):
+            recorder.invoke(_messages(requirements={"min_accuracy": i / 10, "max_latency": 100}))
+        assert not path.exists()
+        recorder.invoke(_messages(requirements={"min_accuracy": 0.2, "max_latency": 100}))
+        assert len(json.loads(path.read_text())) == 3
+        assert not recorder.flush_recordings()
+
+    def test_record_mode_requires_delegate(self):
+        with pytest.raises(KfmConfigurationError):
+            LocalKfmChatModel(mode="record")
+
+
+class TestInjection:
+    def test_injected_error(self):
+        with pytest.raises(KfmInvocationError):
+            LocalKfmChatModel(error_rates={"error": 1.0}).invoke(_messages())
+
+    def test_injected_timeout(self):
+        with pytest.raises(TimeoutError):
+            LocalKfmChatModel(error_rates={"timeout": 1.0}).invoke(_messages())
+
+    def test_injected_malformed_output(self):
+        content = LocalKfmChatModel(error_rates={"malformed": 1.0}).invoke(_messages()).content
+        with pytest.raises(json.JSONDecodeError):
+            json.loads(content)
+
+    def test_invalid_error_config(self):
+        with pytest.raises(KfmConfigurationError):
+            LocalKfmChatModel(error_rates={"boom": 0.1})
+        with pytest.raises(KfmConfigurationError):
+            LocalKfmChatModel(error_rates={"error": 0.7, "timeout": 0.7})
+
+    def test_seeded_draws_are_deterministic(self):
+        first = LocalKfmChatModel(seed=3, latency_jitter_ms=5, error_rates={"error": 0.5})
+        second = LocalKfmChatModel(seed=3, latency_jitter_ms=5, error_rates={"error": 0.5})
+        assert [first._draw_injection() for _ in range(20)] == [second._draw_injection() for _ in range(20)]
+
+    @pytest.mark.asyncio
+    async def test_async_latency_overlaps(self):
+        model = LocalKfmChatModel(latency_ms=100)
+        start = time.perf_counter()
+        await asyncio.gather(*(model.ainvoke(_messages()) for _ in range(10)))
+        assert time.perf_counter() - start < 0.5
+
+
+def test_from_env_disabled_without_mode(monkeypatch):
+    monkeypatch.delenv("KFM_LOCAL_LLM_MODE", raising=False)
+    assert LocalKfmChatModel.from_env() is None
+
+
+def test_from_env_parses_settings(monkeypatch):
+    monkeypatch.setenv("KFM_LOCAL_LLM_MODE", "rules")
+    monkeypatch.setenv("KFM_LOCAL_LLM_LATENCY_MS", "25")
+    monkeypatch.setenv("KFM_LOCAL_LLM_ERROR_RATES", "error=0.05,timeout=0.01")
+    model = LocalKfmChatModel.from_env()
+    assert model.latency_ms == 25.0
+    assert model.error_rates == {"error": 0.05, "timeout": 0.01}
+
+
+@pytest.fixture
+def local_planner(monkeypatch, tmp_path):
+    monkeypatch.setenv("KFM_LOCAL_LLM_MODE", "rules")
+    monkeypatch.setenv("KFM_LOCAL_LLM_LATENCY_MS", "50")
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")  # Ignored while the local tier is configured
+    planner = KFMPlannerLlm(component_registry=MagicMock(spec=ComponentRegistry),
+                            snapshot_storage_path=str(tmp_path / "snapshots"))
+    planner.snapshot_service = None
+    planner.ecm = None
+    return planner
+
+
+def test_planner_uses_local_tier(local_planner):
+    assert list(local_planner.llm_configs) == ["local"]
+    assert local_planner.primary_llm_key_for_logging == "local"
+
+
+@pytest.mark.asyncio
+async def test_planner_decides_offline_concurrently(local_planner):
+    start = time.perf_counter()
+    results = await asyncio.gather(*(local_planner.decide_kfm_action("task", REQUIREMENTS, COMPONENTS) for _ in range(8)))
+    elapsed = time.perf_counter() - start
+
+    assert all(r["action"] == "Marry" and r["component"] == "comp_a" for r in results)
+    assert elapsed < 8 * 0.05  # Decisions overlap instead of queueing behind each other's LLM latency
@@ -0,0 +1,148 @@
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.core.component_registry import ComponentRegistry
+from src.core.execution_engine import ExecutionEngine
+from src.core.kfm_planner import KFMPlanner
+from src.core.metrics_feedback import MetricsFeedbackChannel
+from src.core.state_monitor import StateMonitor
+from src.core.streaming_metrics import MetricsStore
+from src.state_types import ActionType
+
+REQUIREMENTS = {"default": {"min_accuracy": 0.8, "max_latency": 1.0}}
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _monitor(**kwargs):
+    return StateMonitor(
+        MagicMock(spec=ComponentRegistry),
+        performance_data={"steady": {"accuracy": 0.9, "latency": 0.5}},
+        task_requirements=REQUIREMENTS,
+        metrics_store=MetricsStore(clock=FakeClock()),
+        **kwargs,
+    )
+
+
+class TestMetricsFeedbackChannel:
+    def test_submit_and_drain_updates_monitor(self):
+        monitor = _monitor(latency_statistic="last")
+        channel = MetricsFeedbackChannel(monitor)
+        assert channel.submit("steady", latency=0.7, accuracy=0.95)
+        assert monitor.get_performance_data("steady")["latency"] == 0.5  # Not visible until drained
+        assert channel.drain() == 1
+        assert monitor.get_performance_data("steady") == {"accuracy": 0.95, "latency": 0.7}
+
+    def test_new_component_is_added(self):
+        monitor = _monitor()
+        channel = MetricsFeedbackChannel(monitor)
+        channel.submit("fresh", latency=0.2)
+        channel.drain()
+        assert monitor.get_performance_data("fresh")["latency"] == pytest.approx(0.2)
+        assert "accuracy" not in monitor.get_performance_data("fresh")
+
+    def test_drain_batches(self):
+        monitor = _monitor()
+        monitor.ingest_observations = MagicMock(wraps=monitor.ingest_observations)
+        channel = MetricsFeedbackChannel(monitor, batch_size=4)
+        for i in range(10):
+            channel.submit("steady", latency=0.1 * i)
+        assert channel.drain(max_items=6) == 6
+        assert channel.pending() == 4
+        assert channel.drain() == 4
+        assert [len(call.args[0]) for call in monitor.ingest_observations.call_args_list] == [4, 2, 4]
+        assert channel.stats()["batches"] == 3
+        assert monitor.get_metrics_summary("steady")["observations"] == 10
+
+    def test_sample_rate_zero_drops_everything(self):
+        channel = MetricsFeedbackChannel(_monitor(), sample_rate=0.0)
+        assert not channel.submit("steady", latency=0.1)
+        stats = channel.stats()
+        assert stats["dropped_sampling"] == 1 and stats["pending"] == 0
+
+    def test_rate_limit_drops_excess(self):
+        channel = MetricsFeedbackChannel(_monitor(), max_events_per_second=2)
+        accepted = [channel.submit("steady", latency=0.1) for _ in range(10)]
+        assert sum(accepted) == 2
+        assert channel.stats()["dropped_rate_limit"] == 8
+
+        channel.set_ingestion_rate(clear_rate_limit=True)
+        assert channel.submit("steady", latency=0.1)
+
+    def test_overflow_drops_oldest(self):
+        channel = MetricsFeedbackChannel(_monitor(latency_statistic="last"), max_pending=3)
+        for latency in (0.1, 0.2, 0.3, 0.4):
+            channel.submit("steady", latency=latency)
+        assert channel.stats()["dropped_overflow"] == 1
+        assert channel.drain() == 3
+        assert channel.state_monitor.get_metrics_summary("steady")["observations"] == 3
+
+    def test_invalid_controls(self):
+        with pytest.raises(ValueError):
+            MetricsFeedbackChannel(_monitor(), sample_rate=1.5)
+        with pytest.raises(ValueError):
+            MetricsFeedbackChannel(_monitor(), max_events_per_second=0)
+
+    def test_background_thread_flushes_on_stop(self):
+        monitor = _monitor()
+        channel = MetricsFeedbackChannel(monitor, flush_interval=0.01)
+        channel.start()
+        for _ in range(50):
+            channel.submit("steady", latency=0.4)
+        channel.stop()
+        assert channel.pending() == 0
+        assert channel.stats()["ingested"] == 50
+
+    def test_planner_tracks_ingested_latency(self):
+        monitor = _monitor()
+        channel = MetricsFeedbackChannel(monitor)
+        for _ in range(20):
+            channel.submit("steady", latency=2.0)
+        channel.drain()
+        assert KFMPlanner(monitor, MagicMock()).decide_kfm_action("default") == {"action": "fuck", "component": "steady"}
+
+
+class TestExecutionEngineFeedback:
+    def _engine(self, component_func, channel):
+        registry = MagicMock(spec=ComponentRegistry)
+        registry.get_default_component_key = MagicMock(return_value="steady")
+        registry.list_components = MagicMock(return_value={"steady": component_func})
+        registry.get_component = MagicMock(return_value=component_func)
+        return ExecutionEngine(registry, metrics_feedback=channel)
+
+    @pytest.mark.asyncio
+    async def test_execute_reports_measurements(self):
+        monitor = _monitor(latency_statistic="last")
+        channel = MetricsFeedbackChannel(monitor)
+
+        def component(params):
+            time.sleep(0.01)
+            return {"ok": True}, 0.85
+
+        engine = self._engine(component, channel)
+        result = await engine.execute(ActionType.NO_ACTION, None, {}, {})
+        assert result["status"] == "success"
+        assert channel.drain() == 1
+        data = monitor.get_performance_data("steady")
+        assert data["accuracy"] == 0.85
+        assert data["latency"] == pytest.approx(result["performance"]["latency"])
+
+    @pytest.mark.asyncio
+    async def test_failed_execution_is_not_reported(self):
+        channel = MetricsFeedbackChannel(_monitor())
+
+        def component(params):
+            raise RuntimeError("boom")
+
+        engine = self._engine(component, channel)
+        result = await engine.execute(ActionType.NO_ACTION, None, {}, {})
+        assert result["status"] == "error"
+        assert channel.stats()["submitted"] == 0
@@ -0,0 +1,112 @@
+import asyncio
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.core.component_executor import ComponentExecutorPool
+from src.core.component_registry import ComponentRegistry
+from src.core.discovery import ModuleMetadata
+from src.core.execution_engine import ExecutionEngine
+from src.core.micro_batcher import BatchResultMismatchError, MicroBatcher
+from src.core.module_loader import ModuleLoader, ModuleLoadError
+from src.state_types import ActionType
+
+
+@pytest.fixture
+def pool():
+    pool = ComponentExecutorPool()
+    yield pool
+    pool.shutdown()
+
+
+def _metadata(**kwargs):
+    return ModuleMetadata(module_name="batched", version="1.0.0", entry_point="json",
+                          source_file_path=Path("batched.module.yaml"), cached_at_mtime=0.0, **kwargs)
+
+
+class TestMicroBatcher:
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_are_coalesced(self, pool):
+        batch_sizes = []
+
+        def double(batch):
+            batch_sizes.append(len(batch))
+            return [params["x"] * 2 for params in batch]
+
+        batcher = MicroBatcher("comp", double, pool, max_batch_size=8, max_batch_wait=0.05)
+        results = await asyncio.gather(*(batcher.submit({"x": i}) for i in range(20)))
+        assert results == [i * 2 for i in range(20)]
+        assert batch_sizes == [8, 8, 4]
+        assert batcher.stats == {"items": 20, "batches": 3, "max_observed_batch": 8}
+
+    @pytest.mark.asyncio
+    async def test_lone_call_flushes_after_max_wait(self, pool):
+        batcher = MicroBatcher("comp", lambda batch: [len(batch)], pool, max_batch_size=64, max_batch_wait=0.01)
+        assert await asyncio.wait_for(batcher.submit({}), timeout=1) == 1
+
+    @pytest.mark.asyncio
+    async def test_batch_failure_reaches_every_caller(self, pool):
+        def broken(batch):
+            raise RuntimeError("boom")
+
+        batcher = MicroBatcher("comp", broken, pool, max_batch_size=4)
+        results = await asyncio.gather(*(batcher.submit({}) for _ in range(4)), return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    @pytest.mark.asyncio
+    async def test_result_count_mismatch(self, pool):
+        batcher = MicroBatcher("comp", lambda batch: [], pool, max_batch_size=2)
+        with pytest.raises(BatchResultMismatchError):
+            await asyncio.gather(batcher.submit({}), batcher.submit({}))
+
+    def test_invalid_limits(self, pool):
+        with pytest.raises(ValueError):
+            MicroBatcher("comp", lambda batch: batch, pool, max_batch_size=0)
+
+
+class TestBatchEntryPointLoading:
+    def test_function_in_entry_module(self):
+        import json
+        assert ModuleLoader().load_batch_entry_point(_metadata(batch_entry_point="dumps")) is json.dumps
+
+    def test_qualified_reference(self):
+        import os.path
+        assert ModuleLoader().load_batch_entry_point(_metadata(batch_entry_point="os.path:join")) is os.path.join
+
+    def test_missing_function(self):
+        with pytest.raises(ModuleLoadError):
+            ModuleLoader().load_batch_entry_point(_metadata(batch_entry_point="no_such_function"))
+
+    def test_not_declared(self):
+        with pytest.raises(ModuleLoadError):
+            ModuleLoader().load_batch_entry_point(_metadata())
+
+
+class TestExecutionEngineBatching:
+    def _engine(self):
+        registry = MagicMock(spec=ComponentRegistry)
+        registry.get_default_component_key = MagicMock(return_value="model")
+        registry.list_components = MagicMock(return_value={})
+        registry.get_component = MagicMock(return_value=None)
+        return ExecutionEngine(registry)
+
+    @pytest.mark.asyncio
+    async def test_execute_fans_batch_results_out(self):
+        engine = self._engine()
+        batcher = engine.enable_batching(
+            "model", lambda batch: [({"y": params["x"] + 1}, 0.9) for params in batch], max_batch_size=4)
+        results = await asyncio.gather(*(engine.execute(ActionType.NO_ACTION, None, {"x": i}, {}) for i in range(4)))
+        engine.executor_pool.shutdown()
+        assert [r["output"] for r in results] == [{"y": i + 1} for i in range(4)]
+        assert all(r["status"] == "success" and r["performance"]["accuracy"] == 0.9 for r in results)
+        assert batcher.stats["batches"] == 1
+
+    def test_enable_batching_for_module(self):
+        engine = self._engine()
+        assert engine.enable_batching_for_module(_metadata()) is None
+        batcher = engine.enable_batching_for_module(_metadata(batch_entry_point="dumps", max_batch_size=3,
+                                                              max_batch_wait_ms=20))
+        assert (batcher.component_name, batcher.max_batch_size, batcher.max_batch_wait) == ("batched", 3, 0.02)
+        engine.disable_batching("batched")
+        assert "batched" not in engine._batchers
@@ -49,7 +49,7 @@ if LOADABLE_MODULES_PARENT not in sys.path:
     sys.path.insert(0, LOADABLE_MODULES_PARENT)
 
 # Now import the necessary classes from the module under test
-from core.module_loader import ModuleLoader, ModuleLoadError
+from core.module_loader import ModuleLoader, ModuleLoadError, LazyModule
 from core.discovery import ModuleMetadata # Assuming discovery provides this
 
 
@@ -125,4 +125,22 @@ class TestModuleLoader:
         
         assert excinfo.value.module_name == "NoEntry"
         assert isinstance(excinfo.value.original_exception, ValueError)
-        assert "Entry point not specified" in str(excinfo.value.original_exception) 
\ No newline at end of file
+        assert "Entry point not specified" in str(excinfo.value.original_exception) 
+
+class TestLazyModule:
+
+    def test_imports_on_first_attribute_access(self, loader: ModuleLoader):
+        meta = create_loader_meta("ValidModule", "1.0", "loadable_modules.valid_module")
+        timings = []
+        lazy = LazyModule(loader, meta, on_load=lambda m, seconds: timings.append((m, seconds)))
+        assert not lazy.is_loaded and timings == []
+
+        assert lazy.main() == 'Hello from valid_module'
+        assert lazy.is_loaded and lazy.VALUE == 123
+        assert len(timings) == 1 and timings[0][0] is meta and lazy.import_time == timings[0][1]
+
+    def test_failed_import_raises_on_access(self, loader: ModuleLoader):
+        lazy = LazyModule(loader, create_loader_meta("NotFound", "1.0", "loadable_modules.non_existent_module"))
+        with pytest.raises(ModuleLoadError):
+            lazy.main
+        assert not lazy.is_loaded
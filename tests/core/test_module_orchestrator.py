@@ -1,6 +1,8 @@
 # tests/core/test_module_orchestrator.py
 import pytest
 import logging
+import threading
+import time
 from pathlib import Path
 from unittest.mock import MagicMock, call
 import sys
@@ -13,7 +15,7 @@ sys.path.insert(0, str(SRC_DIR))
 # Import necessary components
 from core.discovery import ModuleDiscoveryService, ModuleMetadata, ModuleDependency
 from core.dependency_resolver import DependencyResolver, DependencyResolutionError, MissingDependencyError, CircularDependencyError
-from core.module_loader import ModuleLoader, ModuleLoadError
+from core.module_loader import ModuleLoader, ModuleLoadError, LazyModule
 from core.module_orchestrator import ModuleOrchestrator
 
 # Helper to create metadata for tests
@@ -151,4 +153,69 @@ class TestModuleOrchestrator:
         # Verify result contains only the successfully loaded module
         assert result == {
             ("A", "1.0"): "loaded_module_a"
-        } 
\ No newline at end of file
+        } 
+
+class TestLoadModes:
+
+    def test_invalid_load_mode(self, mock_discovery_service, mock_resolver, mock_loader):
+        with pytest.raises(ValueError):
+            ModuleOrchestrator(mock_discovery_service, mock_resolver, mock_loader, load_mode="eager")
+
+    def test_lazy_mode_defers_imports(self, mock_discovery_service, mock_resolver, mock_loader):
+        meta_a = create_orch_meta("A", "1.0")
+        mock_discovery_service.discover_modules.return_value = {"A": meta_a}  # Real service returns a dict
+        mock_resolver.resolve.return_value = [meta_a]
+        mock_loader.load_module.return_value = MagicMock(run=MagicMock(return_value="ran"))
+        orchestrator = ModuleOrchestrator(mock_discovery_service, mock_resolver, mock_loader, load_mode="lazy")
+
+        result = orchestrator.load_discovered_modules(Path("/modules"))
+        proxy = result[("A", "1.0")]
+        assert isinstance(proxy, LazyModule)
+        mock_loader.load_module.assert_not_called()
+
+        assert proxy.run() == "ran"
+        mock_loader.load_module.assert_called_once_with(meta_a)
+        assert ("A", "1.0") in orchestrator.import_times
+
+    def test_parallel_mode_respects_dependencies(self, mock_discovery_service, mock_resolver, mock_loader):
+        # C and B are independent; A depends on both
+        meta_b = create_orch_meta("B", "1.0")
+        meta_c = create_orch_meta("C", "1.0")
+        meta_a = create_orch_meta("A", "1.0", deps=[("B", ">=1.0"), ("C", "==1.0")])
+        mock_discovery_service.discover_modules.return_value = [meta_a, meta_b, meta_c]
+        mock_resolver.resolve.return_value = [meta_b, meta_c, meta_a]
+
+        events = []
+        lock = threading.Lock()
+        both_started = threading.Barrier(2, timeout=5)
+
+        def load(meta):
+            with lock:
+                events.append(("start", meta.module_name))
+            if meta.module_name in ("B", "C"):
+                both_started.wait()  # Deadlocks (times out) unless B and C import concurrently
+            time.sleep(0.01)
+            with lock:
+                events.append(("end", meta.module_name))
+            return f"loaded_{meta.module_name}"
+
+        mock_loader.load_module.side_effect = load
+        orchestrator = ModuleOrchestrator(mock_discovery_service, mock_resolver, mock_loader, load_mode="parallel")
+        result = orchestrator.load_discovered_modules(Path("/modules"))
+
+        assert list(result) == [("B", "1.0"), ("C", "1.0"), ("A", "1.0")]
+        assert events.index(("start", "A")) > max(events.index(("end", "B")), events.index(("end", "C")))
+        assert set(orchestrator.import_times) == set(result)
+        assert orchestrator.slowest_imports(1)[0][1] >= 0.01
+
+    def test_parallel_mode_continues_after_failure(self, mock_discovery_service, mock_resolver, mock_loader, caplog):
+        meta_b = create_orch_meta("B", "1.0")
+        meta_a = create_orch_meta("A", "1.0", deps=[("B", "==1.0")])
+        mock_discovery_service.discover_modules.return_value = [meta_a, meta_b]
+        mock_resolver.resolve.return_value = [meta_b, meta_a]
+        mock_loader.load_module.side_effect = [ModuleLoadError("B", "1.0", "entry.b", ImportError("Cannot import B")), "loaded_a"]
+        caplog.set_level(logging.ERROR)
+        orchestrator = ModuleOrchestrator(mock_discovery_service, mock_resolver, mock_loader, load_mode="parallel")
+
+        assert orchestrator.load_discovered_modules(Path("/modules")) == {("A", "1.0"): "loaded_a"}
+        assert "Failed to load module B v1.0" in caplog.text
@@ -0,0 +1,126 @@
+import random
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.core.component_registry import ComponentRegistry
+from src.core.kfm_planner import KFMPlanner
+from src.core.performance_index import PerformanceIndex
+from src.core.state_monitor import StateMonitor
+
+REQUIREMENTS = {'default': {'min_accuracy': 0.8, 'max_latency': 1.0}}
+
+
+def _scan_decision(performance_data, requirements=REQUIREMENTS):
+    """Decision from KFMPlanner's original full scan (monitor without an index)."""
+    monitor = MagicMock(spec=StateMonitor)
+    monitor.get_performance_data.return_value = performance_data
+    monitor.get_task_requirements.return_value = requirements['default']
+    return KFMPlanner(monitor, MagicMock()).decide_kfm_action('default')
+
+
+def _indexed_planner(performance_data, requirements=REQUIREMENTS):
+    monitor = StateMonitor(MagicMock(spec=ComponentRegistry), performance_data=performance_data,
+                           task_requirements=requirements)
+    return KFMPlanner(monitor, MagicMock()), monitor
+
+
+class TestPerformanceIndex:
+    def test_ranked_order(self):
+        index = PerformanceIndex({
+            'slow': {'accuracy': 0.9, 'latency': 2.0},
+            'fast': {'accuracy': 0.9, 'latency': 0.5},
+            'weak': {'accuracy': 0.5, 'latency': 0.1},
+        })
+        assert [name for name, _, _ in index.ranked()] == ['fast', 'slow', 'weak']
+
+    def test_update_repositions_component(self):
+        index = PerformanceIndex({'a': {'accuracy': 0.9, 'latency': 0.5}, 'b': {'accuracy': 0.8, 'latency': 0.5}})
+        index.update('a', {'accuracy': 0.7, 'latency': 0.5})
+        assert [name for name, _, _ in index.ranked()] == ['b', 'a']
+        assert len(index) == 2
+
+    def test_remove(self):
+        index = PerformanceIndex({'a': {'accuracy': 0.9, 'latency': 0.5}})
+        index.remove('a')
+        index.remove('missing')
+        assert len(index) == 0 and 'a' not in index
+
+    def test_best_marry_and_fuck(self):
+        index = PerformanceIndex({
+            'accurate_slow': {'accuracy': 0.95, 'latency': 2.0},
+            'balanced': {'accuracy': 0.85, 'latency': 0.9},
+            'fast_weak': {'accuracy': 0.6, 'latency': 0.2},
+        })
+        assert index.best_marry(0.8, 1.0) == 'balanced'
+        assert index.best_marry(0.9, 1.0) is None
+        assert index.best_fuck(0.9, 1.0) == 'accurate_slow'
+        assert index.fuck_candidates(0.9, 1.0, k=5) == ['accurate_slow', 'balanced', 'fast_weak']
+
+    def test_missing_metrics_use_planner_defaults(self):
+        index = PerformanceIndex({'no_latency': {'accuracy': 0.9}, 'no_accuracy': {'latency': 0.1}})
+        assert index.best_marry(0.8, 1.0) is None
+        assert index.fuck_candidates(0.8, 1.0, k=2) == ['no_latency', 'no_accuracy']
+
+    def test_ties_go_to_first_inserted(self):
+        index = PerformanceIndex({'b': {'accuracy': 0.9, 'latency': 0.5}, 'a': {'accuracy': 0.9, 'latency': 0.5}})
+        assert index.best_marry(0.8, 1.0) == 'b'
+
+    @pytest.mark.parametrize("seed", range(10))
+    def test_queries_match_brute_force(self, seed):
+        rng = random.Random(seed)
+        index, metrics = PerformanceIndex(), {}
+        for step in range(300):
+            name = f"comp_{rng.randrange(60)}"
+            if rng.random() < 0.15:
+                index.remove(name)
+                metrics.pop(name, None)
+            else:
+                metrics[name] = {'accuracy': rng.choice([0.5, 0.7, 0.8, 0.9]), 'latency': rng.choice([0.2, 0.5, 1.0, 2.0])}
+                index.update(name, metrics[name])
+            ranked = list(index.ranked())
+            assert sorted(name for name, _, _ in ranked) == sorted(metrics)
+            min_accuracy, max_latency, k = rng.choice([0.6, 0.8, 0.9]), rng.choice([0.3, 1.0, 1.5]), rng.randint(1, 8)
+            marry = [name for name, accuracy, latency in ranked if accuracy >= min_accuracy and latency <= max_latency]
+            fuck = [name for name, accuracy, latency in ranked if (accuracy >= min_accuracy) != (latency <= max_latency)]
+            assert index.best_marry(min_accuracy, max_latency) == (marry[0] if marry else None)
+            assert index.fuck_candidates(min_accuracy, max_latency, k) == fuck[:k]
+
+
+class TestStateMonitorIndex:
+    def test_update_performance_data_maintains_index(self):
+        planner, monitor = _indexed_planner({'a': {'accuracy': 0.9, 'latency': 0.5}})
+        monitor.update_performance_data('b', {'accuracy': 0.95, 'latency': 0.4})
+        assert planner.decide_kfm_action('default') == {'action': 'marry', 'component': 'b'}
+
+        monitor.update_performance_data('b', {'latency': 3.0})
+        assert planner.decide_kfm_action('default') == {'action': 'marry', 'component': 'a'}
+
+    def test_planner_uses_index_without_full_scan(self):
+        planner, monitor = _indexed_planner({'a': {'accuracy': 0.9, 'latency': 0.5}})
+        monitor.get_performance_data = MagicMock(wraps=monitor.get_performance_data)
+        planner.decide_kfm_action('default')
+        # Only the chosen component's metrics are looked up (for logging)
+        monitor.get_performance_data.assert_called_once_with('a')
+
+    @pytest.mark.parametrize("seed", range(30))
+    def test_matches_scan_on_random_updates(self, seed):
+        rng = random.Random(seed)
+        names = [f"comp_{i}" for i in range(rng.randint(1, 25))]
+        initial = {name: {'accuracy': rng.choice([0.5, 0.7, 0.8, 0.9]), 'latency': rng.choice([0.2, 0.5, 1.0, 1.5])}
+                   for name in names}
+        planner, monitor = _indexed_planner({k: dict(v) for k, v in initial.items()})
+
+        for _ in range(20):
+            name = rng.choice(names + ['new_comp'])
+            metrics = {}
+            if rng.random() < 0.8:
+                metrics['accuracy'] = rng.choice([0.5, 0.7, 0.8, 0.9, 0.95])
+            if rng.random() < 0.8:
+                metrics['latency'] = rng.choice([0.2, 0.5, 1.0, 1.5, 3.0])
+            monitor.update_performance_data(name, metrics)
+            performance = monitor.get_performance_data()
+            if any('accuracy' not in m or 'latency' not in m for m in performance.values()):
+                # The scan path's logging formats both metrics; only compare fully populated data
+                continue
+            assert planner.decide_kfm_action('default') == _scan_decision(performance)
@@ -0,0 +1,158 @@
+import sqlite3
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.core.component_registry import ComponentRegistry
+from src.core.discovery import ModuleMetadata
+from src.core.execution_engine import ExecutionEngine
+from src.core.result_cache import ResultCache, params_fingerprint
+from src.state_types import ActionType
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _metadata(version="1.0.0", deterministic=True):
+    return ModuleMetadata(module_name="analyze", version=version, entry_point="analyze",
+                          source_file_path=Path("analyze.module.yaml"), cached_at_mtime=0.0,
+                          deterministic=deterministic)
+
+
+class TestParamsFingerprint:
+    def test_key_order_does_not_matter(self):
+        assert params_fingerprint({"a": 1, "b": [1, 2]}) == params_fingerprint({"b": [1, 2], "a": 1})
+        assert params_fingerprint({"a": 1}) != params_fingerprint({"a": 2})
+
+    def test_unserializable_params_are_not_cacheable(self):
+        assert params_fingerprint({"obj": object()}) is None
+
+
+class TestResultCache:
+    def test_lru_eviction(self):
+        cache = ResultCache(max_entries=2)
+        for key in ("a", "b"):
+            cache.put("comp", "1", key, key.upper())
+        cache.get("comp", "1", "a")  # "b" is now least recently used
+        cache.put("comp", "1", "c", "C")
+        assert cache.get("comp", "1", "b") == (False, None, None)
+        assert cache.get("comp", "1", "a") == (True, "A", "memory")
+        assert cache.stats()["evictions"] == 1
+
+    def test_ttl_expiry(self):
+        clock = FakeClock()
+        cache = ResultCache(ttl_seconds=10, clock=clock)
+        cache.put("comp", "1", "k", "value")
+        clock.now += 11
+        assert cache.get("comp", "1", "k")[0] is False
+        assert cache.stats()["expirations"] == 1
+
+    def test_disk_tier_survives_restart(self, tmp_path):
+        path = tmp_path / "results.sqlite"
+        cache = ResultCache(disk_path=path)
+        cache.put("comp", "1", "k", {"answer": 42})
+        cache.close()
+
+        reopened = ResultCache(disk_path=path)
+        assert reopened.get("comp", "1", "k") == (True, {"answer": 42}, "disk")
+        assert reopened.get("comp", "1", "k")[2] == "memory"  # Promoted on first hit
+        reopened.close()
+
+    def test_disk_tier_stores_json_only(self, tmp_path):
+        path = tmp_path / "results.sqlite"
+        cache = ResultCache(disk_path=path)
+        cache.put("comp", "1", "json", [{"answer": 42}, 0.9])
+        cache.put("comp", "1", "tuple", ({"answer": 42}, 0.9))
+        cache.put("comp", "1", "object", object())
+        cache.close()
+        rows = dict(sqlite3.connect(str(path)).execute("SELECT params_hash, value FROM json_results").fetchall())
+        assert rows == {"json": '[{"answer": 42}, 0.9]'}
+
+        reopened = ResultCache(disk_path=path)
+        assert reopened.get("comp", "1", "json") == (True, [{"answer": 42}, 0.9], "disk")
+        assert reopened.get("comp", "1", "tuple")[0] is False
+        reopened.close()
+
+    def test_invalidate_keeps_current_version(self, tmp_path):
+        cache = ResultCache(disk_path=tmp_path / "results.sqlite")
+        cache.put("comp", "1", "k", "old")
+        cache.put("comp", "2", "k", "new")
+        cache.put("other", "1", "k", "other")
+        cache.invalidate("comp", keep_version="2")
+        assert cache.get("comp", "1", "k")[0] is False
+        assert cache.get("comp", "2", "k")[0] is True
+        assert cache.get("other", "1", "k")[0] is True
+        cache.close()
+
+
+class TestExecutionEngineMemoization:
+    def _engine(self, registry=None, component_key="analyze"):
+        calls = []
+
+        def component(params):
+            calls.append(params)
+            return {"echo": params["text"]}, 0.8
+
+        registry = registry or MagicMock(spec=ComponentRegistry)
+        registry.get_default_component_key = MagicMock(return_value=component_key)
+        registry.list_components = MagicMock(return_value={component_key: component})
+        registry.get_component = MagicMock(return_value=component)
+        return ExecutionEngine(registry), calls
+
+    @pytest.mark.asyncio
+    async def test_repeated_params_hit_cache(self):
+        engine, calls = self._engine()
+        assert engine.enable_memoization_for_module(_metadata())
+        first = await engine.execute(ActionType.NO_ACTION, None, {"text": "hi"}, {})
+        second = await engine.execute(ActionType.NO_ACTION, None, {"text": "hi"}, {})
+        assert len(calls) == 1
+        assert first["performance"]["cache_hit"] == 0.0
+        assert second["performance"]["cache_hit"] == 1.0
+        assert second["output"] == first["output"] and second["performance"]["accuracy"] == 0.8
+
+        second["output"]["echo"] = "mutated"
+        third = await engine.execute(ActionType.NO_ACTION, None, {"text": "hi"}, {})
+        assert third["output"] == {"echo": "hi"}
+
+    @pytest.mark.asyncio
+    async def test_non_deterministic_module_is_not_memoized(self):
+        engine, calls = self._engine()
+        assert not engine.enable_memoization_for_module(_metadata(deterministic=False))
+        for _ in range(2):
+            result = await engine.execute(ActionType.NO_ACTION, None, {"text": "hi"}, {})
+        assert len(calls) == 2
+        assert "cache_hit" not in result["performance"]
+
+    @pytest.mark.asyncio
+    async def test_new_module_version_invalidates(self):
+        registry = ComponentRegistry()
+        engine, calls = self._engine(registry)
+        engine.enable_memoization_for_module(_metadata("1.0.0"))
+        await engine.execute(ActionType.NO_ACTION, None, {"text": "hi"}, {})
+
+        registry.register_module(_metadata("1.1.0"))
+        result = await engine.execute(ActionType.NO_ACTION, None, {"text": "hi"}, {})
+        assert len(calls) == 2
+        assert result["performance"]["cache_hit"] == 0.0
+        assert engine.result_cache.stats()["entries"] == 1
+
+    @pytest.mark.asyncio
+    async def test_new_module_version_invalidates_overridden_component_key(self):
+        registry = ComponentRegistry()
+        engine, calls = self._engine(registry, component_key="analyze_fast")
+        engine.enable_memoization_for_module(_metadata("1.0.0"), component_key="analyze_fast")
+        await engine.execute(ActionType.NO_ACTION, None, {"text": "hi"}, {})
+
+        registry.register_module(_metadata("1.1.0"))
+        result = await engine.execute(ActionType.NO_ACTION, None, {"text": "hi"}, {})
+        assert len(calls) == 2
+        assert result["performance"]["cache_hit"] == 0.0
+
+        registry.deregister_module("analyze")
+        assert engine.result_cache.stats()["entries"] == 0
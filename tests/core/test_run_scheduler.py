@@ -0,0 +1,281 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.core.agent_lifecycle_controller import AgentLifecycleController
+from src.core.reversibility.snapshot_service import SnapshotService
+from src.core.run_scheduler import (
+    RUN_CANCELLED, RUN_COMPLETED, RUN_FAILED, RUN_QUEUED, RUN_RUNNING,
+    AgentRunScheduler, SchedulerSaturatedError,
+)
+from src.tracing import get_correlation_id, get_next_node_execution_id
+
+
+class GatedRunner:
+    """run_fn whose runs block until released; records start order and peak concurrency."""
+
+    def __init__(self, scheduler_ref=None, resource=None):
+        self.started = []
+        self.active = 0
+        self.peak = 0
+        self.gate = asyncio.Event()
+        self.scheduler_ref = scheduler_ref
+        self.resource = resource
+
+    async def __call__(self, state):
+        self.started.append(state["run_id"])
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            if self.resource:
+                async with self.scheduler_ref[0].limiter(self.resource):
+                    await self.gate.wait()
+            else:
+                await self.gate.wait()
+            if state.get("fail"):
+                raise RuntimeError("boom")
+            return dict(state, done=True)
+        finally:
+            self.active -= 1
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class TestAgentRunScheduler:
+    @pytest.mark.asyncio
+    async def test_bounded_concurrency(self):
+        runner = GatedRunner()
+        scheduler = AgentRunScheduler(runner, max_concurrency=3)
+        for i in range(10):
+            await scheduler.submit({"i": i}, run_id=f"r{i}")
+        await settle()
+        assert runner.active == 3
+        runner.gate.set()
+        await scheduler.join()
+        assert runner.peak == 3
+        stats = scheduler.stats()
+        assert stats[RUN_COMPLETED] == 10 and stats["completed_total"] == 10
+        assert stats["latency_p95"] is not None and stats["throughput"] > 0
+        assert (await scheduler.wait("r4"))["i"] == 4
+
+    @pytest.mark.asyncio
+    async def test_priority_order_fifo_within_priority(self):
+        runner = GatedRunner()
+        scheduler = AgentRunScheduler(runner, max_concurrency=1)
+        await scheduler.submit({}, priority=5, run_id="blocker")
+        await settle()
+        for run_id, priority in [("low", 9), ("high-1", 0), ("mid", 3), ("high-2", 0)]:
+            await scheduler.submit({}, priority=priority, run_id=run_id)
+        runner.gate.set()
+        await scheduler.join()
+        assert runner.started == ["blocker", "high-1", "high-2", "mid", "low"]
+
+    @pytest.mark.asyncio
+    async def test_cancel_queued_and_running(self):
+        runner = GatedRunner()
+        scheduler = AgentRunScheduler(runner, max_concurrency=1)
+        await scheduler.submit({}, run_id="running")
+        await scheduler.submit({}, run_id="queued")
+        await settle()
+        assert scheduler.get_run("running").status == RUN_RUNNING
+        assert scheduler.get_run("queued").status == RUN_QUEUED
+
+        assert scheduler.cancel("queued")
+        assert await scheduler.stop_run("running")
+        assert scheduler.get_run("running").status == RUN_CANCELLED
+        assert scheduler.get_run("queued").status == RUN_CANCELLED
+        assert runner.started == ["running"]
+        assert not scheduler.cancel("running")
+        assert not scheduler.cancel("unknown")
+        with pytest.raises(asyncio.CancelledError):
+            await scheduler.wait("queued")
+
+    @pytest.mark.asyncio
+    async def test_cancel_before_first_step(self):
+        runner = GatedRunner()
+        scheduler = AgentRunScheduler(runner, max_concurrency=1)
+        await scheduler.submit({}, run_id="r")
+        await asyncio.sleep(0)  # Dispatched, task not yet stepped
+        scheduler.cancel("r")
+        await scheduler.join()
+        assert scheduler.get_run("r").status == RUN_CANCELLED
+
+    @pytest.mark.asyncio
+    async def test_failed_run(self):
+        scheduler = AgentRunScheduler(GatedRunner(), max_concurrency=1)
+        scheduler._run_fn.gate.set()
+        await scheduler.submit({"fail": True}, run_id="bad")
+        await scheduler.join()
+        run = scheduler.get_run("bad")
+        assert run.status == RUN_FAILED and run.error == "boom"
+
+    @pytest.mark.asyncio
+    async def test_queue_backpressure(self):
+        runner = GatedRunner()
+        scheduler = AgentRunScheduler(runner, max_concurrency=1, max_queue_size=2)
+        await scheduler.submit({}, run_id="a")
+        await settle()
+        await scheduler.submit({}, run_id="b")
+        await scheduler.submit({}, run_id="c")
+        with pytest.raises(SchedulerSaturatedError):
+            scheduler.submit_nowait({}, run_id="d")
+        blocked = asyncio.ensure_future(scheduler.submit({}, run_id="d"))
+        await settle()
+        assert not blocked.done()
+        runner.gate.set()
+        await blocked
+        await scheduler.join()
+        assert scheduler.backpressure_waits == 1
+        assert scheduler.stats()[RUN_COMPLETED] == 4
+
+    @pytest.mark.asyncio
+    async def test_saturated_downstream_pauses_dispatch(self):
+        ref = []
+        runner = GatedRunner(scheduler_ref=ref, resource="llm")
+        scheduler = AgentRunScheduler(runner, max_concurrency=10, capacities={"llm": 2})
+        ref.append(scheduler)
+        for i in range(3):
+            await scheduler.submit({}, run_id=f"r{i}")
+        await settle()
+        # Two hold the LLM and one waits for it: the resource is saturated
+        assert scheduler.saturated_resources() == ["llm"]
+        for i in range(3, 8):
+            await scheduler.submit({}, run_id=f"r{i}")
+        await settle()
+        assert len(runner.started) == 3
+        runner.gate.set()
+        await scheduler.join()
+        assert scheduler.stats()[RUN_COMPLETED] == 8
+        assert scheduler.limiter("llm").peak_waiting >= 1
+
+    @pytest.mark.asyncio
+    async def test_duplicate_run_id_rejected(self):
+        scheduler = AgentRunScheduler(GatedRunner())
+        await scheduler.submit({}, run_id="same")
+        with pytest.raises(ValueError):
+            await scheduler.submit({}, run_id="same")
+        await scheduler.shutdown(cancel_pending=True)
+
+    @pytest.mark.asyncio
+    async def test_history_is_bounded(self):
+        runner = GatedRunner()
+        runner.gate.set()
+        scheduler = AgentRunScheduler(runner, history_size=5)
+        for i in range(30):
+            await scheduler.run({}, run_id=f"r{i}")
+        assert len(scheduler._runs) <= 10
+        assert scheduler.get_run("r29") is not None
+        assert scheduler.completed_total == 30
+
+
+class TestLifecycleControllerScheduling:
+    @pytest.fixture
+    def controller(self):
+        app = MagicMock()
+
+        async def ainvoke(state, config=None):
+            # Two "nodes" per run, interleaved with the other runs
+            trace = []
+            for _ in range(2):
+                trace.append((get_correlation_id(), get_next_node_execution_id()))
+                await asyncio.sleep(0.01)
+            if state.get("explode"):
+                raise RuntimeError("graph failed")
+            return dict(state, thread_id=config["configurable"]["thread_id"], trace=trace, done=True)
+
+        app.ainvoke = ainvoke
+        graph_fn = AsyncMock(return_value=app)
+        config_fn = AsyncMock(return_value={})
+        return AgentLifecycleController(
+            snapshot_service=MagicMock(), component_registry=MagicMock(),
+            execution_engine=MagicMock(), kfm_planner_instance=MagicMock(),
+            graph_creation_fn_factory=lambda: graph_fn,
+            graph_config_fn_factory=lambda: config_fn,
+        ), graph_fn
+
+    @pytest.mark.asyncio
+    async def test_concurrent_runs_share_one_graph(self, controller):
+        controller, graph_fn = controller
+        scheduler = controller.get_run_scheduler(max_concurrency=50)
+        run_ids = await asyncio.gather(*(controller.submit_run({"input": {"i": i}}) for i in range(100)))
+        await scheduler.join()
+        graph_fn.assert_awaited_once()
+        results = [await scheduler.wait(run_id) for run_id in run_ids]
+        assert [result["thread_id"] for result in results] == run_ids
+        assert all(result["original_correlation_id"] == result["run_id"] for result in results)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_runs_keep_their_own_trace_context(self, controller):
+        controller, _ = controller
+        scheduler = controller.get_run_scheduler(max_concurrency=3)
+        run_ids = [await controller.submit_run({}) for _ in range(3)]
+        await scheduler.join()
+        for run_id in run_ids:
+            result = await scheduler.wait(run_id)
+            assert result["trace"] == [(run_id, 1), (run_id, 2)]
+
+    @pytest.mark.asyncio
+    async def test_graph_error_becomes_error_state(self, controller):
+        controller, _ = controller
+        run_id = await controller.submit_run({"explode": True})
+        result = await controller.run_scheduler.wait(run_id)
+        assert result["done"] and "graph failed" in result["error"]
+
+    @pytest.mark.asyncio
+    async def test_stop_by_run_id(self, controller):
+        controller, _ = controller
+        controller.get_run_scheduler(max_concurrency=1)
+        first = await controller.submit_run({})
+        second = await controller.submit_run({})
+        assert await controller.stop_current_run(run_id_to_stop=second)
+        assert controller.run_scheduler.get_run(second).status == RUN_CANCELLED
+        assert (await controller.run_scheduler.wait(first))["done"]
+        assert not await controller.stop_run("missing")
+
+    @pytest.mark.asyncio
+    async def test_saturated_snapshot_storage_pauses_dispatch(self):
+        gate = asyncio.Event()
+        storage = MagicMock()
+
+        async def store_snapshot_manifest(**kwargs):
+            await gate.wait()
+            return {"snapshot_id": kwargs["snapshot_id"]}
+
+        storage.store_snapshot_manifest = store_snapshot_manifest
+        snapshot_service = SnapshotService(snapshot_storage=storage)
+        started = []
+        app = MagicMock()
+
+        async def ainvoke(state, config=None):
+            started.append(state["run_id"])
+            await snapshot_service.take_snapshot("pre_decision", kfm_agent_state={"run_id": state["run_id"]})
+            return dict(state, done=True)
+
+        app.ainvoke = ainvoke
+        planner = MagicMock()
+        controller = AgentLifecycleController(
+            snapshot_service=snapshot_service, component_registry=MagicMock(),
+            execution_engine=MagicMock(), kfm_planner_instance=planner,
+            graph_creation_fn_factory=lambda: AsyncMock(return_value=app),
+            graph_config_fn_factory=lambda: AsyncMock(return_value={}),
+        )
+        scheduler = controller.get_run_scheduler(max_concurrency=10, capacities={"llm": 2, "snapshot": 1})
+        assert snapshot_service.capacity_limiter is scheduler.limiter("snapshot")
+        assert planner.llm_limiter is scheduler.limiter("llm")
+
+        for _ in range(2):
+            await controller.submit_run({})
+        await settle()
+        # One run holds the snapshot store and one waits for it
+        assert scheduler.saturated_resources() == ["snapshot"]
+        for _ in range(5):
+            await controller.submit_run({})
+        await settle()
+        assert len(started) == 2
+        gate.set()
+        await scheduler.join()
+        assert scheduler.stats()[RUN_COMPLETED] == 7
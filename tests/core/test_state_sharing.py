@@ -0,0 +1,110 @@
+import copy
+import json
+import pickle
+
+import pytest
+
+from src.core.state_sharing import (
+    FrozenDict, _encoded_subtrees, encode_state_json, evolve, evolve_in, freeze, thaw,
+)
+from src.tracing import _identify_state_changes
+
+
+class NotComparable:
+    def __eq__(self, other):
+        raise AssertionError("shared subtrees must not be compared")
+
+    __hash__ = object.__hash__
+
+
+class TestFreeze:
+    def test_deeply_read_only(self):
+        frozen = freeze({"a": {"b": [1, {"c": 2}]}, "s": {3}})
+        assert frozen == {"a": {"b": (1, {"c": 2})}, "s": frozenset({3})}
+        assert isinstance(frozen, dict) and isinstance(frozen["a"]["b"][1], FrozenDict)
+        for mutate in (lambda: frozen.__setitem__("x", 1), lambda: frozen["a"].update(x=1),
+                       lambda: frozen["a"]["b"][1].pop("c"), lambda: frozen.setdefault("y", 2)):
+            with pytest.raises(TypeError):
+                mutate()
+
+    def test_copies_the_source_once(self):
+        source = {"items": [1, 2]}
+        frozen = freeze(source)
+        source["items"].append(3)
+        assert frozen["items"] == (1, 2)
+
+    def test_frozen_values_are_reused(self):
+        frozen = freeze({"a": {"b": 1}})
+        assert freeze(frozen) is frozen
+        assert freeze({"outer": frozen})["outer"] is frozen
+        plain_tuple = (1, "x")
+        assert freeze(plain_tuple) is plain_tuple
+
+    def test_deepcopy_and_pickle_give_plain_dicts(self):
+        frozen = freeze({"a": {"b": [1]}})
+        copied = copy.deepcopy(frozen)
+        copied["a"]["c"] = 2
+        assert type(copied) is dict and type(copied["a"]) is dict
+        assert type(copy.copy(frozen)) is dict
+        restored = pickle.loads(pickle.dumps(frozen))
+        assert restored == frozen and type(restored) is dict
+
+    def test_thaw_gives_mutable_containers_back(self):
+        source = {"tags": ["a", {"b": [1]}], "s": {2}}
+        thawed = thaw(freeze(source))
+        assert thawed == source
+        assert type(thawed["tags"]) is list and type(thawed["tags"][1]) is dict and type(thawed["s"]) is set
+        thawed["tags"].append("c")
+        thawed["tags"][1]["b"].append(2)
+
+
+class TestEvolve:
+    def test_shares_unchanged_values(self):
+        payload = freeze({"big": list(range(1000))})
+        state = {"input": payload, "result": None, "last_snapshot_ids": {"monitor_entry": "s1"}}
+        derived = evolve(state, result={"ok": True})
+        assert derived is not state
+        assert derived["input"] is payload
+        assert state["result"] is None
+
+    def test_evolve_in_leaves_shared_dict_alone(self):
+        state = {"last_snapshot_ids": {"monitor_entry": "s1"}}
+        derived = evolve_in(evolve(state), "last_snapshot_ids", "decision_entry", "s2")
+        assert derived["last_snapshot_ids"] == {"monitor_entry": "s1", "decision_entry": "s2"}
+        assert state["last_snapshot_ids"] == {"monitor_entry": "s1"}
+        assert evolve_in({}, "last_snapshot_ids", "x", "s")["last_snapshot_ids"] == {"x": "s"}
+
+
+class TestEncodeStateJson:
+    @pytest.mark.parametrize("state", [
+        {"b": 1, "a": [1, 2.5, None, True], "c": {"z": "é", "y": {"x": []}}},
+        {"input": freeze({"text": "t" * 50, "tags": ["a", "b"], "nested": {"k": 1}}), "done": False},
+        {"obj": object.__new__(NotComparable), "when": 3},  # default=str
+        {1: "int key", 2: "another"},
+        [1, {"a": 2}],
+        None,
+    ])
+    def test_matches_json_dumps(self, state):
+        assert encode_state_json(state) == json.dumps(state, default=str, sort_keys=True)
+
+    def test_mixed_keys_still_raise_type_error(self):
+        with pytest.raises(TypeError):
+            encode_state_json({"a": 1, 2: 3})
+
+    def test_frozen_subtree_encoded_once(self):
+        payload = freeze({"text": "x" * 1000, "rows": [{"i": i} for i in range(50)]})
+        misses, hits = _encoded_subtrees.misses, _encoded_subtrees.hits
+        versions = [{"input": payload, "step": step} for step in range(5)]
+        encoded = [encode_state_json({"kfm_agent_state": version}) for version in versions]
+        assert _encoded_subtrees.misses == misses + 1
+        assert _encoded_subtrees.hits == hits + 4
+        assert encoded[3] == json.dumps({"kfm_agent_state": versions[3]}, default=str, sort_keys=True)
+
+
+class TestTraceDiff:
+    def test_shared_subtrees_are_not_compared(self):
+        shared = NotComparable()
+        before = {"input": shared, "result": None}
+        after = evolve(before, result={"ok": True})
+        changes = _identify_state_changes(before, after)
+        assert set(changes) == {"result"}
@@ -0,0 +1,173 @@
+import random
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.core.component_registry import ComponentRegistry
+from src.core.kfm_planner import KFMPlanner
+from src.core.state_monitor import StateMonitor
+from src.core.streaming_metrics import Ewma, MetricsStore, WindowedQuantileSketch
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _exact_quantile(values, q):
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+class TestEwma:
+    def test_first_value_initializes(self):
+        ewma = Ewma(alpha=0.5)
+        assert ewma.update(2.0) == 2.0
+        assert ewma.update(4.0) == 3.0
+        assert ewma.count == 2
+
+    def test_invalid_alpha(self):
+        with pytest.raises(ValueError):
+            Ewma(alpha=0.0)
+
+
+class TestWindowedQuantileSketch:
+    @pytest.mark.parametrize("seed", range(5))
+    def test_quantiles_within_relative_accuracy(self, seed):
+        rng = random.Random(seed)
+        clock = FakeClock()
+        sketch = WindowedQuantileSketch(relative_accuracy=0.02, clock=clock)
+        values = [rng.lognormvariate(-1.0, 0.8) for _ in range(5000)]
+        for value in values:
+            sketch.add(value)
+        for q, estimate in zip((0.5, 0.95, 0.99), sketch.quantiles()):
+            exact = _exact_quantile(values, q)
+            assert abs(estimate - exact) / exact <= 0.02 + 1e-9
+
+    def test_empty_window(self):
+        assert WindowedQuantileSketch(clock=FakeClock()).quantiles() == (None, None, None)
+
+    def test_old_slots_expire(self):
+        clock = FakeClock()
+        sketch = WindowedQuantileSketch(window_seconds=60, num_slots=6, clock=clock)
+        for _ in range(100):
+            sketch.add(5.0)
+        clock.now += 30
+        for _ in range(10):
+            sketch.add(0.1)
+        assert sketch.count() == 110
+        clock.now += 40  # First batch is now older than the window
+        assert sketch.count() == 10
+        assert sketch.quantile(0.99) == pytest.approx(0.1, rel=0.02)
+        clock.now += 120
+        assert sketch.count() == 0
+
+    def test_observation_older_than_window_is_dropped(self):
+        clock = FakeClock()
+        sketch = WindowedQuantileSketch(window_seconds=60, num_slots=6, clock=clock)
+        sketch.add(1.0)
+        sketch.add(1.0, timestamp=clock.now - 600)
+        assert sketch.count() == 1
+
+    def test_values_below_min_report_zero(self):
+        sketch = WindowedQuantileSketch(clock=FakeClock())
+        sketch.add(0.0)
+        assert sketch.quantile(0.5) == 0.0
+
+    def test_merge_matches_combined_stream(self):
+        clock = FakeClock()
+        rng = random.Random(1)
+        left, right, combined = (WindowedQuantileSketch(clock=clock) for _ in range(3))
+        for i in range(2000):
+            value = rng.uniform(0.01, 3.0)
+            (left if i % 2 else right).add(value)
+            combined.add(value)
+        left.merge(right)
+        assert left.count() == combined.count()
+        assert left.quantiles() == combined.quantiles()
+
+    def test_merge_rejects_incompatible(self):
+        with pytest.raises(ValueError):
+            WindowedQuantileSketch(relative_accuracy=0.01).merge(WindowedQuantileSketch(relative_accuracy=0.02))
+
+    def test_standard_quantiles_are_cached_until_next_observation(self):
+        sketch = WindowedQuantileSketch(clock=FakeClock())
+        sketch.add(1.0)
+        first = sketch.quantiles()
+        assert sketch.quantiles() is first
+        sketch.add(2.0)
+        assert sketch.quantiles() is not first
+
+
+class TestMetricsStore:
+    def test_summary_and_percentiles(self):
+        store = MetricsStore(clock=FakeClock())
+        for latency in (0.1, 0.2, 0.3):
+            store.record("comp", latency=latency, accuracy=0.9)
+        summary = store.summary("comp")
+        assert summary["last_latency"] == 0.3
+        assert summary["observations"] == 3
+        assert set(store.latency_percentiles("comp")) == {"p50", "p95", "p99"}
+        assert store.latency_percentiles("unknown") == {}
+
+    def test_merged_latency_sketch(self):
+        store = MetricsStore(clock=FakeClock())
+        store.record("a", latency=0.1)
+        store.record("b", latency=1.0)
+        assert store.merged_latency_sketch(["a", "b"]).count() == 2
+
+    def test_unsupported_statistic(self):
+        store = MetricsStore(clock=FakeClock())
+        store.record("a", accuracy=0.9)
+        with pytest.raises(ValueError):
+            store.statistic("a", "accuracy", "p95")
+
+
+class TestStateMonitorStreaming:
+    def _monitor(self, **kwargs):
+        return StateMonitor(
+            MagicMock(spec=ComponentRegistry),
+            performance_data={"steady": {"accuracy": 0.9, "latency": 0.5}},
+            task_requirements={"default": {"min_accuracy": 0.8, "max_latency": 1.0}},
+            metrics_store=MetricsStore(clock=FakeClock()),
+            **kwargs,
+        )
+
+    def _decide(self, monitor):
+        return KFMPlanner(monitor, MagicMock()).decide_kfm_action("default")
+
+    def test_single_outlier_does_not_flip_marry(self):
+        monitor = self._monitor()
+        for _ in range(10):
+            monitor.update_performance_data("steady", {"latency": 0.5})
+        monitor.update_performance_data("steady", {"latency": 1.2})
+        assert monitor.get_performance_data("steady")["latency"] < 1.0
+        assert self._decide(monitor) == {"action": "marry", "component": "steady"}
+
+    def test_last_statistic_keeps_overwrite_behaviour(self):
+        monitor = self._monitor(latency_statistic="last")
+        monitor.update_performance_data("steady", {"latency": 1.2})
+        assert monitor.get_performance_data("steady")["latency"] == 1.2
+        assert self._decide(monitor) == {"action": "fuck", "component": "steady"}
+
+    def test_p95_statistic_and_percentile_query(self):
+        monitor = self._monitor(latency_statistic="p95")
+        for i in range(100):
+            monitor.update_performance_data("steady", {"latency": 2.0 if i % 10 == 0 else 0.5})
+        percentiles = monitor.get_latency_percentiles("steady")
+        assert percentiles["p50"] == pytest.approx(0.5, rel=0.02)
+        assert percentiles["p95"] == pytest.approx(2.0, rel=0.02)
+        assert monitor.get_performance_data("steady")["latency"] == percentiles["p95"]
+
+    def test_non_latency_metrics_are_stored_as_given(self):
+        monitor = self._monitor()
+        monitor.update_performance_data("steady", {"cost": 3})
+        assert monitor.get_performance_data("steady")["cost"] == 3
+        assert monitor.get_metrics_summary("steady") == {}
+
+    def test_invalid_statistic(self):
+        with pytest.raises(ValueError):
+            self._monitor(latency_statistic="p42")
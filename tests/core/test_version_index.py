@@ -0,0 +1,63 @@
+import itertools
+
+import pytest
+from packaging.specifiers import SpecifierSet
+from packaging.version import Version
+
+from src.core.version_index import VersionIndex
+
+VERSIONS = ["0.9", "1.0", "1.0.0", "1.0+local", "1.0.post1", "1.1rc1", "1.1", "1.1.dev0",
+            "2.0", "2.0+build.5", "2.1a1", "3.0", "not-a-version"]
+SPECIFIERS = ["", ">=1.0", ">1.0", "<=1.0", "<1.1", "==1.0", "==1.0+local", "==1.*", "!=2.0", "~=1.0",
+              ">=1.0,<2.0", ">=1.1rc1", "<2.1a1", "===1.0.0", ">0.9,!=1.1,<=2.0", ">=4"]
+
+
+def _brute_force(versions, specifier_set):
+    matches = []
+    for version_str in versions:
+        try:
+            if specifier_set.contains(version_str):
+                matches.append((Version(version_str), version_str))
+        except Exception:
+            pass
+    return max(matches)[1] if matches else None
+
+
+class TestVersionIndex:
+    @pytest.mark.parametrize("specifier", SPECIFIERS)
+    def test_best_match_agrees_with_full_scan(self, specifier):
+        index = VersionIndex.from_versions(VERSIONS)
+        specifier_set = SpecifierSet(specifier)
+        expected = _brute_force(VERSIONS, specifier_set)
+        assert index.best_match(specifier_set) == expected
+        assert index.best_match(specifier) == expected  # Memoized string path
+
+    def test_prereleases_override_is_respected(self):
+        index = VersionIndex.from_versions(["1.0", "1.1rc1"])
+        assert index.best_match(">=1.0") == "1.0"
+        assert index.best_match(SpecifierSet(">=1.0", prereleases=True)) == "1.1rc1"
+
+    def test_latest_and_invalid_versions(self):
+        index = VersionIndex.from_versions(VERSIONS)
+        assert index.latest() == "3.0"
+        assert index.invalid == {"not-a-version"}
+        assert len(index) == len(VERSIONS)
+        assert VersionIndex.from_versions(["junk"]).latest() is None
+
+    def test_incremental_updates_match_bulk_build(self):
+        index = VersionIndex.from_versions([])
+        for version_str in reversed(VERSIONS):
+            index = index.with_version(version_str)
+        assert index.sorted_versions() == VersionIndex.from_versions(VERSIONS).sorted_versions()
+        for version_str in itertools.islice(VERSIONS, 0, None, 2):
+            index = index.without_version(version_str)
+        remaining = VERSIONS[1::2]
+        assert index.versions == frozenset(remaining)
+        assert index.sorted_versions() == VersionIndex.from_versions(remaining).sorted_versions()
+
+    def test_updates_do_not_mutate_the_original(self):
+        index = VersionIndex.from_versions(["1.0"])
+        assert index.with_version("1.0") is index
+        grown = index.with_version("2.0")
+        assert index.latest() == "1.0" and grown.latest() == "2.0"
+        assert grown.without_version("2.0").latest() == "1.0" and grown.latest() == "2.0"
@@ -0,0 +1,116 @@
+import json
+import os
+
+import pytest
+from langgraph.graph import END, StateGraph
+
+from src.compilation_cache import (
+    CACHE_FORMAT_VERSION, GRAPH_SOURCE_FILES, GraphCompilationCache, compute_graph_fingerprint, describe_graph,
+    structure_digest,
+)
+from src.state_types import KFMAgentState
+
+
+async def monitor(state):
+    return {}
+
+
+def decide(state):
+    return {"kfm_action": {"action": "Marry", "component": "c"}}
+
+
+def build_graph(with_fallback=False):
+    builder = StateGraph(KFMAgentState)
+    builder.add_node("monitor", monitor, metadata={"stage": "observe"})
+    builder.add_node("decide", decide)
+    builder.add_node("reflect", lambda state: {"done": True})
+    builder.set_entry_point("monitor")
+    builder.add_edge("monitor", "decide")
+    builder.add_edge("decide", "reflect")
+    if with_fallback:
+        builder.add_node("fallback", lambda state: {})
+        builder.add_edge("fallback", "reflect")
+    builder.add_conditional_edges("reflect", lambda state: END)
+    return builder.compile()
+
+
+@pytest.fixture
+def sources(tmp_path):
+    (tmp_path / "graph.py").write_text("NODES = ['monitor']\n")
+    return tmp_path
+
+
+class TestFingerprint:
+    def test_stable_for_same_inputs(self, sources):
+        first = compute_graph_fingerprint({"threading_model": "sequential"}, False, ["graph.py"], str(sources))
+        second = compute_graph_fingerprint({"threading_model": "sequential"}, False, ["graph.py"], str(sources))
+        assert first == second
+
+    def test_ignores_non_structural_config(self, sources):
+        base = compute_graph_fingerprint({}, False, ["graph.py"], str(sources))
+        logging_only = {"log_level": "DEBUG", "log_directory": "elsewhere", "cache_directory": "x"}
+        assert compute_graph_fingerprint(logging_only, False, ["graph.py"], str(sources)) == base
+
+    def test_changes_with_config_mode_and_sources(self, sources):
+        base = compute_graph_fingerprint({}, False, ["graph.py"], str(sources))
+        assert compute_graph_fingerprint({"threading_model": "parallel"}, False, ["graph.py"], str(sources)) != base
+        assert compute_graph_fingerprint({}, True, ["graph.py"], str(sources)) != base
+        (sources / "graph.py").write_text("NODES = ['monitor', 'decide']\n")
+        assert compute_graph_fingerprint({}, False, ["graph.py"], str(sources)) != base
+
+    def test_covers_factory_compiler_and_verification_config(self, tmp_path):
+        for relative_path in GRAPH_SOURCE_FILES:
+            (tmp_path / relative_path).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / relative_path).write_text("original\n")
+        base = compute_graph_fingerprint({}, False, root=str(tmp_path))
+        for relative_path in ("src/factory.py", "src/compiler.py", "verification_config.yaml"):
+            (tmp_path / relative_path).write_text("changed\n")
+            changed = compute_graph_fingerprint({}, False, root=str(tmp_path))
+            assert changed != base, relative_path
+            base = changed
+
+
+class TestDescribeGraph:
+    def test_nodes_edges_and_metadata(self):
+        structure = describe_graph(build_graph())
+        assert [node["name"] for node in structure["nodes"]] == ["monitor", "decide", "reflect"]
+        monitor_node = structure["nodes"][0]
+        assert monitor_node["callable"].endswith("monitor") and monitor_node["async"] is True
+        assert monitor_node["metadata"] == {"stage": "observe"}
+        assert structure["nodes"][1]["async"] is False
+        assert ["monitor", "decide"] in structure["edges"]
+        assert structure["conditional_edges"] == ["reflect"]
+        assert structure["entry_point"] == "monitor"
+        json.dumps(structure)
+
+    def test_digest_tracks_structure(self):
+        assert structure_digest(describe_graph(build_graph())) == structure_digest(describe_graph(build_graph()))
+        assert structure_digest(describe_graph(build_graph())) != structure_digest(describe_graph(build_graph(True)))
+
+
+class TestGraphCompilationCache:
+    def test_store_and_load(self, tmp_path):
+        cache = GraphCompilationCache(str(tmp_path / "cache"))
+        structure = describe_graph(build_graph())
+        assert cache.load("abc") is None and cache.misses == 1
+        stored = cache.store("abc", structure, {"valid": True, "issues": []})
+        loaded = cache.load("abc")
+        assert loaded == stored and cache.hits == 1
+        assert loaded["structure_digest"] == structure_digest(structure)
+        assert loaded["validation_result"] == {"valid": True, "issues": []}
+        assert os.listdir(tmp_path / "cache") == ["abc.json"]
+
+    def test_unreadable_or_outdated_artifacts_are_misses(self, tmp_path):
+        cache = GraphCompilationCache(str(tmp_path))
+        (tmp_path / "broken.json").write_text("{not json")
+        assert cache.load("broken") is None
+        (tmp_path / "old.json").write_text(json.dumps({"format": CACHE_FORMAT_VERSION - 1, "fingerprint": "old"}))
+        assert cache.load("old") is None
+        assert cache.misses == 2
+
+    def test_clear(self, tmp_path):
+        cache = GraphCompilationCache(str(tmp_path / "cache"))
+        cache.store("a", {}, {})
+        cache.store("b", {}, {})
+        assert cache.clear() == 2
+        assert cache.load("a") is None
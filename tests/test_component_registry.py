@@ -428,4 +428,89 @@ class TestComponentRegistryRefactored:
         final_versions = registry.get_module_versions("ThreadMod")
         assert final_versions is not None
         # Check if the final count matches the expected number of unique versions
-        assert len(final_versions) == num_threads * num_versions_per_thread 
\ No newline at end of file
+        assert len(final_versions) == num_threads * num_versions_per_thread 
+
+class TestRegistrySnapshots:
+
+    def test_generation_increments_on_writes(self, registry: ComponentRegistry):
+        assert registry.generation == 0
+        registry.register_module(META_MOD1_V1)  # Registers and sets the default
+        after_register = registry.generation
+        assert after_register >= 1
+        registry.deregister_module("Module1")
+        assert registry.generation > after_register
+
+    def test_snapshot_is_immutable_and_stable(self, registry: ComponentRegistry):
+        registry.register_module(META_MOD1_V1)
+        snapshot = registry.snapshot()
+        registry.register_module(META_MOD2_V1)
+        assert "Module2" not in snapshot.modules
+        assert "Module2" in registry.snapshot().modules
+        with pytest.raises(TypeError):
+            snapshot.modules["Module3"] = {}
+
+    def test_details_are_cached_per_generation(self, registry: ComponentRegistry):
+        registry.register_module(META_MOD1_V1)
+        first = registry.get_all_component_details()
+        assert registry.get_all_component_details() is first
+        registry.register_module(META_MOD1_V2)
+        second = registry.get_all_component_details()
+        assert second is not first
+        assert {d["version"] for d in second["Module1"]} == {"1.0.0", "1.2.0"}
+
+    def test_details_are_read_only_but_copyable(self, registry: ComponentRegistry):
+        import copy
+        import json
+        registry.register_module(META_MOD1_V1)
+        details = registry.get_all_component_details()
+        with pytest.raises(TypeError):
+            details["Module1"][0]["version"] = "9.9.9"
+        assert json.loads(json.dumps(details))["Module1"][0]["dependencies"] == [{"name": "Core", "version_specifier": ">=1.0"}]
+        mutable = copy.deepcopy(details)
+        mutable["Module1"][0]["version"] = "9.9.9"
+        assert registry.get_all_component_details()["Module1"][0]["version"] == "1.0.0"
+
+    def test_readers_do_not_take_the_lock(self, registry: ComponentRegistry):
+        registry.register_module(META_MOD1_V1)
+        acquired = threading.Event()
+        release = threading.Event()
+
+        def writer_holding_lock():
+            with registry._lock:
+                acquired.set()
+                release.wait(timeout=5)
+
+        holder = threading.Thread(target=writer_holding_lock)
+        holder.start()
+        acquired.wait(timeout=5)
+        result = {}
+        reader = threading.Thread(target=lambda: result.update(details=registry.get_all_component_details(),
+                                                               module=registry.get_module("Module1", "1.0.0")))
+        reader.start()
+        reader.join(timeout=2)
+        finished = not reader.is_alive()
+        release.set()
+        holder.join()
+        assert finished
+        assert result["module"] is META_MOD1_V1
+
+
+class TestVersionIndexLookups:
+
+    def test_index_follows_register_and_deregister(self, registry: ComponentRegistry):
+        for meta in (META_MOD1_V2, META_MOD1_V0_9, META_MOD1_V1):
+            registry.register_module(meta)
+        assert registry.snapshot().version_index["Module1"].sorted_versions() == ["0.9.0", "1.0.0", "1.2.0"]
+        registry.deregister_module("Module1", "1.2.0")
+        assert registry.get_latest_module_version("Module1") == META_MOD1_V1
+        registry.deregister_module("Module1")
+        assert "Module1" not in registry.snapshot().version_index
+
+    def test_find_compatible_version(self, registry: ComponentRegistry):
+        for meta in (META_MOD1_V0_9, META_MOD1_V1, META_MOD1_V2):
+            registry.register_module(meta)
+        assert registry.find_compatible_version("Module1", ">=1.0,<1.2") == META_MOD1_V1
+        assert registry.find_compatible_version("Module1", "~=1.0") == META_MOD1_V2
+        assert registry.find_compatible_version("Module1", "==0.*") == META_MOD1_V0_9
+        assert registry.find_compatible_version("Module1", ">2") is None
+        assert registry.find_compatible_version("Missing", ">=1") is None
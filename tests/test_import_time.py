@@ -0,0 +1,36 @@
+import json
+import os
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Importing src.kfm_agent took ~13 s when it pulled in sentence-transformers (torch),
+# chromadb, matplotlib and the Gemini SDK; it is ~1 s without them. Which modules get
+# loaded is checked instead of the wall-clock time, which depends on the machine.
+#
+# Only needed for visualization, debugging, memory or LLM calls, never to import the agent
+DEFERRED_MODULES = [
+    "matplotlib", "networkx", "sentence_transformers", "torch", "chromadb",
+    "langchain_openai", "google.generativeai", "src.visualization", "src.debugging",
+]
+
+
+def run_import(cwd, code="import src.kfm_agent"):
+    env = dict(os.environ, PYTHONPATH=PROJECT_ROOT)
+    completed = subprocess.run([sys.executable, "-c", code], cwd=cwd, env=env,
+                               capture_output=True, text=True, timeout=120)
+    assert completed.returncode == 0, completed.stderr[-2000:]
+    return completed.stdout
+
+
+def test_import_does_not_load_deferred_modules(tmp_path):
+    code = ("import sys, json, src.kfm_agent; "
+            f"print(json.dumps([m for m in {DEFERRED_MODULES!r} if m in sys.modules]))")
+    stdout = run_import(tmp_path, code)
+    assert json.loads(stdout.strip().splitlines()[-1]) == []
+
+
+def test_import_has_no_filesystem_side_effects(tmp_path):
+    run_import(tmp_path)
+    assert os.listdir(tmp_path) == []
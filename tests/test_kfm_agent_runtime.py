@@ -0,0 +1,266 @@
+import asyncio
+import os
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.core.component_registry import ComponentRegistry
+from src.core.execution_engine import ExecutionEngine
+from src.core.state_sharing import thaw
+from src.kfm_agent import KFMAgentRuntime, run_kfm_agent
+
+
+class FakeApp:
+    """Compiled-graph stand-in that records the states it is given."""
+
+    def __init__(self, number, fail=False):
+        self.number = number
+        self.fail = fail
+        self.seen = []
+
+    def invoke(self, state):
+        if self.fail:
+            raise RuntimeError("graph exploded")
+        self.seen.append(state)
+        return dict(state, result={"built": self.number}, done=True)
+
+    async def ainvoke(self, state):
+        await asyncio.sleep(0)
+        return self.invoke(state)
+
+
+class CountingFactory:
+    def __init__(self):
+        self.builds = 0
+        self.feedbacks = []
+        self.fail_next = False
+
+    def __call__(self):
+        if self.fail_next:
+            self.fail_next = False
+            raise ValueError("bad config")
+        self.builds += 1
+        feedback = MagicMock()
+        self.feedbacks.append(feedback)
+        engine = MagicMock(spec=ExecutionEngine)
+        engine.metrics_feedback = feedback
+        return FakeApp(self.builds), {"engine": engine, "registry": MagicMock()}
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    path = tmp_path / "verification_config.yaml"
+    path.write_text("global: {}\n")
+    return path
+
+
+class TestKFMAgentRuntime:
+    def test_builds_once_for_many_runs(self, config_file):
+        factory = CountingFactory()
+        runtime = KFMAgentRuntime(graph_factory=factory, watch_paths=[str(config_file)])
+        assert runtime.generation is None
+        for i in range(5):
+            state = runtime.run({"text": f"run {i}"}, task_name="t")
+            assert state["result"] == {"built": 1}
+        assert factory.builds == 1
+        assert runtime.runs == 5
+
+    def test_runs_get_isolated_state(self, config_file):
+        runtime = KFMAgentRuntime(graph_factory=CountingFactory(), watch_paths=[str(config_file)])
+        input_data = {"text": "hello", "tags": ["a"]}
+        first = runtime.run(input_data)
+        input_data["tags"].append("b")
+        second = runtime.run(input_data)
+        assert first["input"] == {"text": "hello", "tags": ("a",)}
+        assert second["input"]["tags"] == ("a", "b")
+        # The input is shared between state versions, so it is read-only all the way down
+        with pytest.raises(TypeError):
+            first["input"]["text"] = "changed"
+        with pytest.raises(AttributeError):
+            first["input"]["tags"].append("c")
+        assert thaw(first["input"]) == {"text": "hello", "tags": ["a"]}
+        assert second["error"] is None and second["kfm_action"] is None
+
+    def test_invocation_error_is_reported_in_state(self, config_file):
+        factory = CountingFactory()
+        runtime = KFMAgentRuntime(graph_factory=factory, watch_paths=[str(config_file)])
+        runtime.components  # Build
+        runtime.app.fail = True
+        state = runtime.run({"text": "x"}, task_name="broken")
+        assert state["error"] == "graph exploded"
+        assert state["task_name"] == "broken"
+        assert runtime.generation.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_first_build_is_reported_in_state(self, config_file):
+        factory = CountingFactory()
+        runtime = KFMAgentRuntime(graph_factory=factory, watch_paths=[str(config_file)])
+        factory.fail_next = True
+        state = runtime.run({"text": "x"}, task_name="unbuilt")
+        assert state["error"] == "bad config" and state["task_name"] == "unbuilt"
+        assert runtime.generation is None
+        factory.fail_next = True
+        assert (await runtime.arun({"text": "x"}))["error"] == "bad config"
+        assert runtime.run({"text": "x"})["result"] == {"built": 1}
+
+    def test_initial_state_failure_does_not_leak_in_flight(self, config_file):
+        runtime = KFMAgentRuntime(graph_factory=CountingFactory(), watch_paths=[str(config_file)])
+        runtime.components  # Build
+        with patch('src.kfm_agent._initial_state', side_effect=TypeError("bad input")):
+            with pytest.raises(TypeError):
+                runtime.run({})
+            with pytest.raises(TypeError):
+                asyncio.run(runtime.arun({}))
+            with pytest.raises(TypeError):
+                run_kfm_agent({}, runtime=runtime)
+        assert runtime.generation.in_flight == 0
+
+    def test_config_change_triggers_rebuild(self, config_file):
+        factory = CountingFactory()
+        runtime = KFMAgentRuntime(graph_factory=factory, watch_paths=[str(config_file)], check_interval=0)
+        runtime.run({})
+        assert not runtime.check_for_changes()
+        config_file.write_text("global: {log_level: DEBUG}\n")
+        os.utime(config_file, ns=(0, 0))
+        assert runtime.check_for_changes()
+        with patch('src.config.config_loader.load_verification_config') as mock_load:
+            state = runtime.run({})
+        mock_load.assert_called_once_with(force_reload=True)
+        assert state["result"] == {"built": 2}
+        assert runtime.reloads == 1
+        factory.feedbacks[0].stop.assert_called_once()
+        factory.feedbacks[1].stop.assert_not_called()
+
+    def test_watched_directory_change_triggers_rebuild(self, tmp_path):
+        modules = tmp_path / "modules"
+        modules.mkdir()
+        runtime = KFMAgentRuntime(graph_factory=CountingFactory(), watch_paths=[str(modules)])
+        runtime.run({})
+        (modules / "new.module.yaml").write_text("module_name: new\n")
+        assert runtime.check_for_changes()
+
+    def test_failed_reload_keeps_serving(self, config_file):
+        factory = CountingFactory()
+        runtime = KFMAgentRuntime(graph_factory=factory, watch_paths=[str(config_file)], check_interval=0)
+        runtime.run({})
+        factory.fail_next = True
+        config_file.write_text("broken")
+        with patch('src.config.config_loader.load_verification_config'):
+            state = runtime.run({})
+        assert state["result"] == {"built": 1}
+        assert runtime.generation.number == 1
+
+    def test_in_flight_run_finishes_on_its_generation(self, config_file):
+        factory = CountingFactory()
+        runtime = KFMAgentRuntime(graph_factory=factory, watch_paths=[str(config_file)], auto_reload=False)
+        runtime.components
+        started, proceed = threading.Event(), threading.Event()
+        first_app = runtime.app
+        original_invoke = first_app.invoke
+
+        def slow_invoke(state):
+            started.set()
+            proceed.wait(5)
+            return original_invoke(state)
+
+        first_app.invoke = slow_invoke
+        results = []
+        worker = threading.Thread(target=lambda: results.append(runtime.run({})))
+        worker.start()
+        started.wait(5)
+        with patch('src.config.config_loader.load_verification_config'):
+            runtime.reload()
+        factory.feedbacks[0].stop.assert_not_called()  # Still in use
+        proceed.set()
+        worker.join(5)
+        assert results[0]["result"] == {"built": 1}
+        factory.feedbacks[0].stop.assert_called_once()
+        assert runtime.run({})["result"] == {"built": 2}
+
+    @pytest.mark.asyncio
+    async def test_concurrent_async_runs_share_one_build(self, config_file):
+        factory = CountingFactory()
+        runtime = KFMAgentRuntime(graph_factory=factory, watch_paths=[str(config_file)])
+        states = await asyncio.gather(*(runtime.arun({"i": i}, task_name=f"t{i}") for i in range(10)))
+        assert factory.builds == 1
+        assert [state["input"]["i"] for state in states] == list(range(10))
+
+    @pytest.mark.asyncio
+    async def test_async_build_does_not_block_the_event_loop(self, config_file):
+        factory = CountingFactory()
+        building, finish_build = threading.Event(), threading.Event()
+
+        def slow_factory():
+            building.set()
+            finish_build.wait(5)
+            return factory()
+
+        runtime = KFMAgentRuntime(graph_factory=slow_factory, watch_paths=[str(config_file)])
+        run = asyncio.ensure_future(runtime.arun({"text": "x"}))
+        assert await asyncio.to_thread(building.wait, 5)
+        assert not run.done()  # The loop is free while the build runs
+        finish_build.set()
+        assert (await run)["result"] == {"built": 1}
+        assert runtime.generation.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_async_run_during_build_releases_its_generation(self, config_file):
+        factory = CountingFactory()
+        building, finish_build = threading.Event(), threading.Event()
+
+        def slow_factory():
+            building.set()
+            finish_build.wait(5)
+            return factory()
+
+        runtime = KFMAgentRuntime(graph_factory=slow_factory, watch_paths=[str(config_file)])
+        run = asyncio.ensure_future(runtime.arun({"text": "x"}))
+        assert await asyncio.to_thread(building.wait, 5)
+        run.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await run
+        finish_build.set()
+        for _ in range(100):
+            if runtime.generation is not None and runtime.generation.in_flight == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert runtime.generation.in_flight == 0
+        assert (await runtime.arun({"text": "y"}))["result"] == {"built": 1}
+
+    @patch('src.kfm_agent.create_kfm_agent_graph')
+    def test_run_kfm_agent_reuses_runtime(self, mock_create_graph, config_file):
+        runtime = KFMAgentRuntime(graph_factory=CountingFactory(), watch_paths=[str(config_file)])
+        first = run_kfm_agent({"text": "a"}, task_name="one", runtime=runtime)
+        second = run_kfm_agent({"text": "b"}, task_name="two", runtime=runtime)
+        mock_create_graph.assert_not_called()
+        assert first["result"] == second["result"] == {"built": 1}
+        assert runtime.generation.in_flight == 0
+
+    @patch('src.kfm_agent.create_kfm_agent_graph')
+    def test_run_kfm_agent_stops_feedback_of_its_own_graph(self, mock_create_graph):
+        app, components = CountingFactory()()
+        mock_create_graph.return_value = (app, components)
+        state = run_kfm_agent({"text": "a"}, task_name="one")
+        assert state["result"] == {"built": 1}
+        components["engine"].metrics_feedback.stop.assert_called_once()
+        components["engine"].close.assert_called_once()
+
+
+def test_failed_agent_setup_does_not_start_metrics_feedback():
+    from src import factory
+    failing_embeddings = MagicMock()
+    failing_embeddings.EmbeddingService.side_effect = RuntimeError("no model")
+    # The factory still registers components through the older registry API
+    registry = MagicMock(spec=ComponentRegistry)
+    registry.register_component = MagicMock()
+    registry.set_default_component = MagicMock()
+    registry.get_default_component_key = MagicMock(return_value="analyze_balanced")
+    fake_modules = {"src.core.embedding_service": failing_embeddings, "src.core.memory.chroma_manager": MagicMock()}
+    with patch.dict('sys.modules', fake_modules), \
+            patch.object(factory, 'load_verification_config', return_value=MagicMock()), \
+            patch.object(factory, 'ComponentRegistry', return_value=registry), \
+            patch.object(factory, 'MetricsFeedbackChannel') as channel:
+        with pytest.raises(RuntimeError):
+            factory.create_kfm_agent()
+    channel.return_value.start.assert_not_called()
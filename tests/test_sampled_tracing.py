@@ -0,0 +1,151 @@
+import asyncio
+
+import pytest
+
+from src.sampled_tracing import SampledTracer
+from src.tracing import (
+    disable_sampled_tracing, enable_sampled_tracing, get_trace_history, reset_correlation_id, reset_trace_history,
+    save_trace_to_file, trace_node, trace_run,
+)
+
+
+@trace_node
+def monitor(state):
+    return {"performance_data": {"latency": 0.1}}
+
+
+@trace_node
+async def decide(state):
+    await asyncio.sleep(0)
+    if state.get("fail"):
+        raise RuntimeError("planner failed")
+    return {"kfm_action": {"action": "Marry", "component": "c"}}
+
+
+def run_once(fail=False):
+    with trace_run() as correlation_id:
+        # Like LangGraph, each node sees a fresh state rather than one mutated in place
+        state = {"input": {"text": "x"}, "fail": fail}
+        state = {**state, **monitor(state)}
+        try:
+            asyncio.run(decide(state))
+        except RuntimeError:
+            pass
+        return correlation_id
+
+
+@pytest.fixture(autouse=True)
+def clean():
+    reset_trace_history()
+    reset_correlation_id()
+    yield
+    disable_sampled_tracing()
+    reset_trace_history()
+
+
+def test_sampled_runs_record_spans_not_history():
+    tracer = enable_sampled_tracing(sample_rate=1.0, capacity=16)
+    correlation_id = run_once()
+    assert get_trace_history() == []
+    spans = tracer.spans()
+    assert [span.node for span in spans] == ["monitor", "decide"]
+    assert {span.correlation_id for span in spans} == {correlation_id}
+    assert [span.execution_id for span in spans] == [1, 2]
+
+
+def test_unsampled_runs_are_dropped():
+    tracer = enable_sampled_tracing(sample_rate=0.0)
+    for _ in range(5):
+        run_once()
+    assert tracer.spans() == []
+    assert tracer.stats()["runs_unsampled"] == 5
+
+
+def test_head_sampling_decides_per_run():
+    tracer = enable_sampled_tracing(sample_rate=0.5, seed=7)
+    for _ in range(200):
+        run_once()
+    stats = tracer.stats()
+    assert stats["runs_sampled"] + stats["runs_unsampled"] == 200
+    assert 60 < stats["runs_sampled"] < 140
+    by_run = {}
+    for span in tracer.spans():
+        by_run.setdefault(span.correlation_id, []).append(span.node)
+    assert all(nodes == ["monitor", "decide"] for nodes in by_run.values())
+
+
+def test_errors_are_always_sampled_with_the_whole_run():
+    tracer = enable_sampled_tracing(sample_rate=0.0)
+    run_once()
+    correlation_id = run_once(fail=True)
+    spans = tracer.spans()
+    assert [span.node for span in spans] == ["monitor", "decide"]
+    assert {span.correlation_id for span in spans} == {correlation_id}
+    assert tracer.stats()["runs_promoted"] == 1
+    assert spans[-1].error_type == "RuntimeError"
+
+
+def test_cancelled_node_is_recorded_as_cancelled():
+    @trace_node
+    async def hang(state):
+        await asyncio.sleep(10)
+
+    async def cancel_run():
+        with trace_run():
+            task = asyncio.ensure_future(hang({"input": {}}))
+            await asyncio.sleep(0)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+    tracer = enable_sampled_tracing(sample_rate=1.0)
+    asyncio.run(cancel_run())
+    span = tracer.spans()[-1]
+    assert span.node == "hang" and span.cancelled and span.error_type == "CancelledError"
+    entry = span.to_trace_entry()
+    assert entry["cancelled"] is True and entry["success"] is False
+
+
+def test_ring_buffer_is_bounded():
+    tracer = enable_sampled_tracing(sample_rate=1.0, capacity=4)
+    for _ in range(5):
+        last = run_once()
+    spans = tracer.spans()
+    assert len(spans) == 4
+    assert spans[-1].correlation_id == last
+    assert tracer.stats()["spans_recorded"] == 10
+
+
+def test_export_serializes_lazily(tmp_path):
+    tracer = enable_sampled_tracing(sample_rate=1.0)
+    correlation_id = run_once(fail=True)
+    entries = tracer.export(correlation_id)
+    assert [entry["node"] for entry in entries] == ["monitor", "decide"]
+    assert entries[0]["success"] is True
+    assert "performance_data" in entries[0]["state_changes"]
+    assert entries[1]["error"]["type"] == "RuntimeError"
+    assert "planner failed" in entries[1]["error"]["traceback"]
+    assert save_trace_to_file(str(tmp_path / "trace.json"), entries)
+
+
+def test_spans_keep_a_bounded_summary_not_live_objects():
+    tracer = enable_sampled_tracing(sample_rate=1.0)
+    state = {"input": {"text": "x"}, "task_name": "t", **{f"extra_{i}": i for i in range(40)}}
+    monitor(state)
+    state["task_name"] = "replaced after the call"
+    with pytest.raises(RuntimeError):
+        asyncio.run(decide({"fail": True}))
+    ok, failed = tracer.spans()
+    assert ok.input_state is not state and len(ok.input_state) == 16
+    assert ok.input_state["input"] is state["input"] and ok.input_state["task_name"] == "t"
+    assert not hasattr(failed, "exception")
+    assert failed.error_message == "planner failed"
+    assert failed.error_frames[-1].name == "decide" and failed.error_frames[-1].locals is None
+    assert ok.to_trace_entry()["input_state"]["task_name"] == "t"
+
+
+def test_invalid_configuration():
+    with pytest.raises(ValueError):
+        SampledTracer(sample_rate=1.5)
+    with pytest.raises(ValueError):
+        SampledTracer(capacity=0)
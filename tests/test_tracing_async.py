@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+from src.tracing import (
+    get_correlation_id, get_trace_history, reset_correlation_id, reset_trace_history, set_correlation_id,
+    trace_node, trace_run,
+)
+
+
+@trace_node
+async def slow_node(state):
+    await asyncio.sleep(0.05)
+    return {"result": {"value": state["input"] * 2}}
+
+
+@trace_node
+async def failing_node(state):
+    await asyncio.sleep(0.01)
+    raise ValueError("boom")
+
+
+@trace_node
+def sync_node(state):
+    return {"done": True}
+
+
+@pytest.fixture(autouse=True)
+def clean_history():
+    reset_trace_history()
+    reset_correlation_id()
+    yield
+    reset_trace_history()
+    reset_correlation_id()
+
+
+@pytest.mark.asyncio
+async def test_async_node_duration_covers_await():
+    result = await slow_node({"input": 21})
+    assert result == {"result": {"value": 42}}
+    entry = get_trace_history()[-1]
+    assert entry["node"] == "slow_node" and entry["success"] is True
+    assert entry["duration"] >= 0.05
+    assert entry["output_state"] is not None and "result" in entry["state_changes"]
+
+
+@pytest.mark.asyncio
+async def test_async_node_error_is_traced_after_await():
+    with pytest.raises(ValueError):
+        await failing_node({"input": 1})
+    entry = get_trace_history()[-1]
+    assert entry["success"] is False and entry["error"]["type"] == "ValueError"
+    assert "boom" in entry["error"]["traceback"]
+    assert entry["duration"] >= 0.01
+
+
+@pytest.mark.asyncio
+async def test_cancelled_async_node_is_traced():
+    task = asyncio.ensure_future(slow_node({"input": 1}))
+    await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    entry = get_trace_history()[-1]
+    assert entry["node"] == "slow_node"
+    assert entry["success"] is False and entry["cancelled"] is True
+    assert entry["error"]["type"] == "CancelledError"
+    assert entry["duration"] >= 0.01
+
+
+def test_sync_node_still_traced():
+    assert sync_node({"done": False}) == {"done": True}
+    entry = get_trace_history()[-1]
+    assert entry["node"] == "sync_node"
+    assert entry["state_changes"]["done"]["after"] is True
+
+
+@pytest.mark.asyncio
+async def test_concurrent_runs_keep_their_own_context():
+    async def run(i):
+        with trace_run(f"run-{i}") as correlation_id:
+            await slow_node({"input": i})
+            await slow_node({"input": i})
+            return correlation_id
+
+    correlation_ids = await asyncio.gather(*(run(i) for i in range(3)))
+    assert correlation_ids == ["run-0", "run-1", "run-2"]
+    for correlation_id in correlation_ids:
+        entries = [e for e in get_trace_history() if e["correlation_id"] == correlation_id]
+        assert [e["execution_id"] for e in entries] == [1, 2]
+
+
+def test_trace_run_restores_previous_context():
+    set_correlation_id("outer")
+    with trace_run() as inner:
+        assert get_correlation_id() == inner != "outer"
+    assert get_correlation_id() == "outer"